@@ -22,6 +22,7 @@ from jq.client import JupyterHubClient
 from jq.exceptions import JQAuthError, JQError, JQExecutionError
 from jq.runner import (
     JoinQuantRunner,
+    KernelPool,
     KernelSession,
 )
 
@@ -35,6 +36,7 @@ __all__ = [
     "JQExecutionError",
     "JupyterHubClient",
     "JoinQuantRunner",
+    "KernelPool",
     "KernelSession",
     "parse_cookie_string",
 ]
@@ -4,8 +4,10 @@
 存储由 :mod:`jq.cache_store` 提供(按月分片 + 原子写 + 版本隔离).
 
 缓存目录: ``<CWD>/.jqcache/``(可用环境变量 ``JQ_CACHE_DIR`` 覆盖).
-缓存格式: pickle(pandas 原生,零额外依赖). 仅读取本引擎自己写入的文件,
-信任边界为本地文件系统.
+缓存格式: 默认 pickle(pandas 原生,零额外依赖); 行情月分片可选 parquet
+(``DataCache(shard_format='parquet')`` 或环境变量 ``JQ_CACHE_FORMAT``, 需 pyarrow),
+列式存储只解码请求的字段、体积更小. 旧 pickle 缓存用 :meth:`DataCache.migrate_shards`
+原地转换. 仅读取本引擎自己写入的文件, 信任边界为本地文件系统.
 
 使用方式::
 
@@ -33,12 +35,16 @@
 
     dc.status()   # 缓存统计
     dc.clear()    # 清空缓存
+    dc.migrate_shards('parquet')   # pickle 分片原地转 parquet
+    dc.consolidate_shards()        # 已收盘月份合并为按年的多标的文件
 """
 
 from __future__ import annotations
 
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from pathlib import Path
 
@@ -47,6 +53,8 @@ import pandas as pd
 from jq.auth import DEFAULT_BASE_URL, CookieStore
 from jq.cache_store import (
     CACHE_VERSION,
+    PACKED_INDEX_SUFFIX,
+    SHARD_FORMATS,
     MonthlyShardStore,
     SnapshotStore,
     current_month,
@@ -57,11 +65,18 @@ from jq.cache_store import (
     norm_date,
 )
 from jq.exceptions import JQExecutionError
-from jq.runner import JoinQuantRunner
+from jq.runner import JoinQuantRunner, KernelPool
 from jq.serialize import PICKLE_END, PICKLE_START, PICKLE_TRAILER, decode_result
 
 DEFAULT_CACHE_DIR = Path(os.environ.get("JQ_CACHE_DIR", Path.cwd() / ".jqcache"))
 
+#: 默认持久 kernel 数, 可用 ``JQ_KERNELS`` 覆盖. >1 时远程执行走 :class:`KernelPool`,
+#: ``get_price_batch`` 的分块并发下发.
+DEFAULT_KERNELS = int(os.environ.get("JQ_KERNELS", "1"))
+
+#: 行情月分片的默认格式(``pickle`` / ``parquet``), 可用 ``JQ_CACHE_FORMAT`` 覆盖.
+DEFAULT_SHARD_FORMAT = os.environ.get("JQ_CACHE_FORMAT", "pickle")
+
 #: 默认远程执行超时(秒). 比 runner 的 60s 大很多 —— 取数类查询
 #: (尤其批量/长区间/分钟级)轻易超过 1 分钟.
 DEFAULT_EXEC_TIMEOUT = 300.0
@@ -151,7 +166,13 @@ class DataCache:
 
     Args:
         cache_dir: 缓存目录, 默认 ``<CWD>/.jqcache/``.
-        runner: JoinQuantRunner 实例, 默认创建 persistent runner.
+        runner: JoinQuantRunner / :class:`~jq.runner.KernelPool` 实例, 默认创建
+            persistent runner(``kernels > 1`` 时为 KernelPool).
+        shard_format: 行情月分片格式, ``'pickle'`` / ``'parquet'``;
+            默认取 :data:`DEFAULT_SHARD_FORMAT`.
+        kernels: 默认 runner 的持久 kernel 数, 默认取 :data:`DEFAULT_KERNELS`.
+        fetch_workers: ``get_price_batch`` 分块并发上限; 缺省取 runner 的
+            ``max_concurrency``(单 kernel runner 为 1, 即串行).
     """
 
     def __init__(
@@ -160,26 +181,49 @@ class DataCache:
         runner: JoinQuantRunner | None = None,
         *,
         exec_timeout: float = DEFAULT_EXEC_TIMEOUT,
+        shard_format: str | None = None,
+        kernels: int | None = None,
+        fetch_workers: int | None = None,
     ) -> None:
         self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.bars = MonthlyShardStore(self.cache_dir)
+        self.bars = MonthlyShardStore(
+            self.cache_dir, shard_format or DEFAULT_SHARD_FORMAT
+        )
         self.snapshots = SnapshotStore(self.cache_dir)
         self.exec_timeout = float(exec_timeout)
+        self.kernels = max(1, int(kernels if kernels is not None else DEFAULT_KERNELS))
+        self.fetch_workers = fetch_workers
         self._runner = runner
+        self._runner_lock = threading.Lock()
         self._runner_kwargs = {
             "base_url": DEFAULT_BASE_URL,
             "persistent": True,
         }
 
     @property
-    def runner(self) -> JoinQuantRunner:
+    def runner(self) -> JoinQuantRunner | KernelPool:
         """懒创建 runner —— 纯缓存命中的查询无需建立远程连接."""
-        if self._runner is None:
-            self._runner = JoinQuantRunner(
-                cookie_store=CookieStore(), **self._runner_kwargs
-            )
-        return self._runner
+        with self._runner_lock:
+            if self._runner is None:
+                if self.kernels > 1:
+                    self._runner = KernelPool(
+                        self.kernels,
+                        base_url=self._runner_kwargs["base_url"],
+                        cookie_store=CookieStore(),
+                    )
+                else:
+                    self._runner = JoinQuantRunner(
+                        cookie_store=CookieStore(), **self._runner_kwargs
+                    )
+            return self._runner
+
+    def _fetch_parallelism(self, n_tasks: int) -> int:
+        """远程分块的并发度: min(fetch_workers, runner 并发上限, 任务数)."""
+        limit = getattr(self.runner, "max_concurrency", 1)
+        if self.fetch_workers is not None:
+            limit = min(limit, self.fetch_workers)
+        return max(1, min(int(limit), n_tasks))
 
     # ==================================================================
     # 远程执行
@@ -188,7 +232,7 @@ class DataCache:
     def _fetch_raw(self, user_code: str, *, timeout: float | None = None):
         """执行远程代码, 返回反序列化的 ``__result__``.
 
-        用 base64 pickle 传输(而非 JSON table), 绕过本地/聚宽 pandas
+        用 zlib 压缩的分块 pickle 传输(而非 JSON table), 绕过本地/聚宽 pandas
         版本间的兼容性问题; 详见 :mod:`jq.serialize`.
 
         Args:
@@ -221,6 +265,23 @@ class DataCache:
             )
         return df[list(fields)]
 
+    @staticmethod
+    def _bar_columns(
+        fields: list[str] | None, fq: str | None, skip_paused: bool
+    ) -> list[str] | None:
+        """行情缓存需读出的列: 请求字段 + 复权换算/停牌过滤依赖的列.
+
+        ``fields`` 为空表示要全部列, 返回 None(不做列裁剪).
+        """
+        if not fields:
+            return None
+        cols = dict.fromkeys(fields)
+        if fq != "post":
+            cols["factor"] = None
+        if skip_paused:
+            cols["paused"] = None
+        return list(cols)
+
     @staticmethod
     def _to_date_index(
         df: pd.DataFrame, date_col: str, truncate: bool = False
@@ -311,6 +372,7 @@ class DataCache:
         call_builder,
         date_col: str = "date",
         truncate_date: bool = False,
+        columns: list[str] | None = None,
     ) -> pd.DataFrame:
         """按月分片的时间序列查询(缺失月才远程补查).
 
@@ -323,6 +385,7 @@ class DataCache:
             date_col: 日期列名(用于把数字 index 转成日期 index);
                 空串表示数据天然以日期为 index.
             truncate_date: 日期列含时分秒时截断到日.
+            columns: 只从缓存读这些列(None 为全部); 本次新取数据不裁剪.
         """
         start = norm_date(start_date)
         end = norm_date(end_date)
@@ -350,7 +413,7 @@ class DataCache:
             if len(df) > 0:
                 fresh.append(df)
 
-        cached = self.bars.read_range(kind, security, start, end, variant)
+        cached = self.bars.read_range(kind, security, start, end, variant, columns)
         return self._combine(cached, fresh, start, end)
 
     @staticmethod
@@ -458,6 +521,7 @@ class DataCache:
                 f"frequency={frequency!r}, fq='post', fields={req_fields!r})"
             ),
             date_col="",  # get_price 天然以日期为 index
+            columns=self._bar_columns(fields, fq, skip_paused),
         )
         if len(df) == 0:
             return df
@@ -543,13 +607,12 @@ class DataCache:
         start, end = self._resolve_range(start_date, end_date, count)
         variant = f"{frequency}__post"
         codes = list(dict.fromkeys(securities))
+        columns = self._bar_columns(fields, fq, skip_paused)
 
         # 1. 按"缺失月集合"分组, 同组标的可共用一次远程调用
         need: dict[tuple[str, str], list[str]] = {}
-        for code in codes:
-            missing = self.bars.missing_months(
-                "get_price", code, start, end, variant
-            )
+        all_missing = self.bars.missing_months_many("get_price", codes, start, end, variant)
+        for code, missing in all_missing.items():
             for gap in merge_consecutive_months(missing):
                 need.setdefault(gap, []).append(code)
 
@@ -557,7 +620,7 @@ class DataCache:
         #    分块尺寸同时受两个上限约束: 标的数(chunk_size) 与
         #    工作量(max_symbol_months = 标的数 × 月数)。后者不可缺 ——
         #    否则 40只×24月 会作为单次请求发出并得到空 stdout(无错误)。
-        fresh: dict[str, list[pd.DataFrame]] = {}
+        tasks: list[tuple[str, str, list[str], str]] = []
         for (gap_start, gap_end), group in need.items():
             n_months = max(1, len(months_between(gap_start, gap_end)))
             by_workload = max(1, max_symbol_months // n_months)
@@ -570,21 +633,23 @@ class DataCache:
                     f"end_date={gap_end!r}, frequency={frequency!r}, "
                     f"fq='post', fields={bar_fields_for(frequency)!r}, panel=False)"
                 )
-                raw = self._fetch_raw(
-                    code_str, timeout=self._batch_timeout(len(chunk), gap_start, gap_end)
-                )
-                per_code = self._store_batch_result(
-                    raw, chunk, gap_start, gap_end, variant
-                )
-                for code, df in per_code.items():
-                    if len(df) > 0:
-                        fresh.setdefault(code, []).append(df)
+                tasks.append((gap_start, gap_end, chunk, code_str))
 
-        # 3. 从缓存 + 新取数据组装结果
+        fresh: dict[str, list[pd.DataFrame]] = {}
+        for (gap_start, gap_end, chunk, _), raw in zip(tasks, self._fetch_chunks(tasks), strict=True):
+            per_code = self._store_batch_result(
+                raw, chunk, gap_start, gap_end, variant
+            )
+            for code, df in per_code.items():
+                if len(df) > 0:
+                    fresh.setdefault(code, []).append(df)
+
+        # 3. 从缓存 + 新取数据组装结果(按年合并的文件每年只解码一次)
+        cached = self.bars.read_range_many("get_price", codes, start, end, variant, columns)
         out: dict[str, pd.DataFrame] = {}
         for code in codes:
             df = self._combine(
-                self.bars.read_range("get_price", code, start, end, variant),
+                cached[code],
                 fresh.get(code, []),
                 start,
                 end,
@@ -600,6 +665,35 @@ class DataCache:
             out[code] = df
         return out
 
+    def _fetch_chunks(self, tasks: list[tuple[str, str, list[str], str]]):
+        """按序产出各分块的远程结果; runner 支持并发(KernelPool)时分块并发下发.
+
+        结果按提交顺序交回调用方(落盘仍在调用线程串行进行);
+        任一分块失败即取消尚未开始的分块并抛出.
+        """
+        if not tasks:
+            return
+        workers = self._fetch_parallelism(len(tasks))
+
+        def fetch(task):
+            gap_start, gap_end, chunk, code_str = task
+            return self._fetch_raw(
+                code_str, timeout=self._batch_timeout(len(chunk), gap_start, gap_end)
+            )
+
+        if workers <= 1:
+            for task in tasks:
+                yield fetch(task)
+            return
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jq-batch") as ex:
+            futures = [ex.submit(fetch, task) for task in tasks]
+            try:
+                for f in futures:
+                    yield f.result()
+            finally:
+                for f in futures:
+                    f.cancel()
+
     def _batch_timeout(self, n_symbols: int, start: str, end: str) -> float:
         """批量查询的自适应超时: 按 (标的数 × 月数) 规模线性放大.
 
@@ -1402,7 +1496,7 @@ class DataCache:
     # ==================================================================
 
     def status(self) -> dict:
-        """返回缓存统计信息(按 bars / snapshot 分组)."""
+        """返回缓存统计信息(按 bars / packed / snapshot 分组)."""
         root = self.cache_dir / CACHE_VERSION
         out: dict = {
             "cache_dir": str(self.cache_dir),
@@ -1411,20 +1505,21 @@ class DataCache:
             "total_files": 0,
             "total_size_mb": 0.0,
             "bars": {},
+            "packed": {},
             "snapshot": {},
         }
         if not root.exists():
             return out
         total_size = 0
         total_files = 0
-        for section in ("bars", "snapshot"):
+        for section in ("bars", "packed", "snapshot"):
             sec_dir = root / section
             if not sec_dir.exists():
                 continue
             for kind_dir in sorted(sec_dir.iterdir()):
                 if not kind_dir.is_dir():
                     continue
-                files = list(kind_dir.rglob("*.pkl"))
+                files = self._cache_files(kind_dir)
                 size = sum(f.stat().st_size for f in files)
                 total_size += size
                 total_files += len(files)
@@ -1457,7 +1552,7 @@ class DataCache:
         for base in targets:
             if not base.exists():
                 continue
-            for f in base.rglob("*.pkl"):
+            for f in self._cache_files(base):
                 if cutoff and f.stat().st_mtime > cutoff:
                     continue
                 f.unlink(missing_ok=True)
@@ -1479,15 +1574,40 @@ class DataCache:
             return 0
         cur = current_month()
         count = 0
-        for f in root.rglob("*.pkl"):
+        for f in self._cache_files(root):
             if f.stem >= cur:
                 f.unlink(missing_ok=True)
                 count += 1
         return count
 
+    def migrate_shards(self, shard_format: str = "parquet") -> dict[str, int]:
+        """把行情月分片原地转换为 ``shard_format``, 此后本实例也按该格式写入.
+
+        Returns:
+            见 :meth:`MonthlyShardStore.migrate`.
+        """
+        self.bars = MonthlyShardStore(self.cache_dir, shard_format)
+        return self.bars.migrate()
+
+    def consolidate_shards(self, kinds: list[str] | None = None) -> dict[str, int]:
+        """把已收盘月份的月分片合并为按 (kind, 变体, 年) 的多标的文件.
+
+        Returns:
+            见 :meth:`MonthlyShardStore.consolidate`.
+        """
+        return self.bars.consolidate(kinds)
+
+    @staticmethod
+    def _cache_files(base: Path) -> list[Path]:
+        """``base`` 下所有缓存文件(各分片格式 + 年文件索引)."""
+        patterns = [f"*{suffix}" for suffix in (*SHARD_FORMATS.values(), PACKED_INDEX_SUFFIX)]
+        return [f for pattern in patterns for f in base.rglob(pattern)]
+
 
 __all__ = [
     "DEFAULT_CACHE_DIR",
+    "DEFAULT_KERNELS",
+    "DEFAULT_SHARD_FORMAT",
     "DataCache",
     "current_month",
     "is_today_or_future",
@@ -13,14 +13,24 @@
 - **当月不信任**: 当月及未来月的分片永远视为缺失(数据可能不完整).
 - **版本隔离**: 路径含 ``CACHE_VERSION`` 段,格式变更时旧缓存自动失效.
 - **长 key 收敛**: 文件名超长时改用 sha1 摘要,避免 OSError.
+- **分片格式可选**: 默认 pickle(零额外依赖); ``parquet`` 为列式(zstd 压缩),
+  只解码请求的列、体积显著更小, 需 pyarrow. 两种分片可共存,
+  读取时优先本存储的格式, :meth:`MonthlyShardStore.migrate` 原地转换.
+- **按年合并(可选)**: :meth:`MonthlyShardStore.consolidate` 把已收盘月份的分片
+  合并为 ``packed/{kind}/{变体}/{YYYY}`` 多标的年文件 + ``{YYYY}.index.json``
+  (内含哪些标的/月份), 全市场十年回读只碰几十个文件. 新写入仍落月分片,
+  读取时月分片优先于年文件.
 """
 
 from __future__ import annotations
 
 import hashlib
+import importlib.util
+import json
 import os
 import pickle
 import warnings
+from collections import OrderedDict
 from datetime import date
 from pathlib import Path
 
@@ -28,6 +38,16 @@ import pandas as pd
 
 CACHE_VERSION = "v2"
 
+# 月分片格式 → 文件后缀
+SHARD_FORMATS = {"pickle": ".pkl", "parquet": ".parquet"}
+
+# 按年合并文件的索引后缀, 与标的列名
+PACKED_INDEX_SUFFIX = ".index.json"
+_SECURITY_COL = "__security__"
+
+# 已解码的年文件(按标的拆好)在内存中保留的份数; 全市场一年日线约百 MB 级
+_PACKED_MEMO_SIZE = 2
+
 # 文件名单段最大长度(ext4/APFS 单文件名上限 255,留余量给后缀与分隔符)
 _MAX_KEY_LEN = 80
 
@@ -143,22 +163,31 @@ def safe_key(value: object, max_len: int = _MAX_KEY_LEN) -> str:
 # ======================================================================
 
 
+def _atomic_replace(path: Path, write) -> None:
+    """原子写入的通用骨架: ``write(tmp)`` 写临时文件后 ``os.replace``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + f".tmp.{os.getpid()}")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink(missing_ok=True)
+
+
 def atomic_write(path: Path, obj: object) -> None:
     """原子写入 pickle: 先写同目录 ``.tmp`` 再 ``os.replace``.
 
     保证并发写或中途中断都不会产生半截文件.
     """
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + f".tmp.{os.getpid()}")
-    try:
+
+    def write(tmp: Path) -> None:
         with open(tmp, "wb") as fh:
             pickle.dump(obj, fh, protocol=4)
             fh.flush()
             os.fsync(fh.fileno())
-        os.replace(tmp, path)
-    finally:
-        if tmp.exists():
-            tmp.unlink(missing_ok=True)
+
+    _atomic_replace(path, write)
 
 
 def read_pkl(path: Path, *, warn: bool = True) -> object | None:
@@ -178,6 +207,76 @@ def read_pkl(path: Path, *, warn: bool = True) -> object | None:
         return None
 
 
+def atomic_write_parquet(path: Path, df: pd.DataFrame, group_by: str | None = None) -> None:
+    """原子写入 parquet(zstd 压缩, 保留 index).
+
+    ``group_by`` 给出时 ``df`` 须已按该列排好, 每个取值写成一个 row group ——
+    按该列过滤读取(``read_parquet(filters=...)``)时只解码命中的 row group。
+    """
+    if group_by is None:
+        _atomic_replace(path, lambda tmp: df.to_parquet(tmp, compression="zstd"))
+        return
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df)
+    keys = df[group_by].to_numpy()
+    bounds = [0, *(i for i in range(1, len(keys)) if keys[i] != keys[i - 1]), len(keys)]
+
+    def write(tmp: Path) -> None:
+        with pq.ParquetWriter(tmp, table.schema, compression="zstd") as writer:
+            if len(keys) == 0:
+                writer.write_table(table)
+            for lo, hi in zip(bounds[:-1], bounds[1:], strict=True):
+                if hi > lo:
+                    writer.write_table(table.slice(lo, hi - lo))
+
+    _atomic_replace(path, write)
+
+
+def read_parquet(
+    path: Path,
+    columns: list[str] | None = None,
+    *,
+    filters: list[tuple] | None = None,
+    warn: bool = True,
+) -> pd.DataFrame | None:
+    """读取 parquet 分片, 只解码 ``columns``(不存在的列忽略).
+
+    ``filters`` 透传给 pyarrow(按 row group 统计跳过不命中的块).
+    文件不存在返回 None;损坏时告警后返回 None.
+    """
+    if not path.exists():
+        return None
+    try:
+        if columns is not None:
+            import pyarrow.parquet as pq
+
+            names = set(pq.read_schema(path).names)
+            columns = [c for c in columns if c in names]
+        return pd.read_parquet(path, columns=columns, filters=filters)
+    except Exception as exc:  # noqa: BLE001
+        if warn:
+            warnings.warn(
+                f"缓存文件损坏,将重新远程取数: {path} ({type(exc).__name__}: {exc})",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+        return None
+
+
+def _check_shard_format(shard_format: str) -> str:
+    if shard_format not in SHARD_FORMATS:
+        raise ValueError(
+            f"shard_format 只能是 {sorted(SHARD_FORMATS)}, 收到 {shard_format!r}"
+        )
+    if shard_format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        raise ImportError(
+            "shard_format='parquet' 需要 pyarrow: pip install pyarrow"
+        )
+    return shard_format
+
+
 # ======================================================================
 # 月分片存储
 # ======================================================================
@@ -188,10 +287,16 @@ class MonthlyShardStore:
 
     Args:
         root: 缓存根目录.
+        shard_format: 新写分片的格式, ``'pickle'``(默认, ``.pkl``) 或
+            ``'parquet'``(列式, ``.parquet``, 需 pyarrow). 另一格式的既有分片
+            照常可读, 不会被视为缺失.
     """
 
-    def __init__(self, root: Path):
+    def __init__(self, root: Path, shard_format: str = "pickle"):
         self.root = Path(root)
+        self.shard_format = _check_shard_format(shard_format)
+        self._index_memo: dict[Path, tuple[int, dict]] = {}
+        self._packed_memo: OrderedDict[tuple, dict[str, pd.DataFrame]] = OrderedDict()
 
     # ---------------- 路径 ----------------
 
@@ -208,7 +313,28 @@ class MonthlyShardStore:
     def shard_path(
         self, kind: str, security: object, ym: str, variant: str = "default"
     ) -> Path:
-        return self.shard_dir(kind, security, variant) / f"{ym}.pkl"
+        suffix = SHARD_FORMATS[self.shard_format]
+        return self.shard_dir(kind, security, variant) / f"{ym}{suffix}"
+
+    def packed_dir(self, kind: str, variant: str = "default") -> Path:
+        return self.root / CACHE_VERSION / "packed" / safe_key(kind) / safe_key(variant)
+
+    def _monthly_shards(
+        self, kind: str, security: object, variant: str
+    ) -> dict[str, Path]:
+        """该标的已落盘的月分片 ``{YYYY-MM: path}``(一次 listdir, 同月优先本存储格式)."""
+        d = self.shard_dir(kind, security, variant)
+        try:
+            names = os.listdir(d)
+        except (FileNotFoundError, NotADirectoryError):
+            return {}
+        own = SHARD_FORMATS[self.shard_format]
+        out: dict[str, Path] = {}
+        for name in names:
+            stem, suffix = os.path.splitext(name)
+            if suffix in SHARD_FORMATS.values() and (stem not in out or suffix == own):
+                out[stem] = d / name
+        return out
 
     # ---------------- 查询缺失 ----------------
 
@@ -223,18 +349,66 @@ class MonthlyShardStore:
         """返回需要远程取数的月份列表.
 
         缺失判定:
-        - 分片文件不存在 → 缺失(从未查过)
+        - 月分片(任一格式)与年文件索引中都没有 → 缺失(从未查过)
         - 月份 >= 当前月 → 缺失(数据可能不完整,永不信任)
         """
+        return self._missing_many(kind, [security], start, end, variant)[0]
+
+    def missing_months_many(
+        self,
+        kind: str,
+        securities: list,
+        start: object,
+        end: object,
+        variant: str = "default",
+    ) -> dict:
+        """多标的版 :meth:`missing_months`(年文件索引每年只读一次)."""
+        securities = list(dict.fromkeys(securities))
+        return dict(zip(
+            securities, self._missing_many(kind, securities, start, end, variant), strict=True
+        ))
+
+    def _missing_many(
+        self, kind: str, securities: list, start: object, end: object, variant: str
+    ) -> list[list[str]]:
         cur = current_month()
+        months = months_between(start, end)
+        indexes = {
+            year: self.packed_index(kind, variant, year)
+            for year in {ym[:4] for ym in months if ym < cur}
+        }
         out = []
-        for ym in months_between(start, end):
-            if ym >= cur or not self.shard_path(kind, security, ym, variant).exists():
-                out.append(ym)
+        for sec in securities:
+            shards = self._monthly_shards(kind, sec, variant)
+            key = safe_key(sec)
+            packed = {
+                year: index[key]["months"] for year, index in indexes.items() if key in index
+            }
+            out.append([
+                ym for ym in months
+                if ym >= cur or (ym not in shards and ym not in packed.get(ym[:4], ()))
+            ])
         return out
 
     # ---------------- 读 ----------------
 
+    @staticmethod
+    def read_shard(
+        path: Path, columns: list[str] | None = None
+    ) -> pd.DataFrame | None:
+        """读单个分片; ``columns`` 非 None 时只返回其中存在的列.
+
+        parquet 分片只解码这些列; pickle 分片整体反序列化后再取列.
+        """
+        if path.suffix == SHARD_FORMATS["parquet"]:
+            return read_parquet(path, columns)
+        df = read_pkl(path)
+        if not isinstance(df, pd.DataFrame):
+            return None
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        return df
+
     def read_range(
         self,
         kind: str,
@@ -242,21 +416,168 @@ class MonthlyShardStore:
         start: object,
         end: object,
         variant: str = "default",
+        columns: list[str] | None = None,
     ) -> pd.DataFrame:
         """读取 ``[start, end]`` 覆盖月份的所有已缓存数据(不含缺失月).
 
         返回按 index 升序、已按 [start, end] 精确切片的 DataFrame.
+        ``columns`` 非 None 时只读这些列(分片中不存在的列忽略).
         """
-        frames = []
-        for ym in months_between(start, end):
-            df = read_pkl(self.shard_path(kind, security, ym, variant))
-            if isinstance(df, pd.DataFrame) and len(df) > 0:
-                frames.append(df)
-        if not frames:
-            return pd.DataFrame()
-        merged = pd.concat(frames).sort_index()
-        merged = merged[~merged.index.duplicated(keep="last")]
-        return merged.loc[norm_date(start) : norm_date(end)]
+        return self._read_many(kind, [security], start, end, variant, columns)[0]
+
+    def read_range_many(
+        self,
+        kind: str,
+        securities: list,
+        start: object,
+        end: object,
+        variant: str = "default",
+        columns: list[str] | None = None,
+    ) -> dict:
+        """多标的版 :meth:`read_range`, 返回 ``{security: DataFrame}``.
+
+        每个年文件只解码一次再按标的拆分; 月分片逐标的读取并覆盖年文件中的同月数据.
+        """
+        securities = list(dict.fromkeys(securities))
+        frames = self._read_many(kind, securities, start, end, variant, columns)
+        return dict(zip(securities, frames, strict=True))
+
+    def _read_many(
+        self,
+        kind: str,
+        securities: list,
+        start: object,
+        end: object,
+        variant: str,
+        columns: list[str] | None,
+    ) -> list[pd.DataFrame]:
+        lo, hi = norm_date(start), norm_date(end)
+        months = months_between(lo, hi)
+        plan = []
+        for sec in securities:
+            shards = self._monthly_shards(kind, sec, variant)
+            own = [ym for ym in months if ym in shards]
+            frames = [self.read_shard(shards[ym], columns) for ym in own]
+            plan.append((safe_key(sec), set(own), frames))
+
+        for year in sorted({ym[:4] for ym in months}):
+            index = self.packed_index(kind, variant, year)
+            if not any(key in index for key, _, _ in plan):
+                continue
+            wanted = [key for key, _, _ in plan if key in index]
+            groups = self._packed_groups(
+                kind, variant, year, columns,
+                keys=wanted if len(wanted) < len(index) else None,
+                keep=len({ym[:4] for ym in months}),
+            )
+            for key, own, frames in plan:
+                df = groups.get(key)
+                if df is None or key not in index:
+                    continue
+                df = df.loc[lo:hi]
+                shadowed = [ym for ym in own if ym[:4] == year]
+                if shadowed and len(df) > 0:
+                    df = df[~df.index.strftime("%Y-%m").isin(shadowed)]
+                keep = index[key]["columns"]
+                frames.append(df[[c for c in df.columns if c in keep]])
+
+        out = []
+        for _, _, frames in plan:
+            frames = [f for f in frames if isinstance(f, pd.DataFrame) and len(f) > 0]
+            if not frames:
+                out.append(pd.DataFrame())
+                continue
+            merged = pd.concat(frames).sort_index()
+            merged = merged[~merged.index.duplicated(keep="last")]
+            out.append(merged.loc[lo:hi])
+        return out
+
+    # ---------------- 年文件 ----------------
+
+    def _packed_data(self, kind: str, variant: str, year: str) -> Path | None:
+        """年文件路径(优先本存储格式), 不存在返回 None."""
+        base = self.packed_dir(kind, variant) / year
+        own = SHARD_FORMATS[self.shard_format]
+        for suffix in (own, *SHARD_FORMATS.values()):
+            path = base.with_suffix(suffix)
+            if path.exists():
+                return path
+        return None
+
+    def packed_index(self, kind: str, variant: str, year: str) -> dict[str, dict]:
+        """年文件索引 ``{safe_key(标的): {"months": set, "columns": list}}``.
+
+        年文件本身缺失时(如被 ``clear`` 按时间删掉)索引视为空.
+        """
+        path = self.packed_dir(kind, variant) / f"{year}{PACKED_INDEX_SUFFIX}"
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        if self._packed_data(kind, variant, year) is None:
+            return {}
+        hit = self._index_memo.get(path)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))["securities"]
+        except (OSError, ValueError, KeyError) as exc:
+            warnings.warn(
+                f"年文件索引损坏,相关月份将重新远程取数: {path} ({type(exc).__name__}: {exc})",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+            return {}
+        index = {
+            key: {"months": set(e["months"]), "columns": list(e["columns"])}
+            for key, e in raw.items()
+        }
+        self._index_memo[path] = (mtime, index)
+        return index
+
+    def _packed_groups(
+        self,
+        kind: str,
+        variant: str,
+        year: str,
+        columns: list[str] | None,
+        keys: list[str] | None = None,
+        keep: int = 0,
+    ) -> dict[str, pd.DataFrame]:
+        """解码年文件并按标的拆分(近期的几份留在内存, 以文件 mtime 失效).
+
+        ``keys`` 给出时只需这些标的: parquet 年文件按 ``__security__`` 过滤, 只解码
+        对应 row group; pickle 年文件只能整体解码, 此时忽略 ``keys``。``keep`` 为本次
+        请求跨越的年数, 内存里至少留这么多份 —— 逐标的循环读多年区间时, 整体解码的
+        年文件不会在相邻两个标的之间被挤出去重解。
+        """
+        path = self._packed_data(kind, variant, year)
+        if path is None:
+            return {}
+        if path.suffix != SHARD_FORMATS["parquet"]:
+            keys = None
+        memo = self._packed_memo
+        key = (path, path.stat().st_mtime_ns, None if columns is None else tuple(columns),
+               None if keys is None else tuple(sorted(keys)))
+        if key in memo:
+            memo.move_to_end(key)
+            return memo[key]
+        wanted = None if columns is None else [*columns, _SECURITY_COL]
+        if keys is None:
+            df = self.read_shard(path, wanted)
+        else:
+            df = read_parquet(path, wanted, filters=[(_SECURITY_COL, "in", list(keys))])
+        groups: dict[str, pd.DataFrame] = {}
+        if isinstance(df, pd.DataFrame) and _SECURITY_COL in df.columns:
+            for sec, part in df.groupby(_SECURITY_COL, sort=False):
+                part = part.drop(columns=_SECURITY_COL)
+                if not part.index.is_monotonic_increasing:
+                    part = part.sort_index()
+                groups[sec] = part
+        memo[key] = groups
+        while len(memo) > max(_PACKED_MEMO_SIZE, keep):
+            memo.popitem(last=False)
+        return groups
 
     # ---------------- 写 ----------------
 
@@ -293,7 +614,178 @@ class MonthlyShardStore:
                 part = df.loc[lo:hi]
             else:
                 part = pd.DataFrame()
-            atomic_write(self.shard_path(kind, security, ym, variant), part)
+            self.write_shard(self.shard_path(kind, security, ym, variant), part)
+
+    def write_shard(self, path: Path, df: pd.DataFrame) -> Path:
+        """按 ``path`` 的后缀写单个分片, 并删除同月其他格式的旧分片.
+
+        parquet 无法表达的列(如混合类型 object 列)退回 pickle 写入,
+        返回实际写入的路径.
+        """
+        if path.suffix == SHARD_FORMATS["parquet"]:
+            try:
+                # 年文件(含标的列)每个标的一个 row group, 单标的读取只解码自己那块
+                group = _SECURITY_COL if _SECURITY_COL in df.columns else None
+                atomic_write_parquet(path, df, group_by=group)
+            except (ImportError, TypeError, ValueError) as exc:
+                # pyarrow.ArrowInvalid / ArrowTypeError 均继承自 ValueError/TypeError
+                warnings.warn(
+                    f"分片无法存为 parquet, 改用 pickle: {path} ({type(exc).__name__}: {exc})",
+                    RuntimeWarning,
+                    stacklevel=2,
+                )
+                path = path.with_suffix(SHARD_FORMATS["pickle"])
+                atomic_write(path, df)
+        else:
+            atomic_write(path, df)
+        for suffix in SHARD_FORMATS.values():
+            if suffix != path.suffix:
+                path.with_suffix(suffix).unlink(missing_ok=True)
+        return path
+
+    # ---------------- 按年合并 ----------------
+
+    def consolidate(self, kinds: list[str] | None = None) -> dict[str, int]:
+        """把已收盘月份的月分片合并进 ``packed/{kind}/{变体}/{YYYY}`` 年文件.
+
+        每个 (kind, 变体, 年) 一个多标的文件(本存储格式, 含 ``__security__`` 列)
+        和一份 ``{YYYY}.index.json`` 索引(标的 → 月份/列, 空月也记录).
+        已有年文件会与新分片合并重写(同一标的同月以新分片为准).
+        顺序为 写年文件 → 写索引 → 删月分片, 中途中断不丢数据, 重跑即可.
+
+        Args:
+            kinds: 只合并这些缓存类别, 默认全部.
+
+        Returns:
+            ``{"packed_files", "shards", "bytes_before", "bytes_after"}``.
+        """
+        stats = {"packed_files": 0, "shards": 0, "bytes_before": 0, "bytes_after": 0}
+        base = self.root / CACHE_VERSION / "bars"
+        if not base.exists():
+            return stats
+        wanted = None if kinds is None else {safe_key(k) for k in kinds}
+        cur = current_month()
+        groups: dict[tuple[str, str, str], list[tuple[str, str, Path]]] = {}
+        for kind_dir in sorted(p for p in base.iterdir() if p.is_dir()):
+            if wanted is not None and kind_dir.name not in wanted:
+                continue
+            for sec_dir in sorted(p for p in kind_dir.iterdir() if p.is_dir()):
+                for var_dir in sorted(p for p in sec_dir.iterdir() if p.is_dir()):
+                    for f in sorted(var_dir.iterdir()):
+                        ym, suffix = os.path.splitext(f.name)
+                        if suffix in SHARD_FORMATS.values() and len(ym) == 7 and ym < cur:
+                            groups.setdefault(
+                                (kind_dir.name, var_dir.name, ym[:4]), []
+                            ).append((sec_dir.name, ym, f))
+
+        for (kind, variant, year), shards in groups.items():
+            stats["bytes_before"] += self._pack_year(kind, variant, year, shards)
+            stats["packed_files"] += 1
+            stats["shards"] += len(shards)
+            data = self._packed_data(kind, variant, year)
+            stats["bytes_after"] += data.stat().st_size if data else 0
+
+        for d in sorted(
+            (p for p in base.rglob("*") if p.is_dir()),
+            key=lambda p: len(p.parts),
+            reverse=True,
+        ):
+            if not any(d.iterdir()):
+                d.rmdir()
+        return stats
+
+    def _pack_year(
+        self, kind: str, variant: str, year: str, shards: list[tuple[str, str, Path]]
+    ) -> int:
+        """合并一个 (kind, 变体, 年) 的月分片, 返回被替换文件的字节数."""
+        index = {
+            key: {"months": set(e["months"]), "columns": list(e["columns"])}
+            for key, e in self.packed_index(kind, variant, year).items()
+        }
+        old = self._packed_groups(kind, variant, year, None) if index else {}
+        old_path = self._packed_data(kind, variant, year)
+        replaced = old_path.stat().st_size if old_path and index else 0
+
+        fresh: dict[str, list[pd.DataFrame]] = {}
+        fresh_months: dict[str, set[str]] = {}
+        packed: list[Path] = []
+        for key, ym, path in shards:
+            df = self.read_shard(path)
+            if df is None:  # 损坏分片留在原处, 读取时照常视为缺失重取
+                continue
+            replaced += path.stat().st_size
+            packed.append(path)
+            entry = index.setdefault(key, {"months": set(), "columns": []})
+            entry["months"].add(ym)
+            fresh_months.setdefault(key, set()).add(ym)
+            entry["columns"] += [c for c in df.columns if c not in entry["columns"]]
+            if len(df) > 0 and isinstance(df.index, pd.DatetimeIndex):
+                fresh.setdefault(key, []).append(df)
+
+        frames = []
+        for key, df in old.items():
+            if key in fresh_months:
+                df = df[~df.index.strftime("%Y-%m").isin(fresh_months[key])]
+            frames.append(df.assign(**{_SECURITY_COL: key}))
+        for key, dfs in fresh.items():
+            frames += [df.assign(**{_SECURITY_COL: key}) for df in dfs]
+        frames = [f for f in frames if len(f) > 0]
+        data = pd.concat(frames).sort_index(kind="stable") if frames else pd.DataFrame(
+            {_SECURITY_COL: pd.Series([], dtype=object)}
+        )
+        data = data.sort_values(_SECURITY_COL, kind="stable")
+
+        pdir = self.packed_dir(kind, variant)
+        self.write_shard(pdir / f"{year}{SHARD_FORMATS[self.shard_format]}", data)
+        payload = {
+            "securities": {
+                key: {"months": sorted(e["months"]), "columns": e["columns"]}
+                for key, e in sorted(index.items())
+            }
+        }
+        _atomic_replace(
+            pdir / f"{year}{PACKED_INDEX_SUFFIX}",
+            lambda tmp: tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8"),
+        )
+        for path in packed:
+            path.unlink(missing_ok=True)
+        return replaced
+
+    # ---------------- 迁移 ----------------
+
+    def migrate(self, shard_format: str | None = None) -> dict[str, int]:
+        """把全部既有分片(含年文件)原地转换为 ``shard_format``(默认本存储的格式).
+
+        逐个分片原子写新格式后删除旧文件, 中断后重跑即可续完.
+        无法转换的分片(parquet 不支持的列类型)保留原文件.
+
+        Returns:
+            ``{"converted", "kept", "bytes_before", "bytes_after"}``.
+        """
+        target = SHARD_FORMATS[_check_shard_format(shard_format or self.shard_format)]
+        stats = {"converted": 0, "kept": 0, "bytes_before": 0, "bytes_after": 0}
+        sources = []
+        for section in ("bars", "packed"):
+            base = self.root / CACHE_VERSION / section
+            for suffix in SHARD_FORMATS.values():
+                if suffix != target and base.exists():
+                    sources += base.rglob(f"*{suffix}")
+        for src in sorted(sources):
+            df = self.read_shard(src)
+            if df is None:
+                stats["kept"] += 1
+                continue
+            size = src.stat().st_size
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                written = self.write_shard(src.with_suffix(target), df)
+            if written.suffix != target:
+                stats["kept"] += 1
+                continue
+            stats["converted"] += 1
+            stats["bytes_before"] += size
+            stats["bytes_after"] += written.stat().st_size
+        return stats
 
 
 # ======================================================================
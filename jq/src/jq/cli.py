@@ -106,6 +106,9 @@ def cmd_kernel(args: argparse.Namespace) -> int:
     runner = JoinQuantRunner(base_url=args.base_url, kernel_name=args.kernel)
     reg = KernelRegistry()
 
+    if args.pool and args.kernel_cmd in ("status", "close", "warmup"):
+        return _cmd_kernel_pool(args)
+
     if args.kernel_cmd == "status":
         data = reg.load()
         if not data:
@@ -144,6 +147,24 @@ def cmd_kernel(args: argparse.Namespace) -> int:
     return 1
 
 
+def _cmd_kernel_pool(args: argparse.Namespace) -> int:
+    from jq.runner import KernelPool
+
+    pool = KernelPool(args.pool, base_url=args.base_url, kernel_name=args.kernel)
+    if args.kernel_cmd == "status":
+        for h in pool.health():
+            kid = h["kernel_id"]
+            state = "存活 ✓" if h["alive"] else ("已死亡 ✗" if kid else "未创建")
+            print(f"  槽位 {h['slot']}: {kid[:8] + '...' if kid else '(空)':<12} {state}")
+        return 0
+    if args.kernel_cmd == "close":
+        print(f"已关闭 {pool.close()} 个池内 kernel")
+        return 0
+    kids = pool.warmup()
+    print(f"已预热 {len(kids)} 个池内 kernel(jqdata 已预加载)")
+    return 0
+
+
 def cmd_cache(args: argparse.Namespace) -> int:
     from jq.cache import DataCache
 
@@ -162,11 +183,15 @@ def cmd_cache(args: argparse.Namespace) -> int:
                     f"  {name}: {stat['symbols']} 标的, "
                     f"{stat['files']} 分片, {stat['size_kb']} KB"
                 )
+        if info["packed"]:
+            print("\n行情/时序类(按年合并):")
+            for name, stat in info["packed"].items():
+                print(f"  {name}: {stat['files']} 文件, {stat['size_kb']} KB")
         if info["snapshot"]:
             print("\n快照类:")
             for name, stat in info["snapshot"].items():
                 print(f"  {name}: {stat['files']} 文件, {stat['size_kb']} KB")
-        if not info["bars"] and not info["snapshot"]:
+        if not info["bars"] and not info["packed"] and not info["snapshot"]:
             print("\n(空)")
         return 0
 
@@ -187,6 +212,26 @@ def cmd_cache(args: argparse.Namespace) -> int:
         print(f"已删除 {n} 个当月/未来月分片(数据不完整,下次查询会重取)")
         return 0
 
+    if args.cache_cmd == "migrate":
+        st = dc.migrate_shards(args.format)
+        before = st["bytes_before"] / 1024 / 1024
+        after = st["bytes_after"] / 1024 / 1024
+        print(f"已转换 {st['converted']} 个分片为 {args.format}: {before:.2f} MB → {after:.2f} MB")
+        if st["kept"]:
+            print(f"保留原格式 {st['kept']} 个(列类型不支持或文件损坏)")
+        print(f"后续请设置 JQ_CACHE_FORMAT={args.format} 以按该格式写入新分片")
+        return 0
+
+    if args.cache_cmd == "pack":
+        st = dc.consolidate_shards(args.kind or None)
+        before = st["bytes_before"] / 1024 / 1024
+        after = st["bytes_after"] / 1024 / 1024
+        print(
+            f"已将 {st['shards']} 个月分片合并为 {st['packed_files']} 个年文件: "
+            f"{before:.2f} MB → {after:.2f} MB"
+        )
+        return 0
+
     return 1
 
 
@@ -222,6 +267,8 @@ def main(argv: list[str] | None = None) -> int:
     p_kernel = sub.add_parser("kernel", help="持久化 kernel 管理")
     p_kernel.add_argument("--base-url", default=DEFAULT_BASE_URL, help="JupyterHub 根 URL")
     p_kernel.add_argument("--kernel", default="python3", help="kernel 名")
+    p_kernel.add_argument("--pool", type=int, default=0,
+                          help="status/close/warmup 作用于 N 槽位的 KernelPool")
     ks = p_kernel.add_subparsers(dest="kernel_cmd", required=True)
     ks.add_parser("status", help="查持久化 kernel 状态")
     ks.add_parser("close", help="关闭并清理持久化 kernel")
@@ -229,7 +276,7 @@ def main(argv: list[str] | None = None) -> int:
     ks.add_parser("list", help="列所有活跃 kernel")
     p_kernel.set_defaults(func=cmd_kernel)
 
-    # jqdata cache {status|clear|prune}
+    # jqdata cache {status|clear|prune|migrate|pack}
     p_cache = sub.add_parser("cache", help="本地数据缓存管理")
     cs = p_cache.add_subparsers(dest="cache_cmd", required=True)
     cs.add_parser("status", help="查看缓存统计")
@@ -239,6 +286,12 @@ def main(argv: list[str] | None = None) -> int:
     p_cache_clear.add_argument("--all-versions", action="store_true",
                                help="连旧布局版本目录一起清除")
     cs.add_parser("prune", help="删除当月/未来月分片(修复不完整缓存)")
+    p_cache_migrate = cs.add_parser("migrate", help="行情月分片原地转换格式")
+    p_cache_migrate.add_argument("--format", choices=["parquet", "pickle"],
+                                 default="parquet", help="目标格式(默认 parquet)")
+    p_cache_pack = cs.add_parser("pack", help="已收盘月份的分片按 (类别, 变体, 年) 合并")
+    p_cache_pack.add_argument("--kind", action="append", default=None,
+                              help="只合并该缓存类别(可重复), 默认全部")
     p_cache.set_defaults(func=cmd_cache)
 
     args = parser.parse_args(argv)
@@ -44,6 +44,10 @@ from jq.auth import (
     refresh_cookies_via_browser,
 )
 from jq.exceptions import JQExecutionError
+from jq.serialize import ChunkedPayloadDecoder
+
+# 结果分块传输期间, 每收到一条 stream 消息至少再给这么多秒(见 execute)
+_STREAM_GRACE = 60.0
 
 
 class JupyterHubClient:
@@ -272,6 +276,9 @@ class JupyterHubClient:
             - ``result``: str   execute_result 的 text/plain（最后一个）
             - ``error``: dict | None  形如 {ename, evalue, traceback}
             - ``status``: str   "ok" / "error" / "timeout"
+            - ``payload``: :class:`~jq.serialize.ChunkedPayloadDecoder` | None
+              stdout 中分块序列化结果的增量解码器(未出现分块结果时为 None);
+              这部分不再计入 ``stdout``
 
         Notes
         -----
@@ -279,6 +286,9 @@ class JupyterHubClient:
         收 ``stream`` / ``execute_result`` / ``error`` / ``status(idle)``，
         以 parent_header.msg_id 过滤本请求回包。WS 鉴权用 Session jar 里
         （已 OAuth 续期的）cookie。
+
+        分块结果边收边解压(见 :mod:`jq.serialize`); 传输开始后截止时间改为滚动:
+        只要块还在陆续到达, 大结果的回传不会因总超时被打断。
         """
         ws_url = (
             self.base_url.replace("http://", "ws://").replace("https://", "wss://")
@@ -313,6 +323,7 @@ class JupyterHubClient:
 
         stdout_chunks: list[str] = []
         stderr_chunks: list[str] = []
+        decoder = ChunkedPayloadDecoder()
         result_text: str = ""
         error: dict | None = None
         status = "ok"
@@ -360,7 +371,9 @@ class JupyterHubClient:
                     if content.get("name") == "stderr":
                         stderr_chunks.append(text)
                     else:
-                        stdout_chunks.append(text)
+                        stdout_chunks.append(decoder.feed(text))
+                        if decoder.receiving:
+                            deadline = max(deadline, time.time() + min(timeout, _STREAM_GRACE))
                 elif mtype == "execute_result":
                     data = content.get("data", {}) or {}
                     if "text/plain" in data:
@@ -381,10 +394,12 @@ class JupyterHubClient:
             with contextlib.suppress(Exception):
                 ws.close()
 
+        stdout_chunks.append(decoder.finish())
         return {
             "stdout": "".join(stdout_chunks),
             "stderr": "".join(stderr_chunks),
             "result": result_text,
             "error": error,
             "status": status,
+            "payload": decoder if decoder.started else None,
         }
@@ -5,6 +5,7 @@
   - ``run_dataframe(code)`` 约定用户代码把目标 DataFrame 赋给 ``__result__``，
     runner 自动追加序列化语句，本地反序列化为 pandas.DataFrame
   - ``KernelSession`` 长连 kernel，多次 run_code 复用同一 kernel（快但有状态）
+  - ``KernelPool`` 管理 N 个持久化 kernel，互相独立的代码块并发执行
 
 聚宽 jqdata 用法示例（在 run_dataframe 里）::
 
@@ -21,8 +22,10 @@ from __future__ import annotations
 
 import json
 import os
+import queue
 import time
-from collections.abc import Iterator
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path
 
@@ -45,6 +48,9 @@ except ImportError:  # pragma: no cover
 # 持久化 kernel 状态文件:跨命令复用 kernel,省冷启动 + import jqdata 固定开销。
 KERNEL_STATE_PATH = Path.home() / ".jq" / "kernel.json"
 
+# KernelPool 各槽位的状态文件目录(每槽一个 kernel-{i}.json)
+KERNEL_POOL_DIR = Path.home() / ".jq" / "pool"
+
 
 class KernelRegistry:
     """持久化 kernel 状态管理(~/.jq/kernel.json).
@@ -125,7 +131,7 @@ def _extract_dataframe(result: dict) -> pd.DataFrame:
     """从 execute 结果里提取 ``__result__``.
 
     约定用户代码已把目标对象赋给 ``__result__``,
-    runner 追加的 trailer 会把它 base64-pickle 到 stdout 标记区内.
+    runner 追加的 trailer 会把它 pickle 并压缩分块输出到 stdout 标记区内.
 
     用 pickle 而非 ``to_json(orient='table')``: 保留 dtype/时区/MultiIndex,
     且支持非 DataFrame 结果(dict / list / ndarray).
@@ -148,6 +154,7 @@ class JoinQuantRunner:
         refresh_callback: RefreshCallback | None = None,
         timeout: int = 30,
         persistent: bool = False,
+        registry: KernelRegistry | None = None,
     ) -> None:
         self.client = JupyterHubClient(
             base_url=base_url,
@@ -157,7 +164,7 @@ class JoinQuantRunner:
         )
         self.kernel_name = kernel_name
         self.persistent = persistent
-        self.registry = KernelRegistry()
+        self.registry = registry or KernelRegistry()
 
     def run_code(self, code: str, *, timeout: float = 60.0) -> dict:
         """执行任意代码，返回原始输出 dict（见 JupyterHubClient.execute）.
@@ -270,6 +277,211 @@ def persistent_kernel(runner: JoinQuantRunner) -> Iterator[str]:
         runner.registry.touch()
 
 
+class _PoolSlot:
+    """KernelPool 的一个槽位: 独占的 runner(自带 client) + 健康状态."""
+
+    def __init__(self, index: int, runner: JoinQuantRunner) -> None:
+        self.index = index
+        self.runner = runner
+        self.last_ok = 0.0
+        self.failures = 0
+
+
+class KernelPool:
+    """N 个持久化 kernel 的池, 让互相独立的代码块并发执行.
+
+    每个槽位是一个 ``persistent=True`` 的 :class:`JoinQuantRunner`, 状态记在
+    ``{state_dir}/kernel-{i}.json``(:class:`KernelRegistry`), 跨进程复用、
+    首次创建时预 import jqdata。:class:`JupyterHubClient` 线程不安全, 故每个
+    槽位独占一个 client; 同一时刻一个槽位只跑一段代码。
+
+    健康检查: 槽位空闲超过 ``health_interval`` 秒后再取用时先探活, 确认 kernel 已被
+    服务端回收(探活成功且不在活跃列表)才清掉记录、下次执行时重建; 连续 ``max_failures`` 次执行异常的槽位
+    关掉 kernel 重建。
+
+    用法::
+
+        pool = KernelPool(size=4)
+        results = pool.map([code_a, code_b, code_c])   # 并发, 按入参顺序返回
+        dc = DataCache(runner=pool)                     # get_price_batch 分块并发
+
+    Args:
+        size: kernel 数, 即并发上限(聚宽对单账号的 kernel 数有限制, 宜小).
+        state_dir: 槽位状态文件目录.
+        health_interval: 空闲多久(秒)后取用前探活.
+        max_failures: 连续失败多少次后重建该槽位 kernel.
+        runner_factory: ``callable(registry) -> JoinQuantRunner``, 缺省按
+            其余参数构造 persistent runner(测试可注入).
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        *,
+        base_url: str = DEFAULT_BASE_URL,
+        cookie_store: CookieStore | None = None,
+        kernel_name: str = "python3",
+        refresh_callback: RefreshCallback | None = None,
+        timeout: int = 30,
+        state_dir: Path = KERNEL_POOL_DIR,
+        health_interval: float = 300.0,
+        max_failures: int = 2,
+        runner_factory: Callable[[KernelRegistry], JoinQuantRunner] | None = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError(f"size 须 >= 1, 收到 {size}")
+        if runner_factory is None:
+            cookie_store = cookie_store or CookieStore()
+
+            def runner_factory(registry: KernelRegistry) -> JoinQuantRunner:
+                return JoinQuantRunner(
+                    base_url=base_url,
+                    cookie_store=cookie_store,
+                    kernel_name=kernel_name,
+                    refresh_callback=refresh_callback,
+                    timeout=timeout,
+                    persistent=True,
+                    registry=registry,
+                )
+
+        self.size = int(size)
+        self.health_interval = float(health_interval)
+        self.max_failures = int(max_failures)
+        self._slots = [
+            _PoolSlot(i, runner_factory(KernelRegistry(Path(state_dir) / f"kernel-{i}.json")))
+            for i in range(self.size)
+        ]
+        self._idle: queue.Queue[_PoolSlot] = queue.Queue()
+        for slot in self._slots:
+            self._idle.put(slot)
+
+    @property
+    def max_concurrency(self) -> int:
+        """可同时执行的代码块数(= kernel 数), 供 :class:`~jq.cache.DataCache` 设并发度."""
+        return self.size
+
+    def __enter__(self) -> KernelPool:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # ---------------- 执行 ----------------
+
+    def run_code(self, code: str, *, timeout: float = 60.0) -> dict:
+        """在任一空闲 kernel 上执行(无空闲时阻塞等待), 返回原始输出 dict. 线程安全."""
+        slot = self._idle.get()
+        try:
+            self._probe(slot)
+            result = slot.runner.run_code(code, timeout=timeout)
+        except Exception:
+            slot.failures += 1
+            if slot.failures >= self.max_failures:
+                self._recycle(slot)
+            raise
+        else:
+            slot.failures = 0
+            slot.last_ok = time.time()
+            return result
+        finally:
+            self._idle.put(slot)
+
+    def run_dataframe(self, code: str, *, timeout: float = 60.0) -> pd.DataFrame:
+        """同 :meth:`JoinQuantRunner.run_dataframe`, 在任一空闲 kernel 上执行."""
+        result = self.run_code(code + PICKLE_TRAILER, timeout=timeout)
+        return _extract_dataframe(result)
+
+    def map(
+        self,
+        codes: list[str],
+        *,
+        timeout: float | list[float] = 60.0,
+        max_workers: int | None = None,
+    ) -> list[dict]:
+        """并发执行多段代码, 按入参顺序返回原始输出 dict.
+
+        Args:
+            timeout: 单段超时, 或与 ``codes`` 等长的逐段超时.
+            max_workers: 并发上限, 缺省(及上限)为 kernel 数.
+
+        Raises:
+            ValueError: ``timeout`` 为列表但长度与 ``codes`` 不一致.
+            Exception: 按入参顺序第一段失败代码的异常; 尚未开始的代码块不再执行.
+        """
+        timeouts = timeout if isinstance(timeout, list) else [timeout] * len(codes)
+        if len(timeouts) != len(codes):
+            raise ValueError(f"timeout 列表长度 {len(timeouts)} 与代码段数 {len(codes)} 不一致")
+        workers = min(self.size, max_workers or self.size, max(1, len(codes)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jq-kernel") as ex:
+            futures = [
+                ex.submit(self.run_code, code, timeout=t)
+                for code, t in zip(codes, timeouts, strict=True)
+            ]
+            try:
+                return [f.result() for f in futures]
+            except BaseException:
+                for f in futures:
+                    f.cancel()
+                raise
+
+    # ---------------- 健康检查 ----------------
+
+    def _probe(self, slot: _PoolSlot) -> None:
+        """空闲超过 ``health_interval`` 的槽位取用前探活.
+
+        只有 list_kernels 成功且 kernel_id 不在其中才清记录; 探活请求本身失败
+        (网络抖动)时保留记录 —— 清掉会让仍活着的 kernel 在服务端成孤儿。
+        """
+        if not slot.last_ok or time.time() - slot.last_ok <= self.health_interval:
+            return
+        kid = (slot.runner.registry.load() or {}).get("kernel_id", "")
+        if kid:
+            try:
+                kernels = slot.runner.client.list_kernels()
+            except Exception:  # noqa: BLE001 - 探活失败不等于 kernel 已死
+                return
+            if not any(k.get("id") == kid for k in kernels):
+                slot.runner.registry.clear()
+        slot.last_ok = 0.0
+
+    def _recycle(self, slot: _PoolSlot) -> None:
+        """关掉槽位 kernel 并清记录, 下次执行时重建."""
+        try:
+            slot.runner.close_persistent()
+        except Exception:  # noqa: BLE001 - kernel 可能已死, 清记录即可
+            slot.runner.registry.clear()
+        slot.failures = 0
+        slot.last_ok = 0.0
+
+    def health(self) -> list[dict]:
+        """各槽位状态 ``[{slot, kernel_id, alive, failures}]``(一次 list_kernels)."""
+        try:
+            alive = {k.get("id") for k in self._slots[0].runner.client.list_kernels()}
+        except Exception:  # noqa: BLE001
+            alive = set()
+        out = []
+        for slot in self._slots:
+            kid = (slot.runner.registry.load() or {}).get("kernel_id", "")
+            out.append({
+                "slot": slot.index,
+                "kernel_id": kid,
+                "alive": bool(kid) and kid in alive,
+                "failures": slot.failures,
+            })
+        return out
+
+    # ---------------- 生命周期 ----------------
+
+    def warmup(self) -> list[str]:
+        """并发预建全部 kernel(含预 import jqdata), 返回 kernel_id 列表."""
+        with ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="jq-kernel") as ex:
+            return list(ex.map(lambda slot: slot.runner.warmup(), self._slots))
+
+    def close(self) -> int:
+        """关闭全部持久化 kernel, 返回关闭的个数."""
+        return sum(bool(slot.runner.close_persistent()) for slot in self._slots)
+
+
 class KernelSession:
     """长连 kernel，多次 run_code 复用同一 kernel（快但有状态）.
 
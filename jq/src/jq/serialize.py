@@ -9,22 +9,41 @@
    在 pandas 2.x 已被删除, 反序列化抛
    ``ModuleNotFoundError: pandas.core.indexes.numeric``(空 DataFrame 必现).
 
-本模块的方案: **远程侧先净化再 base64-pickle**, 本地从 stdout 标记区解码.
+本模块的方案: **远程侧先净化再 pickle**, 本地从 stdout 标记区解码.
 净化只降级"两版本不共存"的 index 类型, 不改动数据本身.
 
+传输格式(分块流)::
+
+    @@@JQ_CACHE_START@@@ zlib
+    @@@JQ_CHUNK@@@ 0 <base64(zlib 压缩块)>
+    @@@JQ_CHUNK@@@ 1 <...>
+    @@@JQ_CACHE_END@@@ <块数> <crc32(pickle 字节)> <pickle 字节数>
+
+远程侧 ``pickle.dump`` 直接写进流式压缩器, 攒满 :data:`CHUNK_BYTES` 就输出一块并
+flush —— 不再先在内存里拼出完整的 base64 串. 本地 :class:`ChunkedPayloadDecoder`
+随 stream 消息到达逐块解压, 结束行校验块数/CRC/长度, 截断或乱序直接报错.
+压缩用 zlib: 聚宽侧是 Python 3.6, zstd/lz4/pyarrow 不能假定可用, 而 zlib 两侧皆为
+标准库. 旧版单段 base64 格式(``START`` 行后一行 payload)仍可解码.
+
 信任边界: 只解码本连接器自己在受信远程 kernel 中生成的 payload.
 """
 
 from __future__ import annotations
 
 import base64
+import io
 import pickle
+import zlib
 
 from jq.exceptions import JQExecutionError
 
 # 用唯一 token 把 payload 从用户 stdout 里隔离出来, 避免用户 print 干扰解析.
 PICKLE_START = "@@@JQ_CACHE_START@@@"
 PICKLE_END = "@@@JQ_CACHE_END@@@"
+CHUNK_PREFIX = "@@@JQ_CHUNK@@@"
+
+#: 单块压缩后的字节数上限(base64 后约 1.33 倍, 即每条 stream 消息的量级)
+CHUNK_BYTES = 256 * 1024
 
 # 远程侧净化: 两件事——
 # (1) 把老版 pandas 专有的 index 类型降级为两版本都存在的类型;
@@ -96,13 +115,51 @@ def _jq_sanitize(o):
 __result__ = _jq_sanitize(__result__)
 '''
 
+# 远程侧分块输出: pickle.dump → zlib 流式压缩 → 满 CHUNK_BYTES 即 base64 一行并 flush
+_CHUNK_WRITER_CODE = '''
+import pickle as _pk, base64 as _b64, sys as _sys, zlib as _zl
+
+
+class _JQChunkWriter(object):
+    def __init__(self, size):
+        self.size, self.n, self.crc, self.raw = size, 0, 0, 0
+        self.z = _zl.compressobj(6)
+        self.buf = b''
+
+    def write(self, data):
+        self.raw += len(data)
+        self.crc = _zl.crc32(data, self.crc)
+        self.buf += self.z.compress(data)
+        while len(self.buf) >= self.size:
+            self._emit(self.buf[:self.size])
+            self.buf = self.buf[self.size:]
+
+    def _emit(self, block):
+        _sys.stdout.write('%s %d %s\\n' % (_JQ_CHUNK, self.n, _b64.b64encode(block).decode()))
+        _sys.stdout.flush()
+        self.n += 1
+
+    def close(self):
+        self.buf += self.z.flush()
+        while self.buf:
+            self._emit(self.buf[:self.size])
+            self.buf = self.buf[self.size:]
+        _sys.stdout.write('%s %d %d %d\\n' % (_JQ_END, self.n, self.crc & 0xffffffff, self.raw))
+        _sys.stdout.flush()
+
+
+_jq_w = _JQChunkWriter(_JQ_CHUNK_BYTES)
+_sys.stdout.write('\\n%s zlib\\n' % _JQ_START)
+_pk.dump(__result__, _jq_w, protocol=4)
+_jq_w.close()
+'''
+
 #: 追加到用户代码末尾的序列化片段. 用户代码须把目标对象赋给 ``__result__``.
 PICKLE_TRAILER = (
     _SANITIZE_CODE
-    + "\nimport pickle as _pk, base64 as _b64, sys as _sys\n"
-    + f"_sys.stdout.write('\\n{PICKLE_START}\\n')\n"
-    + "_sys.stdout.write(_b64.b64encode(_pk.dumps(__result__, protocol=4)).decode())\n"
-    + f"_sys.stdout.write('\\n{PICKLE_END}\\n')\n"
+    + f"\n_JQ_START, _JQ_CHUNK, _JQ_END = {PICKLE_START!r}, {CHUNK_PREFIX!r}, {PICKLE_END!r}\n"
+    + f"_JQ_CHUNK_BYTES = {CHUNK_BYTES}\n"
+    + _CHUNK_WRITER_CODE
 )
 
 
@@ -117,15 +174,120 @@ def raise_if_remote_error(result: dict) -> None:
     )
 
 
+class ChunkedPayloadDecoder:
+    """分块 payload 的增量解码器.
+
+    :meth:`feed` 接收 stdout 文本片段(可在任意位置断开), 识别出的块立即解压,
+    其余文本原样返回(即用户自己的输出). :meth:`JupyterHubClient.execute` 在收到
+    stream 消息时就喂给它, payload 不再以文本形式整段留在内存.
+    """
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self._state = "idle"  # idle → body → done
+        self._z: zlib._Decompress | None = None
+        self._buf = io.BytesIO()
+        self._n = 0
+        self._crc = 0
+        self._trailer: tuple[int, int, int] | None = None
+
+    @property
+    def started(self) -> bool:
+        """是否已见到分块格式的起始行."""
+        return self._state != "idle"
+
+    @property
+    def receiving(self) -> bool:
+        """起始行已到、结束行未到(传输进行中)."""
+        return self._state == "body"
+
+    @property
+    def chunks(self) -> int:
+        return self._n
+
+    def feed(self, text: str) -> str:
+        """喂入 stdout 片段, 返回其中不属于 payload 的文本."""
+        lines = (self._pending + text).split("\n")
+        self._pending = lines.pop()
+        return "".join(self._line(line) for line in lines)
+
+    def finish(self) -> str:
+        """输出结束: 返回缓冲中的残行(不属于 payload 时)."""
+        rest, self._pending = self._pending, ""
+        return self._line(rest, newline=False) if rest else ""
+
+    def _line(self, line: str, newline: bool = True) -> str:
+        if self._state == "idle" and line.startswith(PICKLE_START + " "):
+            codec = line[len(PICKLE_START) :].strip()
+            if codec != "zlib":
+                raise JQExecutionError(f"不支持的传输编码: {codec!r}")
+            self._state = "body"
+            self._z = zlib.decompressobj()
+            return ""
+        if self._state == "body":
+            if line.startswith(CHUNK_PREFIX + " "):
+                seq, _, data = line[len(CHUNK_PREFIX) + 1 :].partition(" ")
+                if int(seq) != self._n:
+                    raise JQExecutionError(f"payload 分块乱序/缺失: 期望第 {self._n} 块, 收到第 {seq} 块")
+                raw = self._z.decompress(base64.b64decode(data))
+                self._crc = zlib.crc32(raw, self._crc)
+                self._buf.write(raw)
+                self._n += 1
+                return ""
+            if line.startswith(PICKLE_END + " "):
+                n, crc, size = (int(x) for x in line[len(PICKLE_END) :].split())
+                raw = self._z.flush()
+                self._crc = zlib.crc32(raw, self._crc)
+                self._buf.write(raw)
+                self._trailer = (n, crc, size)
+                self._state = "done"
+                return ""
+        return line + "\n" if newline else line
+
+    def load(self) -> object:
+        """校验完整性并反序列化 payload.
+
+        Raises:
+            JQExecutionError: 未收到结束行(截断/超时), 或块数/CRC/长度不符.
+        """
+        if self._trailer is None:
+            raise JQExecutionError(
+                f"payload 不完整: 已收到 {self._n} 块但未见结束标记 —— "
+                "多半是执行超时或输出被截断, 请调大超时或缩小单次请求。"
+            )
+        n, crc, size = self._trailer
+        got = (self._n, self._crc & 0xFFFFFFFF, self._buf.tell())
+        if got != (n, crc, size):
+            raise JQExecutionError(
+                f"payload 校验失败: 块数/CRC/字节数 期望 {(n, crc, size)}, 实得 {got}"
+            )
+        self._buf.seek(0)
+        return pickle.load(self._buf)  # noqa: S301
+
+
 def decode_result(result: dict):
-    """从 execute 结果的 stdout 标记区解码 ``__result__``.
+    """从 execute 结果解码 ``__result__``.
+
+    优先用 execute 期间已增量解码的 ``result["payload"]``
+    (:class:`ChunkedPayloadDecoder`); 否则从 stdout 标记区解码
+    (分块格式与旧版单段格式均可).
 
     Raises:
         JQExecutionError: 远程报错、返回空输出(数据量过大/kernel 异常),
+            payload 截断或校验失败,
             或未找到序列化标记(用户代码没给 ``__result__`` 赋值)。
     """
     raise_if_remote_error(result)
+    stream = result.get("payload")
+    if isinstance(stream, ChunkedPayloadDecoder) and stream.started:
+        return stream.load()
     out = result.get("stdout", "")
+    if f"{PICKLE_START} " in out:
+        stream = ChunkedPayloadDecoder()
+        stream.feed(out)
+        stream.finish()
+        if stream.started:
+            return stream.load()
     i = out.find(PICKLE_START)
     j = out.find(PICKLE_END)
     if i < 0 or j < 0:
@@ -151,7 +313,19 @@ def decode_result(result: dict):
     return pickle.loads(base64.b64decode(payload))  # noqa: S301
 
 
-def encode_for_test(obj: object) -> str:
-    """把对象编码成远程侧输出格式 —— 仅供测试构造假响应."""
-    payload = base64.b64encode(pickle.dumps(obj)).decode()
-    return f"\n{PICKLE_START}\n{payload}\n{PICKLE_END}\n"
+def encode_for_test(
+    obj: object, *, chunk_bytes: int = CHUNK_BYTES, legacy: bool = False
+) -> str:
+    """把对象编码成远程侧输出格式 —— 仅供测试构造假响应.
+
+    默认为分块格式(与 :data:`PICKLE_TRAILER` 输出一致); ``legacy=True`` 为旧版单段格式.
+    """
+    raw = pickle.dumps(obj, protocol=4)
+    if legacy:
+        return f"\n{PICKLE_START}\n{base64.b64encode(raw).decode()}\n{PICKLE_END}\n"
+    packed = zlib.compress(raw, 6)
+    blocks = [packed[i : i + chunk_bytes] for i in range(0, len(packed), chunk_bytes)]
+    lines = [f"\n{PICKLE_START} zlib"]
+    lines += [f"{CHUNK_PREFIX} {n} {base64.b64encode(b).decode()}" for n, b in enumerate(blocks)]
+    lines.append(f"{PICKLE_END} {len(blocks)} {zlib.crc32(raw)} {len(raw)}")
+    return "\n".join(lines) + "\n"
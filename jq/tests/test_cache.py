@@ -12,6 +12,8 @@ from __future__ import annotations
 
 import datetime as dt
 import re
+import threading
+import time
 from pathlib import Path
 
 import pandas as pd
@@ -281,6 +283,93 @@ def test_batch_dedupes_input(dc: DataCache):
     assert len(out) == 1
 
 
+def test_batch_parquet_hit_decodes_only_needed_columns(tmp_path: Path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    dc = DataCache(cache_dir=tmp_path, runner=FakeRunner(), shard_format="parquet")
+    full = dc.get_price_batch(["600519.XSHG"], "2024-01-01", "2024-02-29", fq=None)
+    assert list(tmp_path.rglob("*.parquet")) and not list(tmp_path.rglob("*.pkl"))
+
+    seen: list[list[str] | None] = []
+    read_shard = dc.bars.read_shard
+
+    def spy(path, columns=None):
+        seen.append(columns)
+        return read_shard(path, columns)
+
+    monkeypatch.setattr(dc.bars, "read_shard", spy)
+    out = dc.get_price_batch(
+        ["600519.XSHG"], "2024-01-01", "2024-02-29", fq=None, fields=["close"]
+    )
+    assert dc.runner.fetch_count == 1  # 全部命中
+    assert seen and all(c == ["close", "factor"] for c in seen)
+    pd.testing.assert_series_equal(out["600519.XSHG"]["close"], full["600519.XSHG"]["close"])
+
+
+def test_migrate_shards_keeps_cache_hits(dc: DataCache):
+    pytest.importorskip("pyarrow")
+    before = dc.get_price("X.XSHG", "2024-01-01", "2024-02-29")
+    n = dc.runner.fetch_count
+    stats = dc.migrate_shards("parquet")
+    assert stats["converted"] == 2
+    after = dc.get_price("X.XSHG", "2024-01-01", "2024-02-29")
+    assert dc.runner.fetch_count == n
+    pd.testing.assert_frame_equal(after, before, check_freq=False)
+    assert dc.status()["total_files"] == 2
+
+
+def test_batch_reads_consolidated_year_files(dc: DataCache):
+    codes = ["600519.XSHG", "000001.XSHE"]
+    before = dc.get_price_batch(codes, "2023-12-01", "2024-02-29")
+    n = dc.runner.fetch_count
+    stats = dc.consolidate_shards()
+    assert stats["packed_files"] == 2
+    after = dc.get_price_batch(codes, "2023-12-01", "2024-02-29")
+    assert dc.runner.fetch_count == n  # 全部命中年文件
+    for code in codes:
+        pd.testing.assert_frame_equal(after[code], before[code], check_freq=False)
+    assert "get_price" in dc.status()["packed"]
+    assert dc.clear() > 0
+    assert dc.status()["total_files"] == 0
+
+
+class ConcurrentFakeRunner(FakeRunner):
+    """声明可并发的假 runner(如 KernelPool), 记录同时在途的最大调用数."""
+
+    max_concurrency = 4
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self.peak = 0
+
+    def run_code(self, code: str, *, timeout: float = 60.0) -> dict:
+        with self._lock:
+            self._inflight += 1
+            self.peak = max(self.peak, self._inflight)
+        try:
+            time.sleep(0.05)
+            return super().run_code(code, timeout=timeout)
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+
+def test_batch_chunks_run_concurrently_on_pool(tmp_path: Path):
+    codes = [f"{600000 + i}.XSHG" for i in range(8)]
+    serial = DataCache(cache_dir=tmp_path / "s", runner=FakeRunner())
+    want = serial.get_price_batch(codes, "2024-01-01", "2024-02-29", chunk_size=2)
+
+    dc = DataCache(cache_dir=tmp_path / "p", runner=ConcurrentFakeRunner(), fetch_workers=3)
+    got = dc.get_price_batch(codes, "2024-01-01", "2024-02-29", chunk_size=2)
+    assert dc.runner.fetch_count == 4
+    assert dc.runner.peak == 3  # 受 fetch_workers 上限约束
+    for code in codes:
+        pd.testing.assert_frame_equal(got[code], want[code])
+    dc.get_price_batch(codes, "2024-01-01", "2024-02-29", chunk_size=2)
+    assert dc.runner.fetch_count == 4  # 并发取到的分块同样落盘
+
+
 # ======================================================================
 # ⑫⑬ 其他
 # ======================================================================
@@ -722,6 +811,62 @@ def test_empty_stdout_error_message_points_to_data_volume():
     assert "max_symbol_months" in msg, "应给出可操作的出路"
 
 
+def _run_trailer(obj: object) -> str:
+    """在本地执行远程序列化片段, 返回其 stdout(等同远程 kernel 的输出)."""
+    import contextlib
+    import io
+
+    from jq.serialize import PICKLE_TRAILER
+
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        exec(PICKLE_TRAILER, {"__result__": obj})  # noqa: S102
+    return buf.getvalue()
+
+
+def test_trailer_streams_compressed_chunks_decoded_incrementally(monkeypatch):
+    """㊲ 远程片段输出编号压缩块; 任意切分喂给解码器都能还原, 用户输出原样保留."""
+    import jq.serialize as sz
+
+    monkeypatch.setattr(sz, "PICKLE_TRAILER", sz.PICKLE_TRAILER.replace(
+        f"_JQ_CHUNK_BYTES = {sz.CHUNK_BYTES}", "_JQ_CHUNK_BYTES = 512"))
+    df = _make_post_bars("2020-01-01", "2023-12-31")
+    out = "hello\n" + _run_trailer(df)
+    assert out.count(sz.CHUNK_PREFIX) > 3
+    assert len(out) < len(sz.encode_for_test(df, legacy=True)) / 2
+
+    dec = sz.ChunkedPayloadDecoder()
+    rest = "".join(dec.feed(out[i : i + 1000]) for i in range(0, len(out), 1000))
+    rest += dec.finish()
+    assert rest.strip() == "hello"
+    pd.testing.assert_frame_equal(dec.load(), df)
+    result = {"error": None, "stdout": rest, "payload": dec}
+    pd.testing.assert_frame_equal(sz.decode_result(result), df)
+
+
+def test_truncated_or_corrupt_payload_raises():
+    from jq.exceptions import JQExecutionError
+    from jq.serialize import decode_result, encode_for_test
+
+    out = encode_for_test(list(range(50_000)), chunk_bytes=1024)
+    lines = out.splitlines(keepends=True)
+    with pytest.raises(JQExecutionError, match="未见结束标记"):
+        decode_result({"error": None, "stdout": "".join(lines[:-1])})
+    with pytest.raises(JQExecutionError, match="乱序/缺失"):
+        decode_result({"error": None, "stdout": "".join(lines[:3] + lines[4:])})
+    end = lines[-1].split()
+    end[-1] = str(int(end[-1]) + 1)
+    with pytest.raises(JQExecutionError, match="校验失败"):
+        decode_result({"error": None, "stdout": "".join(lines[:-1]) + " ".join(end) + "\n"})
+
+
+def test_legacy_single_blob_payload_still_decodes():
+    from jq.serialize import decode_result, encode_for_test
+
+    out = encode_for_test({"a": 1}, legacy=True)
+    assert decode_result({"error": None, "stdout": out}) == {"a": 1}
+
+
 def test_valuation_batch_splits_by_row_limit(tmp_path: Path):
     """㉞ 聚宽 continuously 有 10000 行硬上限, 超出静默截断 —— 必须分块.
 
@@ -1,7 +1,7 @@
 """``jq.cache_store`` 单元测试 — 纯本地, 不触网.
 
 覆盖缓存正确性的关键路径: 日期归一化、月份计算、连续月合并、
-长 key 收敛、原子写、月分片读写、缺失月判定、空月标记.
+长 key 收敛、原子写、月分片读写、缺失月判定、空月标记、parquet 分片与迁移、按年合并.
 """
 
 from __future__ import annotations
@@ -333,6 +333,198 @@ def test_long_symbol_list_as_key(store: MonthlyShardStore):
     assert len(got) == 31
 
 
+# ======================================================================
+# parquet 分片
+# ======================================================================
+
+
+@pytest.fixture
+def pq_store(tmp_path: Path) -> MonthlyShardStore:
+    pytest.importorskip("pyarrow")
+    return MonthlyShardStore(tmp_path, "parquet")
+
+
+def _ohlc(start: str, end: str) -> pd.DataFrame:
+    idx = pd.date_range(start, end, freq="D")
+    n = len(idx)
+    return pd.DataFrame(
+        {"close": [float(i) for i in range(n)], "factor": 2.0, "paused": 0.0},
+        index=idx,
+    )
+
+
+def test_unknown_shard_format_rejected(tmp_path: Path):
+    with pytest.raises(ValueError, match="shard_format"):
+        MonthlyShardStore(tmp_path, "feather")
+
+
+def test_parquet_roundtrip_and_column_projection(pq_store: MonthlyShardStore):
+    df = _ohlc("2024-01-01", "2024-02-29")
+    pq_store.write_range(df, "get_price", "X", "2024-01-01", "2024-02-29")
+    assert pq_store.shard_path("get_price", "X", "2024-01").name == "2024-01.parquet"
+    got = pq_store.read_range("get_price", "X", "2024-01-01", "2024-02-29")
+    pd.testing.assert_frame_equal(got, df, check_freq=False)
+    sub = pq_store.read_range(
+        "get_price", "X", "2024-01-01", "2024-02-29", columns=["close", "nope"]
+    )
+    assert list(sub.columns) == ["close"]
+    assert sub.index.equals(got.index)
+
+
+def test_parquet_empty_month_is_marked(pq_store: MonthlyShardStore):
+    pq_store.write_range(pd.DataFrame(), "get_price", "X", "2024-01-01", "2024-01-31")
+    assert pq_store.missing_months("get_price", "X", "2024-01-01", "2024-01-31") == []
+    assert pq_store.read_range("get_price", "X", "2024-01-01", "2024-01-31").empty
+
+
+def test_parquet_store_reads_existing_pickle_shards(tmp_path: Path):
+    pytest.importorskip("pyarrow")
+    MonthlyShardStore(tmp_path).write_range(
+        _ohlc("2024-01-01", "2024-01-31"), "get_price", "X", "2024-01-01", "2024-01-31"
+    )
+    pq_store = MonthlyShardStore(tmp_path, "parquet")
+    assert pq_store.missing_months("get_price", "X", "2024-01-01", "2024-01-31") == []
+    got = pq_store.read_range("get_price", "X", "2024-01-01", "2024-01-31", columns=["close"])
+    assert list(got.columns) == ["close"] and len(got) == 31
+
+
+def test_unparquetable_shard_falls_back_to_pickle(pq_store: MonthlyShardStore):
+    df = pd.DataFrame({"x": [1, "a"]}, index=pd.to_datetime(["2024-01-02", "2024-01-03"]))
+    with pytest.warns(RuntimeWarning, match="pickle"):
+        pq_store.write_range(df, "get_price", "X", "2024-01-01", "2024-01-31")
+    d = pq_store.shard_dir("get_price", "X")
+    assert [p.name for p in d.iterdir()] == ["2024-01.pkl"]
+    assert len(pq_store.read_range("get_price", "X", "2024-01-01", "2024-01-31")) == 2
+
+
+def test_migrate_converts_pickle_shards_in_place(tmp_path: Path):
+    pytest.importorskip("pyarrow")
+    old = MonthlyShardStore(tmp_path)
+    old.write_range(
+        _ohlc("2024-01-01", "2024-03-31"), "get_price", "X", "2024-01-01", "2024-03-31"
+    )
+    old.write_range(pd.DataFrame(), "get_price", "Y", "2024-01-01", "2024-01-31")
+    before = old.read_range("get_price", "X", "2024-01-01", "2024-03-31")
+
+    store = MonthlyShardStore(tmp_path, "parquet")
+    stats = store.migrate()
+    assert stats["converted"] == 4 and stats["kept"] == 0
+    assert not list(tmp_path.rglob("*.pkl"))
+    after = store.read_range("get_price", "X", "2024-01-01", "2024-03-31")
+    pd.testing.assert_frame_equal(after, before, check_freq=False)
+    assert store.missing_months("get_price", "Y", "2024-01-01", "2024-01-31") == []
+    assert store.migrate()["converted"] == 0  # 幂等
+
+
+# ======================================================================
+# 按年合并
+# ======================================================================
+
+
+@pytest.mark.parametrize("shard_format", ["pickle", "parquet"])
+def test_consolidate_packs_closed_months_per_year(tmp_path: Path, shard_format):
+    if shard_format == "parquet":
+        pytest.importorskip("pyarrow")
+    store = MonthlyShardStore(tmp_path, shard_format)
+    for sec in ("A", "B"):
+        store.write_range(
+            _ohlc("2023-11-01", "2024-02-29"), "get_price", sec, "2023-11-01", "2024-02-29"
+        )
+    store.write_range(pd.DataFrame(), "get_price", "C", "2024-01-01", "2024-01-31")
+    before = store.read_range_many("get_price", ["A", "B"], "2023-11-01", "2024-02-29")
+
+    stats = store.consolidate()
+    assert stats == {**stats, "packed_files": 2, "shards": 9}
+    assert not any((tmp_path / CACHE_VERSION / "bars").iterdir())
+    pdir = store.packed_dir("get_price")
+    assert sorted(p.name for p in pdir.iterdir() if "index" in p.name) == [
+        "2023.index.json", "2024.index.json"
+    ]
+    assert store.packed_index("get_price", "default", "2024")["C"]["months"] == {"2024-01"}
+
+    after = store.read_range_many("get_price", ["A", "B"], "2023-11-01", "2024-02-29")
+    for sec in ("A", "B"):
+        pd.testing.assert_frame_equal(after[sec], before[sec], check_freq=False)
+    for sec in ("A", "B"):
+        assert store.missing_months("get_price", sec, "2023-11-01", "2024-02-29") == []
+    assert store.missing_months("get_price", "C", "2023-12-01", "2024-01-31") == ["2023-12"]
+    sub = store.read_range("get_price", "A", "2024-01-10", "2024-01-12", columns=["close"])
+    assert list(sub.columns) == ["close"] and len(sub) == 3
+
+
+def test_monthly_shard_overrides_packed_and_repack_merges(store: MonthlyShardStore):
+    store.write_range(
+        _ohlc("2024-01-01", "2024-02-29"), "get_price", "A", "2024-01-01", "2024-02-29"
+    )
+    store.consolidate()
+    newer = _ohlc("2024-02-01", "2024-02-29") + 100
+    store.write_range(newer, "get_price", "A", "2024-02-01", "2024-02-29")
+    store.write_range(
+        _ohlc("2024-03-01", "2024-03-31"), "get_price", "A", "2024-03-01", "2024-03-31"
+    )
+    got = store.read_range("get_price", "A", "2024-01-01", "2024-03-31")
+    assert len(got) == 91
+    assert got.loc["2024-02-01", "close"] == newer["close"].iloc[0]
+
+    store.consolidate()
+    assert not list(store.shard_dir("get_price", "A").parent.parent.glob("*/*/*.pkl"))
+    again = store.read_range("get_price", "A", "2024-01-01", "2024-03-31")
+    pd.testing.assert_frame_equal(again, got, check_freq=False)
+    assert store.packed_index("get_price", "default", "2024")["A"]["months"] == {
+        "2024-01", "2024-02", "2024-03"
+    }
+
+
+def test_packed_index_ignored_without_data_file(store: MonthlyShardStore):
+    store.write_range(
+        _ohlc("2024-01-01", "2024-01-31"), "get_price", "A", "2024-01-01", "2024-01-31"
+    )
+    store.consolidate()
+    (store.packed_dir("get_price") / "2024.pkl").unlink()
+    assert store.missing_months("get_price", "A", "2024-01-01", "2024-01-31") == ["2024-01"]
+
+
+def test_single_security_read_decodes_only_its_row_groups(
+    pq_store: MonthlyShardStore, monkeypatch: pytest.MonkeyPatch
+):
+    import pyarrow.parquet as pq
+
+    import jq.cache_store as cs
+
+    for sec in ("A", "B", "C"):
+        pq_store.write_range(
+            _ohlc("2024-01-01", "2024-02-29"), "get_price", sec, "2024-01-01", "2024-02-29"
+        )
+    before = pq_store.read_range("get_price", "B", "2024-01-01", "2024-02-29")
+    pq_store.consolidate()
+    assert pq.ParquetFile(pq_store.packed_dir("get_price") / "2024.parquet").num_row_groups == 3
+
+    seen = []
+    orig = cs.read_parquet
+    monkeypatch.setattr(cs, "read_parquet", lambda *a, **k: seen.append(k) or orig(*a, **k))
+    got = pq_store.read_range("get_price", "B", "2024-01-01", "2024-02-29")
+    pd.testing.assert_frame_equal(got, before, check_freq=False)
+    assert seen == [{"filters": [("__security__", "in", ["B"])]}]
+
+
+def test_per_security_loop_decodes_each_pickle_year_once(
+    store: MonthlyShardStore, monkeypatch: pytest.MonkeyPatch
+):
+    import jq.cache_store as cs
+
+    for sec in ("A", "B", "C"):
+        store.write_range(
+            _ohlc("2022-12-01", "2024-01-31"), "get_price", sec, "2022-12-01", "2024-01-31"
+        )
+    store.consolidate()
+    decoded = []
+    orig = cs.read_pkl
+    monkeypatch.setattr(cs, "read_pkl", lambda path, **k: decoded.append(path) or orig(path, **k))
+    for sec in ("A", "B", "C"):
+        assert len(store.read_range("get_price", sec, "2022-12-01", "2024-01-31")) == 427
+    assert len(decoded) == 3  # 三个年文件各解码一次, 不随标的数成倍
+
+
 # ======================================================================
 # 快照存储
 # ======================================================================
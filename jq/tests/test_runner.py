@@ -0,0 +1,152 @@
+"""``jq.runner.KernelPool`` 单元测试 — 用假 runner, 不触网."""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from jq.exceptions import JQExecutionError
+from jq.runner import KernelPool, KernelRegistry
+
+
+class FakeKernelRunner:
+    """模拟 persistent JoinQuantRunner: 记录 kernel 生命周期与并发度."""
+
+    created = 0
+    inflight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, registry: KernelRegistry):
+        self.registry = registry
+        self.alive = True
+        self.fail = False
+        self.probe_error = False
+        self.closed = 0
+        self.client = self
+
+    def _kernel(self) -> str:
+        data = self.registry.load()
+        if not data:
+            with FakeKernelRunner.lock:
+                FakeKernelRunner.created += 1
+                kid = f"k{FakeKernelRunner.created}"
+            self.registry.save(kid, "fake", "python3")
+            return kid
+        return data["kernel_id"]
+
+    def run_code(self, code: str, *, timeout: float = 60.0) -> dict:
+        kid = self._kernel()
+        with FakeKernelRunner.lock:
+            FakeKernelRunner.inflight += 1
+            FakeKernelRunner.peak = max(FakeKernelRunner.peak, FakeKernelRunner.inflight)
+        try:
+            time.sleep(0.02)
+            if self.fail:
+                raise JQExecutionError("boom")
+            return {"stdout": f"{code}@{kid}", "error": None}
+        finally:
+            with FakeKernelRunner.lock:
+                FakeKernelRunner.inflight -= 1
+
+    def list_kernels(self) -> list[dict]:
+        """充当 ``client.list_kernels``: alive 为假时不含本槽 kernel."""
+        if self.probe_error:
+            raise ConnectionError("blip")
+        data = self.registry.load()
+        return [{"id": data["kernel_id"]}] if data and self.alive else []
+
+    def close_persistent(self) -> bool:
+        self.closed += 1
+        had = self.registry.load() is not None
+        self.registry.clear()
+        return had
+
+    def warmup(self) -> str:
+        return self._kernel()
+
+
+@pytest.fixture
+def pool(tmp_path: Path) -> KernelPool:
+    FakeKernelRunner.created = FakeKernelRunner.inflight = FakeKernelRunner.peak = 0
+    return KernelPool(3, state_dir=tmp_path, runner_factory=FakeKernelRunner)
+
+
+def test_map_is_ordered_and_bounded_by_pool_size(pool: KernelPool):
+    out = pool.map([f"c{i}" for i in range(9)])
+    assert [r["stdout"].split("@")[0] for r in out] == [f"c{i}" for i in range(9)]
+    assert FakeKernelRunner.peak == 3
+    assert FakeKernelRunner.created == 3  # 每槽一个持久 kernel, 之后复用
+    assert len({p.name for p in pool._slots[0].runner.registry.path.parent.iterdir()
+                if p.suffix == ".json"}) == 3
+
+
+def test_map_respects_max_workers(pool: KernelPool):
+    pool.map([f"c{i}" for i in range(6)], max_workers=2)
+    assert FakeKernelRunner.peak == 2
+
+
+def test_map_rejects_timeout_list_of_wrong_length(pool: KernelPool):
+    with pytest.raises(ValueError, match="timeout"):
+        pool.map(["a", "b", "c"], timeout=[1.0, 2.0])
+    assert FakeKernelRunner.created == 0
+
+
+def test_repeated_failures_recycle_kernel(tmp_path: Path):
+    FakeKernelRunner.created = 0
+    pool = KernelPool(1, state_dir=tmp_path, runner_factory=FakeKernelRunner)
+    pool.warmup()
+    slot = pool._slots[0]
+    slot.runner.fail = True
+    for _ in range(pool.max_failures):
+        with pytest.raises(JQExecutionError):
+            pool.run_code("x")
+    assert slot.runner.closed == 1
+    slot.runner.fail = False
+    assert pool.run_code("x")["stdout"] == "x@k2"  # 重建了新 kernel
+
+
+def test_idle_slot_is_probed_before_use(pool: KernelPool):
+    pool.map(["a", "b", "c"])
+    slot = pool._slots[0]
+    before = slot.runner.registry.load()["kernel_id"]
+    slot.last_ok -= pool.health_interval + 1
+    slot.runner.alive = False
+    pool.map(["x", "y", "z"])
+    assert slot.runner.registry.load()["kernel_id"] != before  # 探活发现已死 → 重建
+    assert FakeKernelRunner.created == 4
+    assert [h["slot"] for h in pool.health()] == [0, 1, 2]
+
+
+def test_probe_error_keeps_live_kernel_record(pool: KernelPool):
+    pool.map(["a", "b", "c"])
+    slot = pool._slots[0]
+    before = slot.runner.registry.load()["kernel_id"]
+    slot.last_ok -= pool.health_interval + 1
+    slot.runner.probe_error = True
+    pool.map(["x", "y", "z"])
+    assert slot.runner.registry.load()["kernel_id"] == before  # 网络抖动不丢记录
+    assert FakeKernelRunner.created == 3
+
+
+def test_probe_exception_returns_slot(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    pool = KernelPool(1, state_dir=tmp_path, runner_factory=FakeKernelRunner)
+
+    def boom(slot):
+        raise RuntimeError("probe")
+
+    monkeypatch.setattr(pool, "_probe", boom)
+    with pytest.raises(RuntimeError):
+        pool.run_code("x")
+    assert pool._idle.qsize() == 1  # 槽位归还, 后续取用不会永久阻塞
+    monkeypatch.undo()
+    assert pool.run_code("x")["stdout"].startswith("x@")
+
+
+def test_close_shuts_down_all_kernels(pool: KernelPool):
+    pool.warmup()
+    assert pool.close() == 3
+    assert pool.close() == 0
@@ -4,3 +4,22 @@ Based on López de Prado (2018), *Advances in Financial Machine Learning*.
 """
 
 __version__ = "0.1.0"
+
+# 子包按需加载: ``import qlab`` 本身不导入 pandas/sklearn 等重依赖,
+# ``qlab.models`` 之类的属性访问才导入对应子包。
+_SUBPACKAGES = frozenset({
+    "allocation", "core", "data", "diagnostics", "evaluation", "features",
+    "labeling", "models", "sizing", "weights", "workspace",
+})
+
+
+def __getattr__(name: str):
+    if name in _SUBPACKAGES:
+        import importlib
+
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | _SUBPACKAGES)
@@ -0,0 +1,40 @@
+"""子包惰性导出 — 模块级 ``__getattr__``(PEP 562).
+
+子包 ``__init__`` 过去一次性导入全部子模块, ``from qlab.models import PurgedKFold``
+也要连带加载 sklearn 的集成/搜索模块, 短命 CLI 与进程池 worker 白白多付几秒启动。
+:func:`lazy_exports` 让导出名在首次访问时才导入其定义模块:
+
+    __getattr__, __dir__ = lazy_exports(__name__, {
+        "qlab.models.cv.purged_kfold": ["PurgedKFold"],
+        ...
+    })
+
+取到的对象写回包命名空间, 之后的访问不再经过 ``__getattr__``。
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from collections.abc import Callable
+
+
+def lazy_exports(
+    package: str, exports: dict[str, list[str]]
+) -> tuple[Callable[[str], object], Callable[[], list[str]]]:
+    """为 ``package`` 生成 ``(__getattr__, __dir__)``; ``exports`` 为 模块 → 导出名列表."""
+    where = {name: module for module, names in exports.items() for name in names}
+
+    # 绑定为包的模块级 __getattr__ / __dir__(PEP 562), 同名便于回溯定位
+    def __getattr__(name: str) -> object:  # noqa: N807
+        module = where.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:  # noqa: N807
+        return sorted(set(vars(sys.modules[package])) | set(where))
+
+    return __getattr__, __dir__
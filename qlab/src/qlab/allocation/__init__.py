@@ -1,6 +1,10 @@
 """资产配置模块 — 书 Ch16."""
 
-from qlab.allocation.hrp import HierarchicalRiskParity
-from qlab.allocation.ivp import inverse_variance_portfolio
+from qlab._lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "qlab.allocation.hrp": ["HierarchicalRiskParity"],
+    "qlab.allocation.ivp": ["inverse_variance_portfolio"],
+})
 
 __all__ = ["HierarchicalRiskParity", "inverse_variance_portfolio"]
@@ -31,6 +31,26 @@ def cmd_workspace_remove(args: argparse.Namespace) -> None:
     print(f"已删除 workspace: {args.name}")
 
 
+def cmd_store_compact(args: argparse.Namespace) -> None:
+    from qlab.data.store import ParquetShardedBarStore
+    path = Path(args.path) if args.path else Path(args.root) / "store" / "bars"
+    if not path.exists():
+        print(f"(no bar store at {path})")
+        return
+    store = ParquetShardedBarStore(path)
+    stats = store.compact(kind=args.kind, source_version=args.source_version)
+    print(f"已压实 {stats['shards']} 个分片, 合并 {stats['deltas']} 个增量: {path}")
+
+
+def cmd_store_convert(args: argparse.Namespace) -> None:
+    from qlab.data.store import convert_bar_store
+    from qlab.workspace.manager import open_bar_store
+    src = open_bar_store(args.root, args.src)
+    dst = open_bar_store(args.root, args.dst)
+    rows = convert_bar_store(src, dst, kind=args.kind, source_version=args.source_version)
+    print(f"已转换 {rows} 行: {args.src} -> {args.dst}")
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(prog="qlab")
     parser.add_argument("--root", default=".", help="quant-lab 项目根目录")
@@ -52,6 +72,26 @@ def main(argv: list[str] | None = None) -> int:
     p_rm.add_argument("--force", action="store_true")
     p_rm.set_defaults(func=cmd_workspace_remove)
 
+    # store 子命令
+    st = sub.add_parser("store", help="共享缓存维护")
+    st_sub = st.add_subparsers(dest="store_cmd", required=True)
+
+    p_compact = st_sub.add_parser("compact", help="把 K 线分片的增量合并回基础分片")
+    p_compact.add_argument("--path", default=None,
+                           help="K 线分片缓存目录(默认 <root>/store/bars)")
+    p_compact.add_argument("--kind", default=None, help="只压实该 kind(如 daily)")
+    p_compact.add_argument("--source-version", default=None,
+                           help="只压实该数据源版本(需同时给 --kind)")
+    p_compact.set_defaults(func=cmd_store_compact)
+
+    p_convert = st_sub.add_parser("convert", help="在 K 线缓存后端之间搬运数据")
+    p_convert.add_argument("src", choices=["parquet", "partitioned", "arrow"])
+    p_convert.add_argument("dst", choices=["parquet", "partitioned", "arrow"])
+    p_convert.add_argument("--kind", default=None, help="只转换该 kind(如 daily)")
+    p_convert.add_argument("--source-version", default=None,
+                           help="只转换该数据源版本(需同时给 --kind)")
+    p_convert.set_defaults(func=cmd_store_convert)
+
     args = parser.parse_args(argv)
     args.func(args)
     return 0
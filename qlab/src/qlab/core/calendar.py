@@ -2,13 +2,18 @@
 
 抽象在 Protocol 层，默认实现用 exchange_calendars 库的 XSHG（上交所）。
 A 股深沪两市除少数特殊日外日历完全一致，XSHG 足够。
+
+日期运算走 :class:`SessionIndex`: 有序交易日数组 + ``searchsorted``,
+``prev/next_trading_day`` 是它的标量特例; 十万个事件日期整体偏移 N 个交易日
+只是一次 NumPy 调用(:meth:`AShareCalendar.shift_sessions`)。
 """
 
 from __future__ import annotations
 
 from datetime import time
-from typing import Protocol, runtime_checkable
+from typing import Literal, Protocol, runtime_checkable
 
+import numpy as np
 import pandas as pd
 
 
@@ -38,6 +43,84 @@ class Calendar(Protocol):
         ...
 
 
+class SessionIndex:
+    """有序交易日数组上的向量化日期运算.
+
+    所有输入日期先截到当日零点; ``NaT`` 原样传出。非交易日的约定与
+    ``prev/next_trading_day`` 一致:
+
+    - 向前偏移 ``n`` 步: 非交易日的"前第 1 个交易日"是其前最近交易日;
+    - 向后偏移 ``n`` 步: 非交易日先落到其后最近交易日并计为第 1 步;
+    - ``n == 0``: 原样返回(不对齐到交易日)。
+    """
+
+    def __init__(self, sessions: pd.DatetimeIndex) -> None:
+        self.sessions = pd.DatetimeIndex(sessions).as_unit("ns")
+        self._ns = self.sessions.asi8
+
+    def __len__(self) -> int:
+        return len(self._ns)
+
+    def ordinal(self, dates) -> np.ndarray:
+        """交易日序号(int64): 交易日为其在数组中的位置, 非交易日取其后最近交易日的位置."""
+        ns, _ = _floor_days(dates)
+        return np.searchsorted(self._ns, ns, side="left")
+
+    def contains(self, dates) -> np.ndarray:
+        """逐个判断是否交易日(bool 数组)."""
+        ns, nat = _floor_days(dates)
+        pos = np.searchsorted(self._ns, ns, side="left")
+        hit = pos < len(self._ns)
+        hit[hit] = self._ns[pos[hit]] == ns[hit]
+        return hit & ~nat
+
+    def shift(self, dates, n: int, *,
+              errors: Literal["raise", "coerce"] = "raise") -> pd.DatetimeIndex:
+        """每个日期偏移 ``n`` 个交易日(``n < 0`` 向前). 越界时 raise 或置 NaT."""
+        ns, nat = _floor_days(dates)
+        if n == 0:
+            return pd.DatetimeIndex(ns.view("datetime64[ns]"))
+        if n > 0:
+            pos = np.searchsorted(self._ns, ns, side="right") + (n - 1)
+        else:
+            pos = np.searchsorted(self._ns, ns, side="left") + n
+        bad = ((pos < 0) | (pos >= len(self._ns))) & ~nat
+        if bad.any() and errors == "raise":
+            day = pd.Timestamp(ns[np.argmax(bad)])
+            raise IndexError(
+                f"{day.date()} 偏移 {n} 个交易日超出日历范围 "
+                f"[{self.sessions[0].date()}, {self.sessions[-1].date()}]"
+            )
+        out = self._ns[np.clip(pos, 0, len(self._ns) - 1)]
+        out[bad | nat] = np.iinfo(np.int64).min
+        return pd.DatetimeIndex(out.view("datetime64[ns]"))
+
+    def between(self, start, end) -> np.ndarray:
+        """``[start, end]``(含两端) 内的交易日数, 逐对广播."""
+        lo, _ = _floor_days(start)
+        hi, _ = _floor_days(end)
+        n = (np.searchsorted(self._ns, hi, side="right")
+             - np.searchsorted(self._ns, lo, side="left"))
+        return np.maximum(n, 0)
+
+    def range(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.DatetimeIndex:
+        """``[start, end]`` 内的交易日."""
+        lo = np.searchsorted(self._ns, pd.Timestamp(start).normalize().value, side="left")
+        hi = np.searchsorted(self._ns, pd.Timestamp(end).normalize().value, side="right")
+        return self.sessions[lo:hi]
+
+
+def _floor_days(dates) -> tuple[np.ndarray, np.ndarray]:
+    """任意日期输入(标量/列表/Index/Series) → (当日零点的 int64 纳秒数组, NaT 掩码)."""
+    idx = pd.DatetimeIndex(np.atleast_1d(dates)).as_unit("ns").normalize()
+    return idx.asi8, np.asarray(idx.isna())
+
+
+# 无 exchange_calendars 时工作日 fallback 的覆盖范围
+_FALLBACK_FIRST = "1990-01-01"
+_FALLBACK_LAST = "2100-12-31"
+
+
 class AShareCalendar:
     """A 股交易日历（默认实现）.
 
@@ -56,61 +139,61 @@ class AShareCalendar:
     CLOSE_AUCTION_START = time(14, 57)
 
     def __init__(self) -> None:
-        # 延迟导入，避免顶层 import 慢
-        try:
-            import exchange_calendars as xcals
-            self._cal = xcals.get_calendar("XSHG")
-        except ImportError:
-            self._cal = None
+        # exchange_calendars 的导入与日历构建都慢, 推迟到首次查询
+        self._index: SessionIndex | None = None
+
+    @property
+    def session_index(self) -> SessionIndex:
+        """全部交易日的有序数组(首次访问时构建)."""
+        if self._index is None:
+            try:
+                import exchange_calendars as xcals
+                sessions = xcals.get_calendar("XSHG").sessions
+            except ImportError:
+                # fallback: 简单工作日（不准，仅 fallback）
+                sessions = pd.bdate_range(_FALLBACK_FIRST, _FALLBACK_LAST)
+            self._index = SessionIndex(sessions)
+        return self._index
 
     def is_trading_day(self, date: pd.Timestamp) -> bool:
-        if self._cal is not None:
-            return self._cal.is_session(pd.Timestamp(date).normalize())
-        # fallback: 简单工作日判断（不准，仅 fallback）
-        return pd.Timestamp(date).weekday() < 5
+        return bool(self.session_index.contains(date)[0])
 
     def trading_days(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.DatetimeIndex:
-        start = pd.Timestamp(start).normalize()
-        end = pd.Timestamp(end).normalize()
-        if self._cal is not None:
-            return self._cal.sessions_in_range(start, end)
-        return pd.bdate_range(start, end)
+        return self.session_index.range(start, end)
 
     def prev_trading_day(self, date: pd.Timestamp, n: int = 1) -> pd.Timestamp:
-        date = pd.Timestamp(date).normalize()
-        if self._cal is not None:
-            cur = date
-            for _ in range(n):
-                cur = self._cal.previous_session(cur)
-            return cur
-        # fallback
-        return date - pd.tseries.offsets.BDay(n)
+        return self.session_index.shift(date, -n)[0]
 
     def next_trading_day(self, date: pd.Timestamp, n: int = 1) -> pd.Timestamp:
         """返回 ``date`` 之后第 ``n`` 个交易日.
 
         若 ``date`` 本身不是交易日（价格索引含假期等），先落到其后最近
-        交易日并计为第 1 步，避免 ``exchange_calendars`` 抛 NotSessionError。
+        交易日并计为第 1 步。
         """
-        date = pd.Timestamp(date).normalize()
         if n < 0:
             raise ValueError("n 必须 >= 0")
-        if n == 0:
-            return date
-        if self._cal is not None:
-            cur = date
-            if not self._cal.is_session(cur):
-                cur = pd.Timestamp(self._cal.date_to_session(cur, direction="next")).normalize()
-                n -= 1
-                if n == 0:
-                    return cur
-            for _ in range(n):
-                cur = self._cal.next_session(cur)
-            return pd.Timestamp(cur).normalize()
-        return date + pd.tseries.offsets.BDay(n)
+        return self.session_index.shift(date, n)[0]
 
     def count_trading_days(self, start: pd.Timestamp, end: pd.Timestamp) -> int:
-        return len(self.trading_days(start, end))
+        return int(self.session_index.between(start, end)[0])
+
+    # ---- 向量化 -------------------------------------------------------------
+
+    def shift_sessions(self, dates, n: int, *,
+                       errors: Literal["raise", "coerce"] = "raise") -> pd.DatetimeIndex:
+        """整体偏移 ``n`` 个交易日(``n < 0`` 向前), 语义同 ``prev/next_trading_day``.
+
+        ``errors="coerce"`` 时越界日期置 NaT 而非抛 IndexError。
+        """
+        return self.session_index.shift(dates, n, errors=errors)
+
+    def session_ordinal(self, dates) -> np.ndarray:
+        """交易日序号; 非交易日取其后最近交易日的序号. 两日序号差即相隔交易日数."""
+        return self.session_index.ordinal(dates)
+
+    def sessions_between(self, start, end) -> np.ndarray:
+        """逐对统计 ``[start, end]``(含两端) 内的交易日数."""
+        return self.session_index.between(start, end)
 
     def session_times(self, date: pd.Timestamp) -> dict[str, pd.Timestamp]:
         d = pd.Timestamp(date).normalize()
@@ -125,6 +208,29 @@ class AShareCalendar:
         }
 
 
+def shift_sessions(calendar: Calendar, dates, n: int, *,
+                   errors: Literal["raise", "coerce"] = "raise") -> pd.DatetimeIndex:
+    """对任意 :class:`Calendar` 整体偏移 ``n`` 个交易日.
+
+    日历自带向量化 ``shift_sessions`` 时直接用; 否则按去重后的日期逐个调用
+    ``prev/next_trading_day``(第三方日历的兜底)。
+    """
+    fast = getattr(calendar, "shift_sessions", None)
+    if fast is not None:
+        return fast(dates, n, errors=errors)
+    idx = pd.DatetimeIndex(np.atleast_1d(dates)).normalize()
+    step = calendar.next_trading_day if n >= 0 else calendar.prev_trading_day
+    mapping = {}
+    for d in idx.dropna().unique():
+        try:
+            mapping[d] = step(d, abs(n))
+        except Exception:
+            if errors == "raise":
+                raise
+            mapping[d] = pd.NaT
+    return pd.DatetimeIndex(idx.map(mapping))
+
+
 _default_calendar: AShareCalendar | None = None
 
 
@@ -8,6 +8,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 
+import numpy as np
 import pandas as pd
 
 from qlab.core.exceptions import SchemaViolationError
@@ -497,7 +498,8 @@ SCHEMA_INDEX_VALUATION = Schema(
 
 def validate_schema(df: pd.DataFrame, schema: Schema, *,
                     strict_index: bool = True,
-                    check_invariants: bool = True) -> None:
+                    check_invariants: bool = True,
+                    sample_rows: int | None = None) -> None:
     """校验 DataFrame 是否符合 schema.
 
     参数
@@ -507,6 +509,8 @@ def validate_schema(df: pd.DataFrame, schema: Schema, *,
     strict_index : 是否严格校验索引名（False 时允许 RangeIndex）
     check_invariants : 是否运行运行时不变量检查. 默认开启 (设计原则 P4).
                        极少数性能敏感场景可显式关闭.
+    sample_rows : 非 None 时不变量只在至多这么多行的抽样上检查(固定种子, 结果可复现);
+                  索引/必备列/dtype 仍全量检查. 用于交互式探索时的快速抽检.
 
     抛出
     ----
@@ -543,6 +547,9 @@ def validate_schema(df: pd.DataFrame, schema: Schema, *,
         )
 
     if check_invariants:
+        if sample_rows is not None and len(df) > sample_rows:
+            rng = np.random.default_rng(0)
+            df = df.iloc[np.sort(rng.choice(len(df), size=sample_rows, replace=False))]
         _check_invariants(df, schema)
 
 
@@ -597,28 +604,50 @@ def _check_invariants(df: pd.DataFrame, schema: Schema) -> None:
         _check_factor_exposure_invariants(df)
 
 
+def _f64(df: pd.DataFrame, name: str) -> np.ndarray:
+    """列 → float64 数组(缺失为 NaN); 兼容可空整数/浮点与全 NA 的 object 列."""
+    return df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _flag(df: pd.DataFrame, name: str) -> np.ndarray:
+    """布尔列 → bool 数组(缺失视为 False)."""
+    return df[name].fillna(False).to_numpy(dtype=bool)
+
+
 def _check_daily_bar_invariants(df: pd.DataFrame) -> None:
+    """DailyBar 不变量. 每列只抽一次 NumPy 数组, 各条检查在数组上单趟完成.
+
+    NaN 参与的比较一律为 False, 故"需各列非空"的条件与逐列 ``notna`` 过滤等价。
+    """
     errs: list[str] = []
+    cols = set(df.columns)
+    f64: dict[str, np.ndarray] = {}
+    flags: dict[str, np.ndarray] = {}
+
+    def num(name: str) -> np.ndarray:
+        if name not in f64:
+            f64[name] = _f64(df, name)
+        return f64[name]
+
+    def flag(name: str) -> np.ndarray:
+        if name not in flags:
+            flags[name] = _flag(df, name)
+        return flags[name]
 
     # 1) close ≈ close_raw × adj_factor
-    if {"close", "close_raw", "adj_factor"}.issubset(df.columns):
-        mask = df[["close", "close_raw", "adj_factor"]].notna().all(axis=1)
-        diff = (df.loc[mask, "close"] - df.loc[mask, "close_raw"] * df.loc[mask, "adj_factor"]).abs()
-        bad = diff > 1e-4
+    if {"close", "close_raw", "adj_factor"} <= cols:
+        bad = np.abs(num("close") - num("close_raw") * num("adj_factor")) > 1e-4
         if bad.any():
             errs.append(f"close ≠ close_raw × adj_factor: {int(bad.sum())} 行")
 
     # 2) OHLC 序关系（后复权与不复权各自校验）
+    eps = 1e-6
     for prefix in ("", "_raw"):
-        cols = {f"open{prefix}", f"high{prefix}", f"low{prefix}", f"close{prefix}"}
-        if not cols.issubset(df.columns):
+        if not {f"open{prefix}", f"high{prefix}", f"low{prefix}", f"close{prefix}"} <= cols:
             continue
-        op = df[f"open{prefix}"]
-        hi = df[f"high{prefix}"]
-        lo = df[f"low{prefix}"]
-        cl = df[f"close{prefix}"]
-        present = op.notna() & hi.notna() & lo.notna() & cl.notna()
-        eps = 1e-6
+        op, hi = num(f"open{prefix}"), num(f"high{prefix}")
+        lo, cl = num(f"low{prefix}"), num(f"close{prefix}")
+        present = ~(np.isnan(op) | np.isnan(hi) | np.isnan(lo) | np.isnan(cl))
         bad = present & (
             (lo > op + eps) | (op > hi + eps) | (lo > cl + eps) | (cl > hi + eps) | (lo > hi + eps)
         )
@@ -626,59 +655,60 @@ def _check_daily_bar_invariants(df: pd.DataFrame) -> None:
             errs.append(f"OHLC{prefix} 序关系破坏: {int(bad.sum())} 行")
 
     # 3) is_limit_up + is_limit_down ≤ 1
-    if {"is_limit_up", "is_limit_down"}.issubset(df.columns):
-        bad = (df["is_limit_up"].fillna(False) & df["is_limit_down"].fillna(False))
+    if {"is_limit_up", "is_limit_down"} <= cols:
+        bad = flag("is_limit_up") & flag("is_limit_down")
         if bad.any():
             errs.append(f"同时涨停+跌停: {int(bad.sum())} 行")
 
     # 4) adj_factor > 0
-    if "adj_factor" in df.columns:
-        bad = df["adj_factor"].notna() & (df["adj_factor"] <= 0)
+    if "adj_factor" in cols:
+        bad = num("adj_factor") <= 0
         if bad.any():
             errs.append(f"adj_factor ≤ 0: {int(bad.sum())} 行")
 
     # 5) days_since_listing ≥ 0
-    if "days_since_listing" in df.columns:
-        bad = df["days_since_listing"].notna() & (df["days_since_listing"] < 0)
+    if "days_since_listing" in cols:
+        bad = num("days_since_listing") < 0
         if bad.any():
             errs.append(f"days_since_listing < 0: {int(bad.sum())} 行")
 
     # 6) 停牌 → price NaN, volume=0, amount=0
-    if "is_suspended" in df.columns and {"volume", "amount"}.issubset(df.columns):
-        sus = df[df["is_suspended"].fillna(False)]
-        if (sus["volume"].fillna(0) != 0).any() or (sus["amount"].fillna(0) != 0).any():
-            errs.append("停牌日 volume/amount 非 0")
-        # price NaN
-        price_cols_present = [c for c in ("open", "high", "low", "close") if c in sus.columns]
-        if price_cols_present and sus[price_cols_present].notna().any().any():
-            non_nan = int(sus[price_cols_present].notna().any(axis=1).sum())
-            if non_nan:
-                errs.append(f"停牌日价格列非 NaN: {non_nan} 行")
+    if "is_suspended" in cols and {"volume", "amount"} <= cols:
+        sus = flag("is_suspended")
+        if sus.any():
+            v = np.nan_to_num(num("volume")[sus])
+            a = np.nan_to_num(num("amount")[sus])
+            if (v != 0).any() or (a != 0).any():
+                errs.append("停牌日 volume/amount 非 0")
+            price_cols = [c for c in ("open", "high", "low", "close") if c in cols]
+            if price_cols:
+                priced = np.zeros(int(sus.sum()), dtype=bool)
+                for c in price_cols:
+                    priced |= ~np.isnan(num(c)[sus])
+                non_nan = int(priced.sum())
+                if non_nan:
+                    errs.append(f"停牌日价格列非 NaN: {non_nan} 行")
 
     # 7) is_limit_up=True → close_raw 接近 limit_up_price（同理 down）
-    for flag, ref in [("is_limit_up", "limit_up_price"),
-                      ("is_limit_down", "limit_down_price")]:
-        if {flag, ref, "close_raw"}.issubset(df.columns):
-            mask = df[flag].fillna(False) & df["close_raw"].notna() & df[ref].notna()
-            if mask.any():
-                diff = (df.loc[mask, "close_raw"] - df.loc[mask, ref]).abs()
-                # A 股报价精度 0.01，容差略放宽
-                bad = diff > 1e-2
-                if bad.any():
-                    errs.append(f"{flag}=True 但 close_raw ≠ {ref}: {int(bad.sum())} 行")
+    for flag_col, ref in [("is_limit_up", "limit_up_price"),
+                          ("is_limit_down", "limit_down_price")]:
+        if {flag_col, ref, "close_raw"} <= cols:
+            # A 股报价精度 0.01，容差略放宽
+            bad = flag(flag_col) & (np.abs(num("close_raw") - num(ref)) > 1e-2)
+            if bad.any():
+                errs.append(f"{flag_col}=True 但 close_raw ≠ {ref}: {int(bad.sum())} 行")
 
     # 8) volume > 0 ⇔ amount > 0
-    if {"volume", "amount"}.issubset(df.columns):
-        v = df["volume"].fillna(0)
-        a = df["amount"].fillna(0)
-        bad = ((v > 0) ^ (a > 0))
+    if {"volume", "amount"} <= cols:
+        bad = (num("volume") > 0) ^ (num("amount") > 0)
         if bad.any():
             errs.append(f"volume>0 与 amount>0 不一致: {int(bad.sum())} 行")
 
     # 9) free_float ≤ float ≤ total
-    if {"free_float_shares", "float_shares", "total_shares"}.issubset(df.columns):
-        sub = df[["free_float_shares", "float_shares", "total_shares"]].dropna()
-        bad = (sub["free_float_shares"] > sub["float_shares"]) | (sub["float_shares"] > sub["total_shares"])
+    if {"free_float_shares", "float_shares", "total_shares"} <= cols:
+        free, flt, tot = num("free_float_shares"), num("float_shares"), num("total_shares")
+        present = ~(np.isnan(free) | np.isnan(flt) | np.isnan(tot))
+        bad = present & ((free > flt) | (flt > tot))
         if bad.any():
             errs.append(f"股本大小关系破坏: {int(bad.sum())} 行")
 
@@ -5,36 +5,56 @@
 
 公开 API：
     DataLayer            统一数据访问入口
+    DailyPanel           日线宽表面板(date × symbol 数组)
+    IntradayCube         日内立方体(day × bar 槽位 × symbol 数组)
     DataSource           外部数据源 Protocol
     BarStore             缓存层 Protocol
     Universe             投资域查询
 """
 
-from qlab.data.interfaces import BarStore, DataSource, ShardedBarStore
-from qlab.data.layer import DataLayer
-from qlab.data.store import (
-    InMemoryBarStore,
-    InMemoryShardedBarStore,
-    ParquetBarStore,
-    ParquetShardedBarStore,
-)
-from qlab.data.universe import (
-    Universe,
-    UniverseSpec,
-    apply_board_filters,
-    is_bj_symbol,
-    is_star_symbol,
-)
+from qlab._lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "qlab.data.interfaces": ["BarStore", "DataSource", "ShardedBarStore"],
+    "qlab.data.cube": ["IntradayCube"],
+    "qlab.data.layer": ["DataLayer"],
+    "qlab.data.panel": ["DailyPanel"],
+    "qlab.data.session": ["DataSession"],
+    "qlab.data.store": [
+        "ArrowIpcBarStore",
+        "CachingShardedBarStore",
+        "InMemoryBarStore",
+        "InMemoryShardedBarStore",
+        "ParquetBarStore",
+        "ParquetShardedBarStore",
+        "PartitionedParquetBarStore",
+        "convert_bar_store",
+    ],
+    "qlab.data.universe": [
+        "Universe",
+        "UniverseSpec",
+        "apply_board_filters",
+        "is_bj_symbol",
+        "is_star_symbol",
+    ],
+})
 
 __all__ = [
     "DataLayer",
+    "DailyPanel",
+    "IntradayCube",
+    "DataSession",
     "DataSource",
     "BarStore",
     "ShardedBarStore",
+    "ArrowIpcBarStore",
+    "CachingShardedBarStore",
     "InMemoryBarStore",
     "InMemoryShardedBarStore",
     "ParquetBarStore",
     "ParquetShardedBarStore",
+    "PartitionedParquetBarStore",
+    "convert_bar_store",
     "Universe",
     "UniverseSpec",
     "apply_board_filters",
@@ -6,20 +6,102 @@
   - PIT 怎么保证不泄漏
   - 怎么并行
 
-简化版（v1）：内存中已加载的 intraday DataFrame 直接处理。
-未来扩展（v2）：lazy load 分钟数据 + 文件分片并行。
+滑动窗口引擎: 整段日内数据只加载一次, 按 (symbol, timestamp) 排序后每个
+(目标日, 标的) 的回看窗口是一段连续 bar 区间 ``[lo, hi)``(见 :class:`IntradayWindows`)。
+特征可提供向量化 ``reducer`` 一次算出全部窗口; 不提供(或 reducer 放弃)时
+退回逐 (date, symbol) 调用 ``compute_fn``, 同样只切片不重读。
 """
 
 from __future__ import annotations
 
 from collections.abc import Callable
+from dataclasses import dataclass
 
 import numpy as np
 import pandas as pd
 
-from qlab.core.calendar import Calendar
+from qlab.core.calendar import Calendar, shift_sessions
 from qlab.core.enums import Freq
 
+# 窗口终点: 目标日 15:00(含收盘集合竞价), PIT 切片不越过当日最后一个 bar
+_SESSION_END = pd.Timedelta(hours=15)
+
+
+@dataclass(frozen=True)
+class IntradayWindows:
+    """一次加载的日内 bar + 每个 (目标日, 标的) 回看窗口的 bar 区间.
+
+    ``frame`` 按 (symbol, timestamp) 排序、去掉 symbol 层(与 ``xs`` 结果同形);
+    ``codes[i]`` 为第 i 个 bar 所属标的在 ``symbols`` 中的位置;
+    ``lo`` / ``hi`` 形如 ``(n_dates, n_symbols)``, 窗口为 ``frame.iloc[lo:hi]``,
+    ``lo == hi`` 表示无数据。平坦索引(单标的模式)下所有标的共享同一组 bar。
+    """
+
+    dates: pd.DatetimeIndex
+    symbols: pd.Index
+    frame: pd.DataFrame
+    codes: np.ndarray
+    lo: np.ndarray
+    hi: np.ndarray
+
+    @property
+    def timestamps(self) -> pd.DatetimeIndex:
+        ts = self.frame.index
+        if isinstance(ts, pd.MultiIndex):
+            ts = ts.get_level_values("timestamp")
+        return pd.DatetimeIndex(ts)
+
+    def column(self, name: str) -> np.ndarray:
+        """bar 级 float64 数组(缺失为 NaN)."""
+        return pd.to_numeric(self.frame[name]).to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def count(self, mask: np.ndarray | None = None) -> np.ndarray:
+        """每个窗口内(满足 ``mask`` 的) bar 数."""
+        if mask is None:
+            return self.hi - self.lo
+        csum = np.concatenate([[0], np.cumsum(mask, dtype=np.int64)])
+        return csum[self.hi] - csum[self.lo]
+
+    def first(self, mask: np.ndarray) -> np.ndarray:
+        """每个窗口内第一个满足 ``mask`` 的 bar 位置, 没有则 -1."""
+        n = len(mask)
+        nxt = np.where(mask, np.arange(n), n)
+        nxt = np.concatenate([np.minimum.accumulate(nxt[::-1])[::-1], [n]])
+        pos = nxt[self.lo]
+        return np.where(pos < self.hi, pos, -1)
+
+    def last(self, mask: np.ndarray) -> np.ndarray:
+        """每个窗口内最后一个满足 ``mask`` 的 bar 位置, 没有则 -1."""
+        prv = np.maximum.accumulate(np.where(mask, np.arange(len(mask)), -1))
+        prv = np.concatenate([[-1], prv])
+        pos = prv[self.hi]
+        return np.where(pos >= self.lo, pos, -1)
+
+    def block_start(self) -> np.ndarray:
+        """每个 bar 所属标的连续段的起始位置(段内相对下标 = i - block_start[i])."""
+        starts = np.flatnonzero(np.r_[True, self.codes[1:] != self.codes[:-1]])
+        return np.repeat(starts, np.diff(np.r_[starts, len(self.codes)]))
+
+    def apply(self, compute_fn: Callable[[pd.DataFrame], float]) -> np.ndarray:
+        """逐窗口调用 ``compute_fn``(回调路径); 空窗口或抛错记 NaN."""
+        out = np.full(self.lo.shape, np.nan)
+        for i, j in zip(*np.nonzero(self.hi > self.lo), strict=True):
+            try:
+                out[i, j] = float(compute_fn(self.frame.iloc[self.lo[i, j]:self.hi[i, j]]))
+            except Exception:
+                out[i, j] = np.nan
+        return out
+
+    def to_series(self, values: np.ndarray) -> pd.Series:
+        """``(n_dates, n_symbols)`` 结果 → MultiIndex(date, symbol) Series."""
+        values = np.where(self.hi > self.lo, values, np.nan)
+        idx = pd.MultiIndex.from_product([self.dates, self.symbols], names=["date", "symbol"])
+        return pd.Series(values.ravel(), index=idx, name="value").sort_index()
+
+
+# 向量化窗口归约: 返回 (n_dates, n_symbols) 数组; 返回 None 表示数据不适用, 走回调
+Reducer = Callable[[IntradayWindows], "np.ndarray | None"]
+
 
 class IntradayAligner:
     """日内 → 日级特征对齐器."""
@@ -58,6 +140,52 @@ class IntradayAligner:
         # 平坦索引（仅 timestamp）
         return df.loc[(df.index >= start) & (df.index <= end)]
 
+    def windows(
+        self,
+        symbols: list[str],
+        dates: pd.DatetimeIndex,
+        lookback_days: int,
+    ) -> IntradayWindows:
+        """一次加载覆盖全部目标日回看窗口的日内数据, 给出每个窗口的 bar 区间.
+
+        目标日 ``d`` 的窗口为 ``[d 前第 lookback_days-1 个交易日 0:00, d 15:00]``。
+        """
+        dates = pd.DatetimeIndex(dates)
+        sym_index = pd.Index(symbols, name="symbol")
+        starts = shift_sessions(self._cal, dates, -max(lookback_days - 1, 0)).normalize()
+        ends = dates.normalize() + _SESSION_END
+        if len(dates):
+            frame = self._load_window(symbols, starts.min(), ends.max())
+        else:
+            frame = pd.DataFrame()
+
+        if isinstance(frame.index, pd.MultiIndex):
+            codes = sym_index.get_indexer(frame.index.get_level_values("symbol"))
+            ts = pd.DatetimeIndex(frame.index.get_level_values("timestamp")).as_unit("ns").asi8
+            keep = codes >= 0
+            order = np.lexsort((ts[keep], codes[keep]))
+            rows = np.flatnonzero(keep)[order]
+            frame = frame.iloc[rows].droplevel("symbol")
+            codes, ts = codes[rows], ts[rows]
+            bounds = np.searchsorted(codes, np.arange(len(symbols) + 1))
+            blocks = [(j, bounds[j], bounds[j + 1]) for j in range(len(symbols))]
+        else:
+            # 单一 symbol 模式: 全部标的共享同一组 bar
+            frame = frame.sort_index(kind="stable")
+            ts = pd.DatetimeIndex(frame.index).as_unit("ns").asi8 if len(frame) else \
+                np.empty(0, dtype=np.int64)
+            codes = np.zeros(len(frame), dtype=np.int64)
+            blocks = [(j, 0, len(frame)) for j in range(len(symbols))]
+
+        lo = np.zeros((len(dates), len(symbols)), dtype=np.int64)
+        hi = np.zeros_like(lo)
+        lo_ns = starts.as_unit("ns").asi8
+        hi_ns = ends.as_unit("ns").asi8
+        for j, a, b in blocks:
+            lo[:, j] = a + np.searchsorted(ts[a:b], lo_ns, side="left")
+            hi[:, j] = a + np.searchsorted(ts[a:b], hi_ns, side="right")
+        return IntradayWindows(dates, sym_index, frame, np.asarray(codes), lo, hi)
+
     def apply_rolling(
         self,
         compute_fn: Callable[[pd.DataFrame], float],
@@ -65,52 +193,20 @@ class IntradayAligner:
         dates: pd.DatetimeIndex,
         lookback_days: int,
         freq: Freq = Freq.MIN_30,
+        reducer: Reducer | None = None,
     ) -> pd.Series:
-        """对每个 (date, symbol) 调用 compute_fn(过去 lookback_days 的日内数据).
+        """对每个 (date, symbol) 计算过去 lookback_days 的日内数据上的日级值.
+
+        给了 ``reducer`` 时一次向量化算出全部窗口; 否则(或 reducer 返回 None)
+        对每个窗口调用 compute_fn。两条路径共用一次加载的数据。
 
         返回 MultiIndex(date, symbol) 的 Series.
 
         重要：PIT 切片严格 ≤ date 当日的最后一个 bar（含集合竞价）.
         """
-        out: dict[tuple[pd.Timestamp, str], float] = {}
-
-        for date in dates:
-            # 历史窗口
-            start_date = self._cal.prev_trading_day(date, lookback_days - 1)
-            start_ts = pd.Timestamp(start_date).normalize()
-            end_ts = pd.Timestamp(date).normalize() + pd.Timedelta(hours=15)
-
-            window = self._load_window(symbols, start_ts, end_ts)
-            if window.empty:
-                for s in symbols:
-                    out[(date, s)] = np.nan
-                continue
-
-            # 按 symbol 分组计算
-            if isinstance(window.index, pd.MultiIndex):
-                for symbol in symbols:
-                    try:
-                        sym_window = window.xs(symbol, level="symbol")
-                    except KeyError:
-                        out[(date, symbol)] = np.nan
-                        continue
-                    if sym_window.empty:
-                        out[(date, symbol)] = np.nan
-                    else:
-                        try:
-                            out[(date, symbol)] = float(compute_fn(sym_window))
-                        except Exception:
-                            out[(date, symbol)] = np.nan
-            else:
-                # 单一 symbol 模式
-                for symbol in symbols:
-                    if window.empty:
-                        out[(date, symbol)] = np.nan
-                    else:
-                        try:
-                            out[(date, symbol)] = float(compute_fn(window))
-                        except Exception:
-                            out[(date, symbol)] = np.nan
-
-        idx = pd.MultiIndex.from_tuples(out.keys(), names=["date", "symbol"])
-        return pd.Series(list(out.values()), index=idx, name="value").sort_index()
+        windows = self.windows(symbols, dates, lookback_days)
+        if reducer is not None:
+            values = reducer(windows)
+            if values is not None:
+                return windows.to_series(values)
+        return windows.to_series(windows.apply(compute_fn))
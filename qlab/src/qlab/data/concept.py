@@ -1,9 +1,20 @@
-"""ConceptClassification 查询工具 — PIT 安全."""
+"""ConceptClassification 查询工具 — PIT 安全.
+
+单日查询用 :func:`concepts_as_of`; 整段日期用 :func:`concept_intervals` 得到
+(symbol, concept_code, valid_from, valid_to) 区间表, 再由 :func:`expand_concepts`
+对目标日期 searchsorted 一次展开成长表(稀疏关联), 不逐日过滤、拼接。
+"""
 
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
+from qlab.data.industry import _ns, _ranges
+
+INTERVAL_COLUMNS = ["symbol", "concept_code", "concept_name", "valid_from", "valid_to"]
+MEMBERSHIP_COLUMNS = ["date", "symbol", "concept_code", "concept_name"]
+
 
 def concepts_as_of(
     concepts: pd.DataFrame,
@@ -59,3 +70,49 @@ def concept_members_as_of(
     active = df[mask_start & mask_end]
 
     return sorted(active["symbol"].unique().tolist())
+
+
+def concept_intervals(concepts: pd.DataFrame, source: str = "eastmoney") -> pd.DataFrame:
+    """概念记录 → 归属区间表, columns = :data:`INTERVAL_COLUMNS`.
+
+    ``valid_from`` = effective_date, ``valid_to`` = expired_date(不含; NaT 为一直有效),
+    与 :func:`concepts_as_of` 的筛选口径一致。
+    """
+    df = concepts.reset_index() if isinstance(concepts.index, pd.MultiIndex) else concepts
+    if df.empty or "source" not in df.columns:
+        return pd.DataFrame(columns=INTERVAL_COLUMNS)
+    df = df[df["source"] == source]
+    return pd.DataFrame({
+        "symbol": df["symbol"].to_numpy(),
+        "concept_code": df["concept_code"].to_numpy(),
+        "concept_name": df["concept_name"].to_numpy(),
+        "valid_from": pd.to_datetime(df["effective_date"]).to_numpy(),
+        "valid_to": pd.to_datetime(df["expired_date"]).to_numpy(),
+    }, columns=INTERVAL_COLUMNS)
+
+
+def expand_concepts(intervals: pd.DataFrame, dates: pd.DatetimeIndex,
+                    symbols: list[str] | None = None) -> pd.DataFrame:
+    """区间表 → 各日有效的 (date, symbol, concept_code, concept_name) 长表.
+
+    按 (date, symbol, concept_code) 排序; ``symbols`` 为 None 时不限标的。
+    """
+    iv = intervals if symbols is None else intervals[intervals["symbol"].isin(symbols)]
+    days = pd.DatetimeIndex(sorted(set(pd.DatetimeIndex(dates).normalize()))).as_unit("ns")
+    if iv.empty or len(days) == 0:
+        return pd.DataFrame(columns=MEMBERSHIP_COLUMNS)
+    sorted_days = days.to_numpy()
+    lo = np.searchsorted(sorted_days, _ns(iv["valid_from"]), "left")
+    hi = np.searchsorted(sorted_days, _ns(iv["valid_to"], open_end=True), "left")
+    span = np.maximum(hi - lo, 0)
+    total = int(span.sum())
+    if total == 0:
+        return pd.DataFrame(columns=MEMBERSHIP_COLUMNS)
+    out = pd.DataFrame({
+        "date": sorted_days[_ranges(lo, span, total)],
+        "symbol": np.repeat(iv["symbol"].to_numpy(), span),
+        "concept_code": np.repeat(iv["concept_code"].to_numpy(), span),
+        "concept_name": np.repeat(iv["concept_name"].to_numpy(), span),
+    })
+    return out.sort_values(["date", "symbol", "concept_code"], kind="stable") \
+        .reset_index(drop=True)
@@ -0,0 +1,122 @@
+"""IntradayCube — 日内 K 线立方体(day × bar 槽位 × symbol 连续数组).
+
+A 股 30m/60m 等分钟线每个交易日的 bar 槽位固定(上午 / 下午各若干根), 长表
+``MultiIndex(timestamp, symbol)`` 却要为每一行背一份索引, 日内特征再按
+(date, symbol) groupby。:class:`IntradayCube` 把长表落成稠密数组:
+
+- 共享 ``days``(DatetimeIndex)、``slots``(bar 时刻相对当日零点的 TimedeltaIndex)
+  与 ``symbols``(Index);
+- 每个字段一个 C 连续的 ``(n_days, n_slots, n_symbols)`` 数组 —— 数值列 float64
+  (停牌/缺 bar 为 NaN), 布尔列 bool(缺格 False);
+- ``sessions`` 给出每个槽位所属时段(由 :meth:`Calendar.session_times` 判定),
+  日内归约直接沿 ``axis=1`` 做, 无需 groupby。
+
+行/列集合取数据中出现过的交易日 / 槽位 / 标的(升序)。由
+:meth:`DataLayer.intraday_cube` 构造并按 (频率, 区间, 投资域) 记忆化。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from qlab.core.calendar import Calendar
+from qlab.data.panel import _readonly, _scatter
+
+# 槽位时段标签, 与 IntradayBar schema 的 session 取值一致
+SLOT_SESSIONS = ("open_auction", "morning", "afternoon", "close_auction")
+
+
+@dataclass(frozen=True)
+class IntradayCube:
+    """日内 K 线立方体. 见模块说明."""
+
+    days: pd.DatetimeIndex
+    slots: pd.TimedeltaIndex
+    symbols: pd.Index
+    sessions: np.ndarray
+    arrays: dict[str, np.ndarray] = field(default_factory=dict)
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame, fields: list[str], calendar: Calendar) -> IntradayCube:
+        """MultiIndex(timestamp, symbol) 长表 → 立方体; 只落 ``fields`` 中存在的列."""
+        if df.empty:
+            days = pd.DatetimeIndex([], name="date")
+            slots = pd.TimedeltaIndex([], name="slot")
+            symbols = pd.Index([], dtype=object, name="symbol")
+            return cls(days, slots, symbols, _readonly(np.empty(0, dtype=object)), {
+                f: _readonly(np.empty((0, 0, 0), dtype=np.float64)) for f in fields
+            })
+        ts = pd.DatetimeIndex(df.index.get_level_values("timestamp"))
+        day = ts.normalize()
+        day_codes, days = pd.factorize(day, sort=True)
+        slot_codes, slots = pd.factorize(ts - day, sort=True)
+        sym_codes, symbols = pd.factorize(df.index.get_level_values("symbol"), sort=True)
+        days = pd.DatetimeIndex(days, name="date")
+        slots = pd.TimedeltaIndex(slots, name="slot")
+        symbols = pd.Index(symbols, name="symbol")
+
+        n_days, n_slots, n_syms = len(days), len(slots), len(symbols)
+        rows = day_codes * n_slots + slot_codes
+        arrays = {
+            f: _scatter(df[f], rows, sym_codes, (n_days * n_slots, n_syms))
+            .reshape(n_days, n_slots, n_syms)
+            for f in fields if f in df.columns
+        }
+        return cls(days, slots, symbols, _slot_sessions(slots, days[0], calendar), arrays)
+
+    @property
+    def fields(self) -> list[str]:
+        return list(self.arrays)
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        return len(self.days), len(self.slots), len(self.symbols)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.arrays
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        try:
+            return self.arrays[name]
+        except KeyError:
+            raise KeyError(f"立方体无字段 {name!r}, 已有 {self.fields}") from None
+
+    def session_mask(self, session: str) -> np.ndarray:
+        """属于 ``session``(见 :data:`SLOT_SESSIONS`) 的槽位布尔掩码, 形如 ``(n_slots,)``."""
+        if session not in SLOT_SESSIONS:
+            raise ValueError(f"未知时段 {session!r}, 可选 {SLOT_SESSIONS}")
+        return self.sessions == session
+
+    def with_fields(self, other: IntradayCube) -> IntradayCube:
+        """并入 ``other`` 的字段(需同一 days/slots/symbols 网格), 返回新立方体."""
+        if not (other.days.equals(self.days) and other.slots.equals(self.slots)
+                and other.symbols.equals(self.symbols)):
+            raise ValueError("立方体网格不一致, 无法合并字段")
+        return IntradayCube(self.days, self.slots, self.symbols, self.sessions,
+                            {**self.arrays, **other.arrays})
+
+
+def _slot_sessions(slots: pd.TimedeltaIndex, day: pd.Timestamp,
+                   calendar: Calendar) -> np.ndarray:
+    """按日历会话时刻给槽位打时段标签.
+
+    槽位是 bar 的结束时刻: 早于上午开盘为 open_auction, 不晚于上午收盘为
+    morning; 整根 bar 落在尾盘集合竞价内(bar 起点 ≥ ``close_auction_start``,
+    bar 宽取相邻槽位的最小间隔)为 close_auction, 其余为 afternoon —— 1m 的
+    14:58..15:00 归尾盘集竞, 30m/60m 的 15:00 仍是下午连续竞价。
+    """
+    times = {k: pd.Timestamp(v) - day for k, v in calendar.session_times(day).items()}
+    gaps = np.diff(slots.asi8)
+    width = pd.Timedelta(int(gaps.min()) if len(gaps) else 0)
+    out = np.full(len(slots), "afternoon", dtype=object)
+    out[slots - width >= times["close_auction_start"]] = "close_auction"
+    out[slots <= times["morning_close"]] = "morning"
+    out[slots < times["morning_open"]] = "open_auction"
+    return _readonly(out)
@@ -0,0 +1,130 @@
+"""缺失分片的取数规划 — 把 (symbol, 月份) 缺口拼成少量矩形请求.
+
+早先 ``DataLayer`` 把全部缺口并成一个矩形: 所有缺失标的 × [最早缺失月, 最晚缺失月]。
+十年缓存的宇宙里新上市一只股票, 就会连带把最新一个月的全体标的按十年跨度重取;
+缺口零散时更是成倍多取。
+
+:func:`plan_fetches` 的做法:
+
+1. 每个标的的缺失月份切成连续段, 同一段 ``[起, 止]`` 的标的归为一个矩形 ——
+   此时恰好覆盖缺口, 不多取一格;
+2. 矩形数超过 ``max_requests`` 时, 贪心合并"合并后多取格数最少"的相邻矩形
+   (按起止月排序后相邻), 直到满足请求预算。
+
+``max_requests=1`` 退化为旧行为(一个外接矩形)。
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class FetchRect:
+    """一次取数请求: ``symbols`` × ``[first_month, last_month]``(含两端, ``YYYY-MM``)."""
+
+    symbols: tuple[str, ...]
+    first_month: str
+    last_month: str
+
+    @property
+    def start(self) -> pd.Timestamp:
+        return pd.Timestamp(f"{self.first_month}-01")
+
+    @property
+    def end(self) -> pd.Timestamp:
+        return (pd.Timestamp(f"{self.last_month}-01") + pd.offsets.MonthEnd(0)).normalize()
+
+    @property
+    def n_cells(self) -> int:
+        return len(self.symbols) * (_ordinal(self.last_month) - _ordinal(self.first_month) + 1)
+
+
+def plan_fetches(missing: Iterable[tuple[str, str]], max_requests: int = 8) -> list[FetchRect]:
+    """把缺失的 ``(symbol, 'YYYY-MM')`` 规划成不超过 ``max_requests`` 个矩形请求.
+
+    结果覆盖全部缺口; 在预算内尽量少多取(见模块说明)。按起始月、标的排序返回。
+    """
+    if max_requests < 1:
+        raise ValueError(f"max_requests 必须 >= 1, 收到 {max_requests}")
+    by_symbol: dict[str, set[int]] = {}
+    for sym, ym in missing:
+        by_symbol.setdefault(sym, set()).add(_ordinal(ym))
+    if not by_symbol:
+        return []
+
+    # 1) 每个标的的连续缺失段 → 按段归组, 精确覆盖
+    groups: dict[tuple[int, int], set[str]] = {}
+    for sym, months in by_symbol.items():
+        ordered = sorted(months)
+        lo = prev = ordered[0]
+        for m in ordered[1:]:
+            if m != prev + 1:
+                groups.setdefault((lo, prev), set()).add(sym)
+                lo = m
+            prev = m
+        groups.setdefault((lo, prev), set()).add(sym)
+
+    rects = [_Rect(set(syms), lo, hi, len(syms) * (hi - lo + 1))
+             for (lo, hi), syms in sorted(groups.items())]
+    if len(rects) > max_requests:
+        rects = _merge_to_budget(rects, max_requests)
+    out = [FetchRect(tuple(sorted(r.symbols)), _month(r.lo), _month(r.hi)) for r in rects]
+    return sorted(out, key=lambda r: (r.first_month, r.last_month, r.symbols))
+
+
+@dataclass
+class _Rect:
+    symbols: set[str]
+    lo: int
+    hi: int
+    cells: int  # 真实缺口格数(合并后多取的不算)
+
+
+def _merge_cost(a: _Rect, b: _Rect) -> int:
+    area = len(a.symbols | b.symbols) * (max(a.hi, b.hi) - min(a.lo, b.lo) + 1)
+    return area - a.cells - b.cells
+
+
+def _merge_to_budget(rects: list[_Rect], budget: int) -> list[_Rect]:
+    """相邻矩形贪心合并: 每次合并多取格数最少的一对, 链表 + 惰性失效堆."""
+    n = len(rects)
+    prev = list(range(-1, n - 1))
+    nxt = list(range(1, n + 1))
+    nxt[-1] = -1
+    alive = [True] * n
+    version = [0] * n
+    heap = [(_merge_cost(rects[i], rects[i + 1]), i, i + 1, 0, 0) for i in range(n - 1)]
+    heapq.heapify(heap)
+    remaining = n
+    while remaining > budget and heap:
+        _, i, j, vi, vj = heapq.heappop(heap)
+        if not (alive[i] and alive[j]) or version[i] != vi or version[j] != vj:
+            continue
+        a, b = rects[i], rects[j]
+        rects[i] = _Rect(a.symbols | b.symbols, min(a.lo, b.lo), max(a.hi, b.hi),
+                         a.cells + b.cells)
+        version[i] += 1
+        alive[j] = False
+        nxt[i] = nxt[j]
+        if nxt[j] != -1:
+            prev[nxt[j]] = i
+        remaining -= 1
+        for left, right in ((prev[i], i), (i, nxt[i])):
+            if left != -1 and right != -1:
+                heapq.heappush(heap, (_merge_cost(rects[left], rects[right]),
+                                      left, right, version[left], version[right]))
+    return [r for r, ok in zip(rects, alive, strict=True) if ok]
+
+
+def _ordinal(ym: str) -> int:
+    year, month = ym.split("-")
+    return int(year) * 12 + int(month) - 1
+
+
+def _month(ordinal: int) -> str:
+    return f"{ordinal // 12:04d}-{ordinal % 12 + 1:02d}"
@@ -3,14 +3,27 @@
 §3.14 设计：(announce_date, symbol, report_type) 三维索引。
 PIT 查询语义：在 available_at ≤ t 的所有记录里，按 report_period 取最近一期；
 同一 report_period 优先级 official > flash > forecast。
+
+单日查询用 :func:`latest_fundamental_as_of`; 整段日期 × 标的的矩阵用
+:class:`PITIndex`(一次排序 + 一次 as-of 合并, 不再逐日过滤/排序/分组)。
 """
 
 from __future__ import annotations
 
+from dataclasses import dataclass
+
+import numpy as np
 import pandas as pd
 
 from qlab.core.enums import ReportType
 
+_PRIORITY = {rt.value: rt.priority for rt in ReportType}
+
+
+def _priority(report_type: pd.Series) -> pd.Series:
+    """report_type(str 或 ReportType) → 优先级整数; 未知类型记 0."""
+    return report_type.astype(str).map(_PRIORITY).fillna(0).astype("int64")
+
 
 def latest_fundamental_as_of(
     fundamentals: pd.DataFrame,
@@ -45,10 +58,7 @@ def latest_fundamental_as_of(
         return pd.Series(dtype=float)
 
     # 2) 排序：按 (symbol, report_period desc, report_type priority desc)
-    df = df.copy()
-    df["_priority"] = df["report_type"].map(
-        lambda x: ReportType(x).priority if isinstance(x, str) else x.priority
-    )
+    df = df.assign(_priority=_priority(df["report_type"]))
     df = df.sort_values(
         ["symbol", "report_period", "_priority"],
         ascending=[True, False, False],
@@ -123,3 +133,155 @@ def ttm_value(
     if symbols is not None:
         result = result.reindex(symbols)
     return result
+
+
+@dataclass(frozen=True)
+class PITIndex:
+    """财务 PIT 索引: 按 (symbol, available_at, 排名) 预排序的披露记录.
+
+    排名 = (report_period, 优先级) 的字典序, 编码成一个 int64。某日可见的
+    "最新一期"就是 available_at ≤ 该日的记录里排名最高的那条 —— 沿
+    available_at 做分组累计最大值即得每个时点的当前最优记录, 再对目标日期
+    做一次 as-of 合并, 整个 日期 × 标的 矩阵一趟算完。
+
+    与 :func:`latest_fundamental_as_of` 一致: 字段为空的记录不参与(对应其
+    ``groupby().first()`` 跳过空值), 同排名取后披露者。
+    """
+
+    frame: pd.DataFrame
+
+    @classmethod
+    def build(cls, fundamentals: pd.DataFrame) -> PITIndex:
+        df = fundamentals[fundamentals["available_at"].notna()
+                          & fundamentals["report_period"].notna()]
+        period = pd.DatetimeIndex(df["report_period"]).as_unit("ns").asi8
+        rank = period // 86_400_000_000_000 * 4 + _priority(df["report_type"]).to_numpy()
+        frame = df.assign(
+            available_at=pd.DatetimeIndex(df["available_at"]).as_unit("ns"),
+            announce_date=pd.DatetimeIndex(df["announce_date"]).as_unit("ns"),
+            _rank=rank,
+        ).sort_values(["symbol", "available_at", "_rank"], kind="stable")
+        return cls(frame.reset_index(drop=True))
+
+    def panel(self, field: str, dates: pd.DatetimeIndex, symbols: list[str],
+              lookback_days: int | None = None, skipna: bool = True) -> pd.DataFrame:
+        """``field`` 在各日期可见的最新值, 宽表(index=date, columns=symbol).
+
+        ``lookback_days`` 非 None 时只考虑披露日不早于 ``(date - lookback_days)``
+        所在月月初的记录 —— 与逐日按 ``fundamentals(date - lookback_days, date)``
+        取数后查询的窗口一致: 排名最高的记录落在窗口外时, 退回窗口内排名次之
+        的记录(窗口内没有则为 NaN)。
+        ``skipna=False`` 时空值记录同样参与排名(最新一期为空即结果为空, TTM 用)。
+        """
+        dates = pd.DatetimeIndex(sorted(set(pd.DatetimeIndex(dates)))).as_unit("ns")
+        symbols = list(symbols)
+        out = np.full((len(dates), len(symbols)), np.nan)
+        df = self.frame
+        if field in df.columns and len(dates) and symbols:
+            keep = df["symbol"].isin(symbols)
+            df = df[keep & df[field].notna()] if skipna else df[keep]
+        else:
+            df = df.iloc[0:0]
+        if not df.empty:
+            grid = pd.DataFrame({
+                "date": np.repeat(dates.to_numpy(), len(symbols)),
+                "symbol": np.tile(np.asarray(symbols, dtype=object), len(dates)),
+            })
+            hit = _asof_best(df, field, grid)
+            values = hit["value"].to_numpy(dtype=np.float64, copy=True)
+            if lookback_days is not None:
+                cutoff = (grid["date"] - pd.Timedelta(days=lookback_days)) \
+                    .dt.to_period("M").dt.start_time
+                stale = (hit["announce"] < cutoff).to_numpy()
+                values[stale] = np.nan
+                # 最优记录出窗的格子: 按窗口起点分组, 只用窗口内记录重算
+                for start, rows in pd.Series(np.flatnonzero(stale)) \
+                        .groupby(cutoff.to_numpy()[stale]):
+                    sub = df[df["announce_date"] >= start]
+                    if not sub.empty:
+                        values[rows.to_numpy()] = _asof_best(
+                            sub, field, grid.iloc[rows.to_numpy()],
+                        )["value"].to_numpy(dtype=np.float64)
+            out = values.reshape(len(dates), len(symbols))
+        return pd.DataFrame(out, index=pd.DatetimeIndex(dates, name="date"),
+                            columns=pd.Index(symbols, name="symbol"))
+
+
+def _asof_best(df: pd.DataFrame, field: str, grid: pd.DataFrame) -> pd.DataFrame:
+    """``grid`` 的每个 (date, symbol) 在 ``df``(PITIndex 排序)中可见的最优记录.
+
+    返回与 ``grid`` 逐行对齐的 ``value`` / ``announce`` 列(无可见记录为 NaN/NaT)。
+    """
+    # 每条记录到达后的当前最优: 排名创新高的记录生效, 其余沿用前一条最优
+    # (按行号累计最大值传递, 空值记录生效时也不会被前值覆盖)
+    best = df["_rank"].to_numpy() == df.groupby("symbol")["_rank"].cummax().to_numpy()
+    pos = pd.Series(np.where(best, np.arange(len(df)), -1), index=df.index)
+    pos = pos.groupby(df["symbol"]).cummax().to_numpy()
+    events = pd.DataFrame({
+        "symbol": df["symbol"].to_numpy(),
+        "available_at": df["available_at"].to_numpy(),
+        "value": pd.to_numeric(df[field]).to_numpy(dtype=np.float64, na_value=np.nan)[pos],
+        "announce": df["announce_date"].to_numpy()[pos],
+    })
+    events = events.drop_duplicates(["symbol", "available_at"], keep="last")
+    return pd.merge_asof(
+        grid.reset_index(drop=True), events.sort_values("available_at", kind="stable"),
+        left_on="date", right_on="available_at", by="symbol",
+        direction="backward",
+    )
+
+
+def ttm_frame(fundamentals: pd.DataFrame, field: str) -> pd.DataFrame:
+    """一次算出每条正式财报 (symbol, report_period) 的 TTM 事件, 供 :class:`PITIndex` 查询.
+
+    口径同 :func:`ttm_value`: Q4 直接取年报值, 其余为 本期累计 + 上年年报 −
+    上年同期, 三者各取当时可见的最新版本(更正/重述)。本期、上年年报、上年同期
+    任一版本变为可见的时刻都产生一条同排名事件(同排名以后可见者为准), 值按该
+    时刻各自可见的版本算 —— 上年两期未齐时为 NaN, 重述生效前沿用原值, 与逐日
+    调用 :func:`ttm_value` 的可见性一致。返回列 ``f"{field}_ttm"``。
+    """
+    name = f"{field}_ttm"
+    key = ["symbol", "fiscal_year", "fiscal_quarter"]
+    cols = ["symbol", "report_period", "report_type", "announce_date", "available_at",
+            "fiscal_year", "fiscal_quarter"]
+    df = fundamentals[fundamentals["report_type"].astype(str) == ReportType.OFFICIAL.value]
+    if df.empty or field not in df.columns:
+        return pd.DataFrame(columns=[*cols, name])
+    df = df[[*cols, field]].assign(
+        fiscal_year=df["fiscal_year"].astype("int64"),
+        fiscal_quarter=df["fiscal_quarter"].astype("int64"),
+        available_at=pd.DatetimeIndex(df["available_at"]).as_unit("ns"),
+        **{field: pd.to_numeric(df[field]).astype("float64")},
+    ).sort_values("available_at", kind="stable").reset_index(drop=True)
+
+    # 上年各版本平移到本年口径: 年报对应本年各非 Q4 季度, 同期按季度对齐
+    periods = df.loc[df["fiscal_quarter"] != 4, key].drop_duplicates()
+    prev = df[["symbol", "fiscal_year", "fiscal_quarter", "available_at", field]] \
+        .assign(fiscal_year=df["fiscal_year"] + 1)
+    annual = periods.merge(prev[prev["fiscal_quarter"] == 4].drop(columns="fiscal_quarter"),
+                           on=["symbol", "fiscal_year"])
+    same = periods.merge(prev, on=key)
+
+    # 事件时刻: 本期任一版本之后, 三者任一版本可见之时
+    times = pd.concat([df[[*key, "available_at"]], annual[[*key, "available_at"]],
+                       same[[*key, "available_at"]]], ignore_index=True)
+    first = df.groupby(key, as_index=False)["available_at"].min() \
+        .rename(columns={"available_at": "_first"})
+    times = times.merge(first, on=key)
+    times = times[times["available_at"] >= times["_first"]] \
+        .drop(columns="_first").drop_duplicates().sort_values("available_at", kind="stable")
+
+    def latest(right: pd.DataFrame, extra: list[str]) -> pd.DataFrame:
+        """各事件时刻 ``right`` 中同 key 最后可见的版本(无则 NaN)."""
+        right = right.sort_values("available_at", kind="stable") \
+            .rename(columns={"available_at": "_at"})
+        return pd.merge_asof(times, right[[*key, "_at", *extra]], left_on="available_at",
+                             right_on="_at", by=key, direction="backward")
+
+    cur = latest(df, ["report_period", "report_type", "announce_date", field])
+    annual_v = latest(annual, [field])[field].to_numpy()
+    same_v = latest(same, [field])[field].to_numpy()
+    cur_v = cur[field].to_numpy()
+    q4 = (cur["fiscal_quarter"] == 4).to_numpy()
+    value = np.where(q4, cur_v, cur_v + annual_v - same_v)
+    return cur[cols].assign(**{name: value}).reset_index(drop=True)
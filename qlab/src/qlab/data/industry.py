@@ -1,9 +1,17 @@
-"""IndustryClassification 查询工具 — PIT 安全."""
+"""IndustryClassification 查询工具 — PIT 安全.
+
+单日查询用 :func:`industry_as_of`; 整段日期用区间表: :func:`industry_intervals`
+把变更/采样记录压成 (symbol, industry_code, valid_from, valid_to) 区间,
+:func:`expand_industry` 对目标日期 searchsorted 一次展开成 日期 × 标的 矩阵。
+"""
 
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
+INTERVAL_COLUMNS = ["symbol", "industry_code", "industry_name", "valid_from", "valid_to"]
+
 
 def industry_as_of(
     industry: pd.DataFrame,
@@ -52,8 +60,76 @@ def industry_matrix_as_of(
     system: str = "sw",
     level: int = 1,
 ) -> pd.DataFrame:
-    """返回 (date × symbol) 的行业代码矩阵."""
-    out = pd.DataFrame(index=dates, columns=symbols, dtype="object")
-    for date in dates:
-        out.loc[date] = industry_as_of(industry, symbols, date, system, level)
-    return out
+    """返回 (date × symbol) 的行业代码矩阵(逐日结果同 :func:`industry_as_of`)."""
+    return expand_industry(industry_intervals(industry, system, level), dates, symbols)
+
+
+def industry_intervals(industry: pd.DataFrame, system: str = "sw", level: int = 1) -> pd.DataFrame:
+    """行业记录 → 归属区间表, columns = :data:`INTERVAL_COLUMNS`.
+
+    每条记录从其 ``date`` 起生效, 到同一 symbol 的下一条记录为止(``valid_to``
+    不含; 最后一段为 NaT, 即一直有效)。相邻同代码的记录(按月采样的快照)合并为一段。
+    同日多条时与 :func:`industry_as_of` 一样取排序后的最后一条。
+    """
+    flat = industry.reset_index() if isinstance(industry.index, pd.MultiIndex) else industry
+    if flat.empty or not {"system", "level", "date", "symbol"} <= set(flat.columns):
+        return pd.DataFrame(columns=INTERVAL_COLUMNS)
+    df = flat[(flat["system"] == system) & (flat["level"] == level)]
+    if df.empty:
+        return pd.DataFrame(columns=INTERVAL_COLUMNS)
+    df = df.assign(date=pd.to_datetime(df["date"])) \
+        .sort_values(["symbol", "date"], kind="stable") \
+        .drop_duplicates(["symbol", "date"], keep="last")
+    if "industry_name" not in df.columns:
+        df = df.assign(industry_name=None)
+    sym = df["symbol"].to_numpy()
+    code = df["industry_code"].to_numpy()
+    new_sym = np.r_[True, sym[1:] != sym[:-1]]
+    start = new_sym | np.r_[True, code[1:] != code[:-1]]
+    runs = df.loc[start, ["symbol", "industry_code", "industry_name", "date"]] \
+        .rename(columns={"date": "valid_from"}).reset_index(drop=True)
+    nxt = runs["valid_from"].shift(-1)
+    last = runs["symbol"].ne(runs["symbol"].shift(-1))
+    runs["valid_to"] = nxt.where(~last)
+    return runs[INTERVAL_COLUMNS]
+
+
+def expand_industry(intervals: pd.DataFrame, dates: pd.DatetimeIndex,
+                    symbols: list[str]) -> pd.DataFrame:
+    """区间表 → (date × symbol) 行业代码矩阵; 无归属为 None.
+
+    每个区间在(已排序的)目标日期上 searchsorted 出 ``[lo, hi)`` 行段, 一次
+    按段写入, 不逐日过滤。
+    """
+    dates = pd.DatetimeIndex(dates)
+    symbols = list(symbols)
+    out = np.full((len(dates), len(symbols)), None, dtype=object)
+    if len(dates) and symbols and not intervals.empty:
+        col = pd.Index(symbols).get_indexer(intervals["symbol"])
+        iv = intervals[col >= 0]
+        col = col[col >= 0]
+        days = dates.normalize().as_unit("ns").to_numpy()
+        order = np.argsort(days, kind="stable")
+        sorted_days = days[order]
+        lo = np.searchsorted(sorted_days, _ns(iv["valid_from"]), "left")
+        hi = np.searchsorted(sorted_days, _ns(iv["valid_to"], open_end=True), "left")
+        codes = iv["industry_code"].to_numpy()
+        span = np.maximum(hi - lo, 0)
+        total = int(span.sum())
+        if total:
+            rows = order[_ranges(lo, span, total)]
+            out[rows, np.repeat(col, span)] = np.repeat(codes, span)
+    return pd.DataFrame(out, index=dates, columns=symbols, dtype="object")
+
+
+def _ranges(lo: np.ndarray, span: np.ndarray, total: int) -> np.ndarray:
+    """拼接各段 ``[lo_i, lo_i + span_i)`` 的下标."""
+    return np.repeat(lo - (np.cumsum(span) - span), span) + np.arange(total)
+
+
+def _ns(values: pd.Series, open_end: bool = False) -> np.ndarray:
+    """日期列 → datetime64[ns] 数组; ``open_end`` 时 NaT 视为无穷远."""
+    arr = pd.DatetimeIndex(pd.to_datetime(values)).normalize().as_unit("ns").to_numpy()
+    if open_end:
+        arr = np.where(np.isnat(arr), np.datetime64(np.iinfo(np.int64).max, "ns"), arr)
+    return arr
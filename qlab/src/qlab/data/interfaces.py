@@ -217,9 +217,14 @@ class ShardedBarStore(Protocol):
         start: pd.Timestamp,
         end: pd.Timestamp,
         source_version: str,
+        columns: list[str] | None = None,
         **extra_keys: Any,
     ) -> pd.DataFrame:
-        """读取 [start, end] × symbols 的全部已缓存行（缺失部分不报错，仅省略）."""
+        """读取 [start, end] × symbols 的全部已缓存行（缺失部分不报错，仅省略）.
+
+        ``columns`` 为列投影(None 表示全部列), 实现应尽量下推到存储读取层;
+        分片中不存在的列直接省略。
+        """
         ...
 
     def put_range(
@@ -6,10 +6,20 @@
 
 from __future__ import annotations
 
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Literal
+
 import pandas as pd
 
 from qlab.core.calendar import Calendar, get_default_calendar
 from qlab.core.enums import AdjustMode, Freq, ReportType
+from qlab.core.exceptions import SchemaViolationError
 from qlab.core.schema import (
     SCHEMA_BILLBOARD,
     SCHEMA_CALL_AUCTION,
@@ -20,16 +30,87 @@ from qlab.core.schema import (
     SCHEMA_INDEX_VALUATION,
     SCHEMA_MARGIN_TRADING,
     SCHEMA_MONEY_FLOW,
+    Schema,
     validate_schema,
 )
 from qlab.data.alignment import IntradayAligner
-from qlab.data.concept import concepts_as_of
-from qlab.data.fundamentals import latest_fundamental_as_of, ttm_value
-from qlab.data.industry import industry_as_of
+from qlab.data.cube import IntradayCube
+from qlab.data.concept import MEMBERSHIP_COLUMNS, concept_intervals, concepts_as_of, expand_concepts
+from qlab.data.fetch_plan import FetchRect, plan_fetches
+from qlab.data.fundamentals import PITIndex, latest_fundamental_as_of, ttm_frame, ttm_value
+from qlab.data.industry import expand_industry, industry_as_of, industry_intervals
 from qlab.data.interfaces import BarStore, DataSource, ShardedBarStore
+from qlab.data.panel import DailyPanel
+from qlab.data.session import DataSession
 from qlab.data.store import InMemoryBarStore, InMemoryShardedBarStore, make_cache_key
 from qlab.data.universe import Universe, UniverseSpec
 
+logger = logging.getLogger(__name__)
+
+# daily_panels 记忆化保留的 (区间, 投资域) 个数
+_PANEL_MEMO_SIZE = 8
+
+# validate="sample" 时不变量抽检的行数
+_VALIDATE_SAMPLE_ROWS = 20_000
+
+# validate 参数: True 全量(已校验过的缓存分片跳过) / False 不校验 / "sample" 抽检
+Validate = bool | Literal["sample"]
+
+
+def _none() -> None:
+    return None
+
+
+def _fundamental_shards(raw: pd.DataFrame) -> pd.DataFrame:
+    """财务原始行 → 按 (披露日, symbol, 类型, 报告期) 落分片的形式.
+
+    报告期必须进索引: 年报与次年一季报常在同一天披露, 只按 Fundamental
+    索引(披露日, symbol, 类型)去重会让后一份静默覆盖前一份.
+    缺披露日的行无从按披露月落分片, 也永远不会在 PIT 查询里可见: 丢弃并记日志.
+    """
+    index = [*SCHEMA_FUNDAMENTAL.index_names, "report_period"]
+    dated = raw["announce_date"].notna()
+    if not dated.all():
+        logger.warning("财务数据 %d 行缺披露日(announce_date), 不入缓存", int((~dated).sum()))
+        raw = raw[dated]
+    df = raw.set_index(index)
+    return df[~df.index.duplicated(keep="last")]
+
+
+def _coverage_rows(rect: FetchRect, closed: pd.Timestamp) -> pd.DataFrame:
+    """矩形内已结束月份的覆盖记录: 每 (月初, symbol) 一行."""
+    months = pd.date_range(rect.start, min(rect.end, closed - pd.Timedelta(days=1)),
+                           freq="MS")
+    index = pd.MultiIndex.from_product([months, list(rect.symbols)],
+                                       names=["date", "symbol"])
+    return pd.DataFrame({"covered": True}, index=index)
+
+
+def _bisect_changes(days: pd.DatetimeIndex, items: list,
+                    probe: Callable[[pd.Timestamp, list], set]) -> dict:
+    """同一采样间隔内各项首个满足条件的交易日.
+
+    ``days[-1]`` 即采样点, 已知满足; 假定间隔内只变一次。``probe(day, items)``
+    返回 ``items`` 中当日满足条件的那些。每轮二分落在同一天的项并成一次
+    probe —— 整批同日调整(如申万年度重分类)只需约 log2(len(days)) 次查询。
+    """
+    lo = dict.fromkeys(items, 0)
+    hi = dict.fromkeys(items, len(days) - 1)
+    while True:
+        pending = defaultdict(list)
+        for it in items:
+            if lo[it] < hi[it]:
+                pending[(lo[it] + hi[it]) // 2].append(it)
+        if not pending:
+            return {it: days[hi[it]] for it in items}
+        for mid, group in pending.items():
+            hit = probe(days[mid], group)
+            for it in group:
+                if it in hit:
+                    hi[it] = mid
+                else:
+                    lo[it] = mid + 1
+
 
 def _check_store_arg(obj, name: str, want, other, other_name: str) -> None:
     """校验 store 参数满足其协议; 若满足的是**另一个**协议则指出传反了."""
@@ -43,8 +124,8 @@ def _check_store_arg(obj, name: str, want, other, other_name: str) -> None:
     raise TypeError(
         f"DataLayer(...{name}=) 需要 {want.__name__}, "
         f"但收到 {type(obj).__name__}。{hint}\n"
-        "  职责区分: store= 通用 key-based 缓存(universe/fundamentals/industry), "
-        "bar_store= K 线月度分片缓存(daily/intraday)。"
+        "  职责区分: store= 通用 key-based 缓存(universe/corp_actions/industry), "
+        "bar_store= 按月分片缓存(daily/intraday/fundamentals)。"
     )
 
 
@@ -59,14 +140,27 @@ class DataLayer:
         adjust: AdjustMode = AdjustMode.BACKWARD,
         merge_status_overrides: bool = True,
         bar_store: ShardedBarStore | None = None,
+        max_fetch_requests: int = 8,
+        fetch_workers: int = 4,
+        source_concurrency: int | None = None,
     ):
         """
         source : 数据源 Protocol 实现
-        store  : 通用 key-based 缓存（universe / corp_actions / fundamentals / industry）
-        bar_store : K 线分片缓存（daily / intraday）. 默认 InMemoryShardedBarStore.
+        store  : 通用 key-based 缓存（universe / corp_actions / industry）
+        bar_store : 按月分片缓存（daily / intraday K 线; fundamentals / fundamentals_coverage
+                    财务报表及其覆盖记录）. 默认 InMemoryShardedBarStore.
         calendar : 交易日历（默认顺序：调用方 > source.fetch_calendar > get_default_calendar()）
         adjust : 默认复权模式
         merge_status_overrides : daily 末尾是否自动合并 source.fetch_status_overrides 的覆盖列
+        max_fetch_requests : 一次缺失补拉最多拆成几个取数请求(见 :func:`plan_fetches`);
+                             1 = 全部缺口并成一个外接矩形
+        fetch_workers : 缺失补拉的线程池大小; 各矩形及 K 线 / 股本 / 状态覆盖并发取,
+                        冷缓存加载耗时取决于最慢的一次调用而非总和。1 = 串行
+        source_concurrency : 同一数据源同时在途的请求上限。缺省读数据源的
+                             ``max_concurrency`` 属性, 未声明按 1(不假定数据源线程安全)
+
+        数据源可选声明 ``bars_include_shares``: ``fetch_bars`` 是否已带股本列。
+        为 False 时股本与 K 线同批并发取; 未声明时先看 K 线结果再按需补取。
 
         Raises:
             TypeError: ``store`` / ``bar_store`` 不满足对应协议。两者职责不同
@@ -85,6 +179,18 @@ class DataLayer:
             self.calendar = self._resolve_source_calendar(source)
         self.adjust = adjust
         self.merge_status_overrides = merge_status_overrides
+        self.max_fetch_requests = max_fetch_requests
+        self.fetch_workers = fetch_workers
+        limit = (source_concurrency if source_concurrency is not None
+                 else getattr(source, "max_concurrency", 1))
+        self._source_slots = threading.BoundedSemaphore(max(1, int(limit)))
+        # daily_panels 记忆化: (start, end, symbols) → DailyPanel, 小 LRU
+        self._panels: OrderedDict[tuple, DailyPanel] = OrderedDict()
+        # fundamental_panel 记忆化: (symbols, 区间) → PITIndex, 同样大小的 LRU
+        self._pit: OrderedDict[tuple, PITIndex] = OrderedDict()
+        # intraday_cube 记忆化: (freq, start, end, symbols) → IntradayCube
+        self._cubes: OrderedDict[tuple, IntradayCube] = OrderedDict()
+        self._session: DataSession | None = None
 
     @staticmethod
     def _resolve_source_calendar(source: DataSource) -> Calendar:
@@ -97,6 +203,36 @@ class DataLayer:
         except (NotImplementedError, AttributeError):
             return get_default_calendar()
 
+    # ---- 取数会话 -----------------------------------------------------------
+
+    @contextmanager
+    def session(self) -> Iterator[DataSession]:
+        """取数会话: 块内的 daily / 时序类请求合并取数, 窄窗口从内存切片.
+
+        已在会话中时复用外层会话(嵌套安全)。命中统计见 :meth:`DataSession.stats`::
+
+            with data.session() as sess:
+                X = build_feature_matrix(...)
+            sess.stats()  # {"hits": ..., "misses": ..., "store_reads": ..., "by_kind": {...}}
+        """
+        if self._session is not None:
+            yield self._session
+            return
+        self._session = DataSession()
+        try:
+            yield self._session
+        finally:
+            self._session = None
+
+    def reserve_daily(self, symbols: list[str], start: str | pd.Timestamp,
+                      end: str | pd.Timestamp) -> None:
+        """在当前会话中预登记日线窗口(只登记窗口, 字段按实际请求补齐); 无会话时什么也不做."""
+        if self._session is None:
+            return
+        extra_keys = {"freq": Freq.DAILY.value, "adjust": AdjustMode(self.adjust).value}
+        self._session.reserve("daily", symbols, pd.Timestamp(start), pd.Timestamp(end),
+                              columns=[], **extra_keys)
+
     # ---- Universe -----------------------------------------------------------
 
     def universe(self, spec: UniverseSpec | str,
@@ -126,12 +262,21 @@ class DataLayer:
         start: str | pd.Timestamp,
         end: str | pd.Timestamp,
         adjust: AdjustMode | None = None,
-        validate: bool = True,
+        validate: Validate = True,
+        columns: list[str] | None = None,
     ) -> pd.DataFrame:
         """拉取日线 + 复权处理 + 股本回填.
 
         走分片缓存 (kind='daily', symbol, year-month): 缺哪些月份从 source 拉哪些.
 
+        ``columns`` 为列投影, 下推到分片读取层(只解码所需列)。投影结果缺
+        DailyBar 必备列, 故传 ``columns`` 时不做 schema 校验(``validate`` 不生效);
+        缺失补拉仍按整行落盘, 不受投影影响。
+
+        ``validate``: 新拉取的数据落盘时校验一次, 通过即在分片清单上记账;
+        之后读到的分片都记过账则跳过校验(见 :meth:`_validate_range`)。
+        ``"sample"`` 只抽检不变量, 供交互式探索用。
+
         Warning:
             返回的 ``DailyBar`` **同时包含** ``close``(后复权) /
             ``close_raw``(不复权) / ``adj_factor``, 其他口径是这三列的**视图**。
@@ -157,8 +302,29 @@ class DataLayer:
         adjust_mode = AdjustMode(adjust if adjust is not None else self.adjust)
         start = pd.Timestamp(start)
         end = pd.Timestamp(end)
-        source_version = getattr(self.source, "source_version", "unknown")
+        extra_keys = {"freq": Freq.DAILY.value, "adjust": adjust_mode.value}
+
+        validate_fn = partial(self._validate_range, SCHEMA_DAILY_BAR, "daily",
+                              extra_keys, mode=validate)
+
+        if self._session is not None:
+            return self._session.serve(
+                "daily", extra_keys, symbols, start, end, columns,
+                lambda s, a, b, c: self._load_daily(s, a, b, adjust_mode, c),
+                validate_fn if validate else None,
+            )
+
+        df = self._load_daily(symbols, start, end, adjust_mode, columns)
+        # 空结果(退市股/全区间无数据)跳过 validate: 空表 index 名字缺失是
+        # 正常状态, 且无数据无可校验。下游对空结果自行处理。
+        if validate and columns is None and not df.empty:
+            validate_fn(df, symbols, start, end)
+        return df
 
+    def _load_daily(self, symbols: list[str], start: pd.Timestamp, end: pd.Timestamp,
+                    adjust_mode: AdjustMode, columns: list[str] | None) -> pd.DataFrame:
+        """daily 的取数主体: 缺失分片补拉落盘 + 读完整范围(不含校验)."""
+        source_version = getattr(self.source, "source_version", "unknown")
         extra_keys = {"freq": Freq.DAILY.value, "adjust": adjust_mode.value}
 
         # 1) 找缺哪些分片
@@ -167,40 +333,166 @@ class DataLayer:
             source_version=source_version, **extra_keys,
         )
 
-        # 2) 缺的从 source 拉取（按缺失月份覆盖区间一次性 fetch，避免按月单独 RPC）
-        if missing:
-            sym_missing = sorted({s for s, _ in missing})
-            ym_missing = sorted({ym for _, ym in missing})
-            fetch_start = pd.Timestamp(f"{ym_missing[0]}-01")
-            fetch_end = (pd.Timestamp(f"{ym_missing[-1]}-01") + pd.offsets.MonthEnd(0)).normalize()
-            new_df = self.source.fetch_bars(
-                sym_missing, fetch_start, fetch_end,
-                Freq.DAILY, adjust_mode,
-            )
-            if "total_shares" not in new_df.columns:
-                try:
-                    share_df = self.source.fetch_share_capital(sym_missing, fetch_start, fetch_end)
-                    new_df = self._merge_share_capital(new_df, share_df)
-                except (NotImplementedError, AttributeError):
-                    for col in ("total_shares", "float_shares", "free_float_shares"):
-                        new_df[col] = pd.NA
-            if self.merge_status_overrides:
-                new_df = self._apply_status_overrides(new_df, sym_missing, fetch_start, fetch_end)
-            self.bar_store.put_range(
-                new_df, kind="daily", source_version=source_version, **extra_keys,
-            )
+        # 2) 缺的从 source 拉取: 缺口规划成少量矩形请求(见 fetch_plan), 只付缺的那部分
+        #    各矩形及其 K 线 / 股本 / 状态覆盖互相独立, 并发取(见 _fetch_daily_rects)
+        rects = plan_fetches(missing, self.max_fetch_requests)
+        for rect, new_df in zip(rects, self._fetch_daily_rects(rects, adjust_mode), strict=True):
+            self._put_fetched(new_df, SCHEMA_DAILY_BAR, "daily", rect, extra_keys)
 
         # 3) 读完整范围
-        df = self.bar_store.get_range(
+        return self.bar_store.get_range(
             kind="daily", symbols=symbols, start=start, end=end,
-            source_version=source_version, **extra_keys,
+            source_version=source_version, columns=columns, **extra_keys,
         )
 
-        # 空结果(退市股/全区间无数据)跳过 validate: 空表 index 名字缺失是
-        # 正常状态, 且无数据无可校验。下游对空结果自行处理。
-        if validate and not df.empty:
-            validate_schema(df, SCHEMA_DAILY_BAR, strict_index=True)
-        return df
+    def _fetch_daily_rects(self, rects: list[FetchRect],
+                           adjust_mode: AdjustMode) -> list[pd.DataFrame]:
+        """取各矩形的日线: K 线 + 股本回填 + 状态覆盖, 按矩形顺序返回.
+
+        三类调用彼此独立, 与各矩形一起扁平提交到线程池; 股本只在 K 线不带
+        股本列时才需要 —— 数据源声明 ``bars_include_shares = False`` 时与 K 线
+        同批并发, 未声明时等 K 线回来再按需补一轮。合并在调用线程按矩形顺序
+        进行, 结果与串行一致。
+        """
+        shares_needed = getattr(self.source, "bars_include_shares", None)
+        tasks: list[Callable[[], Any]] = []
+        for r in rects:
+            args = (list(r.symbols), r.start, r.end)
+            tasks.append(partial(self._source_call, self.source.fetch_bars,
+                                 *args, Freq.DAILY, adjust_mode))
+            tasks.append(partial(self._fetch_share_capital, *args)
+                         if shares_needed is False else _none)
+            tasks.append(partial(self._fetch_status_overrides, *args)
+                         if self.merge_status_overrides else _none)
+        results = self._run_concurrently(tasks)
+        bars = results[0::3]
+        shares = results[1::3]
+
+        late = [i for i, (b, sh) in enumerate(zip(bars, shares, strict=True))
+                if "total_shares" not in b.columns and sh is None and shares_needed is not False]
+        late_shares = self._run_concurrently([
+            partial(self._fetch_share_capital, list(rects[i].symbols), rects[i].start, rects[i].end)
+            for i in late
+        ])
+        for i, sh in zip(late, late_shares, strict=True):
+            shares[i] = sh
+
+        out = []
+        for new_df, share_df, overrides in zip(bars, shares, results[2::3], strict=True):
+            if "total_shares" not in new_df.columns:
+                if share_df is None:
+                    for col in ("total_shares", "float_shares", "free_float_shares"):
+                        new_df[col] = pd.NA
+                else:
+                    new_df = self._merge_share_capital(new_df, share_df)
+            if overrides is not None:
+                new_df = self._merge_status_overrides(new_df, overrides)
+            out.append(new_df)
+        return out
+
+    # ---- 校验记账 -----------------------------------------------------------
+
+    def _put_fetched(self, new_df: pd.DataFrame, schema: Schema, kind: str,
+                     rect: FetchRect, extra_keys: dict[str, Any]) -> None:
+        """新拉取的矩形落盘, 并在写入时校验一次.
+
+        校验通过、且矩形内原有分片此前也都校验过时, 在分片清单上记账, 之后的
+        读取据此跳过校验。校验失败不在这里抛错 —— 不记账, 读路径照常全量校验并报错。
+        """
+        scope = {"kind": kind, "symbols": list(rect.symbols), "start": rect.start,
+                 "end": rect.end,
+                 "source_version": getattr(self.source, "source_version", "unknown"),
+                 **extra_keys}
+        is_validated = getattr(self.bar_store, "is_validated", None)
+        mark_validated = getattr(self.bar_store, "mark_validated", None)
+        prior_ok = (is_validated is not None and mark_validated is not None
+                    and is_validated(schema=schema.name, **scope))
+        if prior_ok and not new_df.empty:
+            try:
+                validate_schema(new_df, schema, strict_index=True)
+            except SchemaViolationError:
+                prior_ok = False
+        self.bar_store.put_range(new_df, kind=kind, source_version=scope["source_version"],
+                                 **extra_keys)
+        if prior_ok:
+            mark_validated(schema=schema.name, **scope)
+
+    def _validate_range(self, schema: Schema, kind: str, extra_keys: dict[str, Any],
+                        df: pd.DataFrame, symbols: list[str], start: pd.Timestamp,
+                        end: pd.Timestamp, *, mode: Validate = True) -> None:
+        """校验从分片缓存读出的 ``[start, end] × symbols`` 长表, 已记账的分片不重复校验.
+
+        ``mode="sample"`` 只抽检不变量且不记账。全量校验通过后, 只给完整落在
+        ``[start, end]`` 内的月份记账 —— 边缘月份只校验了一部分行。
+        bar store 不提供 ``is_validated`` / ``mark_validated`` 时每次全量校验。
+        """
+        if df.empty or not mode:
+            return
+        if mode == "sample":
+            validate_schema(df, schema, strict_index=True, sample_rows=_VALIDATE_SAMPLE_ROWS)
+            return
+        scope = {"kind": kind, "symbols": symbols,
+                 "source_version": getattr(self.source, "source_version", "unknown"),
+                 "schema": schema.name, **extra_keys}
+        is_validated = getattr(self.bar_store, "is_validated", None)
+        if is_validated is not None and is_validated(start=start, end=end, **scope):
+            return
+        validate_schema(df, schema, strict_index=True)
+        mark_validated = getattr(self.bar_store, "mark_validated", None)
+        first = start.normalize() + pd.offsets.MonthBegin(0)
+        last = (end.normalize() + pd.Timedelta(days=1)).to_period("M").start_time \
+            - pd.Timedelta(days=1)
+        if mark_validated is not None and first <= last:
+            mark_validated(start=first, end=last, **scope)
+
+    def _source_call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """经数据源并发闸门调用(同一数据源同时在途的请求不超过 source_concurrency)."""
+        with self._source_slots:
+            return fn(*args)
+
+    def _run_concurrently(self, tasks: list[Callable[[], Any]]) -> list[Any]:
+        """在 ``fetch_workers`` 线程池上跑独立任务, 结果按提交顺序返回; 异常原样抛出."""
+        if self.fetch_workers <= 1 or len(tasks) <= 1:
+            return [t() for t in tasks]
+        with ThreadPoolExecutor(max_workers=min(self.fetch_workers, len(tasks))) as pool:
+            futures = [pool.submit(t) for t in tasks]
+            return [f.result() for f in futures]
+
+    def _fetch_share_capital(self, symbols: list[str], start: pd.Timestamp,
+                             end: pd.Timestamp) -> pd.DataFrame | None:
+        """股本; 数据源不支持时返回 None."""
+        try:
+            return self._source_call(self.source.fetch_share_capital, symbols, start, end)
+        except (NotImplementedError, AttributeError):
+            return None
+
+    def daily_panels(
+        self,
+        symbols: list[str],
+        start: str | pd.Timestamp,
+        end: str | pd.Timestamp,
+        fields: list[str],
+    ) -> DailyPanel:
+        """日线宽表面板: 每个字段一个 (date × symbol) 连续数组, 见 :class:`DailyPanel`.
+
+        按 (区间, 投资域) 记忆化: 同一次矩阵构建里各特征共享同一份透视结果,
+        后来的请求只补透视尚未有的字段(列投影读取, 不重读已有列)。
+        最近 ``_PANEL_MEMO_SIZE`` 个 (区间, 投资域) 常驻。
+        """
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end)
+        key = (start, end, tuple(sorted(set(symbols))))
+        panel = self._panels.get(key)
+        todo = [f for f in fields if panel is None or f not in panel]
+        if todo:
+            df = self.daily(list(key[2]), start, end, validate=False, columns=todo)
+            fresh = DailyPanel.from_long(df, todo)
+            panel = fresh if panel is None else panel.with_fields(fresh)
+            self._panels[key] = panel
+        self._panels.move_to_end(key)
+        while len(self._panels) > _PANEL_MEMO_SIZE:
+            self._panels.popitem(last=False)
+        return panel
 
     def status_overrides(
         self,
@@ -216,19 +508,19 @@ class DataLayer:
         except (NotImplementedError, AttributeError):
             return pd.DataFrame(columns=["date", "symbol"]).set_index(["date", "symbol"])
 
-    def _apply_status_overrides(
-        self,
-        bars: pd.DataFrame,
-        symbols: list[str],
-        start: pd.Timestamp,
-        end: pd.Timestamp,
-    ) -> pd.DataFrame:
+    def _fetch_status_overrides(self, symbols: list[str], start: pd.Timestamp,
+                                end: pd.Timestamp) -> pd.DataFrame | None:
+        """状态覆盖; 数据源不支持或无覆盖时返回 None."""
         try:
-            overrides = self.source.fetch_status_overrides(symbols, start, end)
+            overrides = self._source_call(self.source.fetch_status_overrides, symbols, start, end)
         except (NotImplementedError, AttributeError):
-            return bars
+            return None
         if overrides is None or overrides.empty:
-            return bars
+            return None
+        return overrides
+
+    @staticmethod
+    def _merge_status_overrides(bars: pd.DataFrame, overrides: pd.DataFrame) -> pd.DataFrame:
         # 规范化索引
         if not isinstance(overrides.index, pd.MultiIndex):
             if {"date", "symbol"}.issubset(overrides.columns):
@@ -266,10 +558,13 @@ class DataLayer:
         end: str | pd.Timestamp,
         freq: Freq = Freq.MIN_30,
         adjust: AdjustMode | None = None,
-        validate: bool = True,
+        validate: Validate = True,
+        columns: list[str] | None = None,
     ) -> pd.DataFrame:
         """日内 K 线（分片缓存：kind='intraday'）.
 
+        ``columns`` 列投影与 ``validate`` 语义同 :meth:`daily`(传入 ``columns`` 时不做 schema 校验)。
+
         Warning:
             同 :meth:`daily` —— ``IntradayBar`` 也同时包含复权/不复权/因子三组列,
             ``adjust`` 不影响返回内容。切换口径请用 ``apply_adjust``。
@@ -297,27 +592,54 @@ class DataLayer:
             source_version=source_version, **extra_keys,
         )
 
-        if missing:
-            sym_missing = sorted({s for s, _ in missing})
-            ym_missing = sorted({ym for _, ym in missing})
-            fetch_start = pd.Timestamp(f"{ym_missing[0]}-01")
-            fetch_end = (pd.Timestamp(f"{ym_missing[-1]}-01") + pd.offsets.MonthEnd(0)).normalize()
-            new_df = self.source.fetch_bars(
-                sym_missing, fetch_start, fetch_end, freq_obj, adjust_mode,
-            )
-            self.bar_store.put_range(
-                new_df, kind="intraday", source_version=source_version, **extra_keys,
-            )
+        rects = plan_fetches(missing, self.max_fetch_requests)
+        fetched = self._run_concurrently([
+            partial(self._source_call, self.source.fetch_bars,
+                    list(r.symbols), r.start, r.end, freq_obj, adjust_mode)
+            for r in rects
+        ])
+        for rect, new_df in zip(rects, fetched, strict=True):
+            self._put_fetched(new_df, SCHEMA_INTRADAY_BAR, "intraday", rect, extra_keys)
 
         df = self.bar_store.get_range(
             kind="intraday", symbols=symbols, start=start, end=end,
-            source_version=source_version, **extra_keys,
+            source_version=source_version, columns=columns, **extra_keys,
         )
 
-        if validate and not df.empty:
-            validate_schema(df, SCHEMA_INTRADAY_BAR, strict_index=True)
+        if validate and columns is None:
+            self._validate_range(SCHEMA_INTRADAY_BAR, "intraday", extra_keys,
+                                 df, symbols, start, end, mode=validate)
         return df
 
+    def intraday_cube(
+        self,
+        symbols: list[str],
+        start: str | pd.Timestamp,
+        end: str | pd.Timestamp,
+        fields: list[str],
+        freq: Freq = Freq.MIN_30,
+    ) -> IntradayCube:
+        """日内立方体: 每个字段一个 (day × 槽位 × symbol) 数组, 见 :class:`IntradayCube`.
+
+        记忆化方式同 :meth:`daily_panels`: 按 (频率, 区间, 投资域) 缓存, 后来的
+        请求只补落尚未有的字段。
+        """
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end)
+        key = (Freq(freq).value, start, end, tuple(sorted(set(symbols))))
+        cube = self._cubes.get(key)
+        todo = [f for f in fields if cube is None or f not in cube]
+        if todo:
+            df = self.intraday(list(key[3]), start, end, freq=freq, validate=False,
+                               columns=todo)
+            fresh = IntradayCube.from_long(df, todo, self.calendar)
+            cube = fresh if cube is None else cube.with_fields(fresh)
+            self._cubes[key] = cube
+        self._cubes.move_to_end(key)
+        while len(self._cubes) > _PANEL_MEMO_SIZE:
+            self._cubes.popitem(last=False)
+        return cube
+
     def intraday_aligner(self, freq: Freq = Freq.MIN_30) -> IntradayAligner:
         """返回 lazy load 的 IntradayAligner."""
 
@@ -337,32 +659,59 @@ class DataLayer:
         fields: list[str] | None = None,
         validate: bool = True,
     ) -> pd.DataFrame:
+        """财务报表(Fundamental schema, 普通列形式).
+
+        按 (symbol, 披露月) 分片缓存在 ``bar_store``(kind='fundamentals'),
+        另记一份"已取过"的覆盖分片(kind='fundamentals_coverage') —— 多数月份
+        没有披露, 没有数据分片不代表没取过。只补拉覆盖缺口里的标的 × 月份,
+        投资域增删标的、取子集都不再整批重取。
+
+        区间对齐到月边界: fundamental_as_of/ttm 按日滚动查询时, 相邻交易日
+        落在同一批月份分片上。当月(及未来月份)的覆盖不记账, 之后的调用会补
+        拉新披露的报表。缺披露日(announce_date)的行不入缓存, 丢弃行数记 warning 日志。
+        """
         start = pd.Timestamp(start)
         end = pd.Timestamp(end)
-
-        # 缓存键对齐到月边界: fundamental_as_of/ttm 按日滞动查询时,
-        # 相邻交易日的 start/end 仅差一天会让键全 miss(雪崩式重取)。
-        # 拉宽到[月首, 月末]: 同月内共享一份; 数据含多取的部分不影响下游 PIT
-        # (as_of/ttm 均按 available_at <= date 精确截断)。
         q_start = start.to_period("M").start_time
         q_end = end.to_period("M").end_time.normalize()
+        source_version = getattr(self.source, "source_version", "unknown")
+        extra_keys = {
+            "report_types": ",".join(sorted(r.value for r in report_types or [])) or "all",
+            "fields": ",".join(sorted(fields)) if fields else "all",
+            # 分片索引含报告期; 旧布局(缺报告期, 同日多份报表已丢行)的分片不复用
+            "layout": "period",
+        }
 
-        key = make_cache_key(
-            kind="fundamentals", symbols=sorted(symbols),
-            start=str(q_start.date()), end=str(q_end.date()),
-            report_types=sorted([r.value for r in (report_types or [])]),
-            fields=sorted(fields) if fields else None,
-            source_version=getattr(self.source, "source_version", "unknown"),
+        missing = self.bar_store.missing_ranges(
+            kind="fundamentals_coverage", symbols=symbols, start=q_start, end=q_end,
+            source_version=source_version, **extra_keys,
         )
-        if self.store.has(key):
-            df = self.store.get(key)
-        else:
-            df = self.source.fetch_fundamentals(
-                symbols, q_start, q_end, report_types, fields
+        rects = plan_fetches(missing, self.max_fetch_requests)
+        fetched = self._run_concurrently([
+            partial(self._source_call, self.source.fetch_fundamentals,
+                    list(r.symbols), r.start, r.end, report_types, fields)
+            for r in rects
+        ])
+        closed = pd.Timestamp.now().to_period("M").start_time
+        for rect, raw in zip(rects, fetched, strict=True):
+            if raw is not None and not raw.empty:
+                self.bar_store.put_range(
+                    _fundamental_shards(raw), kind="fundamentals",
+                    source_version=source_version, **extra_keys,
+                )
+            self.bar_store.put_range(
+                _coverage_rows(rect, closed), kind="fundamentals_coverage",
+                source_version=source_version, **extra_keys,
             )
-            self.store.put(key, df)
 
-        if validate and not df.empty:
+        df = self.bar_store.get_range(
+            kind="fundamentals", symbols=symbols, start=q_start, end=q_end,
+            source_version=source_version, **extra_keys,
+        )
+        if df.empty:
+            return pd.DataFrame(columns=["symbol", *SCHEMA_FUNDAMENTAL.all_columns])
+        df = df.reset_index()
+        if validate:
             validate_schema(df, SCHEMA_FUNDAMENTAL, strict_index=False)
         return df
 
@@ -379,6 +728,43 @@ class DataLayer:
         df = self.fundamentals(symbols, start, date, validate=False)
         return latest_fundamental_as_of(df, field, date, symbols)
 
+    def fundamental_panel(
+        self,
+        symbols: list[str],
+        field: str,
+        dates: pd.DatetimeIndex,
+        lookback_days: int | None = None,
+        ttm: bool = False,
+    ) -> pd.DataFrame:
+        """批量 PIT 查询: 各日期可见的 ``field`` 最新值, 宽表(index=date, columns=symbol).
+
+        逐日结果与 :meth:`fundamental_as_of` / ``ttm=True`` 时与 :meth:`fundamental_ttm`
+        (同 ``lookback_days``, 默认分别 600 / 730 天)一致, 但只取一次数、建一次
+        :class:`~qlab.data.fundamentals.PITIndex`(按投资域与区间记忆化), 再一趟
+        as-of 合并得到整个矩阵。TTM 先由 :func:`~qlab.data.fundamentals.ttm_frame`
+        对每期财报算一次, 再走同一套 as-of。
+        """
+        if lookback_days is None:
+            lookback_days = 730 if ttm else 600
+        dates = pd.DatetimeIndex(dates)
+        symbols = sorted(set(symbols))
+        if len(dates) == 0:
+            return PITIndex(pd.DataFrame()).panel(field, dates, symbols)
+        start = dates.min() - pd.Timedelta(days=lookback_days)
+        end = dates.max()
+        key = (tuple(symbols), start.to_period("M"), end.to_period("M"))
+        pit = self._pit.get(key)
+        if pit is None:
+            pit = PITIndex.build(self.fundamentals(symbols, start, end, validate=False))
+            self._pit[key] = pit
+        self._pit.move_to_end(key)
+        while len(self._pit) > _PANEL_MEMO_SIZE:
+            self._pit.popitem(last=False)
+        if ttm:
+            return PITIndex.build(ttm_frame(pit.frame, field)).panel(
+                f"{field}_ttm", dates, symbols, lookback_days=lookback_days, skipna=False)
+        return pit.panel(field, dates, symbols, lookback_days=lookback_days)
+
     def fundamental_ttm(
         self,
         symbols: list[str],
@@ -446,8 +832,178 @@ class DataLayer:
 
         return industry_as_of(df, symbols, date, system, level)
 
+    def industry_matrix(
+        self,
+        dates: pd.DatetimeIndex,
+        symbols: list[str],
+        system: str = "sw",
+        level: int = 1,
+        lookback_days: int | None = None,
+    ) -> pd.DataFrame:
+        """整段日期的行业归属矩阵(index=date, columns=symbol, 无归属为 None).
+
+        对 ``[dates[0] - lookback_days, dates[-1]]`` 取一次分类记录, 压成区间表
+        (见 :func:`~qlab.data.industry.industry_intervals`, 按投资域与区间缓存),
+        再 searchsorted 一次展开 —— 不再逐日查 :meth:`industry`。
+
+        ``lookback_days`` 缺省按数据源而定: 按采样返回的数据源
+        (``classification_sampled``, 如聚宽)在区间起点即有一条快照, 取 0;
+        只返回变更事件的数据源取 5 年, 让起点之前的最后一次变更落在窗口内。
+
+        采样式数据源若还提供单点查询 ``industry_asof``(如聚宽), 落缓存前把每次
+        变更在前后两个采样点之间二分到确切交易日(见 :meth:`_exact_industry`),
+        结果与逐日 :meth:`industry` 一致; 否则粒度随采样, 月中变更最多晚一个月。
+        """
+        dates = pd.DatetimeIndex(dates)
+        if len(dates) == 0:
+            return pd.DataFrame(index=dates, columns=list(symbols), dtype="object")
+        lookback_days = self._classification_lookback(lookback_days)
+        start = dates.min().normalize() - pd.Timedelta(days=lookback_days)
+        end = dates.max().normalize()
+        exact = self._refines_samples("industry_asof")
+        key = make_cache_key(
+            kind="industry_intervals", symbols=sorted(symbols),
+            start=str(start.date()), end=str(end.date()), system=system, level=level,
+            source_version=getattr(self.source, "source_version", "unknown"),
+            granularity="day" if exact else "sample",
+        )
+        if self.store.has(key):
+            intervals = self.store.get(key)
+        else:
+            raw = self.source.fetch_industry_classification(symbols, (start, end), system, level)
+            intervals = industry_intervals(raw, system, level)
+            if exact and not intervals.empty:
+                flat = raw.reset_index() if isinstance(raw.index, pd.MultiIndex) else raw
+                intervals = self._exact_industry(intervals, flat["date"], system, level)
+            self.store.put(key, intervals)
+        return expand_industry(intervals, dates, symbols)
+
+    def _refines_samples(self, asof_name: str) -> bool:
+        """区间表是否要把采样点之间的变更细化到日: 采样式数据源且有单点查询."""
+        return bool(getattr(self.source, "classification_sampled", False)) \
+            and callable(getattr(self.source, asof_name, None))
+
+    def _sample_brackets(self, grid, bounds) -> dict[tuple, list[int]]:
+        """各边界所在的采样间隔 → 边界序号.
+
+        间隔为 (``grid`` 中早于边界的最近一点, 边界] 内的交易日; 边界前没有
+        观测点(区间起点)或间隔内只有边界当天的不用细化。
+        """
+        grid = pd.DatetimeIndex(pd.to_datetime(pd.Series(grid)).dropna().unique()) \
+            .normalize().sort_values()
+        out: dict[tuple, list[int]] = defaultdict(list)
+        for i, b in enumerate(pd.to_datetime(pd.Series(bounds))):
+            if pd.isna(b):
+                continue
+            b = b.normalize()
+            pos = grid.searchsorted(b, "left")
+            if pos == 0:
+                continue
+            days = self.calendar.trading_days(grid[pos - 1] + pd.Timedelta(days=1), b)
+            if len(days) > 1:
+                out[tuple(days)].append(i)
+        return out
+
+    def _exact_industry(self, intervals: pd.DataFrame, sampled: pd.Series,
+                        system: str, level: int) -> pd.DataFrame:
+        """把采样区间表的每次变更二分到确切交易日(逐次走 :meth:`industry` 单点查询)."""
+        iv = intervals.reset_index(drop=True)
+        syms = iv["symbol"].to_numpy()
+        codes = iv["industry_code"].to_numpy()
+        valid_from = iv["valid_from"].to_numpy(copy=True)
+        valid_to = iv["valid_to"].to_numpy(copy=True)
+
+        def probe(day, rows):
+            got = self.industry(sorted({syms[r] for r in rows}), day, system, level)
+            return {r for r in rows if got.get(syms[r]) == codes[r]}
+
+        for days, rows in self._sample_brackets(sampled, valid_from).items():
+            for r, day in _bisect_changes(pd.DatetimeIndex(days), rows, probe).items():
+                valid_from[r] = day
+                if r > 0 and syms[r - 1] == syms[r]:
+                    valid_to[r - 1] = day
+        return iv.assign(valid_from=valid_from, valid_to=valid_to)
+
+    def _classification_lookback(self, lookback_days: int | None) -> int:
+        """行业/概念区间表的回看天数: 显式值优先, 否则采样式数据源 0、变更事件式 5 年."""
+        if lookback_days is not None:
+            return lookback_days
+        return 0 if getattr(self.source, "classification_sampled", False) else 365 * 5
+
     # ---- 概念板块 -----------------------------------------------------------
 
+    def concept_membership(
+        self,
+        dates: pd.DatetimeIndex,
+        symbols: list[str],
+        source: str | None = None,
+        lookback_days: int | None = None,
+    ) -> pd.DataFrame:
+        """整段日期的概念归属长表, columns=[date, symbol, concept_code, concept_name].
+
+        与 :meth:`industry_matrix` 同构: 一次取 ``fetch_concepts`` 的归属区间
+        (按投资域与区间缓存), searchsorted 展开到各日期。``source`` 缺省语义同
+        :meth:`concepts`; 数据源不支持概念时返回空表。``lookback_days`` 缺省值同
+        :meth:`industry_matrix`; 有 ``concepts_asof`` 的采样式数据源同样把纳入/
+        移出日二分到确切交易日, 结果与逐日 :meth:`concepts` 一致。
+        """
+        if source is None:
+            source = getattr(self.source, "concept_source", "eastmoney")
+        dates = pd.DatetimeIndex(dates)
+        if len(dates) == 0:
+            return pd.DataFrame(columns=MEMBERSHIP_COLUMNS)
+        lookback_days = self._classification_lookback(lookback_days)
+        start = dates.min().normalize() - pd.Timedelta(days=lookback_days)
+        end = dates.max().normalize()
+        exact = self._refines_samples("concepts_asof")
+        key = make_cache_key(
+            kind="concept_intervals", symbols=sorted(symbols),
+            start=str(start.date()), end=str(end.date()), source=source,
+            source_version=getattr(self.source, "source_version", "unknown"),
+            granularity="day" if exact else "sample",
+        )
+        if self.store.has(key):
+            intervals = self.store.get(key)
+        else:
+            try:
+                raw = self.source.fetch_concepts(symbols, (start, end), source)
+            except (NotImplementedError, AttributeError):
+                return pd.DataFrame(columns=MEMBERSHIP_COLUMNS)
+            intervals = concept_intervals(raw, source)
+            if exact and not intervals.empty:
+                intervals = self._exact_concepts(intervals, source)
+            self.store.put(key, intervals)
+        return expand_concepts(intervals, dates, symbols)
+
+    def _exact_concepts(self, intervals: pd.DataFrame, source: str) -> pd.DataFrame:
+        """把采样区间表的纳入/移出日二分到确切交易日(逐次走 :meth:`concepts` 单点查询).
+
+        采样点取区间表里出现过的全部起止日: 各标的共用一套采样日, 间隔偏宽
+        只多几轮二分, 不影响结果。
+        """
+        iv = intervals.reset_index(drop=True)
+        syms = iv["symbol"].to_numpy()
+        pairs = list(zip(syms, iv["concept_code"], strict=True))
+        bounds = {"valid_from": iv["valid_from"].to_numpy(copy=True),
+                  "valid_to": iv["valid_to"].to_numpy(copy=True)}
+        grid = pd.concat([iv["valid_from"], iv["valid_to"]])
+
+        def probe(day, items):
+            got = self.concepts(sorted({syms[r] for _, r in items}), day, source)
+            members = set(zip(got["symbol"], got["concept_code"], strict=True))
+            # 起点找首个已纳入的日子, 终点找首个已移出的日子
+            return {(col, r) for col, r in items
+                    if (pairs[r] in members) == (col == "valid_from")}
+
+        for col, values in bounds.items():
+            for days, rows in self._sample_brackets(grid, values).items():
+                items = [(col, r) for r in rows]
+                found = _bisect_changes(pd.DatetimeIndex(days), items, probe)
+                for (_, r), day in found.items():
+                    values[r] = day
+        return iv.assign(**bounds)
+
+
     def concepts(
         self,
         symbols: list[str],
@@ -545,7 +1101,7 @@ class DataLayer:
         symbols: list[str],
         start: str | pd.Timestamp,
         end: str | pd.Timestamp,
-        validate: bool = True,
+        validate: Validate = True,
     ) -> pd.DataFrame:
         """时序类数据的通用编排: 分片缓存 + 缺失补拉 + schema 校验.
 
@@ -553,34 +1109,45 @@ class DataLayer:
         """
         start = pd.Timestamp(start)
         end = pd.Timestamp(end)
-        source_version = getattr(self.source, "source_version", "unknown")
+        validate_fn = partial(self._validate_range, schema, kind, {}, mode=validate)
 
+        def load(syms: list[str], a: pd.Timestamp, b: pd.Timestamp, _columns=None):
+            return self._load_timeseries(kind, fetch_fn, schema, syms, a, b)
+
+        if self._session is not None:
+            return self._session.serve(
+                kind, {}, symbols, start, end, None, load,
+                validate_fn if validate else None,
+            )
+        df = load(symbols, start, end)
+        if validate and not df.empty:
+            validate_fn(df, symbols, start, end)
+        return df
+
+    def _load_timeseries(self, kind: str, fetch_fn, schema: Schema, symbols: list[str],
+                         start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        source_version = getattr(self.source, "source_version", "unknown")
         missing = self.bar_store.missing_ranges(
             kind=kind, symbols=symbols, start=start, end=end,
             source_version=source_version,
         )
-        if missing:
-            sym_missing = sorted({s for s, _ in missing})
-            ym_missing = sorted({ym for _, ym in missing})
-            fetch_start = pd.Timestamp(f"{ym_missing[0]}-01")
-            fetch_end = (pd.Timestamp(f"{ym_missing[-1]}-01") + pd.offsets.MonthEnd(0)).normalize()
-            new_df = fetch_fn(sym_missing, fetch_start, fetch_end)
+        rects = plan_fetches(missing, self.max_fetch_requests)
+        fetched = self._run_concurrently([
+            partial(self._source_call, fetch_fn, list(r.symbols), r.start, r.end)
+            for r in rects
+        ])
+        for rect, new_df in zip(rects, fetched, strict=True):
             if new_df is not None and not new_df.empty:
-                self.bar_store.put_range(
-                    new_df, kind=kind, source_version=source_version,
-                )
+                self._put_fetched(new_df, schema, kind, rect, {})
 
-        df = self.bar_store.get_range(
+        return self.bar_store.get_range(
             kind=kind, symbols=symbols, start=start, end=end,
             source_version=source_version,
         )
-        if validate and not df.empty:
-            validate_schema(df, schema, strict_index=True)
-        return df
 
     def margin_trading(
         self, symbols: list[str], start: str | pd.Timestamp,
-        end: str | pd.Timestamp, validate: bool = True,
+        end: str | pd.Timestamp, validate: Validate = True,
     ) -> pd.DataFrame:
         """两融(融资融券). 返回 MarginTrading schema."""
         return self._timeseries(
@@ -590,7 +1157,7 @@ class DataLayer:
 
     def money_flow(
         self, symbols: list[str], start: str | pd.Timestamp,
-        end: str | pd.Timestamp, validate: bool = True,
+        end: str | pd.Timestamp, validate: Validate = True,
     ) -> pd.DataFrame:
         """资金流向. 返回 MoneyFlow schema."""
         return self._timeseries(
@@ -600,7 +1167,7 @@ class DataLayer:
 
     def call_auction(
         self, symbols: list[str], start: str | pd.Timestamp,
-        end: str | pd.Timestamp, validate: bool = True,
+        end: str | pd.Timestamp, validate: Validate = True,
     ) -> pd.DataFrame:
         """集合竞价. 返回 CallAuction schema."""
         return self._timeseries(
@@ -0,0 +1,102 @@
+"""DailyPanel — 日线宽表面板(date × symbol 连续数组).
+
+特征库几乎都要 ``ctx.daily([...])["close"].unstack("symbol")``, 一次矩阵构建里
+同一段数据会被长表 → 宽表反复透视几十次。:class:`DailyPanel` 把透视做一次:
+
+- 共享 ``dates``(DatetimeIndex) 与 ``symbols``(Index);
+- 每个字段一个 C 连续的 ``(n_dates, n_symbols)`` 数组 —— 数值列 float64
+  (缺格 NaN), 布尔列 bool(缺格 False);
+- 数组只读, :meth:`frame` 给出不拷贝的宽表 DataFrame 视图, 多个特征共享同一块内存。
+
+行/列集合与 ``unstack("symbol")`` 完全一致(出现过的日期 / 标的, 升序), 故特征
+从 unstack 切到面板不改变结果。由 :meth:`DataLayer.daily_panels` 构造并按
+(区间, 投资域) 记忆化。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+_NUMERIC_KINDS = frozenset({"integer", "floating", "mixed-integer-float", "decimal", "empty"})
+
+
+@dataclass(frozen=True)
+class DailyPanel:
+    """日线宽表面板. 见模块说明."""
+
+    dates: pd.DatetimeIndex
+    symbols: pd.Index
+    arrays: dict[str, np.ndarray] = field(default_factory=dict)
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame, fields: list[str]) -> DailyPanel:
+        """MultiIndex(date, symbol) 长表 → 面板; 只透视 ``fields`` 中存在的列."""
+        if df.empty:
+            dates = pd.DatetimeIndex([], name="date")
+            symbols = pd.Index([], dtype=object, name="symbol")
+            return cls(dates, symbols, {
+                f: _readonly(np.empty((0, 0), dtype=np.float64)) for f in fields
+            })
+        date_codes, dates = pd.factorize(df.index.get_level_values(0), sort=True)
+        sym_codes, symbols = pd.factorize(df.index.get_level_values(1), sort=True)
+        dates = pd.DatetimeIndex(dates, name="date")
+        symbols = pd.Index(symbols, name="symbol")
+        arrays = {
+            f: _scatter(df[f], date_codes, sym_codes, (len(dates), len(symbols)))
+            for f in fields if f in df.columns
+        }
+        return cls(dates, symbols, arrays)
+
+    @property
+    def fields(self) -> list[str]:
+        return list(self.arrays)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.dates), len(self.symbols)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.arrays
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        try:
+            return self.arrays[name]
+        except KeyError:
+            raise KeyError(f"面板无字段 {name!r}, 已有 {self.fields}") from None
+
+    def frame(self, name: str) -> pd.DataFrame:
+        """字段的宽表视图(index=date, columns=symbol), 不拷贝底层数组."""
+        return pd.DataFrame(self[name], index=self.dates, columns=self.symbols, copy=False)
+
+    def with_fields(self, other: DailyPanel) -> DailyPanel:
+        """并入 ``other`` 的字段(需同一 dates/symbols 网格), 返回新面板."""
+        if not (other.dates.equals(self.dates) and other.symbols.equals(self.symbols)):
+            raise ValueError("面板网格不一致, 无法合并字段")
+        return DailyPanel(self.dates, self.symbols, {**self.arrays, **other.arrays})
+
+
+def _scatter(col: pd.Series, rows: np.ndarray, cols: np.ndarray,
+             shape: tuple[int, int]) -> np.ndarray:
+    kind = pd.api.types.infer_dtype(col, skipna=True)
+    if kind == "boolean":
+        out = np.zeros(shape, dtype=bool)
+        out[rows, cols] = col.fillna(False).to_numpy(dtype=bool)
+    elif kind in _NUMERIC_KINDS:
+        # 股本列缺失时是全 pd.NA 的 object 列, 同样落成 NaN
+        out = np.full(shape, np.nan, dtype=np.float64)
+        out[rows, cols] = pd.to_numeric(col).to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        raise TypeError(f"面板只支持数值/布尔字段, {col.name!r} 的类型为 {col.dtype}")
+    return _readonly(out)
+
+
+def _readonly(arr: np.ndarray) -> np.ndarray:
+    arr.flags.writeable = False
+    return arr
@@ -0,0 +1,177 @@
+"""DataSession — 一次构建内的取数合并(request coalescing).
+
+一次 ``build_feature_matrix`` 里, lookback 不同的特征会对同一投资域发出大量
+互相重叠的 ``daily`` / ``money_flow`` / ``call_auction`` 请求, 每次都重跑
+``missing_ranges`` + ``get_range`` + schema 校验。会话期间 :class:`DataLayer`
+把这些请求交给 :class:`DataSession`:
+
+- 按 (kind, 缓存键) 维护一张内存长表, 覆盖迄今请求过(及 :meth:`reserve` 预登记)
+  的窗口并集 × 标的并集 × 字段并集;
+- 被覆盖的请求直接切片返回(命中), 不碰 store;
+- 未覆盖时: 只缺字段 → 只补读缺的列; 缺窗口/标的 → 按并集重读一次;
+- schema 校验对每张全列长表只做一次, 之后的切片不再重复校验。
+
+会话只活在 ``with data.session():`` 块内, 退出即释放内存。
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import pandas as pd
+
+# (symbols, start, end, columns) -> 长表
+Loader = Callable[[list[str], pd.Timestamp, pd.Timestamp, "list[str] | None"], pd.DataFrame]
+# (长表, symbols, start, end) -> None; 不通过时抛错
+Validator = Callable[[pd.DataFrame, list[str], pd.Timestamp, pd.Timestamp], None]
+
+
+@dataclass
+class _Window:
+    """一张会话长表覆盖的范围; ``columns`` 为 None 表示全部列."""
+
+    symbols: frozenset[str]
+    start: pd.Timestamp
+    end: pd.Timestamp
+    columns: frozenset[str] | None
+
+    def covers(self, symbols: frozenset[str], start: pd.Timestamp, end: pd.Timestamp) -> bool:
+        return symbols <= self.symbols and self.start <= start and end <= self.end
+
+    def has_columns(self, columns: frozenset[str] | None) -> bool:
+        if self.columns is None:
+            return True
+        return columns is not None and columns <= self.columns
+
+    def union(self, other: _Window) -> _Window:
+        cols = None if self.columns is None or other.columns is None else self.columns | other.columns
+        return _Window(self.symbols | other.symbols, min(self.start, other.start),
+                       max(self.end, other.end), cols)
+
+
+@dataclass
+class _Frame:
+    window: _Window
+    df: pd.DataFrame
+    validated: bool = False
+
+
+class DataSession:
+    """一次构建内的取数合并缓存. 由 :meth:`DataLayer.session` 创建, 不直接实例化."""
+
+    def __init__(self) -> None:
+        self._frames: dict[tuple, _Frame] = {}
+        self._reserved: dict[tuple, _Window] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    # ---- 预登记 -------------------------------------------------------------
+
+    def reserve(self, kind: str, symbols: list[str], start: pd.Timestamp,
+                end: pd.Timestamp, columns: list[str] | None = None,
+                **extra_keys) -> None:
+        """预登记将要请求的窗口, 首次真正取数时按并集一次取齐.
+
+        ``build_feature_matrix`` 用它登记最宽 lookback 的日线窗口, 避免窄窗口
+        先取、宽窗口再整段重取。
+        """
+        key = self._key(kind, extra_keys)
+        want = _Window(frozenset(symbols), pd.Timestamp(start), pd.Timestamp(end),
+                       None if columns is None else frozenset(columns))
+        prev = self._reserved.get(key)
+        self._reserved[key] = want if prev is None else prev.union(want)
+
+    # ---- 取数 ---------------------------------------------------------------
+
+    def serve(self, kind: str, extra_keys: dict, symbols: list[str],
+              start: pd.Timestamp, end: pd.Timestamp, columns: list[str] | None,
+              loader: Loader, validate: Validator | None = None,
+              ) -> pd.DataFrame:
+        """返回 ``[start, end] × symbols × columns`` 的长表, 能切片就不读 store.
+
+        ``validate`` 非 None 时保证结果所在的全列长表已校验过(每张表一次),
+        回调拿到的是整张会话长表及其覆盖窗口。
+        """
+        key = self._key(kind, extra_keys)
+        want = _Window(frozenset(symbols), start, end,
+                       None if columns is None else frozenset(columns))
+        stats = self._stats.setdefault(kind, {"hits": 0, "misses": 0, "store_reads": 0})
+        frame = self._frames.get(key)
+
+        if frame is not None and frame.window.covers(want.symbols, start, end) \
+                and frame.window.has_columns(want.columns):
+            stats["hits"] += 1
+        elif frame is not None and frame.window.covers(want.symbols, start, end):
+            # 只缺字段: 在已有窗口上补读缺的列
+            stats["misses"] += 1
+            frame = self._add_columns(frame, want.columns, loader, stats)
+            self._frames[key] = frame
+        else:
+            stats["misses"] += 1
+            window = want
+            for other in (self._reserved.pop(key, None), frame.window if frame else None):
+                if other is not None:
+                    window = window.union(other)
+            stats["store_reads"] += 1
+            df = loader(sorted(window.symbols), window.start, window.end,
+                        None if window.columns is None else sorted(window.columns))
+            frame = _Frame(window, df)
+            self._frames[key] = frame
+
+        if validate is not None and frame.window.columns is None \
+                and not frame.validated and not frame.df.empty:
+            w = frame.window
+            validate(frame.df, sorted(w.symbols), w.start, w.end)
+            frame.validated = True
+        return _slice(frame, want)
+
+    @staticmethod
+    def _add_columns(frame: _Frame, columns: frozenset[str] | None, loader: Loader,
+                     stats: dict[str, int]) -> _Frame:
+        w = frame.window
+        stats["store_reads"] += 1
+        if columns is None:
+            df = loader(sorted(w.symbols), w.start, w.end, None)
+            return _Frame(_Window(w.symbols, w.start, w.end, None), df)
+        extra = sorted(columns - (w.columns or frozenset()))
+        add = loader(sorted(w.symbols), w.start, w.end, extra)
+        cols = w.columns | frozenset(extra)
+        if frame.df.empty or add.empty:
+            df = add if frame.df.empty else frame.df
+        elif add.index.equals(frame.df.index):
+            df = pd.concat([frame.df, add.drop(columns=frame.df.columns, errors="ignore")], axis=1)
+        else:
+            # 行集不一致(两次读之间有写入): 按字段并集整段重读
+            stats["store_reads"] += 1
+            df = loader(sorted(w.symbols), w.start, w.end, sorted(cols))
+        return _Frame(_Window(w.symbols, w.start, w.end, cols), df)
+
+    # ---- 统计 ---------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """命中统计: ``hits``(免掉的 store 读取次数) / ``misses`` / ``store_reads`` / ``by_kind``."""
+        by_kind = {k: dict(v) for k, v in self._stats.items()}
+        total = {f: sum(v[f] for v in by_kind.values()) for f in ("hits", "misses", "store_reads")}
+        return {**total, "by_kind": by_kind}
+
+    @staticmethod
+    def _key(kind: str, extra_keys: dict) -> tuple:
+        return (kind, *sorted((k, str(v)) for k, v in extra_keys.items()))
+
+
+def _slice(frame: _Frame, want: _Window) -> pd.DataFrame:
+    """会话长表 → 请求窗口的切片(日期二分 + 标的/列筛选)."""
+    df = frame.df
+    if df.empty:
+        return df
+    w = frame.window
+    if want.start > w.start or want.end < w.end:
+        dates = df.index.get_level_values(0)
+        lo = dates.searchsorted(want.start, side="left")
+        hi = dates.searchsorted(want.end, side="right")
+        df = df.iloc[lo:hi]
+    if want.symbols != w.symbols:
+        df = df[df.index.get_level_values(1).isin(want.symbols)]
+    if want.columns is not None:
+        df = df[[c for c in df.columns if c in want.columns]]
+    return df
@@ -30,6 +30,11 @@ class FakeDataSource:
     """合成 A 股数据源."""
 
     source_version = "fake-v1"
+    #: fetch_bars 已带股本列; 纯内存生成, 可并发调用(见 DataLayer.source_concurrency)
+    bars_include_shares = True
+    max_concurrency = 4
+    #: 行业/概念在区间起点给一条快照(DataLayer 区间表无需回看)
+    classification_sampled = True
 
     def __init__(self, seed: int = 42, n_symbols: int = 50,
                  start_year: int = 2018, base_price: float = 10.0,
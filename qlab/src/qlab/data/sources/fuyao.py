@@ -242,6 +242,9 @@ class FuyaoDataSource:
     """同花顺扶摇数据源。"""
 
     source_version = "fuyao-v1"
+    #: fetch_bars 不带股本, DataLayer 与 K 线并发补取; 无状态 HTTP 客户端, 可并发调用
+    bars_include_shares = False
+    max_concurrency = 4
 
     def __init__(
         self,
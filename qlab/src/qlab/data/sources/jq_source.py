@@ -28,7 +28,7 @@ from typing import TYPE_CHECKING, Any
 import numpy as np
 import pandas as pd
 
-from qlab.core.calendar import Calendar, get_default_calendar
+from qlab.core.calendar import Calendar, SessionIndex, get_default_calendar
 from qlab.core.enums import AdjustMode, Freq, ReportType
 from qlab.core.exceptions import DataUnavailableError
 
@@ -219,6 +219,12 @@ class JQDataSource:
     #:     concepts_as_of(df, syms, date, source=JQDataSource.concept_source)
     concept_source = "jq"
 
+    #: fetch_bars 自带股本列(见 _attach_shares); 单个远程内核, 不并发
+    bars_include_shares = True
+    max_concurrency = 1
+    #: 行业/概念按月采样, 区间起点即有一条快照(DataLayer 区间表无需回看)
+    classification_sampled = True
+
     def __init__(self, cache: DataCache | None = None) -> None:
         if cache is None:
             try:
@@ -1434,34 +1440,31 @@ class JQCalendar:
     def __init__(self, name: str, sessions: pd.DatetimeIndex) -> None:
         self.name = name
         self.sessions = sessions
-        self._set = set(sessions)
+        self.session_index = SessionIndex(sessions)
 
     def is_trading_day(self, date: pd.Timestamp) -> bool:
-        return pd.Timestamp(date).normalize() in self._set
+        return bool(self.session_index.contains(date)[0])
 
     def trading_days(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.DatetimeIndex:
-        lo = pd.Timestamp(start).normalize()
-        hi = pd.Timestamp(end).normalize()
-        return self.sessions[(self.sessions >= lo) & (self.sessions <= hi)]
+        return self.session_index.range(start, end)
 
     def prev_trading_day(self, date: pd.Timestamp, n: int = 1) -> pd.Timestamp:
-        d = pd.Timestamp(date).normalize()
-        pos = self.sessions.searchsorted(d, side="left")
-        target = int(pos) - n
-        if target < 0:
-            raise IndexError(f"{d.date()} 前第 {n} 个交易日超出日历起点")
-        return self.sessions[target]
+        return self.session_index.shift(date, -n)[0]
 
     def next_trading_day(self, date: pd.Timestamp, n: int = 1) -> pd.Timestamp:
-        d = pd.Timestamp(date).normalize()
-        pos = self.sessions.searchsorted(d, side="right")
-        target = int(pos) + n - 1
-        if target >= len(self.sessions):
-            raise IndexError(f"{d.date()} 后第 {n} 个交易日超出日历终点")
-        return self.sessions[target]
+        return self.session_index.shift(date, n)[0]
 
     def count_trading_days(self, start: pd.Timestamp, end: pd.Timestamp) -> int:
-        return len(self.trading_days(start, end))
+        return int(self.session_index.between(start, end)[0])
+
+    def shift_sessions(self, dates, n: int, *, errors: str = "raise") -> pd.DatetimeIndex:
+        return self.session_index.shift(dates, n, errors=errors)
+
+    def session_ordinal(self, dates) -> np.ndarray:
+        return self.session_index.ordinal(dates)
+
+    def sessions_between(self, start, end) -> np.ndarray:
+        return self.session_index.between(start, end)
 
     def session_times(self, date: pd.Timestamp) -> dict[str, pd.Timestamp]:
         # A 股会话时刻与默认日历一致
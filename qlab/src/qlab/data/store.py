@@ -4,23 +4,44 @@
 
 两类存储：
 - BarStore (key-based): 用于 universe / corp_actions / fundamentals / industry
-- ShardedBarStore: K 线专用，按 (kind, symbol, year-month) 分片
+- ShardedBarStore: K 线专用，按 (kind, symbol, year-month) 分片;
+  多标的场景可用 PartitionedParquetBarStore 按 (kind, year-month) 合并分区
 """
 
 from __future__ import annotations
 
 import hashlib
+import io
 import json
 import logging
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
+import numpy as np
 import pandas as pd
 
+from qlab.data.fetch_plan import plan_fetches
 from qlab.data.interfaces import BarStore, ShardedBarStore
 
+try:  # 文件锁: POSIX 有 fcntl, Windows 退化为无锁(单机单进程仍安全)
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 
+_MANIFEST_NAME = "_manifest.json"
+_YM_STEM = re.compile(r"^\d{4}-\d{2}$")
+
 
 def make_cache_key(**kwargs: Any) -> str:
     """生成确定性的缓存键.
@@ -70,6 +91,18 @@ def _months_between(start: pd.Timestamp, end: pd.Timestamp) -> list[str]:
     return [str(p) for p in months]
 
 
+def _project(df: pd.DataFrame, columns: list[str] | None) -> pd.DataFrame:
+    """列投影; 分片里没有的列跳过(不同批次落盘的分片列集可能不一致)."""
+    if columns is None:
+        return df
+    return df[[c for c in columns if c in df.columns]]
+
+
+def _default_io_workers() -> int:
+    """分片并行读取的默认线程数: I/O + 解压为主, 上限 8 避免打满磁盘队列."""
+    return min(8, os.cpu_count() or 1)
+
+
 def _series_year_month(idx: pd.DatetimeIndex) -> pd.Index:
     return pd.Index([f"{d.year:04d}-{d.month:02d}" for d in idx])
 
@@ -103,38 +136,89 @@ class InMemoryBarStore(BarStore):
 class ParquetBarStore(BarStore):
     """Parquet 持久化缓存. 生产用.
 
-    存储路径：{root}/{key}.parquet
+    存储路径：{root}/{key}.parquet, 旁边一个 ``{key}.parquet.sha1`` 校验文件
+    (``{"checksum", "bytes"}``)。``put`` 先写 tmp 再 rename, 不会留下半截文件。
+
+    ``has`` 只读一次文件字节(不解码)并核对魔数 + 校验和, 通过后把字节暂存在
+    当前线程, 紧随其后的 ``get`` 直接从内存解码 —— 命中一次 = 一次读 + 一次解码。
+    没有校验文件的旧缓存退化为解析 footer, 通过后补写校验文件。
     """
 
+    _MAGIC = b"PAR1"
+
     def __init__(self, root: str | Path):
         self.root = Path(root)
         self.root.mkdir(parents=True, exist_ok=True)
+        self._verified = threading.local()
 
     def _path(self, key: str) -> Path:
         return self.root / f"{key}.parquet"
 
+    def _sidecar(self, key: str) -> Path:
+        return self.root / f"{key}.parquet.sha1"
+
+    def _read_sidecar(self, key: str) -> dict[str, Any] | None:
+        try:
+            return json.loads(self._sidecar(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _verify(self, key: str, payload: bytes) -> bool:
+        if len(payload) < 8 or payload[:4] != self._MAGIC or payload[-4:] != self._MAGIC:
+            return False
+        meta = self._read_sidecar(key)
+        if meta is not None:
+            return meta.get("bytes") == len(payload) and meta.get("checksum") == _checksum(payload)
+        # 旧缓存无校验文件: footer 能解析即认可, 并补写校验文件
+        import pyarrow.parquet as pq
+
+        try:
+            pq.ParquetFile(io.BytesIO(payload)).metadata  # noqa: B018 - 只解析 footer
+        except Exception:  # noqa: BLE001
+            return False
+        self._write_sidecar(key, payload)
+        return True
+
+    def _write_sidecar(self, key: str, payload: bytes) -> None:
+        meta = {"checksum": _checksum(payload), "bytes": len(payload)}
+        try:
+            _atomic_write_bytes(self._sidecar(key), json.dumps(meta).encode("utf-8"))
+        except OSError as ex:
+            logger.warning("缓存校验文件写入失败(不影响本次读取): %s (%s)", key, ex)
+
     def has(self, key: str) -> bool:
         """键是否存在**且可读** —— 损坏文件视为不存在(会重取并覆写)."""
         p = self._path(key)
-        if not p.exists():
-            return False
         try:
-            pd.read_parquet(p)
-        except Exception:  # noqa: BLE001 - 读不出就当缓存不可用
+            payload = p.read_bytes()
+        except FileNotFoundError:
+            return False
+        if not self._verify(key, payload):
             logger.warning("缓存文件损坏, 将重取并覆写: %s", p)
             return False
+        self._verified.entry = (key, payload)
         return True
 
     def get(self, key: str) -> pd.DataFrame:
+        entry = getattr(self._verified, "entry", None)
+        self._verified.entry = None
+        if entry is not None and entry[0] == key:
+            return pd.read_parquet(io.BytesIO(entry[1]))
         return pd.read_parquet(self._path(key))
 
     def put(self, key: str, df: pd.DataFrame) -> None:
-        df.to_parquet(self._path(key))
+        buf = io.BytesIO()
+        df.to_parquet(buf)
+        payload = buf.getvalue()
+        self._verified.entry = None
+        _atomic_write_bytes(self._path(key), payload)
+        self._write_sidecar(key, payload)
 
     def invalidate(self, key_pattern: str) -> None:
         # 支持简单的 glob 风格
         for p in self.root.glob(f"{key_pattern}*.parquet"):
             p.unlink()
+            p.with_name(f"{p.name}.sha1").unlink(missing_ok=True)
 
 
 class InMemoryShardedBarStore(ShardedBarStore):
@@ -147,6 +231,8 @@ class InMemoryShardedBarStore(ShardedBarStore):
     def __init__(self) -> None:
         # _store[shard_key] = DataFrame slice
         self._store: dict[str, pd.DataFrame] = {}
+        # _validated[shard_key] = 已通过校验的 schema 名; 分片被改写即失效
+        self._validated: dict[str, set[str]] = {}
 
     @staticmethod
     def _shard_key(kind: str, source_version: str, symbol: str, year_month: str,
@@ -154,7 +240,8 @@ class InMemoryShardedBarStore(ShardedBarStore):
         extra_str = "/".join(f"{k}={_safe_segment(extra[k])}" for k in sorted(extra))
         return f"{kind}/{_safe_segment(source_version)}/{extra_str}/{_safe_segment(symbol)}/{year_month}"
 
-    def get_range(self, *, kind, symbols, start, end, source_version, **extra_keys):
+    def get_range(self, *, kind, symbols, start, end, source_version, columns=None,
+                  **extra_keys):
         start = pd.Timestamp(start)
         end = pd.Timestamp(end)
         months = _months_between(start, end)
@@ -163,7 +250,7 @@ class InMemoryShardedBarStore(ShardedBarStore):
             for ym in months:
                 k = self._shard_key(kind, source_version, sym, ym, **extra_keys)
                 if k in self._store:
-                    parts.append(self._store[k])
+                    parts.append(_project(self._store[k], columns))
         if not parts:
             return pd.DataFrame()
         df = pd.concat(parts).sort_index()
@@ -186,6 +273,7 @@ class InMemoryShardedBarStore(ShardedBarStore):
         grouped = df.groupby([sym_lvl, ym_lvl], sort=False)
         for (sym, ym), part in grouped:
             k = self._shard_key(kind, source_version, str(sym), str(ym), **extra_keys)
+            self._validated.pop(k, None)
             existing = self._store.get(k)
             if existing is not None:
                 # 合并去重
@@ -221,6 +309,194 @@ class InMemoryShardedBarStore(ShardedBarStore):
                 if len(parts) < 2 or parts[-2] not in sym_filter:
                     continue
             del self._store[k]
+            self._validated.pop(k, None)
+
+    def is_validated(self, *, kind, symbols, start, end, source_version, schema,
+                     **extra_keys) -> bool:
+        """范围内已缓存的分片是否都通过过 ``schema`` 校验(见 :meth:`mark_validated`)."""
+        for sym in _unique(symbols):
+            for ym in _months_between(pd.Timestamp(start), pd.Timestamp(end)):
+                k = self._shard_key(kind, source_version, sym, ym, **extra_keys)
+                if k in self._store and schema not in self._validated.get(k, ()):
+                    return False
+        return True
+
+    def mark_validated(self, *, kind, symbols, start, end, source_version, schema,
+                       **extra_keys) -> None:
+        """记录范围内分片已通过 ``schema`` 校验; 调用方保证整月都校验过."""
+        for sym in _unique(symbols):
+            for ym in _months_between(pd.Timestamp(start), pd.Timestamp(end)):
+                k = self._shard_key(kind, source_version, sym, ym, **extra_keys)
+                if k in self._store:
+                    self._validated.setdefault(k, set()).add(schema)
+
+
+class _ShardManifest:
+    """单个 ``{kind}/{source_version}/{extra=val}/...`` 目录的分片清单.
+
+    ``{base}/_manifest.json`` 记录每个 ``{symbol}/{YYYY-MM}`` 分片的
+    ``rows / min_date / max_date / bytes / checksum / written_at``。
+    :meth:`ParquetShardedBarStore.missing_ranges` 只查清单(外加一次 stat),
+    不再为"证明分片存在且可读"而解码整个 parquet。
+
+    清单写盘走 tmp + ``os.replace``; 写盘前先按磁盘上的最新版本合并本进程的
+    增删, 缩小多进程并发写同一清单时互相覆盖的窗口。
+    """
+
+    def __init__(self, base: Path) -> None:
+        self.path = base / _MANIFEST_NAME
+        self.entries: dict[str, dict[str, Any]] = {}
+        self._mtime_ns: int | None = None
+        self._pending_set: dict[str, dict[str, Any]] = {}
+        self._pending_drop: set[str] = set()
+        self.reload()
+
+    def _read_disk(self) -> dict[str, dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            # 清单损坏不致命: 分片文件仍在, 读路径会按旧格式回填
+            logger.warning("分片清单损坏, 将按分片文件重建: %s", self.path)
+            return {}
+        return data.get("shards", {}) if isinstance(data, dict) else {}
+
+    def _disk_mtime(self) -> int | None:
+        try:
+            return self.path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def reload(self) -> None:
+        self.entries = self._read_disk()
+        self.entries.update(self._pending_set)
+        for k in self._pending_drop:
+            self.entries.pop(k, None)
+        self._mtime_ns = self._disk_mtime()
+
+    def refresh(self) -> None:
+        """其他进程改写过清单时重新加载(一次 stat)."""
+        if self._disk_mtime() != self._mtime_ns:
+            self.reload()
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pending_set or self._pending_drop)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        return self.entries.get(key)
+
+    def set(self, key: str, record: dict[str, Any]) -> None:
+        self.entries[key] = record
+        self._pending_set[key] = record
+        self._pending_drop.discard(key)
+
+    def drop(self, key: str) -> None:
+        self.entries.pop(key, None)
+        self._pending_set.pop(key, None)
+        self._pending_drop.add(key)
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """跨进程互斥锁: 保护"读清单 → 写分片/增量 → 写清单"的临界区.
+
+        追加增量与 :meth:`ParquetShardedBarStore.compact` 并发时, 不加锁会让
+        压实写回的清单覆盖掉别的进程刚追加的增量条目(增量文件成孤儿)。
+        """
+        if fcntl is None:  # pragma: no cover
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(_MANIFEST_NAME + ".lock"), "w") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                self.refresh()
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        merged = self._read_disk()
+        merged.update(self._pending_set)
+        for k in self._pending_drop:
+            merged.pop(k, None)
+        _atomic_write_bytes(
+            self.path,
+            json.dumps({"version": 1, "shards": merged}, sort_keys=True).encode("utf-8"),
+        )
+        self.entries = merged
+        self._pending_set.clear()
+        self._pending_drop.clear()
+        self._mtime_ns = self._disk_mtime()
+
+
+def _atomic_write_bytes(path: Path, payload: bytes) -> None:
+    """原子写: 先写同目录 tmp 再 ``os.replace``, 中断不会留下半截文件."""
+    tmp = path.with_name(f"{path.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(payload)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _save_manifest_quietly(manifest: _ShardManifest, lock: bool = False) -> None:
+    """读路径上的清单回填/剔除: 写不进去(只读缓存)不影响本次读取.
+
+    ``lock=True`` 时在 :meth:`_ShardManifest.lock` 内写盘(调用方尚未持锁时用)。
+    """
+    if not manifest.dirty:
+        return
+    try:
+        if lock:
+            with manifest.lock():
+                manifest.save()
+        else:
+            manifest.save()
+    except OSError as ex:
+        logger.warning("分片清单写入失败(不影响本次读取): %s (%s)", manifest.path, ex)
+
+
+def _parse_scope(root: Path, base: Path) -> tuple[str, str, dict[str, str]]:
+    """``{kind}/{source_version}/{k=v}/...`` 目录 → (kind, source_version, extra_keys).
+
+    值是落盘时的文件名安全形式; ``_safe_segment`` 幂等, 回传给 store 仍落到同一目录。
+    """
+    parts = base.relative_to(root).parts
+    extra = dict(p.split("=", 1) for p in parts[2:])
+    return parts[0], parts[1], extra
+
+
+def _scope_root(root: Path, kind: str | None, source_version: str | None) -> Path:
+    if kind is None:
+        return root
+    scope = root / _safe_segment(kind)
+    return scope if source_version is None else scope / _safe_segment(source_version)
+
+
+def _checksum(payload: bytes) -> str:
+    return hashlib.sha1(payload).hexdigest()
+
+
+def _shard_record(df: pd.DataFrame, payload: bytes) -> dict[str, Any]:
+    """分片清单条目. ``payload`` 是落盘的原始字节(checksum 与 bytes 按它算)."""
+    if isinstance(df.index, pd.MultiIndex) and len(df) > 0:
+        dates = pd.DatetimeIndex(df.index.get_level_values(0))
+        min_date, max_date = str(dates.min()), str(dates.max())
+    else:
+        min_date = max_date = None
+    return {
+        "rows": int(len(df)),
+        "min_date": min_date,
+        "max_date": max_date,
+        "bytes": len(payload),
+        "checksum": _checksum(payload),
+        "written_at": pd.Timestamp.now(tz="UTC").isoformat(),
+    }
 
 
 class ParquetShardedBarStore(ShardedBarStore):
@@ -229,26 +505,80 @@ class ParquetShardedBarStore(ShardedBarStore):
     目录结构::
 
         root/
+          {kind}/{source_version}/{extra=val}/.../_manifest.json
           {kind}/{source_version}/{extra=val}/.../{symbol}/{YYYY-MM}.parquet
 
     `extra_keys` 形如 `freq='1d'`, `adjust='backward'`：按 key 字典序展开为子目录段。
+
+    每个 ``{kind}/{source_version}/{extra...}`` 目录带一份分片清单
+    (见 :class:`_ShardManifest`), 由 :meth:`put_range` 原子维护:
+
+    - :meth:`missing_ranges` 只查内存中的清单 + stat 比对文件大小, 不解码;
+    - :meth:`get_range` 读分片时校验 checksum, 不符即视为损坏并从清单剔除
+      (下次 ``missing_ranges`` 会判为缺失并重取);
+    - 无清单的旧缓存照常可用: 首次遇到时按旧方式解码一次并回填清单。
+
+    写入模式(``write_mode``):
+
+    - ``"rewrite"``(默认): 读旧分片 → 合并 → 整片重写;
+    - ``"append"``: 已有分片只追加一个增量文件 ``{YYYY-MM}.delta.{ns}.parquet``
+      (登记在清单条目的 ``deltas`` 里), 代价与新行数成正比。读取时按写入顺序
+      合并, 同键后写覆盖。增量由 :meth:`compact` 合并回基础分片
+      (``qlab store compact`` 同样可调); 单个分片增量超过 ``max_deltas`` 时
+      写入当场压实, 限制读放大。
     """
 
-    def __init__(self, root: str | Path) -> None:
+    def __init__(
+        self,
+        root: str | Path,
+        max_workers: int | None = None,
+        write_mode: Literal["rewrite", "append"] = "rewrite",
+        max_deltas: int = 16,
+    ) -> None:
+        """
+        root : 缓存根目录
+        max_workers : :meth:`get_range` 并行读分片的线程数上限。
+            None 取 ``min(8, cpu_count)``; 1 为串行。
+        write_mode : ``"rewrite"`` 整片重写 / ``"append"`` 追加增量文件
+        max_deltas : append 模式下单个分片最多挂多少个增量, 超过即当场压实
+        """
+        if write_mode not in ("rewrite", "append"):
+            raise ValueError(f"write_mode 只能是 'rewrite' 或 'append', 收到 {write_mode!r}")
         self.root = Path(root)
         self.root.mkdir(parents=True, exist_ok=True)
-
-    def _shard_dir(self, kind: str, source_version: str, symbol: str,
-                   extra: dict[str, Any]) -> Path:
+        self.write_mode = write_mode
+        self.max_deltas = max_deltas
+        self.max_workers = max_workers if max_workers is not None else _default_io_workers()
+        self._manifests: dict[Path, _ShardManifest] = {}
+        # 并行读分片时, 清单的剔除/回填会从工作线程发生
+        self._lock = threading.Lock()
+
+    def _base_dir(self, kind: str, source_version: str, extra: dict[str, Any]) -> Path:
         path = self.root / _safe_segment(kind) / _safe_segment(source_version)
         for k in sorted(extra):
             path = path / f"{_safe_segment(k)}={_safe_segment(extra[k])}"
-        path = path / _safe_segment(symbol)
         return path
 
+    def _shard_dir(self, kind: str, source_version: str, symbol: str,
+                   extra: dict[str, Any]) -> Path:
+        return self._base_dir(kind, source_version, extra) / _safe_segment(symbol)
+
     def _shard_path(self, kind, source_version, symbol, year_month, extra) -> Path:
         return self._shard_dir(kind, source_version, symbol, extra) / f"{year_month}.parquet"
 
+    @staticmethod
+    def _manifest_key(symbol: str, year_month: str) -> str:
+        return f"{_safe_segment(symbol)}/{year_month}"
+
+    def _manifest(self, base: Path) -> _ShardManifest:
+        m = self._manifests.get(base)
+        if m is None:
+            m = _ShardManifest(base)
+            self._manifests[base] = m
+        else:
+            m.refresh()
+        return m
+
     def _read_shard(self, path: Path) -> pd.DataFrame | None:
         """读单个分片; 文件损坏时返回 None 而不抛异常.
 
@@ -265,18 +595,143 @@ class ParquetShardedBarStore(ShardedBarStore):
             )
             return None
 
-    def get_range(self, *, kind, symbols, start, end, source_version, **extra_keys):
+    def _load_shard(self, manifest: _ShardManifest, key: str, path: Path,
+                    columns: list[str] | None = None) -> pd.DataFrame | None:
+        """读基础分片 + 清单登记的全部增量, 按写入顺序合并(后写覆盖).
+
+        任一增量损坏 → 整个分片作废(基础分片 + 增量一并删除、从清单剔除):
+        只丢一个增量会让该月"看似完整"却缺了后写入的行。
+        """
+        entry = manifest.get(key)
+        df = self._load_base(manifest, key, path, columns)
+        deltas = (entry or {}).get("deltas") or []
+        if df is None or not deltas:
+            return df
+        parts = [df]
+        for rec in deltas:
+            got = self._load_file(path.parent / rec["file"], rec, columns)
+            if got is None:
+                logger.warning("分片增量损坏, 整个分片作废并将从远程重取: %s", path)
+                self._discard_shard(manifest, key, path, entry)
+                return None
+            parts.append(got)
+        merged = pd.concat(parts)
+        return merged[~merged.index.duplicated(keep="last")].sort_index()
+
+    def _load_file(self, path: Path, rec: dict[str, Any],
+                   columns: list[str] | None) -> pd.DataFrame | None:
+        """读单个增量文件: 全列读校验 checksum, 投影读只解码所需列块."""
+        try:
+            if columns is not None:
+                return self._read_columns(path, columns)
+            payload = path.read_bytes()
+            if rec.get("checksum") != _checksum(payload):
+                return None
+            return pd.read_parquet(io.BytesIO(payload))
+        except Exception:  # noqa: BLE001 - 任何读失败都当作增量不可用
+            return None
+
+    def _discard_shard(self, manifest: _ShardManifest, key: str, path: Path,
+                       entry: dict[str, Any] | None) -> None:
+        with self._lock:
+            manifest.drop(key)
+        path.unlink(missing_ok=True)
+        for rec in (entry or {}).get("deltas") or []:
+            (path.parent / rec["file"]).unlink(missing_ok=True)
+
+    @staticmethod
+    def _read_columns(path: Path, columns: list[str]) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+
+        pf = pq.ParquetFile(path)
+        names = set(pf.schema_arrow.names)
+        return pf.read(
+            columns=[c for c in columns if c in names], use_pandas_metadata=True,
+        ).to_pandas()
+
+    def _load_base(self, manifest: _ShardManifest, key: str, path: Path,
+                   columns: list[str] | None = None) -> pd.DataFrame | None:
+        """按清单读基础分片并校验 checksum; 无清单条目的旧分片解码后回填.
+
+        校验失败 / 解码失败 → 从清单剔除并返回 None(视为缺失)。
+        ``columns`` 投影读取见 :meth:`_load_projected`。
+        """
+        entry = manifest.get(key)
+        if columns is not None and entry is not None:
+            return self._load_projected(manifest, key, path, columns)
+        try:
+            payload = path.read_bytes()
+        except OSError:
+            if entry is not None:
+                with self._lock:
+                    manifest.drop(key)
+            return None
+        if entry is not None and entry.get("checksum") != _checksum(payload):
+            # 删掉而非留着: 否则下次会被当作无清单的旧分片解码回填, 坏数据复活
+            logger.warning("分片校验和不符, 已删除并将从远程重取: %s", path)
+            with self._lock:
+                manifest.drop(key)
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            df = pd.read_parquet(io.BytesIO(payload))
+        except Exception:  # noqa: BLE001 - 任何读失败都当作分片不可用
+            logger.warning("分片损坏, 已忽略并将从远程重取: %s", path)
+            if entry is not None:
+                with self._lock:
+                    manifest.drop(key)
+            return None
+        if entry is None:
+            with self._lock:
+                manifest.set(key, _shard_record(df, payload))
+        return _project(df, columns)
+
+    def _load_projected(self, manifest: _ShardManifest, key: str, path: Path,
+                        columns: list[str]) -> pd.DataFrame | None:
+        """只解码 ``columns``(+ 索引列) 的列块.
+
+        投影读取的意义就在于不读其他列的字节, 因此**不做整文件 checksum**,
+        只依赖 :meth:`missing_ranges` 的大小比对 + 解码失败检测;
+        需要完整校验时不传 ``columns``。
+        """
+        try:
+            return self._read_columns(path, columns)
+        except Exception:  # noqa: BLE001 - 任何读失败都当作分片不可用
+            logger.warning("分片损坏, 已忽略并将从远程重取: %s", path)
+            with self._lock:
+                manifest.drop(key)
+            return None
+
+    def get_range(self, *, kind, symbols, start, end, source_version, columns=None,
+                  **extra_keys):
+        """读取 [start, end] × symbols.
+
+        ``columns`` 投影下推到 parquet 读取(只解码所需列块); 各分片在至多
+        ``max_workers`` 个线程上并行读取, 结果按 (symbol, 月份) 提交顺序拼接。
+        """
         start = pd.Timestamp(start)
         end = pd.Timestamp(end)
         months = _months_between(start, end)
-        parts: list[pd.DataFrame] = []
+        manifest = self._manifest(self._base_dir(kind, source_version, extra_keys))
+        jobs: list[tuple[str, Path]] = []
         for sym in _unique(symbols):
             for ym in months:
+                key = self._manifest_key(sym, ym)
                 p = self._shard_path(kind, source_version, sym, ym, extra_keys)
-                if p.exists():
-                    got = self._read_shard(p)
-                    if got is not None:
-                        parts.append(got)
+                if manifest.get(key) is None and not p.exists():
+                    continue
+                jobs.append((key, p))
+
+        def load(job: tuple[str, Path]) -> pd.DataFrame | None:
+            return self._load_shard(manifest, job[0], job[1], columns)
+
+        if self.max_workers > 1 and len(jobs) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as pool:
+                loaded = list(pool.map(load, jobs))
+        else:
+            loaded = [load(job) for job in jobs]
+        parts = [got for got in loaded if got is not None]
+        _save_manifest_quietly(manifest)
         if not parts:
             return pd.DataFrame()
         df = pd.concat(parts).sort_index()
@@ -287,7 +742,10 @@ class ParquetShardedBarStore(ShardedBarStore):
         return df
 
     def put_range(self, df, *, kind, source_version, **extra_keys):
-        """写入分片.
+        """写入分片, 并原子更新分片清单.
+
+        每个分片先写 tmp 再 ``os.replace``; 全部分片落盘后清单一次性替换。
+        中途被打断时, 已落盘但未进清单的分片会在下次读取时按旧格式回填。
 
         Raises:
             OSError: 缓存目录不可写(权限/只读挂载/盘满)。不包一层的话
@@ -298,44 +756,254 @@ class ParquetShardedBarStore(ShardedBarStore):
             return
         if not isinstance(df.index, pd.MultiIndex) or len(df.index.names) < 2:
             raise ValueError("put_range expects MultiIndex(date|timestamp, symbol)")
+        base = self._base_dir(kind, source_version, extra_keys)
+        manifest = self._manifest(base)
         date_lvl = pd.DatetimeIndex(df.index.get_level_values(0))
         sym_lvl = df.index.get_level_values(1)
         ym_lvl = _series_year_month(date_lvl)
         grouped = df.groupby([sym_lvl, ym_lvl], sort=False)
-        for (sym, ym), part in grouped:
-            shard_dir = self._shard_dir(kind, source_version, str(sym), extra_keys)
-            try:
-                shard_dir.mkdir(parents=True, exist_ok=True)
-                p = shard_dir / f"{ym}.parquet"
-                existing = self._read_shard(p) if p.exists() else None
-                if existing is not None:
-                    merged = pd.concat([existing, part])
-                    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
-                else:
-                    # 不存在或已损坏 —— 直接用新数据覆写, 以修复半写文件
-                    merged = part.sort_index()
-                merged.to_parquet(p)
-            except OSError as ex:
-                raise OSError(
-                    f"分片缓存写入失败: {shard_dir}\n"
-                    f"  原因: {type(ex).__name__}: {ex}\n"
-                    f"  常见成因: 缓存根目录({self.root})不可写 / 只读挂载 / 磁盘已满。\n"
-                    "  出路: 换一个可写的目录, 或改用 InMemoryShardedBarStore(不落盘)。"
-                ) from ex
+        target = base
+        stale: list[Path] = []
+        try:
+            base.mkdir(parents=True, exist_ok=True)
+            with manifest.lock():
+                for (sym, ym), part in grouped:
+                    shard_dir = self._shard_dir(kind, source_version, str(sym), extra_keys)
+                    target = shard_dir
+                    shard_dir.mkdir(parents=True, exist_ok=True)
+                    p = shard_dir / f"{ym}.parquet"
+                    key = self._manifest_key(str(sym), str(ym))
+                    entry = manifest.get(key)
+                    if (
+                        self.write_mode == "append" and entry is not None
+                        and len(entry.get("deltas") or []) < self.max_deltas
+                    ):
+                        self._append_delta(manifest, key, p, entry, part)
+                        continue
+                    existing = self._load_shard(manifest, key, p) if p.exists() else None
+                    if existing is not None:
+                        merged = pd.concat([existing, part])
+                        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+                    else:
+                        # 不存在或已损坏 —— 直接用新数据覆写, 以修复半写文件
+                        merged = part.sort_index()
+                    stale.extend(self._rewrite_base(manifest, key, p, merged))
+                target = manifest.path
+                manifest.save()
+        except OSError as ex:
+            raise OSError(
+                f"分片缓存写入失败: {target}\n"
+                f"  原因: {type(ex).__name__}: {ex}\n"
+                f"  常见成因: 缓存根目录({self.root})不可写 / 只读挂载 / 磁盘已满。\n"
+                "  出路: 换一个可写的目录, 或改用 InMemoryShardedBarStore(不落盘)。"
+            ) from ex
+        # 清单已不再引用的旧增量: 清单落盘之后再删, 中断也不会丢数据
+        for f in stale:
+            f.unlink(missing_ok=True)
+
+    def _append_delta(self, manifest: _ShardManifest, key: str, path: Path,
+                      entry: dict[str, Any], part: pd.DataFrame) -> None:
+        part = part[~part.index.duplicated(keep="last")].sort_index()
+        payload = part.to_parquet()
+        name = f"{path.stem}.delta.{time.time_ns()}.parquet"
+        _atomic_write_bytes(path.parent / name, payload)
+        rec = _shard_record(part, payload)
+        rec["file"] = name
+        entry = {k: v for k, v in entry.items() if k != "validated"}  # 新增量未经校验
+        manifest.set(key, {**entry, "deltas": [*(entry.get("deltas") or []), rec]})
+
+    def _rewrite_base(self, manifest: _ShardManifest, key: str, path: Path,
+                      merged: pd.DataFrame) -> list[Path]:
+        """整片重写基础分片; 返回被取代、待清单落盘后删除的增量文件."""
+        old = manifest.get(key) or {}
+        payload = merged.to_parquet()
+        _atomic_write_bytes(path, payload)
+        manifest.set(key, _shard_record(merged, payload))
+        return [path.parent / rec["file"] for rec in old.get("deltas") or []]
+
+    def compact(self, *, kind: str | None = None, source_version: str | None = None,
+                **extra_keys: Any) -> dict[str, int]:
+        """把增量合并回基础分片(后写覆盖), 返回 ``{"shards": 压实分片数, "deltas": 合并增量数}``.
+
+        不传参数即压实整个缓存根目录; ``kind`` / ``source_version`` / ``extra_keys``
+        逐级收窄范围(``source_version`` 需给出 ``kind``, ``extra_keys`` 需同时给出
+        ``kind`` 与 ``source_version``)。
+        压实读取时逐个校验 checksum, 损坏的分片直接作废(下次按缺失重取)。
+        """
+        if extra_keys and (kind is None or source_version is None):
+            raise ValueError("compact(**extra_keys) 需要同时指定 kind 与 source_version")
+        if source_version is not None and kind is None:
+            raise ValueError("compact(source_version=...) 需要同时指定 kind")
+        if kind is None:
+            scope = self.root
+        elif source_version is None:
+            scope = self.root / _safe_segment(kind)
+        else:
+            scope = self._base_dir(kind, source_version, extra_keys)
+        stats = {"shards": 0, "deltas": 0}
+        if not scope.exists():
+            return stats
+        for mpath in sorted(scope.rglob(_MANIFEST_NAME)):
+            manifest = self._manifest(mpath.parent)
+            stale: list[Path] = []
+            with manifest.lock():
+                for key, entry in sorted(manifest.entries.items()):
+                    deltas = entry.get("deltas") or []
+                    if not deltas:
+                        continue
+                    p = mpath.parent / f"{key}.parquet"
+                    merged = self._load_shard(manifest, key, p)
+                    if merged is None:
+                        continue
+                    stale.extend(self._rewrite_base(manifest, key, p, merged))
+                    stats["shards"] += 1
+                    stats["deltas"] += len(deltas)
+                manifest.save()
+            for f in stale:
+                f.unlink(missing_ok=True)
+        return stats
 
     def missing_ranges(self, *, kind, symbols, start, end, source_version, **extra_keys):
         """列出缺失分片。**损坏的分片也算缺失** —— 否则会被当成已缓存
         而不重取, 最终在 :meth:`get_range` 静默丢数据。
+
+        清单内的分片只做一次 stat 比对文件大小(截断/被改写即判缺失),
+        不解码; 完整的 checksum 校验推迟到真正读数据的 :meth:`get_range`。
+        不在清单里的旧分片解码一次并回填清单。
         """
         months = _months_between(pd.Timestamp(start), pd.Timestamp(end))
+        manifest = self._manifest(self._base_dir(kind, source_version, extra_keys))
         missing: list[tuple[str, str]] = []
         for sym in _unique(symbols):
             for ym in months:
+                key = self._manifest_key(sym, ym)
                 p = self._shard_path(kind, source_version, sym, ym, extra_keys)
-                if not p.exists() or self._read_shard(p) is None:
+                entry = manifest.get(key)
+                if entry is not None:
+                    if not self._sizes_match(p, entry):
+                        # 与 checksum 损坏同样处理: 基础分片与增量一并删除, 免得重取落空时
+                        # 基础分片被当作旧格式回填、增量行静默丢失
+                        self._discard_shard(manifest, key, p, entry)
+                        missing.append((sym, ym))
+                    continue
+                if not p.exists() or self._load_shard(manifest, key, p) is None:
                     missing.append((sym, ym))
+        _save_manifest_quietly(manifest, lock=True)
         return missing
 
+    def is_validated(self, *, kind, symbols, start, end, source_version, schema,
+                     **extra_keys) -> bool:
+        """范围内清单有记录的分片是否都通过过 ``schema`` 校验(只查清单, 不读分片).
+
+        校验记录挂在分片清单条目上; 分片被重写/追加增量时条目随之替换, 记录自然失效。
+        """
+        manifest = self._manifest(self._base_dir(kind, source_version, extra_keys))
+        months = _months_between(pd.Timestamp(start), pd.Timestamp(end))
+        for sym in _unique(symbols):
+            for ym in months:
+                entry = manifest.get(self._manifest_key(sym, ym))
+                if entry is not None and schema not in entry.get("validated", ()):
+                    return False
+        return True
+
+    def mark_validated(self, *, kind, symbols, start, end, source_version, schema,
+                       **extra_keys) -> None:
+        """在清单里记录范围内分片已通过 ``schema`` 校验; 调用方保证整月都校验过.
+
+        清单写不进去(只读缓存)时静默跳过 —— 代价只是下次再校验一遍。
+        """
+        base = self._base_dir(kind, source_version, extra_keys)
+        if not base.exists():
+            return
+        manifest = self._manifest(base)
+        months = _months_between(pd.Timestamp(start), pd.Timestamp(end))
+        try:
+            with manifest.lock():
+                for sym in _unique(symbols):
+                    for ym in months:
+                        key = self._manifest_key(sym, ym)
+                        entry = manifest.get(key)
+                        if entry is not None and schema not in entry.get("validated", ()):
+                            validated = sorted({*entry.get("validated", ()), schema})
+                            manifest.set(key, {**entry, "validated": validated})
+                _save_manifest_quietly(manifest)
+        except OSError as ex:
+            logger.warning("校验记录写入失败(不影响本次读取): %s (%s)", base, ex)
+
+    def _inventory(self, kind: str | None = None, source_version: str | None = None,
+                   ) -> Iterator[tuple[str, str, dict[str, str], str, list[str]]]:
+        """遍历已落盘的分片: ``(kind, source_version, extra_keys, 月份, symbols)``.
+
+        按目录扫描(含无清单的旧分片), 供 :func:`convert_bar_store` 这类一次性操作用。
+        """
+        scope = _scope_root(self.root, kind, source_version)
+        if not scope.exists():
+            return
+        cells: dict[Path, dict[str, list[str]]] = {}
+        for p in scope.rglob("*.parquet"):
+            if _YM_STEM.match(p.stem):
+                cells.setdefault(p.parent.parent, {}).setdefault(p.stem, []).append(
+                    p.parent.name
+                )
+        for base in sorted(cells):
+            kind_, sv, extra = _parse_scope(self.root, base)
+            for ym in sorted(cells[base]):
+                yield kind_, sv, extra, ym, sorted(cells[base][ym])
+
+    def shard_stamps(self, *, kind, symbols, start, end, source_version,
+                     **extra_keys) -> dict[tuple[str, str], tuple | None]:
+        """各 (symbol, 月份) 分片的版本戳 ``(path, mtime_ns, size, 增量数)``; 未缓存为 None.
+
+        供 :class:`CachingShardedBarStore` 判断内存里的解码结果是否过期 ——
+        本进程或其他进程改写 / 追加 / 压实过分片, 戳都会变。只 stat, 不解码。
+        """
+        months = _months_between(pd.Timestamp(start), pd.Timestamp(end))
+        manifest = self._manifest(self._base_dir(kind, source_version, extra_keys))
+        out: dict[tuple[str, str], tuple | None] = {}
+        for sym in _unique(symbols):
+            for ym in months:
+                p = self._shard_path(kind, source_version, sym, ym, extra_keys)
+                entry = manifest.get(self._manifest_key(sym, ym)) or {}
+                try:
+                    st = p.stat()
+                except OSError:
+                    out[(sym, ym)] = None
+                    continue
+                out[(sym, ym)] = (str(p), st.st_mtime_ns, st.st_size,
+                                  len(entry.get("deltas") or []))
+        return out
+
+    @staticmethod
+    def _sizes_match(path: Path, entry: dict[str, Any]) -> bool:
+        """基础分片与各增量文件的大小是否与清单一致(只 stat, 不解码)."""
+        try:
+            if path.stat().st_size != entry.get("bytes"):
+                return False
+            return all(
+                (path.parent / rec["file"]).stat().st_size == rec.get("bytes")
+                for rec in entry.get("deltas") or []
+            )
+        except OSError:
+            return False
+
+    def shard_manifest(self, *, kind: str, source_version: str,
+                       **extra_keys: Any) -> pd.DataFrame:
+        """分片清单快照. index=(symbol, year_month), 列同清单条目字段.
+
+        symbol 为落盘时的文件名安全形式(见 ``_safe_segment``);
+        ``deltas`` 列为尚未压实的增量文件数, 其余字段描述基础分片。
+        """
+        manifest = self._manifest(self._base_dir(kind, source_version, extra_keys))
+        cols = ["rows", "min_date", "max_date", "bytes", "checksum", "written_at"]
+        keys = list(manifest.entries)
+        idx = pd.MultiIndex.from_tuples(
+            [tuple(k.split("/", 1)) for k in keys], names=["symbol", "year_month"],
+        ) if keys else pd.MultiIndex.from_arrays([[], []], names=["symbol", "year_month"])
+        out = pd.DataFrame([manifest.entries[k] for k in keys], columns=cols)
+        out["deltas"] = [len(manifest.entries[k].get("deltas") or []) for k in keys]
+        out.index = idx
+        return out.sort_index()
+
     def invalidate_range(self, *, kind, symbols=None, source_version=None, **extra_keys):
         base = self.root / _safe_segment(kind)
         if not base.exists():
@@ -346,12 +1014,685 @@ class ParquetShardedBarStore(ShardedBarStore):
             return
         # symbols 过滤：递归扫描 leaf 子目录
         if symbols is None:
-            # 整段删除
-            import shutil
+            # 整段删除(清单随目录一起删)
             shutil.rmtree(base, ignore_errors=True)
+            for cached in [b for b in self._manifests if b == base or base in b.parents]:
+                del self._manifests[cached]
             return
         sym_set = {_safe_segment(s) for s in symbols}
-        for path in base.rglob("*"):
+        for path in list(base.rglob("*")):
             if path.is_dir() and path.name in sym_set:
-                import shutil
                 shutil.rmtree(path, ignore_errors=True)
+        for mpath in base.rglob(_MANIFEST_NAME):
+            manifest = self._manifest(mpath.parent)
+            with manifest.lock():
+                for key in list(manifest.entries):
+                    if key.split("/", 1)[0] in sym_set:
+                        manifest.drop(key)
+                manifest.save()
+
+
+class PartitionedParquetBarStore(ShardedBarStore):
+    """K 线分区缓存（多标的 Parquet 数据集版）.
+
+    目录结构::
+
+        root/
+          {kind}/{source_version}/{extra=val}/.../_manifest.json
+          {kind}/{source_version}/{extra=val}/.../{YYYY-MM}.parquet
+
+    与 :class:`ParquetShardedBarStore` 的区别: 一个月份分区装**全部标的**,
+    行按 ``(symbol, date)`` 排序并按 ``row_group_size`` 切行组(带 min/max 统计)。
+    5000 标的 × 240 月从 ~120 万个小文件降到 240 个; :meth:`get_range` 是一次
+    pyarrow dataset 扫描, ``symbol`` / 日期谓词下推到行组统计, 只解码命中的行组。
+
+    清单条目按月份记账(字段同 :class:`ParquetShardedBarStore`, 另加 ``symbols``),
+    :meth:`missing_ranges` 同样只查清单 + stat。分区读取走谓词下推、不读全文件,
+    故不做整文件 checksum; 解码失败的分区从清单剔除, 下次判为缺失并重取。
+
+    不要与 :class:`ParquetShardedBarStore` 共用同一个 ``root``。
+    """
+
+    _SUFFIX = ".parquet"
+
+    def __init__(self, root: str | Path, row_group_size: int = 8192) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.row_group_size = row_group_size
+        self._manifests: dict[Path, _ShardManifest] = {}
+        # (分区目录, 月份) → (checksum, 标的集合); checksum 变了即重建
+        self._symbol_sets: dict[tuple[Path, str], tuple[str | None, frozenset[str]]] = {}
+
+    def _base_dir(self, kind: str, source_version: str, extra: dict[str, Any]) -> Path:
+        path = self.root / _safe_segment(kind) / _safe_segment(source_version)
+        for k in sorted(extra):
+            path = path / f"{_safe_segment(k)}={_safe_segment(extra[k])}"
+        return path
+
+    def _manifest(self, base: Path) -> _ShardManifest:
+        m = self._manifests.get(base)
+        if m is None:
+            m = _ShardManifest(base)
+            self._manifests[base] = m
+        else:
+            m.refresh()
+        return m
+
+    def _partition_symbols(self, base: Path, ym: str, entry: dict[str, Any]) -> frozenset[str]:
+        """分区内的标的集合(按 checksum 记忆, 避免每次从 list 重建 set)."""
+        checksum = entry.get("checksum")
+        cached = self._symbol_sets.get((base, ym))
+        if cached is None or cached[0] != checksum:
+            cached = (checksum, frozenset(entry.get("symbols", ())))
+            self._symbol_sets[(base, ym)] = cached
+        return cached[1]
+
+    def _read_partition(self, path: Path) -> pd.DataFrame | None:
+        """整读一个分区(写入合并 / 旧分区回填用); 损坏返回 None."""
+        try:
+            return pd.read_parquet(path)
+        except Exception:  # noqa: BLE001 - 任何读失败都当作分区不可用
+            logger.warning("分区损坏, 已忽略并将从远程重取: %s", path)
+            return None
+
+    def _write_partition(self, path: Path, df: pd.DataFrame) -> dict[str, Any]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        ordered = df.sort_index(level=[1, 0])
+        table = pa.Table.from_pandas(ordered, preserve_index=True)
+        buf = io.BytesIO()
+        pq.write_table(
+            table, buf, row_group_size=self.row_group_size, write_statistics=True,
+        )
+        payload = buf.getvalue()
+        _atomic_write_bytes(path, payload)
+        record = _shard_record(ordered, payload)
+        record["symbols"] = sorted({str(s) for s in ordered.index.get_level_values(1)})
+        return record
+
+    def get_range(self, *, kind, symbols, start, end, source_version, columns=None,
+                  **extra_keys):
+        """一次 dataset 扫描读取 [start, end] × symbols.
+
+        ``columns`` 投影下推到扫描(索引列总会带上); 扫描本身由 pyarrow 多线程执行。
+        """
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end)
+        symbols = _unique(symbols)
+        base = self._base_dir(kind, source_version, extra_keys)
+        manifest = self._manifest(base)
+        paths = [
+            base / f"{ym}{self._SUFFIX}" for ym in _months_between(start, end)
+            if manifest.get(ym) is not None or (base / f"{ym}{self._SUFFIX}").exists()
+        ]
+        if not symbols or not paths:
+            return pd.DataFrame()
+        try:
+            df = self._scan(paths, symbols, start, _inclusive_end(end), columns)
+        except Exception:  # noqa: BLE001 - 有坏分区: 逐个扫描, 隔离坏的那个
+            parts = []
+            for p in paths:
+                try:
+                    parts.append(
+                        self._scan([p], symbols, start, _inclusive_end(end), columns)
+                    )
+                except Exception:  # noqa: BLE001
+                    logger.warning("分区损坏, 已忽略并将从远程重取: %s", p)
+                    manifest.drop(p.stem)
+            _save_manifest_quietly(manifest)
+            parts = [p for p in parts if not p.empty]
+            df = pd.concat(parts) if parts else pd.DataFrame()
+        if df.empty:
+            return pd.DataFrame()
+        return df.sort_index()
+
+    def _scan(self, paths: list[Path], symbols: list[str], start: pd.Timestamp,
+              end: pd.Timestamp, columns: list[str] | None = None) -> pd.DataFrame:
+        """一次 dataset 扫描; symbol / 日期谓词下推到行组统计."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset([str(p) for p in paths], format="parquet")
+        index_cols = (dataset.schema.pandas_metadata or {}).get("index_columns", [])
+        if len(index_cols) < 2:
+            raise ValueError(f"分区缺少 (date, symbol) 索引列: {paths}")
+        date_col, sym_col = index_cols[0], index_cols[1]
+        date_type = dataset.schema.field(date_col).type
+        lo = pa.scalar(start.to_datetime64()).cast(date_type, safe=False)
+        hi = pa.scalar(end.to_datetime64()).cast(date_type, safe=False)
+        expr = (
+            pc.field(sym_col).isin(symbols)
+            & (pc.field(date_col) >= lo)
+            & (pc.field(date_col) <= hi)
+        )
+        if columns is not None:
+            names = set(dataset.schema.names)
+            columns = index_cols + [c for c in columns if c in names and c not in index_cols]
+        return dataset.to_table(filter=expr, columns=columns).to_pandas()
+
+    def put_range(self, df, *, kind, source_version, **extra_keys):
+        """按月份分区写入: 读旧分区 → 合并(后写覆盖) → 按 (symbol, date) 排序重写.
+
+        Raises:
+            OSError: 缓存目录不可写(同 :meth:`ParquetShardedBarStore.put_range`)。
+        """
+        if df is None or df.empty:
+            return
+        if not isinstance(df.index, pd.MultiIndex) or len(df.index.names) < 2:
+            raise ValueError("put_range expects MultiIndex(date|timestamp, symbol)")
+        base = self._base_dir(kind, source_version, extra_keys)
+        manifest = self._manifest(base)
+        ym_lvl = _series_year_month(pd.DatetimeIndex(df.index.get_level_values(0)))
+        target = base
+        try:
+            base.mkdir(parents=True, exist_ok=True)
+            # 读-合并-重写整月分区: 持清单锁, 并发写同一月份不会互相覆盖行
+            with manifest.lock():
+                for ym, part in df.groupby(ym_lvl, sort=False):
+                    p = base / f"{ym}{self._SUFFIX}"
+                    target = p
+                    existing = self._read_partition(p) if p.exists() else None
+                    if existing is not None and not existing.empty:
+                        merged = pd.concat([existing, part])
+                        merged = merged[~merged.index.duplicated(keep="last")]
+                    else:
+                        merged = part[~part.index.duplicated(keep="last")]
+                    manifest.set(str(ym), self._write_partition(p, merged))
+                target = manifest.path
+                manifest.save()
+        except OSError as ex:
+            raise OSError(
+                f"分区缓存写入失败: {target}\n"
+                f"  原因: {type(ex).__name__}: {ex}\n"
+                f"  常见成因: 缓存根目录({self.root})不可写 / 只读挂载 / 磁盘已满。\n"
+                "  出路: 换一个可写的目录, 或改用 InMemoryShardedBarStore(不落盘)。"
+            ) from ex
+
+    def missing_ranges(self, *, kind, symbols, start, end, source_version, **extra_keys):
+        """列出缺失的 (symbol, 月份)。只查清单 + 每个分区一次 stat, 不解码.
+
+        分区文件大小与清单不符(截断/被改写)→ 整个分区判缺失。
+        不在清单里的分区(写完分区、清单尚未落盘时被打断)只读 symbol 列回填。
+        """
+        base = self._base_dir(kind, source_version, extra_keys)
+        manifest = self._manifest(base)
+        months = _months_between(pd.Timestamp(start), pd.Timestamp(end))
+        present: dict[str, frozenset[str]] = {}
+        for ym in months:
+            p = base / f"{ym}{self._SUFFIX}"
+            entry = manifest.get(ym)
+            if entry is not None:
+                try:
+                    intact = p.stat().st_size == entry.get("bytes")
+                except OSError:
+                    intact = False
+                if not intact:
+                    manifest.drop(ym)
+                    entry = None
+            elif p.exists():
+                entry = self._backfill(manifest, ym, p)
+            present[ym] = (
+                frozenset() if entry is None else self._partition_symbols(base, ym, entry)
+            )
+        _save_manifest_quietly(manifest)
+        return [
+            (sym, ym) for sym in _unique(symbols) for ym in months if sym not in present[ym]
+        ]
+
+    def _backfill(self, manifest: _ShardManifest, ym: str, path: Path) -> dict[str, Any] | None:
+        df = self._read_partition(path)
+        if df is None or not isinstance(df.index, pd.MultiIndex):
+            return None
+        payload = path.read_bytes()
+        record = _shard_record(df, payload)
+        record["symbols"] = sorted({str(s) for s in df.index.get_level_values(1)})
+        manifest.set(ym, record)
+        return record
+
+    def is_validated(self, *, kind, symbols, start, end, source_version, schema,
+                     **extra_keys) -> bool:
+        """范围内分区里请求到的标的是否都通过过 ``schema`` 校验(只查清单).
+
+        分区条目记 ``validated = {schema: [symbols]}``; 分区重写时条目替换, 记录失效。
+        """
+        manifest = self._manifest(self._base_dir(kind, source_version, extra_keys))
+        wanted = set(_unique(symbols))
+        for ym in _months_between(pd.Timestamp(start), pd.Timestamp(end)):
+            entry = manifest.get(ym)
+            if entry is None:
+                continue
+            done = set((entry.get("validated") or {}).get(schema, ()))
+            if not (wanted & set(entry.get("symbols", ()))) <= done:
+                return False
+        return True
+
+    def mark_validated(self, *, kind, symbols, start, end, source_version, schema,
+                       **extra_keys) -> None:
+        """在分区清单里记录这些标的已通过 ``schema`` 校验; 调用方保证整月都校验过."""
+        base = self._base_dir(kind, source_version, extra_keys)
+        if not base.exists():
+            return
+        manifest = self._manifest(base)
+        wanted = set(_unique(symbols))
+        for ym in _months_between(pd.Timestamp(start), pd.Timestamp(end)):
+            entry = manifest.get(ym)
+            if entry is None:
+                continue
+            validated = dict(entry.get("validated") or {})
+            done = set(validated.get(schema, ()))
+            new = (wanted & set(entry.get("symbols", ()))) | done
+            if new != done:
+                validated[schema] = sorted(new)
+                manifest.set(ym, {**entry, "validated": validated})
+        if manifest.dirty:
+            _save_manifest_quietly(manifest)
+
+    def _inventory(self, kind: str | None = None, source_version: str | None = None,
+                   ) -> Iterator[tuple[str, str, dict[str, str], str, list[str]]]:
+        """遍历已落盘的分区: ``(kind, source_version, extra_keys, 月份, symbols)``."""
+        scope = _scope_root(self.root, kind, source_version)
+        if not scope.exists():
+            return
+        parts = sorted(
+            p for p in scope.rglob(f"*{self._SUFFIX}") if _YM_STEM.match(p.stem)
+        )
+        for p in parts:
+            manifest = self._manifest(p.parent)
+            entry = manifest.get(p.stem) or self._backfill(manifest, p.stem, p)
+            if entry is None:
+                continue
+            kind_, sv, extra = _parse_scope(self.root, p.parent)
+            yield kind_, sv, extra, p.stem, list(entry.get("symbols", []))
+        for base in {p.parent for p in parts}:
+            _save_manifest_quietly(self._manifest(base))
+
+    def shard_stamps(self, *, kind, symbols, start, end, source_version,
+                     **extra_keys) -> dict[tuple[str, str], tuple | None]:
+        """各 (symbol, 月份) 的版本戳 ``(分区 path, mtime_ns, size)``; 同月标的共享一个戳."""
+        base = self._base_dir(kind, source_version, extra_keys)
+        out: dict[tuple[str, str], tuple | None] = {}
+        for ym in _months_between(pd.Timestamp(start), pd.Timestamp(end)):
+            p = base / f"{ym}{self._SUFFIX}"
+            try:
+                st = p.stat()
+                stamp: tuple | None = (str(p), st.st_mtime_ns, st.st_size)
+            except OSError:
+                stamp = None
+            for sym in _unique(symbols):
+                out[(sym, ym)] = stamp
+        return out
+
+    def shard_manifest(self, *, kind: str, source_version: str,
+                       **extra_keys: Any) -> pd.DataFrame:
+        """分区清单快照. index=year_month, 列同清单条目字段(含 ``symbols``)."""
+        manifest = self._manifest(self._base_dir(kind, source_version, extra_keys))
+        cols = ["rows", "min_date", "max_date", "bytes", "checksum", "written_at", "symbols"]
+        keys = sorted(manifest.entries)
+        out = pd.DataFrame([manifest.entries[k] for k in keys], columns=cols)
+        out.index = pd.Index(keys, name="year_month")
+        return out
+
+    def invalidate_range(self, *, kind, symbols=None, source_version=None, **extra_keys):
+        base = self.root / _safe_segment(kind)
+        if source_version is not None:
+            base = base / _safe_segment(source_version)
+        if not base.exists():
+            return
+        if symbols is None:
+            shutil.rmtree(base, ignore_errors=True)
+            for cached in [b for b in self._manifests if b == base or base in b.parents]:
+                del self._manifests[cached]
+            return
+        # 按标的失效: 重写受影响的分区, 剔除这些标的的行
+        drop = {str(s) for s in symbols}
+        for mpath in list(base.rglob(_MANIFEST_NAME)):
+            manifest = self._manifest(mpath.parent)
+            with manifest.lock():
+                for ym in sorted(manifest.entries):
+                    if not drop.intersection(manifest.entries[ym].get("symbols", ())):
+                        continue
+                    p = mpath.parent / f"{ym}{self._SUFFIX}"
+                    df = self._read_partition(p) if p.exists() else None
+                    if df is None:
+                        manifest.drop(ym)
+                        continue
+                    keep = df[~df.index.get_level_values(1).isin(drop)]
+                    if keep.empty:
+                        p.unlink(missing_ok=True)
+                        manifest.drop(ym)
+                    else:
+                        manifest.set(ym, self._write_partition(p, keep))
+                manifest.save()
+
+
+class ArrowIpcBarStore(PartitionedParquetBarStore):
+    """K 线分区缓存（Arrow IPC / Feather v2, 内存映射读取版）.
+
+    目录与清单同 :class:`PartitionedParquetBarStore`(一个月份一个多标的分区),
+    文件为 ``{YYYY-MM}.arrow``。读取走 ``pa.memory_map``:
+
+    - 未压缩(默认)时 Arrow 缓冲区直接指向页缓存, 多个研究进程读同一批文件
+      共享内存, 不经过 Parquet 解码;
+    - 行按 ``(symbol, date)`` 排序, 每个标的的行区间记在文件 schema 元数据里,
+      取某些标的 = 零拷贝 ``slice``, 日期边界在切片内二分;
+    - 列投影在转 pandas 之前完成, 只有被选中的列会物化成 DataFrame。
+
+    ``compression="lz4"`` 换更小的文件, 代价是读时解压(不再零拷贝)。
+    与 Parquet 后端可互转, 见 :func:`convert_bar_store`。
+    """
+
+    _SUFFIX = ".arrow"
+    _SYMBOL_INDEX_KEY = b"qlab_symbol_index"
+
+    def __init__(self, root: str | Path,
+                 compression: Literal["lz4", "zstd"] | None = None) -> None:
+        super().__init__(root)
+        self.compression = compression
+
+    def _open(self, path: Path):
+        import pyarrow as pa
+
+        return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+    def _read_partition(self, path: Path) -> pd.DataFrame | None:
+        try:
+            return self._open(path).to_pandas()
+        except Exception:  # noqa: BLE001 - 任何读失败都当作分区不可用
+            logger.warning("分区损坏, 已忽略并将从远程重取: %s", path)
+            return None
+
+    def _write_partition(self, path: Path, df: pd.DataFrame) -> dict[str, Any]:
+        import pyarrow as pa
+
+        ordered = df.sort_index(level=[1, 0])
+        sym_lvl = ordered.index.get_level_values(1).astype(str)
+        codes, uniques = pd.factorize(sym_lvl, sort=False)
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        lengths = np.diff(np.r_[starts, len(codes)])
+        sym_index = {
+            str(uniques[codes[i]]): [int(i), int(n)] for i, n in zip(starts, lengths, strict=True)
+        }
+        table = pa.Table.from_pandas(ordered, preserve_index=True)
+        meta = dict(table.schema.metadata or {})
+        meta[self._SYMBOL_INDEX_KEY] = json.dumps(sym_index).encode("utf-8")
+        table = table.replace_schema_metadata(meta)
+        sink = pa.BufferOutputStream()
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        payload = sink.getvalue().to_pybytes()
+        _atomic_write_bytes(path, payload)
+        record = _shard_record(ordered, payload)
+        record["symbols"] = sorted(sym_index)
+        return record
+
+    def _scan(self, paths: list[Path], symbols: list[str], start: pd.Timestamp,
+              end: pd.Timestamp, columns: list[str] | None = None) -> pd.DataFrame:
+        """按标的行区间零拷贝切片 + 切片内二分日期边界, 最后一次性转 pandas."""
+        import pyarrow as pa
+
+        slices = []
+        for p in paths:
+            table = self._open(p)
+            meta = table.schema.metadata or {}
+            index_cols = json.loads(meta[b"pandas"]).get("index_columns", [])
+            sym_index = json.loads(meta[self._SYMBOL_INDEX_KEY])
+            if columns is not None:
+                keep = index_cols + [c for c in columns
+                                     if c in table.schema.names and c not in index_cols]
+                table = table.select(keep)
+            for sym in symbols:
+                span = sym_index.get(sym)
+                if span is None:
+                    continue
+                part = table.slice(span[0], span[1])
+                dates = part.column(index_cols[0]).to_numpy()
+                lo = np.searchsorted(dates, start.to_datetime64().astype(dates.dtype), "left")
+                hi = np.searchsorted(dates, end.to_datetime64().astype(dates.dtype), "right")
+                if hi > lo:
+                    slices.append(part.slice(lo, hi - lo))
+        if not slices:
+            return pd.DataFrame()
+        return pa.concat_tables(slices).to_pandas()
+
+
+def convert_bar_store(src: ShardedBarStore, dst: ShardedBarStore, *,
+                      kind: str | None = None, source_version: str | None = None) -> int:
+    """把 ``src`` 的已缓存 K 线逐月搬到 ``dst``, 返回搬运行数.
+
+    用于 Parquet 分片 / 分区 与 Arrow IPC 后端互转(``qlab store convert``)。
+    ``src`` 需是落盘后端(能枚举已缓存内容); ``dst`` 任意 :class:`ShardedBarStore`。
+    ``kind`` / ``source_version`` 收窄搬运范围。
+    """
+    inventory = getattr(src, "_inventory", None)
+    if not callable(inventory):
+        raise TypeError(f"{type(src).__name__} 无法枚举已缓存内容, 不能作为转换源")
+    rows = 0
+    for kind_, sv, extra, ym, symbols in inventory(kind, source_version):
+        month = pd.Period(ym, freq="M")
+        df = src.get_range(
+            kind=kind_, symbols=symbols, start=month.start_time,
+            end=month.end_time.normalize(), source_version=sv, **extra,
+        )
+        if df.empty:
+            continue
+        dst.put_range(df, kind=kind_, source_version=sv, **extra)
+        rows += len(df)
+    return rows
+
+
+class CachingShardedBarStore(ShardedBarStore):
+    """进程内 LRU 缓存包装: 把解码后的 (symbol, 月份) 分片留在内存里.
+
+    同一次 ``build_feature_matrix`` 中每个特征各自 ``ctx.daily(...)``, 没有这层
+    时相同分片会被每个特征从磁盘重新读一遍。
+
+    - 缓存单元为 ``(kind, source_version, extra_keys, symbol, 月份)``, 记录已解码
+      的列; 列投影请求只补读缺的列。
+    - 每个单元带底层 store 的版本戳(``shard_stamps``, 即分片 path + mtime);
+      戳变了(其他进程改写 / 追加 / 压实)视为过期。底层没有 ``shard_stamps``
+      时只靠本包装的 :meth:`put_range` / :meth:`invalidate_range` 失效。
+    - 一次请求的未命中单元按 :func:`~qlab.data.fetch_plan.plan_fetches` 拆成至多
+      ``max_reads`` 个矩形读取底层 store。
+    - 总字节数(``DataFrame.memory_usage(deep=True)``)超过 ``max_bytes`` 时按
+      最久未用淘汰; :meth:`stats` 给出命中 / 淘汰统计。
+
+    其余方法(``compact`` / ``shard_manifest`` 等)透传给底层 store。
+    """
+
+    def __init__(self, inner: ShardedBarStore, max_bytes: int = 1 << 30,
+                 max_reads: int = 8) -> None:
+        self.inner = inner
+        self.max_bytes = max_bytes
+        self.max_reads = max_reads
+        self._cells: OrderedDict[tuple, _CachedCell] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "evicted_bytes": 0}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+    @staticmethod
+    def _scope(kind: str, source_version: str, extra: dict[str, Any]) -> tuple:
+        return (kind, source_version, tuple(sorted((k, str(v)) for k, v in extra.items())))
+
+    def _stamps(self, **kwargs: Any) -> dict[tuple[str, str], tuple | None]:
+        fn = getattr(self.inner, "shard_stamps", None)
+        return fn(**kwargs) if callable(fn) else {}
+
+    def get_range(self, *, kind, symbols, start, end, source_version, columns=None,
+                  **extra_keys):
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end)
+        symbols = _unique(symbols)
+        months = _months_between(start, end)
+        scope = self._scope(kind, source_version, extra_keys)
+        stamps = self._stamps(kind=kind, symbols=symbols, start=start, end=end,
+                              source_version=source_version, **extra_keys)
+        want = None if columns is None else set(columns)
+
+        cells: dict[tuple[str, str], _CachedCell] = {}
+        miss: list[tuple[str, str]] = []
+        with self._lock:
+            for sym in symbols:
+                for ym in months:
+                    cell = self._cells.get((*scope, sym, ym))
+                    if cell is not None and cell.covers(want, stamps.get((sym, ym))):
+                        self._cells.move_to_end((*scope, sym, ym))
+                        cells[(sym, ym)] = cell
+                        self._stats["hits"] += 1
+                    else:
+                        miss.append((sym, ym))
+                        self._stats["misses"] += 1
+        if miss:
+            cells.update(self._fill(scope, miss, stamps, columns, kind=kind,
+                                    source_version=source_version, **extra_keys))
+
+        parts = [
+            _project(cells[(sym, ym)].frame, columns)
+            for sym in symbols for ym in months if not cells[(sym, ym)].frame.empty
+        ]
+        if not parts:
+            return pd.DataFrame()
+        df = pd.concat(parts).sort_index()
+        if isinstance(df.index, pd.MultiIndex):
+            date_lvl = pd.DatetimeIndex(df.index.get_level_values(0))
+            df = df.loc[(date_lvl >= start) & (date_lvl <= _inclusive_end(end))]
+        return df
+
+    def _fill(self, scope: tuple, miss: list[tuple[str, str]],
+              stamps: dict[tuple[str, str], tuple | None], columns: list[str] | None,
+              *, kind: str, source_version: str, **extra_keys: Any,
+              ) -> dict[tuple[str, str], _CachedCell]:
+        """未命中单元按 :func:`plan_fetches` 拼成至多 ``max_reads`` 个矩形, 每个矩形一次
+        底层读取, 再切回单元 —— 全体标的的当月 + 一只新标的的十年不会并成十年全宇宙。
+
+        投影请求只读矩形内各单元都还没有的列(同版本旧单元已读过的列不重读), 与旧列合并。
+        """
+        wanted = set(miss)
+        out: dict[tuple[str, str], _CachedCell] = {}
+        for rect in plan_fetches(miss, self.max_reads):
+            cells = [(sym, ym) for sym in rect.symbols for ym in _months_between(
+                rect.start, rect.end) if (sym, ym) in wanted]
+            read_cols = columns
+            if columns is not None:
+                with self._lock:
+                    have: set[str] | None = None
+                    for sym, ym in cells:
+                        old = self._cells.get((*scope, sym, ym))
+                        if (old is None or old.loaded is None
+                                or old.stamp != stamps.get((sym, ym))):
+                            have = set()
+                            break
+                        have = set(old.loaded) if have is None else have & old.loaded
+                read_cols = [c for c in columns if c not in (have or ())] or columns
+            got = self.inner.get_range(
+                kind=kind, symbols=list(rect.symbols), start=rect.start, end=rect.end,
+                source_version=source_version, columns=read_cols, **extra_keys,
+            )
+            pieces: dict[tuple[str, str], pd.DataFrame] = {}
+            if not got.empty and isinstance(got.index, pd.MultiIndex):
+                ym_lvl = _series_year_month(pd.DatetimeIndex(got.index.get_level_values(0)))
+                for (sym, ym), part in got.groupby([got.index.get_level_values(1), ym_lvl],
+                                                   sort=False):
+                    pieces[(str(sym), str(ym))] = part
+            empty = got.iloc[0:0] if isinstance(got.index, pd.MultiIndex) else pd.DataFrame()
+
+            with self._lock:
+                for sym, ym in cells:
+                    key = (*scope, sym, ym)
+                    stamp = stamps.get((sym, ym))
+                    frame = pieces.get((sym, ym), empty)
+                    old = self._cells.pop(key, None)
+                    if old is not None:
+                        self._bytes -= old.nbytes
+                    cell = _CachedCell.build(frame, read_cols, stamp, old)
+                    self._cells[key] = cell
+                    self._bytes += cell.nbytes
+                    out[(sym, ym)] = cell
+                self._evict()
+        return out
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._cells:
+            _, cell = self._cells.popitem(last=False)
+            self._bytes -= cell.nbytes
+            self._stats["evictions"] += 1
+            self._stats["evicted_bytes"] += cell.nbytes
+
+    def _drop(self, match) -> None:
+        with self._lock:
+            for key in [k for k in self._cells if match(k)]:
+                self._bytes -= self._cells.pop(key).nbytes
+
+    def put_range(self, df, *, kind, source_version, **extra_keys):
+        self.inner.put_range(df, kind=kind, source_version=source_version, **extra_keys)
+        if df is None or df.empty:
+            return
+        scope = self._scope(kind, source_version, extra_keys)
+        ym_lvl = _series_year_month(pd.DatetimeIndex(df.index.get_level_values(0)))
+        touched = {(*scope, str(s), str(ym))
+                   for s, ym in zip(df.index.get_level_values(1), ym_lvl, strict=True)}
+        self._drop(lambda k: k in touched)
+
+    def missing_ranges(self, *, kind, symbols, start, end, source_version, **extra_keys):
+        return self.inner.missing_ranges(
+            kind=kind, symbols=symbols, start=start, end=end,
+            source_version=source_version, **extra_keys,
+        )
+
+    def invalidate_range(self, *, kind, symbols=None, source_version=None, **extra_keys):
+        self.inner.invalidate_range(
+            kind=kind, symbols=symbols, source_version=source_version, **extra_keys,
+        )
+        sym_set = None if symbols is None else set(symbols)
+        self._drop(lambda k: k[0] == kind
+                   and (source_version is None or k[1] == source_version)
+                   and (sym_set is None or k[3] in sym_set))
+
+    def clear(self) -> None:
+        """清空内存缓存(不动底层 store)."""
+        self._drop(lambda k: True)
+
+    def stats(self) -> dict[str, int]:
+        """命中 / 未命中(按单元计) / 淘汰次数与字节 / 当前单元数与字节."""
+        with self._lock:
+            return {**self._stats, "entries": len(self._cells), "bytes": self._bytes}
+
+
+class _CachedCell:
+    """一个 (symbol, 月份) 缓存单元: 已解码的帧 + 已读过的列 + 版本戳."""
+
+    __slots__ = ("frame", "loaded", "stamp", "nbytes")
+
+    def __init__(self, frame: pd.DataFrame, loaded: frozenset[str] | None,
+                 stamp: tuple | None) -> None:
+        self.frame = frame
+        self.loaded = loaded  # None = 全部列都已读过
+        self.stamp = stamp
+        self.nbytes = int(frame.memory_usage(deep=True).sum()) if len(frame.columns) else 0
+
+    def covers(self, want: set[str] | None, stamp: tuple | None) -> bool:
+        if stamp != self.stamp:
+            return False
+        if self.loaded is None:
+            return True
+        return want is not None and want <= self.loaded
+
+    @classmethod
+    def build(cls, frame: pd.DataFrame, columns: list[str] | None, stamp: tuple | None,
+              old: _CachedCell | None) -> _CachedCell:
+        """新读到的列与同版本旧单元的列合并, 避免投影请求互相顶掉."""
+        if columns is None:
+            return cls(frame, None, stamp)
+        loaded = frozenset(columns)
+        if old is not None and old.stamp == stamp and old.loaded is not None:
+            extra = [c for c in old.frame.columns if c not in frame.columns]
+            if extra:
+                frame = frame.join(old.frame[extra], how="outer") if not frame.empty \
+                    else old.frame[extra]
+            loaded = loaded | old.loaded
+        return cls(frame, loaded, stamp)
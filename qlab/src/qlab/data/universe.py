@@ -129,7 +129,9 @@ def parse_broad_universe(spec: str) -> tuple[bool, bool] | None:
 class Universe:
     """PIT 成分股查询.
 
-    底层存储是 DataFrame，但对外暴露按日查询的语义。
+    底层存储是 DataFrame，但对外暴露按日查询的语义。构造时一次性编码成
+    日期序号 × 标的编码 的 bool 成员矩阵(权重为并行的 float32 矩阵), 按日查询、
+    整段掩码、求交都是数组下标运算, 不再对 MultiIndex 做 ``xs``。
     """
 
     def __init__(self, df: pd.DataFrame, spec: UniverseSpec):
@@ -144,6 +146,21 @@ class Universe:
         self._df = df.sort_index()
         self._spec = spec
 
+        date_codes, dates = pd.factorize(
+            pd.DatetimeIndex(self._df.index.get_level_values("date")), sort=True)
+        sym_codes, symbols = pd.factorize(self._df.index.get_level_values("symbol"), sort=True)
+        self._dates = pd.DatetimeIndex(dates, name="date")
+        self._symbols = pd.Index(symbols, name="symbol")
+        self._rows = (date_codes, sym_codes)
+        shape = (len(self._dates), len(self._symbols))
+        self._member = np.zeros(shape, dtype=bool)
+        self._member[date_codes, sym_codes] = \
+            self._df["in_universe"].fillna(False).to_numpy(dtype=bool)
+        self._weight = np.full(shape, np.nan, dtype=np.float32)
+        if "weight" in self._df.columns:
+            self._weight[date_codes, sym_codes] = pd.to_numeric(self._df["weight"]) \
+                .to_numpy(dtype=np.float32, na_value=np.nan)
+
     @property
     def spec(self) -> UniverseSpec:
         return self._spec
@@ -152,36 +169,54 @@ class Universe:
     def name(self) -> str:
         return self._spec.name
 
+    def _date_row(self, date: pd.Timestamp) -> int:
+        """日期 → 矩阵行号; 不在宇宙日期内返回 -1."""
+        return int(self._dates.get_indexer([pd.Timestamp(date).normalize()])[0])
+
     def members(self, date: pd.Timestamp) -> list[str]:
         """返回某日的成分股代码列表."""
-        date = pd.Timestamp(date).normalize()
-        try:
-            sub = self._df.xs(date, level="date")
-        except KeyError:
+        row = self._date_row(date)
+        if row < 0:
             return []
-        return sub[sub["in_universe"]].index.tolist()
+        return self._symbols[self._member[row]].tolist()
 
     def weights(self, date: pd.Timestamp) -> pd.Series:
-        """返回某日的成分股权重（指数 universe 有效）."""
-        date = pd.Timestamp(date).normalize()
-        try:
-            sub = self._df.xs(date, level="date")
-        except KeyError:
+        """返回某日的成分股权重（指数 universe 有效; 按 float32 存储）."""
+        row = self._date_row(date)
+        if row < 0:
             return pd.Series(dtype=float)
-        return sub.loc[sub["in_universe"], "weight"].dropna()
+        w = self._weight[row]
+        keep = self._member[row] & ~np.isnan(w)
+        return pd.Series(w[keep].astype(np.float64), index=self._symbols[keep], name="weight")
 
     def is_member(self, date: pd.Timestamp, symbol: str) -> bool:
         """某日某股票是否在 universe 内."""
-        return symbol in self.members(date)
+        row = self._date_row(date)
+        col = self._symbols.get_indexer([symbol])[0]
+        return bool(row >= 0 and col >= 0 and self._member[row, col])
+
+    def members_panel(self) -> pd.DataFrame:
+        """成员矩阵宽表(index=date, columns=symbol, bool), 与内部矩阵共享内存(只读)."""
+        view = self._member.view()
+        view.flags.writeable = False
+        return pd.DataFrame(view, index=self._dates, columns=self._symbols, copy=False)
+
+    def mask_for(self, index: pd.MultiIndex) -> pd.Series:
+        """任意 MultiIndex(date, symbol) 上的成员掩码; 宇宙外的日期/标的为 False."""
+        rows = self._dates.get_indexer(
+            pd.DatetimeIndex(index.get_level_values(0)).normalize())
+        cols = self._symbols.get_indexer(index.get_level_values(1))
+        ok = (rows >= 0) & (cols >= 0)
+        out = np.zeros(len(index), dtype=bool)
+        out[ok] = self._member[rows[ok], cols[ok]]
+        return pd.Series(out, index=index, name="in_universe")
 
     def date_range(self) -> tuple[pd.Timestamp, pd.Timestamp]:
-        dates = self._df.index.get_level_values("date").unique()
-        return dates.min(), dates.max()
+        return self._dates.min(), self._dates.max()
 
     def all_symbols(self) -> list[str]:
         """所有曾出现过的成分股. 用于上游数据拉取."""
-        symbols = self._df.index.get_level_values("symbol").unique()
-        return sorted(symbols.tolist())
+        return self._symbols.tolist()
 
     def as_dataframe(self) -> pd.DataFrame:
         """返回完整 DataFrame 副本（不希望被修改）."""
@@ -197,14 +232,22 @@ class Universe:
         """
         if not isinstance(mask.index, pd.MultiIndex):
             raise UniverseError("mask 必须是 MultiIndex(date, symbol)")
-        m = mask.reindex(self._df.index).fillna(False).astype(bool)
-        keep = self._df["in_universe"].astype(bool) & m
+        # mask 落到成员矩阵的网格上(不 reindex MultiIndex), 再按行编码取回
+        rows = self._dates.get_indexer(pd.DatetimeIndex(mask.index.get_level_values(0)))
+        cols = self._symbols.get_indexer(mask.index.get_level_values(1))
+        ok = (rows >= 0) & (cols >= 0)
+        grid = np.zeros(self._member.shape, dtype=bool)
+        grid[rows[ok], cols[ok]] = mask.fillna(False).to_numpy(dtype=bool)[ok]
+        date_codes, sym_codes = self._rows
+        keep = self._member[date_codes, sym_codes] & grid[date_codes, sym_codes]
         out = self._df.copy()
         out["in_universe"] = keep
         if "weight" in out.columns:
-            w = out["weight"].where(keep)
-            sums = w.groupby(level="date").transform("sum")
-            out["weight"] = w / sums.replace(0, np.nan)
+            w = pd.to_numeric(out["weight"]).to_numpy(dtype=np.float64, na_value=np.nan)
+            w = np.where(keep, w, np.nan)
+            sums = np.bincount(date_codes, weights=np.nan_to_num(w), minlength=len(self._dates))
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out["weight"] = w / np.where(sums == 0, np.nan, sums)[date_codes]
         suffix = name_suffix or "|filtered"
         new_spec = UniverseSpec(f"{self._spec.name}{suffix}")
         return Universe(out, new_spec)
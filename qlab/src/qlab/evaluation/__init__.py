@@ -7,20 +7,24 @@
 - trial_registry  实验追踪表（DSR 数据基础）
 """
 
-from qlab.evaluation.backtest.cpcv import CombinatorialPurgedCV
-from qlab.evaluation.backtest.walk_forward import walk_forward_backtest
-from qlab.evaluation.pbo import PBOResult, compute_pbo
-from qlab.evaluation.risk.strategy_risk import implied_precision, prob_strategy_failure
-from qlab.evaluation.statistics.classification import classification_scores
-from qlab.evaluation.statistics.drawdown import compute_dd_tuw
-from qlab.evaluation.statistics.runs import returns_hhi
-from qlab.evaluation.statistics.sharpe import (
-    annualized_sharpe,
-    deflated_sharpe_ratio,
-    probabilistic_sharpe_ratio,
-    sharpe_ratio,
-)
-from qlab.evaluation.trial_registry import TrialRegistry
+from qlab._lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "qlab.evaluation.backtest.cpcv": ["CombinatorialPurgedCV"],
+    "qlab.evaluation.backtest.walk_forward": ["walk_forward_backtest"],
+    "qlab.evaluation.pbo": ["PBOResult", "compute_pbo"],
+    "qlab.evaluation.risk.strategy_risk": ["implied_precision", "prob_strategy_failure"],
+    "qlab.evaluation.statistics.classification": ["classification_scores"],
+    "qlab.evaluation.statistics.drawdown": ["compute_dd_tuw"],
+    "qlab.evaluation.statistics.runs": ["returns_hhi"],
+    "qlab.evaluation.statistics.sharpe": [
+        "annualized_sharpe",
+        "deflated_sharpe_ratio",
+        "probabilistic_sharpe_ratio",
+        "sharpe_ratio",
+    ],
+    "qlab.evaluation.trial_registry": ["TrialRegistry"],
+})
 
 __all__ = [
     "CombinatorialPurgedCV",
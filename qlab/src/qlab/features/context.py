@@ -13,7 +13,10 @@ import pandas as pd
 
 from qlab.core.calendar import Calendar
 from qlab.core.enums import Freq
+from qlab.data.alignment import Reducer
+from qlab.data.cube import IntradayCube
 from qlab.data.layer import DataLayer
+from qlab.data.panel import DailyPanel
 from qlab.data.universe import Universe
 
 
@@ -88,20 +91,53 @@ class FeatureContext:
         start = self.calendar.prev_trading_day(self.target_dates[0], extra)
         end = self.target_dates[-1]
         symbols = self.universe.all_symbols()
-        df = self.data.daily(symbols, start, end, validate=False)
+        df = self.data.daily(symbols, start, end, validate=False, columns=fields)
         if fields is not None:
             df = df[fields]
         return df
 
+    def daily_panel(self, fields: list[str],
+                    lookback_days: int | None = None) -> DailyPanel:
+        """取日线宽表面板(窗口同 :meth:`daily`), 见 :meth:`DataLayer.daily_panels`.
+
+        同一 DataLayer 上窗口与投资域相同的请求共享一次透视。
+        """
+        extra = max(lookback_days or 0, self.history_extra_days)
+        start = self.calendar.prev_trading_day(self.target_dates[0], extra)
+        end = self.target_dates[-1]
+        return self.data.daily_panels(self.universe.all_symbols(), start, end, fields)
+
+    def panel(self, field: str, lookback_days: int | None = None) -> pd.DataFrame:
+        """单字段宽表(index=date, columns=symbol), 等价于
+        ``daily([field], lookback_days)[field].unstack("symbol")`` 但透视只做一次.
+
+        返回的宽表与其他特征共享只读底层数组, 需要原地修改时先 ``copy()``。
+        """
+        return self.daily_panel([field], lookback_days).frame(field)
+
+    def intraday_cube(self, fields: list[str], lookback_days: int | None = None,
+                      freq: Freq = Freq.MIN_30) -> IntradayCube:
+        """取日内立方体(窗口同 :meth:`daily`), 见 :meth:`DataLayer.intraday_cube`.
+
+        日内归约沿 ``axis=1``(槽位) 做, 结果是 (day × symbol) 的日级数组。
+        """
+        extra = max(lookback_days or 0, self.history_extra_days)
+        start = self.calendar.prev_trading_day(self.target_dates[0], extra)
+        end = self.target_dates[-1]
+        return self.data.intraday_cube(self.universe.all_symbols(), start, end, fields, freq=freq)
+
     def intraday_rolling(
         self,
         compute_fn: Callable[[pd.DataFrame], float],
         lookback_days: int,
         freq: Freq = Freq.MIN_30,
+        reducer: Reducer | None = None,
     ) -> pd.Series:
         """日内派生因子的标准入口.
 
         对 target_dates 中的每个 (date, symbol)，调用 compute_fn(过去 lookback_days 的日内数据)。
+        提供 ``reducer`` 时改为一次向量化算出全部窗口(见 :class:`~qlab.data.alignment.IntradayWindows`),
+        compute_fn 只作回退。
         返回 MultiIndex(date, symbol) 的 Series。
         """
         aligner = self.data.intraday_aligner(freq)
@@ -111,6 +147,7 @@ class FeatureContext:
             dates=self.target_dates,
             lookback_days=lookback_days,
             freq=freq,
+            reducer=reducer,
         )
 
     def fundamental(self, field: str, date: pd.Timestamp | None = None,
@@ -126,30 +163,30 @@ class FeatureContext:
                 return self.data.fundamental_ttm(symbols, field, date)
             return self.data.fundamental_as_of(symbols, field, date)
 
-        # 对每个 target_date 算一次
-        out = {}
-        for d in self.target_dates:
-            if ttm:
-                vals = self.data.fundamental_ttm(symbols, field, d)
-            else:
-                vals = self.data.fundamental_as_of(symbols, field, d)
-            for sym, val in vals.items():
-                out[(d, sym)] = val
-        idx = pd.MultiIndex.from_tuples(out.keys(), names=["date", "symbol"])
-        return pd.Series(list(out.values()), index=idx, name=field).sort_index()
+        wide = self.fundamental_panel(field, ttm=ttm)
+        idx = pd.MultiIndex.from_product([wide.index, wide.columns], names=["date", "symbol"])
+        return pd.Series(wide.to_numpy().ravel(), index=idx, name=field)
+
+    def fundamental_panel(self, field: str, ttm: bool = False) -> pd.DataFrame:
+        """target_dates × 投资域 的 PIT 财务宽表, 见 :meth:`DataLayer.fundamental_panel`."""
+        return self.data.fundamental_panel(self.universe.all_symbols(), field,
+                                           self.target_dates, ttm=ttm)
 
     def industry(self, system: str = "sw", level: int = 1,
                  date: pd.Timestamp | None = None) -> pd.Series:
+        """行业归属, MultiIndex(date, symbol).
+
+        date 为 None 时对 target_dates 一次取区间表展开(见
+        :meth:`DataLayer.industry_matrix`), 不逐日查询; 有单点查询的采样式数据源
+        (如聚宽)变更日二分到确切交易日, 与逐日传 ``date`` 结果一致。
+        """
         symbols = self.universe.all_symbols()
         if date is not None:
             return self.data.industry(symbols, date, system, level)
-        out = {}
-        for d in self.target_dates:
-            ind = self.data.industry(symbols, d, system, level)
-            for sym, val in ind.items():
-                out[(d, sym)] = val
-        idx = pd.MultiIndex.from_tuples(out.keys(), names=["date", "symbol"])
-        return pd.Series(list(out.values()), index=idx, name=f"industry_{system}_l{level}").sort_index()
+        wide = self.data.industry_matrix(self.target_dates, symbols, system, level)
+        idx = pd.MultiIndex.from_product([wide.index, wide.columns], names=["date", "symbol"])
+        return pd.Series(wide.to_numpy().ravel(), index=idx, dtype="object",
+                         name=f"industry_{system}_l{level}").sort_index()
 
     def concepts(self, source: str | None = None,
                  date: pd.Timestamp | None = None) -> pd.DataFrame:
@@ -160,6 +197,9 @@ class FeatureContext:
         ``source`` 缺省时透传 ``None`` 给 :meth:`DataLayer.concepts`, 由其向数据源
         取 ``concept_source``(如 JQDataSource 为 ``"jq"``) —— 避免在此硬编码 eastmoney
         而与非东财数据源(如聚宽)失配导致静默返回空。
+
+        date 为 None 时走 :meth:`DataLayer.concept_membership` 的区间表, 精度同
+        :meth:`industry`。
         """
         symbols = self.universe.all_symbols()
         if date is not None:
@@ -167,14 +207,7 @@ class FeatureContext:
             result["date"] = date
             return result
 
-        parts = []
-        for d in self.target_dates:
-            result = self.data.concepts(symbols, d, source)
-            result["date"] = d
-            parts.append(result)
-        if not parts:
-            return pd.DataFrame(columns=["date", "symbol", "concept_code", "concept_name"])
-        return pd.concat(parts, ignore_index=True)
+        return self.data.concept_membership(self.target_dates, symbols, source)
 
     # ---- 两融 / 资金流 / 集合竞价(时序类, 同 daily 的 PIT 窗口模式) --------
 
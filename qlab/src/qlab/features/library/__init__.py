@@ -1,43 +1,57 @@
 """特征库 — 按因子族组织.
 
 每个文件按主题分（动量、波动率、量价、基本面、微观结构、日内派生）。
-所有特征通过装饰器自动注册到全局 registry。
+各模块底部调 ``registry.register`` 注册自己的因子。
 
-按需 import 触发注册：
+按名惰性注册：:data:`FEATURE_INDEX` 记录 注册名 → 定义模块, 全局 registry
+首次 ``get`` / ``has`` 某个库内名字时才导入对应模块, 导入本包不再实例化全部因子。
+类名同样按需导入：
 
-    from qlab.features.library import momentum, volatility
-    # 之后 registry 中就有这些特征了
+    from qlab.features.library import Momentum   # 只加载 momentum 模块
+    registry.get("rv_20d")                      # 只加载 volatility 模块
 """
 
-# 触发各模块的注册副作用
-from qlab.features.library import (  # noqa: F401
-    auction,
-    flow,
-    fundamental,
-    intraday,
-    momentum,
-    price,
-    trend,
-    volatility,
-    volume,
-)
-from qlab.features.library.auction import AuctionPremium, AuctionVolumeRatio
-from qlab.features.library.fundamental import PB, PE_TTM
-from qlab.features.library.intraday import IntradayVolSlope, MorningReturn
-from qlab.features.library.momentum import Momentum, MomentumResidual, SmoothMomentum
-from qlab.features.library.price import FractionalDiff, LogPrice, PriceMA
-from qlab.features.library.flow import FlowHold
-from qlab.features.library.trend import (
-    DistToHigh,
-    IsStage2,
-    StageLabel,
-    TrendDirection,
-    TrendEfficiency,
-    TrendOvernightEfficiency,
-    TrendSessionEfficiency,
-)
-from qlab.features.library.volatility import EwmVol, RealizedVol
-from qlab.features.library.volume import TurnoverRatio, VolumeRatio
+from qlab._lazy import lazy_exports
+
+# 模块 → 该模块注册的因子名; 新增因子须同步登记(tests 校验与实际注册一致)
+FEATURE_INDEX: dict[str, list[str]] = {
+    "qlab.features.library.auction": ["auction_premium", "auction_vol_ratio"],
+    "qlab.features.library.flow": ["flow_hold"],
+    "qlab.features.library.fundamental": ["pb", "pe_ttm"],
+    "qlab.features.library.intraday": ["intraday_vol_slope_5d", "morning_return"],
+    "qlab.features.library.momentum": [
+        "mom_5d", "mom_10d", "mom_20d", "mom_resid_20d", "smooth_mom_60d", "smooth_mom_90d",
+    ],
+    "qlab.features.library.price": ["ffd_d0.4", "log_close", "ma_20d"],
+    "qlab.features.library.trend": [
+        "dist_high_60d", "dist_high_252d", "is_stage2_200d", "stage_200d",
+        "trend_direction", "trend_efficiency",
+        "trend_overnight_efficiency", "trend_session_efficiency",
+    ],
+    "qlab.features.library.volatility": ["ewm_vol_20d", "ewm_vol_100d", "rv_20d"],
+    "qlab.features.library.volume": ["turnover_5d", "turnover_20d", "vol_ratio_5d"],
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "qlab.features.library.auction": ["AuctionPremium", "AuctionVolumeRatio"],
+    "qlab.features.library.fundamental": ["PB", "PE_TTM"],
+    "qlab.features.library.intraday": ["IntradayVolSlope", "MorningReturn"],
+    "qlab.features.library.momentum": ["Momentum", "MomentumResidual", "SmoothMomentum"],
+    "qlab.features.library.price": ["FractionalDiff", "LogPrice", "PriceMA"],
+    "qlab.features.library.flow": ["FlowHold"],
+    "qlab.features.library.trend": [
+        "DistToHigh",
+        "IsStage2",
+        "StageLabel",
+        "TrendDirection",
+        "TrendEfficiency",
+        "TrendOvernightEfficiency",
+        "TrendSessionEfficiency",
+    ],
+    "qlab.features.library.volatility": ["EwmVol", "RealizedVol"],
+    "qlab.features.library.volume": ["TurnoverRatio", "VolumeRatio"],
+})
+
 
 __all__ = [
     # momentum
@@ -23,15 +23,15 @@ class FlowHold(DailyFeature):
         )
 
     def compute(self, ctx: FeatureContext) -> pd.Series:
-        df = ctx.daily(lookback_days=260)
-        volume = df["volume"].unstack("symbol") if "volume" in df.columns else None
-        float_shares = (
-            df["float_shares"].unstack("symbol") if "float_shares" in df.columns else None
+        panel = ctx.daily_panel(
+            ["close", "high", "low", "volume", "float_shares"], lookback_days=260
         )
+        volume = panel.frame("volume") if "volume" in panel else None
+        float_shares = panel.frame("float_shares") if "float_shares" in panel else None
         panels = flow_panels(
-            df["close"].unstack("symbol"),
-            high=df["high"].unstack("symbol"),
-            low=df["low"].unstack("symbol"),
+            panel.frame("close"),
+            high=panel.frame("high"),
+            low=panel.frame("low"),
             volume=volume,
             float_shares=float_shares,
         )
@@ -6,6 +6,8 @@ import numpy as np
 import pandas as pd
 
 from qlab.core.enums import Freq
+from qlab.data.alignment import IntradayWindows
+from qlab.data.cube import IntradayCube
 from qlab.features.base import FeatureMeta, IntradayDerivedFeature
 from qlab.features.context import FeatureContext
 from qlab.features.registry import registry
@@ -32,6 +34,43 @@ def _compute_vol_slope(intraday_window: pd.DataFrame) -> float:
     return float(slope)
 
 
+_VAR_WINDOW = 10
+
+
+def _vol_slope_windows(w: IntradayWindows) -> np.ndarray | None:
+    """:func:`_compute_vol_slope` 的向量化版本: 全部 (date, symbol) 窗口一次算完.
+
+    整段按标的排好的 bar 上先算一次 10 bar 滚动方差; 窗口 ``[lo, hi)`` 内可用的
+    方差点是 ``[lo+10, hi-1]``(其 10 个收益都落在窗口内), 斜率由前缀和给出的
+    最小二乘闭式解求得。缺价/非正价时 dropna 会改变位置, 交回逐窗口回调。
+    """
+    close = w.column("close")
+    if not len(close):
+        return np.full(w.lo.shape, np.nan)
+    if not (np.isfinite(close).all() and (close > 0).all()):
+        return None
+    start = w.block_start()
+    ret = np.diff(np.log(close), prepend=np.nan)
+    ret[start == np.arange(len(ret))] = 0.0  # 跨标的边界的伪收益, 任何窗口都用不到
+    var = pd.Series(ret).rolling(_VAR_WINDOW).var().to_numpy()
+    y = np.nan_to_num(var)
+    rel = np.arange(len(y)) - start
+    p = np.concatenate([[0.0], np.cumsum(y)])
+    q = np.concatenate([[0.0], np.cumsum(rel * y)])
+
+    m = (w.hi - w.lo - _VAR_WINDOW).astype(np.float64)
+    ok = m >= 2
+    a = np.where(ok, w.lo + _VAR_WINDOW, 0)
+    b1 = np.where(ok, w.hi, 0)
+    sy = p[b1] - p[a]
+    sxy = (q[b1] - q[a]) - rel[a] * sy
+    sx = m * (m - 1) / 2
+    sxx = (m - 1) * m * (2 * m - 1) / 6
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (m * sxy - sx * sy) / (m * sxx - sx * sx)
+    return np.where(ok, slope, np.nan)
+
+
 class IntradayVolSlope(IntradayDerivedFeature):
     """日内波动率斜率（过去 N 日）."""
 
@@ -53,6 +92,7 @@ class IntradayVolSlope(IntradayDerivedFeature):
             compute_fn=_compute_vol_slope,
             lookback_days=self.lookback_days,
             freq=self.freq,
+            reducer=_vol_slope_windows,
         ).rename(self.meta.name)
 
 
@@ -76,6 +116,22 @@ def _morning_return(intraday_window: pd.DataFrame) -> float:
     return float(np.log(closes.iloc[-1]) - np.log(closes.iloc[0]))
 
 
+def _morning_return_cube(cube: IntradayCube) -> np.ndarray:
+    """:func:`_morning_return` 的立方体版本: 沿槽位轴取每日首末有效上午收盘价.
+
+    返回 ``(n_days, n_symbols)``; 有效价不足 2 个的格子为 NaN。
+    """
+    close = cube["close"][:, cube.session_mask("morning"), :]
+    valid = ~np.isnan(close)
+    n_valid = valid.sum(axis=1)
+    first = np.argmax(valid, axis=1)[:, None, :]
+    last = (close.shape[1] - 1 - np.argmax(valid[:, ::-1, :], axis=1))[:, None, :]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = (np.log(np.take_along_axis(close, last, axis=1))
+               - np.log(np.take_along_axis(close, first, axis=1)))[:, 0, :]
+    return np.where(n_valid >= 2, out, np.nan)
+
+
 class MorningReturn(IntradayDerivedFeature):
     """当日上午累计收益."""
 
@@ -92,11 +148,12 @@ class MorningReturn(IntradayDerivedFeature):
         )
 
     def compute(self, ctx: FeatureContext) -> pd.Series:
-        return ctx.intraday_rolling(
-            compute_fn=_morning_return,
-            lookback_days=1,
-            freq=self.freq,
-        ).rename(self.meta.name)
+        cube = ctx.intraday_cube(["close"], freq=self.freq)
+        values = pd.DataFrame(_morning_return_cube(cube), index=cube.days,
+                              columns=cube.symbols)
+        values = values.reindex(index=ctx.target_dates, columns=ctx.universe.all_symbols())
+        values.index.name, values.columns.name = "date", "symbol"
+        return values.stack(future_stack=True).sort_index().rename(self.meta.name)
 
 
 registry.register(instance=MorningReturn())
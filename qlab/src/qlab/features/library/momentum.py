@@ -24,8 +24,7 @@ class Momentum(DailyFeature):
         )
 
     def compute(self, ctx: FeatureContext) -> pd.Series:
-        df = ctx.daily(["close"], lookback_days=self.window + 1)
-        close = df["close"].unstack("symbol")
+        close = ctx.panel("close", lookback_days=self.window + 1)
         log_close = np.log(close)
         mom = log_close - log_close.shift(self.window)
         return mom.stack(future_stack=True).rename(self.meta.name)
@@ -83,9 +82,7 @@ class SmoothMomentum(DailyFeature):
     def compute(self, ctx: FeatureContext) -> pd.Series:
         from qlab.core.price_panels import smooth_momentum_panel
 
-        close = ctx.daily(["close"], lookback_days=self.window)["close"].unstack(
-            "symbol"
-        )
+        close = ctx.panel("close", lookback_days=self.window)
         out = smooth_momentum_panel(close, window=self.window)
         return out.stack(future_stack=True).rename(self.meta.name)
 
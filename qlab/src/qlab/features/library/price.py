@@ -37,8 +37,7 @@ class PriceMA(DailyFeature):
         )
 
     def compute(self, ctx: FeatureContext) -> pd.Series:
-        df = ctx.daily(["close"], lookback_days=self.window)
-        close = df["close"].unstack("symbol")
+        close = ctx.panel("close", lookback_days=self.window)
         ma = close.rolling(self.window).mean()
         return ma.stack(future_stack=True).rename(self.meta.name)
 
@@ -85,8 +84,7 @@ class FractionalDiff(DailyFeature):
         )
 
     def compute(self, ctx: FeatureContext) -> pd.Series:
-        df = ctx.daily(["close"], lookback_days=len(self._weights))
-        log_close = np.log(df["close"]).unstack("symbol")
+        log_close = np.log(ctx.panel("close", lookback_days=len(self._weights)))
         weights = self._weights
         width = len(weights)
 
@@ -29,9 +29,7 @@ class StageLabel(DailyFeature):
         )
 
     def compute(self, ctx: FeatureContext) -> pd.Series:
-        close = ctx.daily(
-            ["close"], lookback_days=self.ma_window + self.slope_lookback
-        )["close"].unstack("symbol")
+        close = ctx.panel("close", lookback_days=self.ma_window + self.slope_lookback)
         stage = stage_panel(
             close, ma_window=self.ma_window, slope_lookback=self.slope_lookback
         )
@@ -75,9 +73,7 @@ class DistToHigh(DailyFeature):
         )
 
     def compute(self, ctx: FeatureContext) -> pd.Series:
-        close = ctx.daily(["close"], lookback_days=self.window)["close"].unstack(
-            "symbol"
-        )
+        close = ctx.panel("close", lookback_days=self.window)
         dist = dist_to_high_panel(close, window=self.window)
         return dist.stack(future_stack=True).rename(self.meta.name)
 
@@ -91,11 +87,8 @@ registry.register(instance=DistToHigh(60))
 def _trend_panel_field(
     ctx: FeatureContext, field: str, *, lookback_days: int = 260
 ) -> pd.Series:
-    df = ctx.daily(["close", "high", "low", "open"], lookback_days=lookback_days)
-    close = df["close"].unstack("symbol")
-    high = df["high"].unstack("symbol")
-    low = df["low"].unstack("symbol")
-    open_ = df["open"].unstack("symbol")
+    panel = ctx.daily_panel(["close", "high", "low", "open"], lookback_days=lookback_days)
+    close, high, low, open_ = (panel.frame(f) for f in ("close", "high", "low", "open"))
     panels = (
         direction_panels(close, high=high, low=low, open_=open_)
         if field == "direction"
@@ -24,8 +24,7 @@ class EwmVol(DailyFeature):
         )
 
     def compute(self, ctx: FeatureContext) -> pd.Series:
-        df = ctx.daily(["close"], lookback_days=self.span)
-        close = df["close"].unstack("symbol")
+        close = ctx.panel("close", lookback_days=self.span)
         log_ret = np.log(close).diff()
         vol = log_ret.ewm(span=self.span, min_periods=10).std()
         return vol.stack(future_stack=True).rename(self.meta.name)
@@ -49,8 +48,7 @@ class RealizedVol(DailyFeature):
         )
 
     def compute(self, ctx: FeatureContext) -> pd.Series:
-        df = ctx.daily(["close"], lookback_days=self.window + 1)
-        close = df["close"].unstack("symbol")
+        close = ctx.panel("close", lookback_days=self.window + 1)
         log_ret = np.log(close).diff()
         vol = log_ret.rolling(self.window).std()
         return vol.stack(future_stack=True).rename(self.meta.name)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
 from qlab.features.base import DailyFeature, FeatureMeta
@@ -23,11 +24,10 @@ class TurnoverRatio(DailyFeature):
         )
 
     def compute(self, ctx: FeatureContext) -> pd.Series:
-        df = ctx.daily(["volume", "float_shares"], lookback_days=self.window)
+        panel = ctx.daily_panel(["volume", "float_shares"], lookback_days=self.window)
         # 换手率 = volume / float_shares（按日）
-        turnover = df["volume"] / df["float_shares"].replace(0, pd.NA)
+        turnover_wide = panel.frame("volume") / panel.frame("float_shares").replace(0, np.nan)
         # 滚动平均
-        turnover_wide = turnover.unstack("symbol")
         result = turnover_wide.rolling(self.window).mean()
         return result.stack(future_stack=True).rename(self.meta.name)
 
@@ -50,8 +50,7 @@ class VolumeRatio(DailyFeature):
         )
 
     def compute(self, ctx: FeatureContext) -> pd.Series:
-        df = ctx.daily(["volume"], lookback_days=self.window + 1)
-        vol = df["volume"].unstack("symbol").astype(float)
+        vol = ctx.panel("volume", lookback_days=self.window + 1)
         avg_vol = vol.shift(1).rolling(self.window).mean()
         ratio = vol / avg_vol.replace(0, pd.NA)
         return ratio.stack(future_stack=True).rename(self.meta.name)
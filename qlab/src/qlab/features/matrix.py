@@ -143,7 +143,7 @@ def _build_mask(
     symbols = universe.all_symbols()
     bars = data.daily(
         symbols, target_dates[0], target_dates[-1],
-        validate=False,
+        validate=False, columns=["is_suspended", "is_limit_up", "is_limit_down"],
     )
     keep_cols = [c for c in ("is_suspended", "is_limit_up", "is_limit_down") if c in bars.columns]
     if not keep_cols:
@@ -260,52 +260,71 @@ def build_feature_matrix(
     )
 
     # 5. 依次计算（缓存存**未按入场对齐**的原始值；对齐在步骤 7）
-    computed: dict[str, pd.Series] = {}
-    metas: dict[str, FeatureMeta] = {}
-    value_metas: dict[str, FeatureValueMeta] = {}
-
-    for feat in ordered:
-        meta = feat.meta
-        cache_key = make_feature_key(meta, dataset_id, uni.name, (start, end))
-
-        if feature_store.has(cache_key):
-            value = feature_store.get(cache_key)
-            cached_meta = feature_store.get_meta(cache_key)
-            if cached_meta is not None:
-                value_metas[meta.name] = cached_meta
-        else:
-            ctx = FeatureContext(
-                data=data,
-                target_dates=target_dates,
-                universe=uni,
-                calendar=calendar,
-                mode=mode,
-                history_extra_days=meta.lookback_days,
-                upstream_values={
-                    name: computed[name] for name in meta.dependencies if name in computed
-                },
-            )
-            try:
-                value = feat.compute(ctx)
-            except Exception as e:
-                raise FeatureComputationError(meta.name, str(e), cause=e) from e
-
-            value.name = meta.name
-            vm = FeatureValueMeta(
-                feature_name=meta.name,
-                feature_version=meta.version,
-                computed_at=FeatureValueMeta.now_iso(),
-                dataset_id=dataset_id,
-                universe_id=uni.name,
-                date_range=(str(start.date()), str(end.date())),
-                pipeline_hash=pipeline_hash,
-                data_version=data_version,
+    # 取数会话: 各特征 lookback 不同的日线请求合并为一次读取, 窄窗口从内存切片
+    # (只为特征缓存未命中、确实要计算的特征预登记窗口)
+    cache_keys = {f.meta.name: make_feature_key(f.meta, dataset_id, uni.name, (start, end))
+                  for f in ordered}
+    misses = [f for f in ordered if not feature_store.has(cache_keys[f.meta.name])]
+    with data.session():
+        if misses:
+            widest = max(f.meta.lookback_days for f in misses)
+            data.reserve_daily(
+                symbols, calendar.prev_trading_day(target_dates[0], widest), target_dates[-1],
             )
-            feature_store.put(cache_key, value, meta=vm)
-            value_metas[meta.name] = vm
+        computed: dict[str, pd.Series] = {}
+        metas: dict[str, FeatureMeta] = {}
+        value_metas: dict[str, FeatureValueMeta] = {}
+
+        for feat in ordered:
+            meta = feat.meta
+            cache_key = cache_keys[meta.name]
+
+            if feature_store.has(cache_key):
+                value = feature_store.get(cache_key)
+                cached_meta = feature_store.get_meta(cache_key)
+                if cached_meta is not None:
+                    value_metas[meta.name] = cached_meta
+            else:
+                ctx = FeatureContext(
+                    data=data,
+                    target_dates=target_dates,
+                    universe=uni,
+                    calendar=calendar,
+                    mode=mode,
+                    history_extra_days=meta.lookback_days,
+                    upstream_values={
+                        name: computed[name] for name in meta.dependencies if name in computed
+                    },
+                )
+                try:
+                    value = feat.compute(ctx)
+                except Exception as e:
+                    raise FeatureComputationError(meta.name, str(e), cause=e) from e
+
+                value.name = meta.name
+                vm = FeatureValueMeta(
+                    feature_name=meta.name,
+                    feature_version=meta.version,
+                    computed_at=FeatureValueMeta.now_iso(),
+                    dataset_id=dataset_id,
+                    universe_id=uni.name,
+                    date_range=(str(start.date()), str(end.date())),
+                    pipeline_hash=pipeline_hash,
+                    data_version=data_version,
+                )
+                feature_store.put(cache_key, value, meta=vm)
+                value_metas[meta.name] = vm
+
+            computed[meta.name] = value
+            metas[meta.name] = meta
 
-        computed[meta.name] = value
-        metas[meta.name] = meta
+        mask = None
+        if generate_mask:
+            try:
+                mask = _build_mask(data, uni, target_dates, list(metas.keys()))
+            except Exception:
+                # 状态字段缺失等情况下不致命——降级为不生成 mask
+                mask = None
 
     # 6. 横向拼接（稠密）
     df = pd.concat(computed.values(), axis=1, keys=computed.keys())
@@ -321,14 +340,6 @@ def build_feature_matrix(
     # 7. 按 entry_timing × available_at 做 PIT 对齐
     df = align_features_for_entry(df, metas, timing)
 
-    mask = None
-    if generate_mask:
-        try:
-            mask = _build_mask(data, uni, target_dates, list(metas.keys()))
-        except Exception:
-            # 状态字段缺失等情况下不致命——降级为不生成 mask
-            mask = None
-
     return FeatureMatrix(
         values=df, metas=metas, mask=mask, value_metas=value_metas,
         entry_timing=timing,
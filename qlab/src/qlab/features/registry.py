@@ -10,6 +10,7 @@
 
 from __future__ import annotations
 
+import importlib
 from typing import TypeVar
 
 from qlab.core.exceptions import FeatureRegistrationError
@@ -24,6 +25,8 @@ class FeatureRegistry:
     def __init__(self) -> None:
         self._registry: dict[str, Feature] = {}
         self._classes: dict[str, type] = {}
+        # 尚未导入的 注册名 → 定义模块(见 register_lazy)
+        self._pending: dict[str, str] = {}
 
     def register(self, cls: F | None = None, *, instance: Feature | None = None) -> F:
         """注册一个特征类或实例.
@@ -46,6 +49,7 @@ class FeatureRegistry:
                     )
                 return  # 同名同版本: 幂等
             self._registry[name] = inst
+            self._pending.pop(name, None)
             if target_cls is not None:
                 self._classes[name] = target_cls
 
@@ -62,6 +66,19 @@ class FeatureRegistry:
 
         return _decorator  # type: ignore[return-value]
 
+    def register_lazy(self, module: str, names: list[str]) -> None:
+        """登记 ``module`` 会注册的因子名; 首次按名访问时才导入该模块."""
+        for name in names:
+            if name not in self._registry:
+                self._pending[name] = module
+
+    def _resolve(self, name: str | None = None) -> None:
+        """导入登记了 ``name`` 的模块(``None`` 表示全部待导入模块)."""
+        modules = set(self._pending.values()) if name is None else {self._pending.get(name)}
+        for module in sorted(m for m in modules if m is not None):
+            importlib.import_module(module)
+            self._pending = {n: m for n, m in self._pending.items() if m != module}
+
     def get(self, name: str) -> Feature:
         """按注册名取因子.
 
@@ -69,9 +86,12 @@ class FeatureRegistry:
             KeyError: 未注册。注册表为空时额外提示导入遗漏 ——
                 因子靠**导入副作用**注册(``library/*.py`` 底部调 register),
                 忘记 import 时表是空的, 光报"已注册: []"很难定位。
+                内置因子库按名惰性登记, 库内名字无需事先导入。
         """
+        if name in self._pending:
+            self._resolve(name)
         if name not in self._registry:
-            if not self._registry:
+            if not self._registry and not self._pending:
                 raise KeyError(
                     f"特征 '{name}' 未注册 —— 注册表是**空**的。\n"
                     "  因子靠导入副作用注册, 请先导入因子库:\n"
@@ -79,15 +99,16 @@ class FeatureRegistry:
                     "  (或 from qlab.features.library import Momentum, ... )\n"
                     "  自定义因子需先 registry.register(instance=YourFeature(...))。"
                 )
-            raise KeyError(
-                f"特征 '{name}' 未注册。已注册: {sorted(self._registry.keys())}"
-            )
+            raise KeyError(f"特征 '{name}' 未注册。已注册: {self.all_names()}")
         return self._registry[name]
 
     def has(self, name: str) -> bool:
+        if name in self._pending:
+            self._resolve(name)
         return name in self._registry
 
     def all_names(self) -> list[str]:
+        self._resolve()
         return sorted(self._registry.keys())
 
     def all_features(self) -> list[Feature]:
@@ -96,13 +117,20 @@ class FeatureRegistry:
     def clear(self) -> None:
         self._registry.clear()
         self._classes.clear()
+        self._pending.clear()
 
     def __len__(self) -> int:
-        return len(self._registry)
+        # 计入已登记未导入的名字, 与 has()/get() 口径一致且不触发导入
+        return len(self._registry) + len(self._pending)
 
     def __repr__(self) -> str:
         return f"<FeatureRegistry n={len(self)}>"
 
 
-# 全局单例
+# 全局单例; 内置因子库按名惰性登记
 registry = FeatureRegistry()
+
+from qlab.features.library import FEATURE_INDEX  # noqa: E402 - 库包只含索引, 不回引本模块
+
+for _module, _names in FEATURE_INDEX.items():
+    registry.register_lazy(_module, _names)
@@ -14,54 +14,50 @@ Join 注意: 多标的下 ``event_start`` 会重复，请用 ``event_id`` 或
 :func:`ensure_event_key`，勿只按 ``event_start`` merge。
 """
 
-from qlab.core.enums import EntryAt, EntryTiming
-from qlab.labeling.events import (
-    CUSUMFilter,
-    EntropySampler,
-    EventSampler,
-    HMMTrendSampler,
-    NewHighBreakoutSampler,
-    RunSampler,
-    VolumeCUSUMFilter,
-    daily_event_pairs,
-    ensure_event_key,
-    filter_pairs,
-    to_event_dataframe,
-)
-from qlab.labeling.sample_masks import (
-    anti_climax_mask,
-    bull_trend_mask,
-    combine_masks,
-    cross_sectional_rank_mask,
-    expand_date_mask,
-    feature_threshold_mask,
-    industry_leader_mask,
-    industry_rs_mask,
-    liquidity_top_n_mask,
-    market_breadth_mask,
-    market_breadth_ok,
-    mask_to_wide,
-    near_high_mask,
-    relative_strength_mask,
-    smooth_momentum_score,
-    stage2_mask,
-    tradable_hygiene_mask,
-    volume_confirm_mask,
-)
-from qlab.labeling.exit import (
-    EXIT_RESEARCH_DEFAULT,
-    EXIT_TB_1_5_1_V20,
-    ExitSettings,
-)
-from qlab.labeling.meta_labeling import meta_label_bins, to_meta_labels
-from qlab.labeling.sample_frame import LabeledSamples, build_labeled_samples
-from qlab.labeling.sample_spec import (
-    SampleSpec,
-    confirmation_to_entry,
-    wide_ohlc_to_long,
-)
-from qlab.labeling.thresholds import daily_ewm_vol, daily_ewm_vol_panel, targets_from_panel
-from qlab.labeling.triple_barrier import TripleBarrier, label_events
+from qlab._lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "qlab.core.enums": ["EntryAt", "EntryTiming"],
+    "qlab.labeling.events": [
+        "CUSUMFilter",
+        "EntropySampler",
+        "EventSampler",
+        "HMMTrendSampler",
+        "NewHighBreakoutSampler",
+        "RunSampler",
+        "VolumeCUSUMFilter",
+        "daily_event_pairs",
+        "ensure_event_key",
+        "filter_pairs",
+        "to_event_dataframe",
+    ],
+    "qlab.labeling.sample_masks": [
+        "anti_climax_mask",
+        "bull_trend_mask",
+        "combine_masks",
+        "cross_sectional_rank_mask",
+        "expand_date_mask",
+        "feature_threshold_mask",
+        "industry_leader_mask",
+        "industry_rs_mask",
+        "liquidity_top_n_mask",
+        "market_breadth_mask",
+        "market_breadth_ok",
+        "mask_to_wide",
+        "near_high_mask",
+        "relative_strength_mask",
+        "smooth_momentum_score",
+        "stage2_mask",
+        "tradable_hygiene_mask",
+        "volume_confirm_mask",
+    ],
+    "qlab.labeling.exit": ["EXIT_RESEARCH_DEFAULT", "EXIT_TB_1_5_1_V20", "ExitSettings"],
+    "qlab.labeling.meta_labeling": ["meta_label_bins", "to_meta_labels"],
+    "qlab.labeling.sample_frame": ["LabeledSamples", "build_labeled_samples"],
+    "qlab.labeling.sample_spec": ["SampleSpec", "confirmation_to_entry", "wide_ohlc_to_long"],
+    "qlab.labeling.thresholds": ["daily_ewm_vol", "daily_ewm_vol_panel", "targets_from_panel"],
+    "qlab.labeling.triple_barrier": ["TripleBarrier", "label_events"],
+})
 
 __all__ = [
     "CUSUMFilter",
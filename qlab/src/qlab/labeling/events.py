@@ -7,7 +7,7 @@ from abc import ABC, abstractmethod
 import numpy as np
 import pandas as pd
 
-from qlab.core.calendar import Calendar, get_default_calendar
+from qlab.core.calendar import Calendar, get_default_calendar, shift_sessions
 from qlab.core.enums import EntryTiming
 from qlab.core.schema import SCHEMA_EVENT, validate_schema
 
@@ -365,17 +365,22 @@ class HMMTrendSampler(EventSampler):
 
 def _make_event_ids(timestamps: pd.Series, symbols: pd.Series) -> list[str]:
     """稳定唯一 event_id: ``{symbol}|{YYYYMMDD}``，同日同标的再追加 ``|n``."""
-    base = [
-        f"{sym}|{pd.Timestamp(ts).strftime('%Y%m%d')}"
-        for ts, sym in zip(timestamps, symbols)
-    ]
-    seen: dict[str, int] = {}
-    out: list[str] = []
-    for b in base:
-        n = seen.get(b, 0)
-        seen[b] = n + 1
-        out.append(b if n == 0 else f"{b}|{n}")
-    return out
+    base = pd.Series(
+        np.asarray(symbols, dtype=object).astype(str), dtype=object
+    ) + "|" + pd.DatetimeIndex(timestamps).strftime("%Y%m%d").to_numpy(dtype=object)
+    n = base.groupby(base, sort=False).cumcount().to_numpy()
+    dup = n > 0
+    out = base.to_numpy(dtype=object, copy=True)
+    out[dup] = [f"{b}|{k}" for b, k in zip(out[dup], n[dup], strict=True)]
+    return out.tolist()
+
+
+def _lookup(values: pd.Series, ts: pd.DatetimeIndex, sym: np.ndarray) -> np.ndarray:
+    """按 (timestamp, symbol) 批量取值, 缺失为 NaN."""
+    if not isinstance(values.index, pd.MultiIndex):
+        return np.full(len(ts), np.nan)
+    key = pd.MultiIndex.from_arrays([ts, sym])
+    return values.reindex(key).to_numpy(dtype=np.float64, na_value=np.nan)
 
 
 def ensure_event_key(df: pd.DataFrame) -> pd.DataFrame:
@@ -468,39 +473,34 @@ def to_event_dataframe(
         out.index.name = "event_start"
         return out
 
-    rows = []
+    ts = pd.DatetimeIndex(pairs["timestamp"]).normalize()
+    sym = pairs["symbol"].to_numpy()
+    # 一次 searchsorted 偏移全部入场日; 越界 → NaT(无垂直屏障)
+    t1 = shift_sessions(cal, ts, v_days, errors="coerce")
     n_clipped = 0
-    for _, row in pairs.iterrows():
-        ts = pd.Timestamp(row["timestamp"]).normalize()
-        sym = row["symbol"]
-        try:
-            t1 = cal.next_trading_day(ts, v_days)
-        except Exception:
-            t1 = pd.NaT
-        if pe is not None and pd.notna(t1) and t1 > pe and pe > ts:
-            t1 = pe
-            n_clipped += 1
-        if isinstance(target, pd.Series):
-            tgt = float(target.get((ts, sym), np.nan))
-        else:
-            tgt = float(target)
-        sd: float | None
-        if side is None:
-            sd = np.nan
-        elif isinstance(side, pd.Series):
-            sd = float(side.get((ts, sym), np.nan))
-        else:
-            sd = float(side)
-        rows.append({
-            "event_start": ts,
-            "symbol": sym,
-            "t1": t1,
-            "target": tgt,
-            "side": sd,
-            "entry_timing": timing.value,
-        })
-
-    df = pd.DataFrame(rows)
+    if pe is not None:
+        clip = np.asarray((t1 > pe) & (pe > ts))
+        n_clipped = int(clip.sum())
+        t1 = t1.where(~clip, pe)
+    if isinstance(target, pd.Series):
+        tgt = _lookup(target, ts, sym)
+    else:
+        tgt = np.full(len(ts), float(target))
+    if side is None:
+        sd = np.full(len(ts), np.nan)
+    elif isinstance(side, pd.Series):
+        sd = _lookup(side, ts, sym)
+    else:
+        sd = np.full(len(ts), float(side))
+
+    df = pd.DataFrame({
+        "event_start": ts,
+        "symbol": sym,
+        "t1": t1,
+        "target": tgt,
+        "side": sd,
+        "entry_timing": timing.value,
+    })
     df["event_id"] = _make_event_ids(df["event_start"], df["symbol"])
     df = df.set_index("event_start").sort_index()
     if n_clipped:
@@ -18,7 +18,7 @@ from typing import Any, Protocol
 
 import pandas as pd
 
-from qlab.core.calendar import Calendar, get_default_calendar
+from qlab.core.calendar import Calendar, get_default_calendar, shift_sessions
 from qlab.core.enums import EntryAt, EntryTiming
 from qlab.labeling.events import VolumeCUSUMFilter, to_event_dataframe
 from qlab.labeling.exit import EXIT_RESEARCH_DEFAULT, ExitSettings
@@ -53,8 +53,7 @@ def confirmation_to_entry(
     cal = calendar or get_default_calendar()
     out = pairs.copy()
     ts = pd.to_datetime(out["timestamp"]).dt.normalize()
-    mapping = {t: cal.next_trading_day(pd.Timestamp(t), 1) for t in ts.unique()}
-    out["timestamp"] = ts.map(mapping)
+    out["timestamp"] = shift_sessions(cal, ts, 1).to_numpy()
     return out.dropna(subset=["timestamp"]).reset_index(drop=True)
 
 
@@ -6,16 +6,20 @@
 - hyperparam/     GridSearch / RandomSearch + LogUniform + MyPipeline
 """
 
-from qlab.models.cv.purged_kfold import PurgedKFold
-from qlab.models.cv.score import cv_score
-from qlab.models.ensemble.bagging import build_bagging_classifier
-from qlab.models.feature_importance.mda import feat_imp_mda
-from qlab.models.feature_importance.mdi import feat_imp_mdi
-from qlab.models.feature_importance.orthogonal import orthogonalize_features
-from qlab.models.feature_importance.sfi import feat_imp_sfi
-from qlab.models.hyperparam.log_uniform import log_uniform
-from qlab.models.hyperparam.search import clf_hyper_fit
-from qlab.models.pipeline import MyPipeline
+from qlab._lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "qlab.models.cv.purged_kfold": ["PurgedKFold"],
+    "qlab.models.cv.score": ["cv_score"],
+    "qlab.models.ensemble.bagging": ["build_bagging_classifier"],
+    "qlab.models.feature_importance.mda": ["feat_imp_mda"],
+    "qlab.models.feature_importance.mdi": ["feat_imp_mdi"],
+    "qlab.models.feature_importance.orthogonal": ["orthogonalize_features"],
+    "qlab.models.feature_importance.sfi": ["feat_imp_sfi"],
+    "qlab.models.hyperparam.log_uniform": ["log_uniform"],
+    "qlab.models.hyperparam.search": ["clf_hyper_fit"],
+    "qlab.models.pipeline": ["MyPipeline"],
+})
 
 __all__ = [
     "PurgedKFold",
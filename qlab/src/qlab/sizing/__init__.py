@@ -3,12 +3,16 @@
 依赖 core/，独立于 data/features/models。
 """
 
-from qlab.sizing.dynamic import dynamic_position, limit_price
-from qlab.sizing.from_probability import (
-    avg_active_signals,
-    bet_size_from_probability,
-    discretize_signal,
-)
+from qlab._lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "qlab.sizing.dynamic": ["dynamic_position", "limit_price"],
+    "qlab.sizing.from_probability": [
+        "avg_active_signals",
+        "bet_size_from_probability",
+        "discretize_signal",
+    ],
+})
 
 __all__ = [
     "bet_size_from_probability",
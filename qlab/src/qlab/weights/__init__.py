@@ -3,17 +3,18 @@
 非 IID 标签的修正：uniqueness + sequential bootstrap + return attribution + time decay。
 """
 
-from qlab.weights.sequential_bootstrap import (
-    build_indicator_matrix,
-    seq_bootstrap_sample,
-)
-from qlab.weights.time_decay import time_decay_factors
-from qlab.weights.uniqueness import (
-    average_uniqueness,
-    num_concurrent_events,
-    return_attribution_weights,
-    sample_weights,
-)
+from qlab._lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "qlab.weights.sequential_bootstrap": ["build_indicator_matrix", "seq_bootstrap_sample"],
+    "qlab.weights.time_decay": ["time_decay_factors"],
+    "qlab.weights.uniqueness": [
+        "average_uniqueness",
+        "num_concurrent_events",
+        "return_attribution_weights",
+        "sample_weights",
+    ],
+})
 
 __all__ = [
     "num_concurrent_events",
@@ -1,6 +1,10 @@
 """Workspace 模块 — §7.4 决议."""
 
-from qlab.workspace.config import ExperimentConfig, load_config
-from qlab.workspace.manager import Workspace
+from qlab._lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "qlab.workspace.config": ["ExperimentConfig", "load_config"],
+    "qlab.workspace.manager": ["Workspace"],
+})
 
 __all__ = ["Workspace", "ExperimentConfig", "load_config"]
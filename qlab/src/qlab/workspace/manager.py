@@ -4,7 +4,9 @@
 
     quant-lab/
     ├── store/                       # 全局共享缓存
-    │   ├── bars/
+    │   ├── bars/                    # K 线分片(parquet 后端)
+    │   ├── bars-partitioned/        # 月分区(partitioned 后端)
+    │   ├── bars-arrow/              # Arrow IPC 月分区(arrow 后端)
     │   └── features/
     └── workspaces/
         └── <name>/
@@ -21,11 +23,44 @@ import shutil
 from pathlib import Path
 
 from qlab.core.exceptions import QlabError
-from qlab.data.store import ParquetBarStore, ParquetShardedBarStore
+from qlab.data.interfaces import ShardedBarStore
+from qlab.data.store import (
+    ArrowIpcBarStore,
+    CachingShardedBarStore,
+    ParquetBarStore,
+    ParquetShardedBarStore,
+    PartitionedParquetBarStore,
+)
 from qlab.evaluation.trial_registry import TrialRegistry
 from qlab.features.store import ParquetFeatureStore
 from qlab.workspace.config import ExperimentConfig, load_config, save_config
 
+# bar_store 后端 → (store/ 下的子目录, 构造器); 各后端目录独立, 可用 ``qlab store convert`` 互转
+BAR_STORE_BACKENDS: dict[str, tuple[str, type]] = {
+    "parquet": ("bars", ParquetShardedBarStore),
+    "partitioned": ("bars-partitioned", PartitionedParquetBarStore),
+    "arrow": ("bars-arrow", ArrowIpcBarStore),
+}
+
+
+def open_bar_store(root: str | Path, backend: str = "parquet",
+                   write_mode: str | None = None) -> ShardedBarStore:
+    """打开 ``<root>/store`` 下指定后端的共享 K 线缓存.
+
+    ``write_mode`` 仅 ``"parquet"`` 后端支持(见 :class:`ParquetShardedBarStore`),
+    缺省沿用后端默认。
+    """
+    if backend not in BAR_STORE_BACKENDS:
+        raise QlabError(
+            f"未知 bar_store 后端: {backend!r}, 可选 {sorted(BAR_STORE_BACKENDS)}"
+        )
+    subdir, cls = BAR_STORE_BACKENDS[backend]
+    if write_mode is None:
+        return cls(Path(root) / "store" / subdir)
+    if backend != "parquet":
+        raise QlabError(f"bar_store 后端 {backend!r} 不支持 write_mode")
+    return cls(Path(root) / "store" / subdir, write_mode=write_mode)
+
 
 class Workspace:
     """一个工作空间."""
@@ -90,9 +125,23 @@ class Workspace:
     def trial_registry(self) -> TrialRegistry:
         return TrialRegistry(self.trials_db_path)
 
-    def bar_store(self) -> ParquetShardedBarStore:
-        """K 线分片缓存（生产用）."""
-        return ParquetShardedBarStore(self.shared_bar_store)
+    def bar_store(self, backend: str = "parquet",
+                  cache_bytes: int | None = None,
+                  write_mode: str | None = None) -> ShardedBarStore:
+        """K 线分片缓存（生产用）.
+
+        ``backend`` 见 :data:`BAR_STORE_BACKENDS`: ``"parquet"``(每标的每月一文件,
+        默认)、``"partitioned"``(每月一个多标的 Parquet 分区)、``"arrow"``(每月一个
+        Arrow IPC 分区, 内存映射零拷贝读, 适合多进程反复读同一批数据)。
+        ``cache_bytes`` 非 None 时外包一层 :class:`CachingShardedBarStore`,
+        在进程内按该字节预算缓存已解码分片(同一次特征矩阵构建中各特征共享)。
+        ``write_mode="append"`` 让 parquet 后端的增量写入追加增量文件而非整片
+        重写(定期 ``compact()`` 合并), 其他后端不支持该参数。
+        """
+        store = open_bar_store(self.root, backend, write_mode)
+        if cache_bytes is not None:
+            store = CachingShardedBarStore(store, max_bytes=cache_bytes)
+        return store
 
     def kv_store(self) -> ParquetBarStore:
         """通用 key-based 缓存（universe / corp_actions / industry / fundamentals）."""
@@ -9,9 +9,11 @@ import pandas as pd
 import pytest
 
 from qlab.data import (
+    ArrowIpcBarStore,
     DataLayer,
     InMemoryShardedBarStore,
     ParquetShardedBarStore,
+    PartitionedParquetBarStore,
 )
 from qlab.data.sources import FakeDataSource
 
@@ -29,6 +31,9 @@ def fake_bars() -> pd.DataFrame:
 @pytest.mark.parametrize("store_factory", [
     pytest.param(lambda: InMemoryShardedBarStore(), id="memory"),
     pytest.param(lambda: ParquetShardedBarStore(tempfile.mkdtemp()), id="parquet"),
+    pytest.param(lambda: PartitionedParquetBarStore(tempfile.mkdtemp()), id="partitioned"),
+    pytest.param(lambda: ArrowIpcBarStore(tempfile.mkdtemp()), id="arrow"),
+    pytest.param(lambda: ArrowIpcBarStore(tempfile.mkdtemp(), compression="lz4"), id="arrow-lz4"),
 ])
 def test_put_get_roundtrip(store_factory, fake_bars):
     store = store_factory()
@@ -50,6 +55,9 @@ def test_put_get_roundtrip(store_factory, fake_bars):
 @pytest.mark.parametrize("store_factory", [
     pytest.param(lambda: InMemoryShardedBarStore(), id="memory"),
     pytest.param(lambda: ParquetShardedBarStore(tempfile.mkdtemp()), id="parquet"),
+    pytest.param(lambda: PartitionedParquetBarStore(tempfile.mkdtemp()), id="partitioned"),
+    pytest.param(lambda: ArrowIpcBarStore(tempfile.mkdtemp()), id="arrow"),
+    pytest.param(lambda: ArrowIpcBarStore(tempfile.mkdtemp(), compression="lz4"), id="arrow-lz4"),
 ])
 def test_missing_ranges(store_factory, fake_bars):
     store = store_factory()
@@ -75,6 +83,9 @@ def test_missing_ranges(store_factory, fake_bars):
 @pytest.mark.parametrize("store_factory", [
     pytest.param(lambda: InMemoryShardedBarStore(), id="memory"),
     pytest.param(lambda: ParquetShardedBarStore(tempfile.mkdtemp()), id="parquet"),
+    pytest.param(lambda: PartitionedParquetBarStore(tempfile.mkdtemp()), id="partitioned"),
+    pytest.param(lambda: ArrowIpcBarStore(tempfile.mkdtemp()), id="arrow"),
+    pytest.param(lambda: ArrowIpcBarStore(tempfile.mkdtemp(), compression="lz4"), id="arrow-lz4"),
 ])
 def test_source_version_isolation(store_factory, fake_bars):
     """source_version 不同 → 视为完全不同的缓存."""
@@ -216,6 +227,55 @@ def test_corrupted_kv_cache_treated_as_absent(tmp_path):
     assert len(store.get("k1")) == 3
 
 
+def test_kv_cache_hit_reads_file_once_and_checks_sidecar(tmp_path, monkeypatch):
+    import numpy as np
+
+    from qlab.data.store import ParquetBarStore
+
+    store = ParquetBarStore(tmp_path)
+    df = pd.DataFrame({"a": np.arange(100.0)})
+    store.put("k1", df)
+    assert (tmp_path / "k1.parquet.sha1").exists()
+
+    reads: list[Path] = []
+    decodes: list = []
+    orig = Path.read_bytes
+    monkeypatch.setattr(Path, "read_bytes", lambda self: reads.append(self) or orig(self))
+    monkeypatch.setattr(pd, "read_parquet", _counting(pd.read_parquet, decodes))
+    assert store.has("k1")
+    pd.testing.assert_frame_equal(store.get("k1"), df)
+    assert [p.name for p in reads] == ["k1.parquet"] and len(decodes) == 1
+
+    # 同尺寸、魔数完好的中段损坏: 校验和识别
+    monkeypatch.undo()
+    raw = bytearray((tmp_path / "k1.parquet").read_bytes())
+    raw[len(raw) // 2] ^= 0xFF
+    (tmp_path / "k1.parquet").write_bytes(bytes(raw))
+    assert not store.has("k1")
+
+
+def test_kv_cache_legacy_file_without_sidecar_is_backfilled(tmp_path):
+    import numpy as np
+
+    from qlab.data.store import ParquetBarStore
+
+    df = pd.DataFrame({"a": np.arange(3.0)})
+    df.to_parquet(tmp_path / "old.parquet")
+    store = ParquetBarStore(tmp_path)
+    assert store.has("old")
+    assert (tmp_path / "old.parquet.sha1").exists()
+    pd.testing.assert_frame_equal(store.get("old"), df)
+    store.invalidate("old")
+    assert not list(tmp_path.iterdir())
+
+
+def _counting(fn, calls: list):
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        return fn(*args, **kwargs)
+    return wrapper
+
+
 def test_read_only_cache_dir_raises_actionable_error(tmp_path):
     """缓存目录不可写时, 报错要点明"缓存写不进去"而不是裸的 PermissionError."""
     import os
@@ -254,3 +314,792 @@ def test_datalayer_rejects_swapped_store_args(tmp_path):
         store=ParquetBarStore(tmp_path / "kv"),
         bar_store=ParquetShardedBarStore(tmp_path / "bars"),
     )
+
+
+# ======================================================================
+# 分片清单 —— missing_ranges 不再解码分片, 损坏在真正读数据时由 checksum 识别
+# ======================================================================
+
+
+def _one_symbol_bars(n: int = 5) -> pd.DataFrame:
+    import numpy as np
+
+    idx = pd.MultiIndex.from_product(
+        [pd.bdate_range("2024-06-03", periods=n), ["600519.SH"]],
+        names=["date", "symbol"],
+    )
+    return pd.DataFrame({"close": np.arange(len(idx), dtype=float)}, index=idx)
+
+
+def test_manifest_records_shards_and_missing_ranges_skips_decode(tmp_path, monkeypatch):
+    store = ParquetShardedBarStore(tmp_path)
+    df = _one_symbol_bars()
+    store.put_range(df, kind="daily", source_version="v1", freq="1d")
+
+    man = store.shard_manifest(kind="daily", source_version="v1", freq="1d")
+    rec = man.loc[("600519.SH", "2024-06")]
+    assert rec["rows"] == len(df)
+    assert pd.Timestamp(rec["min_date"]) == pd.Timestamp("2024-06-03")
+    assert pd.Timestamp(rec["max_date"]) == pd.Timestamp("2024-06-07")
+    assert rec["bytes"] > 0 and len(rec["checksum"]) == 40
+
+    # 清单在另一个 store 实例里同样生效, 且规划缺失时不得解码任何分片
+    fresh = ParquetShardedBarStore(tmp_path)
+
+    def _boom(*a, **k):
+        raise AssertionError("missing_ranges 不应解码分片")
+
+    monkeypatch.setattr(pd, "read_parquet", _boom)
+    missing = fresh.missing_ranges(
+        kind="daily", symbols=["600519.SH"],
+        start=pd.Timestamp("2024-06-01"), end=pd.Timestamp("2024-07-31"),
+        source_version="v1", freq="1d",
+    )
+    assert missing == [("600519.SH", "2024-07")]
+
+
+def test_manifest_checksum_catches_same_size_corruption(tmp_path):
+    """字节数不变的损坏 stat 看不出, 由 get_range 的 checksum 识别并剔除."""
+    store = ParquetShardedBarStore(tmp_path)
+    df = _one_symbol_bars()
+    kw = dict(kind="daily", source_version="v1")
+    store.put_range(df, **kw)
+    shard = next(tmp_path.rglob("*.parquet"))
+    raw = bytearray(shard.read_bytes())
+    raw[len(raw) // 2] ^= 0xFF
+    shard.write_bytes(bytes(raw))
+
+    rng = dict(symbols=["600519.SH"], start=pd.Timestamp("2024-06-03"),
+               end=pd.Timestamp("2024-06-07"))
+    assert store.missing_ranges(**kw, **rng) == []
+    assert store.get_range(**kw, **rng).empty
+    assert store.missing_ranges(**kw, **rng) == [("600519.SH", "2024-06")]
+
+
+def test_legacy_shards_without_manifest_are_backfilled(tmp_path):
+    store = ParquetShardedBarStore(tmp_path)
+    df = _one_symbol_bars()
+    kw = dict(kind="daily", source_version="v1")
+    store.put_range(df, **kw)
+    next(tmp_path.rglob("_manifest.json")).unlink()
+
+    legacy = ParquetShardedBarStore(tmp_path)
+    rng = dict(symbols=["600519.SH"], start=pd.Timestamp("2024-06-03"),
+               end=pd.Timestamp("2024-06-07"))
+    assert legacy.missing_ranges(**kw, **rng) == []
+    assert len(legacy.shard_manifest(**kw)) == 1
+    assert len(legacy.get_range(**kw, **rng)) == len(df)
+
+
+def test_invalidate_range_updates_manifest(tmp_path, fake_bars):
+    store = ParquetShardedBarStore(tmp_path)
+    kw = dict(kind="daily", source_version="v1", freq="1d", adjust="backward")
+    store.put_range(fake_bars, **kw)
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    store.invalidate_range(kind="daily", symbols=[syms[0]], source_version="v1")
+
+    man = store.shard_manifest(**kw)
+    assert syms[0] not in man.index.get_level_values("symbol")
+    missing = store.missing_ranges(
+        symbols=syms, start=pd.Timestamp("2023-01-01"), end=pd.Timestamp("2023-06-30"), **kw,
+    )
+    assert {s for s, _ in missing} == {syms[0]}
+
+
+# ======================================================================
+# PartitionedParquetBarStore —— 一个月份一个多标的分区, 谓词下推读取
+# ======================================================================
+
+
+def test_partitioned_layout_one_file_per_month(tmp_path, fake_bars):
+    store = PartitionedParquetBarStore(tmp_path, row_group_size=16)
+    kw = dict(kind="daily", source_version="v1", freq="1d", adjust="backward")
+    store.put_range(fake_bars, **kw)
+    files = sorted(p.name for p in tmp_path.rglob("*.parquet"))
+    assert files == [f"2023-0{m}.parquet" for m in range(1, 7)]
+
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    got = store.get_range(
+        symbols=syms[1:3], start=pd.Timestamp("2023-02-10"), end=pd.Timestamp("2023-03-15"),
+        **kw,
+    )
+    dates = fake_bars.index.get_level_values("date")
+    want = fake_bars[
+        fake_bars.index.get_level_values("symbol").isin(syms[1:3])
+        & (dates >= "2023-02-10") & (dates <= "2023-03-15")
+    ].sort_index()
+    pd.testing.assert_frame_equal(got, want, check_freq=False)
+
+
+def test_partitioned_merge_and_invalidate(tmp_path, fake_bars):
+    store = PartitionedParquetBarStore(tmp_path)
+    kw = dict(kind="daily", source_version="v1")
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    sym_lvl = fake_bars.index.get_level_values("symbol")
+    # 分两批写同一月份: 不同标的合并进同一分区, 同键后写覆盖
+    store.put_range(fake_bars[sym_lvl == syms[0]], **kw)
+    store.put_range(fake_bars[sym_lvl != syms[0]], **kw)
+    patched = fake_bars[sym_lvl == syms[0]].copy()
+    patched["close"] = -1.0
+    store.put_range(patched, **kw)
+
+    rng = dict(start=pd.Timestamp("2023-01-01"), end=pd.Timestamp("2023-06-30"))
+    got = store.get_range(symbols=syms, **kw, **rng)
+    assert len(got) == len(fake_bars)
+    assert (got.xs(syms[0], level="symbol")["close"] == -1.0).all()
+
+    store.invalidate_range(kind="daily", symbols=[syms[0]], source_version="v1")
+    missing = store.missing_ranges(symbols=syms, **kw, **rng)
+    assert {s for s, _ in missing} == {syms[0]}
+    assert syms[0] not in store.get_range(symbols=syms, **kw, **rng).index.get_level_values(1)
+
+
+def test_partitioned_concurrent_writers_keep_each_others_rows(tmp_path, fake_bars):
+    from concurrent.futures import ThreadPoolExecutor
+
+    kw = dict(kind="daily", source_version="v1")
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    sym_lvl = fake_bars.index.get_level_values("symbol")
+
+    # 每个写者各持一份清单, 并发读-合并-重写同一批月份分区
+    def write(sym):
+        PartitionedParquetBarStore(tmp_path).put_range(fake_bars[sym_lvl == sym], **kw)
+
+    with ThreadPoolExecutor(max_workers=len(syms)) as pool:
+        list(pool.map(write, syms))
+
+    rng = dict(start=pd.Timestamp("2023-01-01"), end=pd.Timestamp("2023-06-30"))
+    store = PartitionedParquetBarStore(tmp_path)
+    assert len(store.get_range(symbols=syms, **kw, **rng)) == len(fake_bars)
+    assert store.missing_ranges(symbols=syms, **kw, **rng) == []
+
+
+def test_partitioned_intraday_end_is_inclusive(tmp_path):
+    import numpy as np
+
+    store = PartitionedParquetBarStore(tmp_path)
+    ts = pd.to_datetime(["2024-06-03 10:00", "2024-06-03 15:00", "2024-06-04 10:00"])
+    idx = pd.MultiIndex.from_product([ts, ["600519.SH"]], names=["timestamp", "symbol"])
+    df = pd.DataFrame({"close": np.arange(3.0)}, index=idx)
+    store.put_range(df, kind="intraday", source_version="v1", freq="30m")
+    got = store.get_range(
+        kind="intraday", symbols=["600519.SH"], start=pd.Timestamp("2024-06-03"),
+        end=pd.Timestamp("2024-06-03"), source_version="v1", freq="30m",
+    )
+    assert len(got) == 2
+
+
+# ======================================================================
+# 列投影下推 + 并行读分片
+# ======================================================================
+
+
+@pytest.mark.parametrize("store_factory", [
+    pytest.param(lambda: InMemoryShardedBarStore(), id="memory"),
+    pytest.param(lambda: ParquetShardedBarStore(tempfile.mkdtemp(), max_workers=4), id="parquet"),
+    pytest.param(lambda: PartitionedParquetBarStore(tempfile.mkdtemp()), id="partitioned"),
+    pytest.param(lambda: ArrowIpcBarStore(tempfile.mkdtemp()), id="arrow"),
+    pytest.param(lambda: ArrowIpcBarStore(tempfile.mkdtemp(), compression="lz4"), id="arrow-lz4"),
+])
+def test_get_range_column_projection(store_factory, fake_bars):
+    store = store_factory()
+    kw = dict(kind="daily", source_version="v1", freq="1d", adjust="backward")
+    store.put_range(fake_bars, **kw)
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    rng = dict(symbols=syms, start=pd.Timestamp("2023-01-01"), end=pd.Timestamp("2023-06-30"))
+    got = store.get_range(columns=["close", "no_such_column"], **rng, **kw)
+    assert list(got.columns) == ["close"]
+    assert list(got.index.names) == ["date", "symbol"]
+    full = store.get_range(**rng, **kw)
+    pd.testing.assert_series_equal(got["close"], full["close"])
+
+
+def test_parallel_reads_match_serial(tmp_path, fake_bars):
+    kw = dict(kind="daily", source_version="v1")
+    ParquetShardedBarStore(tmp_path).put_range(fake_bars, **kw)
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    rng = dict(symbols=syms, start=pd.Timestamp("2023-01-01"), end=pd.Timestamp("2023-06-30"))
+    serial = ParquetShardedBarStore(tmp_path, max_workers=1).get_range(**rng, **kw)
+    parallel = ParquetShardedBarStore(tmp_path, max_workers=8).get_range(**rng, **kw)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_datalayer_daily_columns_projection():
+    src = FakeDataSource(seed=5, n_symbols=3, start_year=2022)
+    data = DataLayer(source=src)
+    df = data.daily(src.all_symbols, "2023-02-01", "2023-03-31", columns=["close", "volume"])
+    assert list(df.columns) == ["close", "volume"]
+    full = data.daily(src.all_symbols, "2023-02-01", "2023-03-31")
+    pd.testing.assert_frame_equal(df, full[["close", "volume"]])
+
+
+# ======================================================================
+# append 写入模式 + compact
+# ======================================================================
+
+
+def test_append_mode_writes_deltas_and_compacts(tmp_path, fake_bars):
+    store = ParquetShardedBarStore(tmp_path, write_mode="append")
+    kw = dict(kind="daily", source_version="v1", freq="1d")
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    dates = fake_bars.index.get_level_values("date")
+    first = fake_bars[dates < "2023-06-15"]
+    store.put_range(first, **kw)
+    base_files = {p: p.stat().st_mtime_ns for p in tmp_path.rglob("2023-06.parquet")}
+
+    # 追加当月新行 + 改写一个旧行(后写覆盖)
+    tail = fake_bars[dates >= "2023-06-15"].copy()
+    fix = first[first.index.get_level_values("date") == first.index[-1][0]].copy()
+    fix["close"] = -1.0
+    store.put_range(pd.concat([tail, fix]), **kw)
+
+    # 基础分片未被重写, 只多了增量文件
+    assert {p: p.stat().st_mtime_ns for p in tmp_path.rglob("2023-06.parquet")} == base_files
+    assert list(tmp_path.rglob("*.delta.*.parquet"))
+    assert store.shard_manifest(**kw)["deltas"].max() == 1
+
+    rng = dict(symbols=syms, start=pd.Timestamp("2023-01-01"), end=pd.Timestamp("2023-06-30"))
+    want = fake_bars.copy()
+    want.loc[fix.index, "close"] = -1.0
+    got = store.get_range(**rng, **kw)
+    pd.testing.assert_frame_equal(got, want.sort_index(), check_freq=False)
+    assert store.missing_ranges(**rng, **kw) == []
+
+    with pytest.raises(ValueError, match="kind"):
+        store.compact(source_version="v1")
+    stats = store.compact()
+    assert stats["shards"] == len(syms) and stats["deltas"] == len(syms)
+    assert not list(tmp_path.rglob("*.delta.*.parquet"))
+    assert store.shard_manifest(**kw)["deltas"].max() == 0
+    pd.testing.assert_frame_equal(
+        ParquetShardedBarStore(tmp_path).get_range(**rng, **kw), got,
+    )
+
+
+def test_append_mode_corrupt_delta_discards_shard(tmp_path):
+    store = ParquetShardedBarStore(tmp_path, write_mode="append")
+    kw = dict(kind="daily", source_version="v1")
+    df = _one_symbol_bars(10)
+    store.put_range(df.iloc[:5], **kw)
+    store.put_range(df.iloc[5:], **kw)
+    delta = next(tmp_path.rglob("*.delta.*.parquet"))
+    raw = bytearray(delta.read_bytes())
+    raw[len(raw) // 2] ^= 0xFF
+    delta.write_bytes(bytes(raw))
+
+    rng = dict(symbols=["600519.SH"], start=pd.Timestamp("2024-06-01"),
+               end=pd.Timestamp("2024-06-30"))
+    assert store.get_range(**rng, **kw).empty
+    assert store.missing_ranges(**rng, **kw) == [("600519.SH", "2024-06")]
+
+
+def test_size_mismatch_discards_base_and_deltas(tmp_path):
+    """stat 发现大小不符: 基础分片与增量一并删除, 之后不会把基础分片当旧格式回填."""
+    store = ParquetShardedBarStore(tmp_path, write_mode="append")
+    kw = dict(kind="daily", source_version="v1")
+    df = _one_symbol_bars(10)
+    store.put_range(df.iloc[:5], **kw)
+    store.put_range(df.iloc[5:], **kw)
+    base = next(p for p in tmp_path.rglob("*.parquet") if ".delta." not in p.name)
+    base.write_bytes(base.read_bytes() + b"\0")
+
+    rng = dict(symbols=["600519.SH"], start=pd.Timestamp("2024-06-01"),
+               end=pd.Timestamp("2024-06-30"))
+    assert store.missing_ranges(**rng, **kw) == [("600519.SH", "2024-06")]
+    assert not list(tmp_path.rglob("*.parquet"))
+    assert store.missing_ranges(**rng, **kw) == [("600519.SH", "2024-06")]
+
+
+def test_cli_store_compact(tmp_path, capsys):
+    from qlab.cli import main
+
+    store = ParquetShardedBarStore(tmp_path / "store" / "bars", write_mode="append")
+    df = _one_symbol_bars(10)
+    store.put_range(df.iloc[:5], kind="daily", source_version="v1")
+    store.put_range(df.iloc[5:], kind="daily", source_version="v1")
+    assert main(["--root", str(tmp_path), "store", "compact", "--kind", "daily"]) == 0
+    assert "合并 1 个增量" in capsys.readouterr().out
+    assert not list(tmp_path.rglob("*.delta.*.parquet"))
+
+
+# ======================================================================
+# ArrowIpcBarStore + 后端互转
+# ======================================================================
+
+
+def test_arrow_store_layout_and_symbol_slices(tmp_path, fake_bars):
+    store = ArrowIpcBarStore(tmp_path)
+    kw = dict(kind="daily", source_version="v1", freq="1d", adjust="backward")
+    store.put_range(fake_bars, **kw)
+    files = sorted(p.name for p in tmp_path.rglob("*.arrow"))
+    assert files == [f"2023-0{m}.arrow" for m in range(1, 7)]
+
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    got = store.get_range(
+        symbols=[syms[2], syms[0]], start=pd.Timestamp("2023-02-10"),
+        end=pd.Timestamp("2023-03-15"), **kw,
+    )
+    dates = fake_bars.index.get_level_values("date")
+    want = fake_bars[
+        fake_bars.index.get_level_values("symbol").isin([syms[0], syms[2]])
+        & (dates >= "2023-02-10") & (dates <= "2023-03-15")
+    ].sort_index()
+    pd.testing.assert_frame_equal(got, want, check_freq=False)
+
+
+def test_arrow_store_corrupt_partition_is_missing(tmp_path, fake_bars):
+    store = ArrowIpcBarStore(tmp_path)
+    kw = dict(kind="daily", source_version="v1")
+    store.put_range(fake_bars, **kw)
+    part = next(tmp_path.rglob("2023-02.arrow"))
+    part.write_bytes(b"garbage")
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    rng = dict(start=pd.Timestamp("2023-01-01"), end=pd.Timestamp("2023-06-30"))
+    got = store.get_range(symbols=syms, **kw, **rng)
+    assert (got.index.get_level_values("date").month != 2).all()
+    assert {ym for _, ym in store.missing_ranges(symbols=syms, **kw, **rng)} == {"2023-02"}
+
+
+@pytest.mark.parametrize("src_cls,dst_cls", [
+    (ParquetShardedBarStore, ArrowIpcBarStore),
+    (ArrowIpcBarStore, ParquetShardedBarStore),
+    (PartitionedParquetBarStore, ArrowIpcBarStore),
+])
+def test_convert_bar_store_roundtrip(tmp_path, fake_bars, src_cls, dst_cls):
+    from qlab.data import convert_bar_store
+
+    src, dst = src_cls(tmp_path / "src"), dst_cls(tmp_path / "dst")
+    kw = dict(kind="daily", source_version="v1", freq="1d", adjust="backward")
+    src.put_range(fake_bars, **kw)
+    assert convert_bar_store(src, dst) == len(fake_bars)
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    rng = dict(symbols=syms, start=pd.Timestamp("2023-01-01"), end=pd.Timestamp("2023-06-30"))
+    assert dst.missing_ranges(**rng, **kw) == []
+    pd.testing.assert_frame_equal(
+        dst.get_range(**rng, **kw), src.get_range(**rng, **kw), check_freq=False,
+    )
+
+
+def test_workspace_bar_store_backends_and_cli_convert(tmp_path, capsys):
+    from qlab.cli import main
+    from qlab.core.exceptions import QlabError
+    from qlab.workspace import Workspace
+
+    ws = Workspace(tmp_path, "demo")
+    assert isinstance(ws.bar_store(), ParquetShardedBarStore)
+    assert isinstance(ws.bar_store("arrow"), ArrowIpcBarStore)
+    with pytest.raises(QlabError, match="未知 bar_store 后端"):
+        ws.bar_store("hdf5")
+    assert ws.bar_store(write_mode="append").write_mode == "append"
+    with pytest.raises(QlabError, match="write_mode"):
+        ws.bar_store("arrow", write_mode="append")
+
+    df = _one_symbol_bars(10)
+    ws.bar_store().put_range(df, kind="daily", source_version="v1")
+    assert main(["--root", str(tmp_path), "store", "convert", "parquet", "arrow"]) == 0
+    assert "已转换 10 行" in capsys.readouterr().out
+    got = ws.bar_store("arrow").get_range(
+        kind="daily", symbols=["600519.SH"], start=df.index[0][0], end=df.index[-1][0],
+        source_version="v1",
+    )
+    pd.testing.assert_frame_equal(got, df, check_freq=False)
+
+
+# ======================================================================
+# CachingShardedBarStore —— 进程内 LRU
+# ======================================================================
+
+
+class _CountingStore(InMemoryShardedBarStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.reads: list[list[str] | None] = []
+        self.rects: list[tuple] = []
+
+    def get_range(self, **kw):
+        self.reads.append(kw.get("columns"))
+        self.rects.append((tuple(kw["symbols"]), kw["start"], kw["end"]))
+        return super().get_range(**kw)
+
+
+def test_caching_store_serves_repeat_reads_from_memory(fake_bars):
+    from qlab.data import CachingShardedBarStore
+
+    inner = _CountingStore()
+    store = CachingShardedBarStore(inner)
+    kw = dict(kind="daily", source_version="v1", freq="1d")
+    store.put_range(fake_bars, **kw)
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    rng = dict(symbols=syms, start=pd.Timestamp("2023-01-01"), end=pd.Timestamp("2023-06-30"))
+
+    close = store.get_range(columns=["close"], **rng, **kw)
+    again = store.get_range(columns=["close"], **rng, **kw)
+    narrower = store.get_range(
+        columns=["close"], symbols=syms[:2], start=pd.Timestamp("2023-03-05"),
+        end=pd.Timestamp("2023-03-20"), source_version="v1", kind="daily", freq="1d",
+    )
+    assert inner.reads == [["close"]]
+    pd.testing.assert_frame_equal(close, again)
+    assert len(narrower) < len(close)
+
+    # 新列只补读缺的部分, 已读列保留
+    both = store.get_range(columns=["close", "volume"], **rng, **kw)
+    assert inner.reads[-1] == ["volume"] and len(inner.reads) == 2
+    pd.testing.assert_frame_equal(both, fake_bars[["close", "volume"]].sort_index(),
+                                  check_freq=False)
+    assert store.stats()["hits"] > 0
+
+    # put_range 让被写到的单元失效
+    patched = fake_bars[fake_bars.index.get_level_values("symbol") == syms[0]].copy()
+    patched["close"] = -1.0
+    store.put_range(patched, **kw)
+    got = store.get_range(columns=["close"], **rng, **kw)
+    assert (got.xs(syms[0], level="symbol")["close"] == -1.0).all()
+
+
+def test_caching_store_reads_misses_as_rectangles(fake_bars):
+    """全体标的缺当月 + 一只新标的缺整段: 拆成两个矩形读, 不按外接矩形重读全宇宙."""
+    from qlab.data import CachingShardedBarStore
+
+    inner = _CountingStore()
+    store = CachingShardedBarStore(inner)
+    kw = dict(kind="daily", source_version="v1")
+    store.put_range(fake_bars, **kw)
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    store.get_range(symbols=syms[:3], start=pd.Timestamp("2023-01-01"),
+                    end=pd.Timestamp("2023-05-31"), **kw)
+    inner.rects.clear()
+
+    got = store.get_range(symbols=syms, start=pd.Timestamp("2023-01-01"),
+                          end=pd.Timestamp("2023-06-30"), **kw)
+    pd.testing.assert_frame_equal(got, fake_bars.sort_index(), check_freq=False)
+    assert sorted(inner.rects) == sorted([
+        (tuple(syms[:3]), pd.Timestamp("2023-06-01"), pd.Timestamp("2023-06-30")),
+        ((syms[3],), pd.Timestamp("2023-01-01"), pd.Timestamp("2023-06-30")),
+    ])
+
+
+def test_caching_store_revalidates_on_shard_mtime(tmp_path, fake_bars):
+    from qlab.data import CachingShardedBarStore
+
+    kw = dict(kind="daily", source_version="v1")
+    writer = ParquetShardedBarStore(tmp_path)
+    writer.put_range(fake_bars, **kw)
+    cached = CachingShardedBarStore(ParquetShardedBarStore(tmp_path))
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    rng = dict(symbols=syms, start=pd.Timestamp("2023-01-01"), end=pd.Timestamp("2023-06-30"))
+    cached.get_range(**rng, **kw)
+
+    # 另一个 store 实例(相当于另一个进程)改写分片 → 戳变化 → 缓存过期
+    patched = fake_bars[fake_bars.index.get_level_values("symbol") == syms[1]].copy()
+    patched["close"] = -2.0
+    writer.put_range(patched, **kw)
+    got = cached.get_range(**rng, **kw)
+    assert (got.xs(syms[1], level="symbol")["close"] == -2.0).all()
+
+
+def test_caching_store_respects_byte_budget(fake_bars):
+    from qlab.data import CachingShardedBarStore
+
+    store = CachingShardedBarStore(InMemoryShardedBarStore(), max_bytes=20_000)
+    kw = dict(kind="daily", source_version="v1")
+    store.put_range(fake_bars, **kw)
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    out = store.get_range(symbols=syms, start=pd.Timestamp("2023-01-01"),
+                          end=pd.Timestamp("2023-06-30"), **kw)
+    assert len(out) == len(fake_bars)
+    st = store.stats()
+    assert st["bytes"] <= 20_000 and st["evictions"] > 0
+
+
+# ======================================================================
+# 缺失补拉规划 —— 只取真正缺的 (symbol, 月份)
+# ======================================================================
+
+
+def _cells(rects) -> set[tuple[str, str]]:
+    return {
+        (s, str(p)) for r in rects for s in r.symbols
+        for p in pd.period_range(r.first_month, r.last_month, freq="M")
+    }
+
+
+def test_plan_fetches_new_listing_does_not_refetch_history():
+    from qlab.data.fetch_plan import plan_fetches
+
+    months = [str(p) for p in pd.period_range("2015-01", "2024-12", freq="M")]
+    old = [f"{i:06d}.SZ" for i in range(50)]
+    # 老标的只缺最新一个月; 新标的缺十年
+    missing = [(s, "2024-12") for s in old] + [("688999.SH", m) for m in months]
+    rects = plan_fetches(missing, max_requests=8)
+    assert _cells(rects) == set(missing)
+    assert sum(r.n_cells for r in rects) == len(missing)
+    assert len(rects) == 2
+
+    # 预算为 1 退化为外接矩形
+    (bbox,) = plan_fetches(missing, max_requests=1)
+    assert (bbox.first_month, bbox.last_month) == ("2015-01", "2024-12")
+    assert len(bbox.symbols) == 51
+
+
+def test_plan_fetches_respects_budget_and_covers_gaps():
+    import numpy as np
+
+    from qlab.data.fetch_plan import plan_fetches
+
+    rng = np.random.default_rng(3)
+    months = [str(p) for p in pd.period_range("2020-01", "2021-12", freq="M")]
+    missing = {(f"S{i:03d}", m) for i in range(40) for m in months if rng.random() < 0.2}
+    for budget in (1, 3, 10, 1000):
+        rects = plan_fetches(missing, max_requests=budget)
+        assert len(rects) <= budget
+        assert _cells(rects) >= missing
+    exact = plan_fetches(missing, max_requests=1000)
+    assert sum(r.n_cells for r in exact) == len(missing)
+    assert plan_fetches([], max_requests=4) == []
+
+
+def test_datalayer_fetches_only_missing_rectangles():
+    src = FakeDataSource(seed=5, n_symbols=4, start_year=2022)
+    data = DataLayer(source=src, bar_store=InMemoryShardedBarStore())
+    syms = src.all_symbols
+    data.daily(syms[:3], "2023-01-01", "2023-05-31", validate=False)
+
+    calls = []
+    orig = src.fetch_bars
+
+    def spy(symbols, start, end, *a, **k):
+        calls.append((tuple(symbols), start, end))
+        return orig(symbols, start, end, *a, **k)
+
+    src.fetch_bars = spy
+    data.daily(syms, "2023-01-01", "2023-06-30", validate=False)
+    assert sorted(calls) == sorted([
+        ((syms[3],), pd.Timestamp("2023-01-01"), pd.Timestamp("2023-06-30")),
+        (tuple(syms[:3]), pd.Timestamp("2023-06-01"), pd.Timestamp("2023-06-30")),
+    ])
+
+
+# ======================================================================
+# 缺失补拉并发 —— 冷缓存耗时取决于最慢的一次调用
+# ======================================================================
+
+
+class _SlowSource(FakeDataSource):
+    """每次远程调用睡 ``delay`` 秒, 记录同时在途的请求数; K 线不带股本列."""
+
+    bars_include_shares = False
+
+    def __init__(self, delay: float, **kw) -> None:
+        import threading
+
+        super().__init__(**kw)
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _slow(self, fn, *args):
+        import time
+
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def fetch_bars(self, symbols, start, end, *a, **k):
+        bars = super().fetch_bars(symbols, start, end, *a, **k)
+        return self._slow(lambda: bars.drop(
+            columns=["total_shares", "float_shares", "free_float_shares"]))
+
+    def fetch_share_capital(self, symbols, start, end):
+        return self._slow(super().fetch_share_capital, symbols, start, end)
+
+    def fetch_status_overrides(self, symbols, start, end):
+        return self._slow(super().fetch_status_overrides, symbols, start, end)
+
+
+def test_datalayer_fetches_source_calls_concurrently():
+    import time
+
+    kw = dict(seed=8, n_symbols=3, start_year=2022)
+    syms = FakeDataSource(**kw).all_symbols
+
+    serial_src = _SlowSource(0.0, **kw)
+    serial = DataLayer(source=serial_src, fetch_workers=1).daily(
+        syms, "2023-01-01", "2023-03-31", validate=False)
+
+    src = _SlowSource(0.2, **kw)
+    data = DataLayer(source=src, fetch_workers=8, source_concurrency=3)
+    t0 = time.perf_counter()
+    got = data.daily(syms, "2023-01-01", "2023-03-31", validate=False)
+    elapsed = time.perf_counter() - t0
+    pd.testing.assert_frame_equal(got, serial)
+    assert src.peak == 3 and serial_src.peak == 1
+    assert elapsed < 0.5, f"三类调用应并发: {elapsed:.2f}s"
+
+
+# ======================================================================
+# 校验记账 —— 缓存分片只校验一次; DailyBar 不变量单趟检查
+# ======================================================================
+
+
+def test_daily_bar_invariants_report_each_violation():
+    from qlab.core.exceptions import SchemaViolationError
+    from qlab.core.schema import SCHEMA_DAILY_BAR, validate_schema
+
+    src = FakeDataSource(seed=3, n_symbols=3, start_year=2022)
+    df = src.fetch_bars(src.all_symbols, pd.Timestamp("2023-01-01"), pd.Timestamp("2023-02-28"))
+    validate_schema(df, SCHEMA_DAILY_BAR)
+
+    bad = df.copy()
+    bad.iloc[0, bad.columns.get_loc("is_limit_up")] = True
+    bad.iloc[0, bad.columns.get_loc("is_limit_down")] = True
+    bad.iloc[1, bad.columns.get_loc("high_raw")] = bad["low_raw"].iloc[1] - 1.0
+    bad.iloc[2, bad.columns.get_loc("free_float_shares")] = bad["float_shares"].iloc[2] * 2
+    with pytest.raises(SchemaViolationError) as exc:
+        validate_schema(bad, SCHEMA_DAILY_BAR)
+    msg = str(exc.value)
+    assert "同时涨停+跌停: 1 行" in msg
+    assert "OHLC_raw 序关系破坏: 1 行" in msg
+    assert "股本大小关系破坏: 1 行" in msg
+
+    # 抽检: 抽不到坏行就放行, 索引/dtype 仍全量检查
+    validate_schema(bad.iloc[4:], SCHEMA_DAILY_BAR, sample_rows=10)
+
+
+def test_datalayer_validates_cached_shards_once(tmp_path, monkeypatch):
+    import qlab.data.layer as layer_mod
+
+    calls = []
+    real = layer_mod.validate_schema
+
+    def counting(df, schema, **kw):
+        calls.append((schema.name, len(df), kw.get("sample_rows")))
+        return real(df, schema, **kw)
+
+    monkeypatch.setattr(layer_mod, "validate_schema", counting)
+    src = FakeDataSource(seed=4, n_symbols=3, start_year=2022)
+    store = ParquetShardedBarStore(tmp_path)
+    syms = src.all_symbols
+
+    DataLayer(source=src, bar_store=store).daily(syms, "2023-01-01", "2023-03-31")
+    assert [c[0] for c in calls] == ["DailyBar"]  # 落盘时校验一次, 读取据记账跳过
+
+    calls.clear()
+    fresh = DataLayer(source=src, bar_store=ParquetShardedBarStore(tmp_path))
+    fresh.daily(syms, "2023-01-10", "2023-03-20")
+    assert calls == []
+    fresh.daily(syms, "2023-01-10", "2023-03-20", validate="sample")
+    assert calls[-1][2] is not None
+
+    # 追加增量让记账失效: 再读时整段重新校验, 通过后重新记账
+    calls.clear()
+    extra = src.fetch_bars(syms[:1], pd.Timestamp("2023-02-01"), pd.Timestamp("2023-02-10"))
+    store.put_range(extra, kind="daily", source_version=src.source_version,
+                    freq="1d", adjust="backward")
+    fresh.daily(syms, "2023-01-01", "2023-03-31")
+    assert len(calls) == 1
+    calls.clear()
+    fresh.daily(syms, "2023-01-01", "2023-03-31")
+    assert calls == []
+
+
+@pytest.mark.parametrize("store_factory", [
+    pytest.param(lambda: InMemoryShardedBarStore(), id="memory"),
+    pytest.param(lambda: PartitionedParquetBarStore(tempfile.mkdtemp()), id="partitioned"),
+    pytest.param(lambda: ArrowIpcBarStore(tempfile.mkdtemp()), id="arrow"),
+])
+def test_validation_marks_cleared_by_rewrite(store_factory, fake_bars):
+    store = store_factory()
+    syms = sorted(fake_bars.index.get_level_values("symbol").unique())
+    keys = dict(kind="daily", source_version="v1", freq="1d", adjust="backward")
+    rng = dict(start=pd.Timestamp("2023-01-01"), end=pd.Timestamp("2023-06-30"))
+    store.put_range(fake_bars, **keys)
+    assert not store.is_validated(symbols=syms, schema="DailyBar", **rng, **keys)
+    store.mark_validated(symbols=syms, schema="DailyBar", **rng, **keys)
+    assert store.is_validated(symbols=syms, schema="DailyBar", **rng, **keys)
+    assert not store.is_validated(symbols=syms, schema="Other", **rng, **keys)
+
+    march = fake_bars[fake_bars.index.get_level_values("date").month == 3]
+    store.put_range(march, **keys)
+    assert not store.is_validated(symbols=syms, schema="DailyBar", **rng, **keys)
+    assert store.is_validated(symbols=syms, schema="DailyBar", start=rng["start"],
+                              end=pd.Timestamp("2023-02-28"), **keys)
+
+
+# ======================================================================
+# 财务按 (symbol, 披露月) 分片 —— 投资域增删标的只补拉新增部分
+# ======================================================================
+
+
+@pytest.mark.parametrize("store_factory", [
+    pytest.param(lambda: InMemoryShardedBarStore(), id="memory"),
+    pytest.param(lambda: ParquetShardedBarStore(tempfile.mkdtemp()), id="parquet"),
+    pytest.param(lambda: PartitionedParquetBarStore(tempfile.mkdtemp()), id="partitioned"),
+    pytest.param(lambda: ArrowIpcBarStore(tempfile.mkdtemp()), id="arrow"),
+])
+def test_fundamentals_fetch_only_missing_symbols(store_factory):
+    src = FakeDataSource(seed=6, n_symbols=4, start_year=2021)
+    syms = src.all_symbols
+    data = DataLayer(source=src, bar_store=store_factory())
+    first = data.fundamentals(syms[:3], "2022-01-01", "2023-12-31")
+    assert set(first["symbol"]) == set(syms[:3])
+
+    calls = []
+    orig = src.fetch_fundamentals
+
+    def spy(symbols, start, end, *a, **k):
+        calls.append(tuple(symbols))
+        return orig(symbols, start, end, *a, **k)
+
+    src.fetch_fundamentals = spy
+    subset = data.fundamentals(syms[1:3], "2022-03-05", "2023-06-20")
+    assert calls == []
+    assert set(subset["symbol"]) == set(syms[1:3])
+    pd.testing.assert_frame_equal(
+        subset.reset_index(drop=True),
+        first[first["symbol"].isin(syms[1:3])
+              & first["announce_date"].between("2022-03-01", "2023-06-30")].reset_index(drop=True),
+    )
+
+    grown = data.fundamentals(syms, "2022-01-01", "2023-12-31")
+    assert calls == [(syms[3],)]
+    assert set(grown["symbol"]) == set(syms)
+
+
+@pytest.mark.parametrize("store_factory", [
+    pytest.param(lambda: InMemoryShardedBarStore(), id="memory"),
+    pytest.param(lambda: ParquetShardedBarStore(tempfile.mkdtemp()), id="parquet"),
+    pytest.param(lambda: PartitionedParquetBarStore(tempfile.mkdtemp()), id="partitioned"),
+    pytest.param(lambda: ArrowIpcBarStore(tempfile.mkdtemp()), id="arrow"),
+])
+def test_fundamentals_keep_reports_announced_same_day(store_factory):
+    """年报与次年一季报同日披露: 分片按报告期区分, 两份都保留."""
+    src = FakeDataSource(seed=6, n_symbols=1, start_year=2023)
+    sym = src.all_symbols[0]
+    announce = pd.Timestamp("2024-04-26")
+
+    def same_day(symbols, start, end, *a, **k):
+        return pd.DataFrame([
+            {"report_period": pd.Timestamp(period), "symbol": sym,
+             "report_type": "official", "announce_date": announce,
+             "available_at": announce + pd.Timedelta(hours=9, minutes=30),
+             "fiscal_year": year, "fiscal_quarter": quarter, "source": "stub",
+             "net_profit": profit}
+            for period, year, quarter, profit in [
+                ("2023-12-31", 2023, 4, 400.0), ("2024-03-31", 2024, 1, 100.0),
+            ]
+        ])
+
+    src.fetch_fundamentals = same_day
+    data = DataLayer(source=src, bar_store=store_factory())
+    df = data.fundamentals([sym], "2024-01-01", "2024-06-30")
+    got = df.set_index("report_period")["net_profit"].sort_index()
+    assert got.to_dict() == {pd.Timestamp("2023-12-31"): 400.0,
+                             pd.Timestamp("2024-03-31"): 100.0}
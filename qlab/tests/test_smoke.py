@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+import subprocess
+import sys
+
 import numpy as np
 import pandas as pd
 import pytest
@@ -17,6 +20,58 @@ def test_core_imports():
     assert Freq.DAILY == "1d"
 
 
+_IMPORT_BUDGET_US = 100_000  # `import qlab` 累计耗时上限(微秒)
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True,
+                          check=True, timeout=120)
+
+
+def test_import_qlab_within_startup_budget():
+    """`import qlab` 不得拖入 pandas/sklearn/exchange_calendars, 且在固定预算内."""
+    out = _run_python("-X", "importtime", "-c", "import qlab")
+    cumulative = {}
+    for line in out.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cum, name = line.split("|")
+            if cum.strip().isdigit():
+                cumulative[name.strip()] = int(cum)
+    assert cumulative["qlab"] < _IMPORT_BUDGET_US, cumulative["qlab"]
+    for heavy in ("pandas", "sklearn", "scipy", "yaml", "exchange_calendars"):
+        assert heavy not in cumulative, f"import qlab 拖入了 {heavy}"
+
+    # 子包导出按需加载: 只导入包不触发其子模块
+    probe = (
+        "import sys, qlab.models, qlab.evaluation, qlab.workspace, qlab.labeling, qlab.data\n"
+        "print(sorted(m for m in ('pandas', 'sklearn', 'scipy', 'yaml') if m in sys.modules))"
+    )
+    assert _run_python("-c", probe).stdout.strip() == "[]"
+
+
+def test_feature_library_registers_lazily_by_name():
+    probe = (
+        "import sys\n"
+        "from qlab.features import registry\n"
+        "from qlab.features.library import FEATURE_INDEX\n"
+        "n = len(registry)  # 计入待导入的登记名, 不触发导入\n"
+        "assert n == sum(map(len, FEATURE_INDEX.values())), n\n"
+        "assert registry.get('rv_20d').meta.name == 'rv_20d'\n"
+        "loaded = sorted(m for m in FEATURE_INDEX if m in sys.modules)\n"
+        "assert loaded == ['qlab.features.library.volatility'], loaded\n"
+        "assert 'qlab.core.calendar' not in sys.modules or "
+        "sys.modules['qlab.core.calendar']._default_calendar is None\n"
+        "assert 'exchange_calendars' not in sys.modules\n"
+        "by_module = {}\n"
+        "for name in registry.all_names():\n"
+        "    by_module.setdefault(type(registry.get(name)).__module__, set()).add(name)\n"
+        "assert by_module == {m: set(n) for m, n in FEATURE_INDEX.items()}, by_module\n"
+        "assert len(registry) == n\n"
+        "print('ok')"
+    )
+    assert _run_python("-c", probe).stdout.strip() == "ok"
+
+
 def test_calendar():
     from qlab.core.calendar import get_default_calendar
     cal = get_default_calendar()
@@ -24,6 +79,39 @@ def test_calendar():
     assert cal.is_trading_day(pd.Timestamp("2024-01-02"))
 
 
+def test_calendar_vectorized_shift_matches_sessions():
+    from qlab.core.calendar import get_default_calendar
+    cal = get_default_calendar()
+    sessions = cal.trading_days(pd.Timestamp("2023-01-01"), pd.Timestamp("2024-12-31"))
+    # 含周末/节假日(非交易日)与 NaT
+    dates = pd.DatetimeIndex(pd.date_range("2023-06-01", "2024-06-30").tolist() + [pd.NaT])
+    pos = {d: i for i, d in enumerate(sessions)}
+
+    def ref_next(d, n):
+        i = sessions.searchsorted(d, side="left")
+        return sessions[i + n] if d in pos else sessions[i + n - 1]
+
+    def ref_prev(d, n):
+        return sessions[sessions.searchsorted(d, side="left") - n]
+
+    for n in (1, 5):
+        fwd = cal.shift_sessions(dates, n)
+        back = cal.shift_sessions(dates, -n)
+        assert pd.isna(fwd[-1]) and pd.isna(back[-1])
+        assert list(fwd[:-1]) == [ref_next(d, n) for d in dates[:-1]]
+        assert list(back[:-1]) == [ref_prev(d, n) for d in dates[:-1]]
+        assert cal.next_trading_day(dates[5], n) == fwd[5]
+        assert cal.prev_trading_day(dates[5], n) == back[5]
+
+    assert (cal.session_ordinal(sessions) == cal.session_ordinal(sessions[0])[0]
+            + np.arange(len(sessions))).all()
+    counts = cal.sessions_between(dates[:-1], dates[:-1] + pd.Timedelta(days=30))
+    assert counts[0] == cal.count_trading_days(dates[0], dates[0] + pd.Timedelta(days=30))
+    with pytest.raises(IndexError, match="超出日历范围"):
+        cal.shift_sessions(sessions[-1:], 10_000)
+    assert pd.isna(cal.shift_sessions(sessions[-1:], 10_000, errors="coerce")[0])
+
+
 def test_parallel_linear_partition():
     from qlab.core.parallel import linear_partitions
     parts = linear_partitions(100, 4)
@@ -57,6 +145,177 @@ def test_data_layer():
     assert not df.empty
 
 
+def test_daily_panels_match_unstack_and_are_memoized(monkeypatch):
+    from qlab.data import DataLayer
+    from qlab.data.sources import FakeDataSource
+    from qlab.features.context import FeatureContext
+
+    data = DataLayer(source=FakeDataSource(seed=1, n_symbols=5))
+    uni = data.universe("csi500", "2023-01-01", "2023-03-31")
+    syms = uni.all_symbols()
+    long = data.daily(syms, "2023-01-01", "2023-03-31", validate=False)
+
+    calls = []
+    orig = data.daily
+    monkeypatch.setattr(data, "daily", lambda *a, **k: calls.append(k["columns"]) or orig(*a, **k))
+    panel = data.daily_panels(syms, "2023-01-01", "2023-03-31", ["close", "is_suspended"])
+    for f in ("close", "is_suspended"):
+        want = long[f].unstack("symbol")
+        got = panel.frame(f)
+        assert got.index.equals(want.index) and got.columns.equals(want.columns)
+        assert panel[f].flags.c_contiguous and not panel[f].flags.writeable
+    assert panel["close"].dtype == np.float64 and panel["is_suspended"].dtype == bool
+    pd.testing.assert_frame_equal(
+        panel.frame("close"), long["close"].unstack("symbol"), check_freq=False,
+    )
+
+    # 同 (区间, 投资域) 命中记忆; 新字段只补读该列
+    again = data.daily_panels(syms, "2023-01-01", "2023-03-31", ["close", "volume"])
+    assert calls == [["close", "is_suspended"], ["volume"]]
+    assert again["close"] is panel["close"]
+
+    days = data.calendar.trading_days(pd.Timestamp("2023-03-01"), pd.Timestamp("2023-03-31"))
+    ctx = FeatureContext(data=data, target_dates=days, universe=uni, calendar=data.calendar)
+    wide = ctx.panel("close", lookback_days=5)
+    want = ctx.daily(["close"], lookback_days=5)["close"].unstack("symbol")
+    pd.testing.assert_frame_equal(wide, want, check_freq=False)
+
+
+def test_fundamental_panel_matches_per_date_as_of():
+    from qlab.data import DataLayer
+    from qlab.data.sources import FakeDataSource
+
+    src = FakeDataSource(seed=6, n_symbols=5, start_year=2020)
+    data = DataLayer(source=src)
+    syms = src.all_symbols
+    dates = data.calendar.trading_days(pd.Timestamp("2022-01-01"), pd.Timestamp("2023-06-30"))
+    for field in ("equity_to_shareholders", "forecast_net_profit_min"):
+        wide = data.fundamental_panel(syms, field, dates)
+        assert wide.shape == (len(dates), len(syms))
+        for d in dates[::20]:
+            want = data.fundamental_as_of(syms, field, d).reindex(syms)
+            np.testing.assert_allclose(wide.loc[d].to_numpy(float), want.to_numpy(float))
+
+
+def test_fundamental_shards_log_rows_without_announce_date(caplog):
+    from qlab.data.layer import _fundamental_shards
+
+    raw = pd.DataFrame({
+        "symbol": "A", "report_type": "official",
+        "report_period": pd.to_datetime(["2023-03-31", "2023-06-30"]),
+        "announce_date": pd.to_datetime(["2023-04-20", None]),
+        "net_profit": [1.0, 2.0],
+    })
+    with caplog.at_level("WARNING", logger="qlab.data.layer"):
+        got = _fundamental_shards(raw)
+    assert len(got) == 1
+    assert "1 行缺披露日" in caplog.text
+
+
+def test_fundamental_ttm_panel_matches_ttm_value():
+    from qlab.data import DataLayer
+    from qlab.data.fundamentals import PITIndex, ttm_frame, ttm_value
+    from qlab.data.sources import FakeDataSource
+
+    src = FakeDataSource(seed=6, n_symbols=5, start_year=2020)
+    data = DataLayer(source=src)
+    syms = src.all_symbols
+    field = "net_profit_to_shareholders"
+    dates = data.calendar.trading_days(pd.Timestamp("2022-01-01"), pd.Timestamp("2023-06-30"))
+    wide = data.fundamental_panel(syms, field, dates, ttm=True)
+    for d in dates[::15]:
+        want = data.fundamental_ttm(syms, field, d).reindex(syms)
+        np.testing.assert_allclose(wide.loc[d].to_numpy(float), want.to_numpy(float))
+
+    # 上年同期晚于本期披露: 凑齐前为 NaN, 凑齐后才出 TTM
+    rows = pd.DataFrame({
+        "symbol": "A", "report_type": "official",
+        "report_period": pd.to_datetime(["2022-06-30", "2022-12-31", "2023-06-30"]),
+        "announce_date": pd.to_datetime(["2023-08-10", "2023-03-30", "2023-08-01"]),
+        "fiscal_year": [2022, 2022, 2023], "fiscal_quarter": [2, 4, 2],
+        field: [40.0, 100.0, 50.0],
+    })
+    rows["available_at"] = rows["announce_date"] + pd.Timedelta(hours=9, minutes=30)
+    probe = pd.DatetimeIndex(["2023-08-05", "2023-08-11"])
+    got = PITIndex.build(ttm_frame(rows, field)).panel(f"{field}_ttm", probe, ["A"], skipna=False)
+    want = [ttm_value(rows, field, d, ["A"]).iloc[0] for d in probe]
+    np.testing.assert_allclose(got["A"].to_numpy(), want)
+    assert np.isnan(want[0]) and want[1] == 110.0
+
+    # 上年年报重述: 重述可见前沿用原值, 可见后换新值(不等到重述才出 TTM)
+    rows = pd.DataFrame({
+        "symbol": "A", "report_type": "official",
+        "report_period": pd.to_datetime(["2023-03-31", "2023-12-31", "2023-12-31",
+                                         "2024-03-31"]),
+        "announce_date": pd.to_datetime(["2023-04-20", "2024-03-30", "2024-06-01",
+                                         "2024-04-25"]),
+        "fiscal_year": [2023, 2023, 2023, 2024], "fiscal_quarter": [1, 4, 4, 1],
+        field: [10.0, 50.0, 55.0, 12.0],
+    })
+    rows["available_at"] = rows["announce_date"] + pd.Timedelta(hours=9, minutes=30)
+    probe = pd.DatetimeIndex(["2024-04-01", "2024-05-10", "2024-06-03"])
+    got = PITIndex.build(ttm_frame(rows, field)).panel(f"{field}_ttm", probe, ["A"], skipna=False)
+    want = [ttm_value(rows, field, d, ["A"]).iloc[0] for d in probe]
+    np.testing.assert_allclose(got["A"].to_numpy(), want)
+    assert want == [50.0, 52.0, 57.0]
+
+
+def test_pit_panel_lookback_falls_back_to_record_in_window():
+    """最优记录出窗时退回窗口内排名次之的记录, 与逐日按窗口取数查询一致."""
+    from qlab.data.fundamentals import PITIndex, latest_fundamental_as_of
+
+    rows = pd.DataFrame({
+        "symbol": ["A", "A", "B"], "report_type": "official",
+        "report_period": pd.to_datetime(["2023-06-30", "2022-12-31", "2023-06-30"]),
+        "announce_date": pd.to_datetime(["2023-08-01", "2024-03-05", "2023-08-01"]),
+        "net_profit": [50.0, 80.0, 7.0],
+    })
+    rows["available_at"] = rows["announce_date"] + pd.Timedelta(hours=9, minutes=30)
+    probe = pd.DatetimeIndex(["2023-09-01", "2024-03-10", "2024-06-01"])
+    got = PITIndex.build(rows).panel("net_profit", probe, ["A", "B"], lookback_days=90)
+    for d in probe:
+        cutoff = (d - pd.Timedelta(days=90)).to_period("M").start_time
+        window = rows[rows["announce_date"] >= cutoff]
+        want = latest_fundamental_as_of(window, "net_profit", d, ["A", "B"])
+        np.testing.assert_array_equal(got.loc[d].to_numpy(float),
+                                      want.reindex(["A", "B"]).to_numpy(float))
+    assert got.loc["2024-06-01", "A"] == 80.0 and np.isnan(got.loc["2024-06-01", "B"])
+
+
+def test_data_session_coalesces_overlapping_requests(monkeypatch):
+    from qlab.data import DataLayer
+    from qlab.data.sources import FakeDataSource
+
+    data = DataLayer(source=FakeDataSource(seed=1, n_symbols=5))
+    syms = data.universe("csi500", "2023-01-01", "2023-06-30").all_symbols()
+    plain = data.daily(syms, "2023-03-01", "2023-04-30", validate=False)
+    plain_cols = data.daily(syms[:2], "2023-04-01", "2023-04-30", columns=["close", "volume"])
+
+    reads = []
+    orig = data.bar_store.get_range
+    monkeypatch.setattr(data.bar_store, "get_range", lambda **k: reads.append(k) or orig(**k))
+    with data.session() as sess:
+        data.reserve_daily(syms, "2023-02-01", "2023-04-30")
+        got = data.daily(syms, "2023-03-01", "2023-04-30", columns=["close"])
+        got_cols = data.daily(syms[:2], "2023-04-01", "2023-04-30", columns=["close", "volume"])
+        full = data.daily(syms, "2023-03-01", "2023-04-30")
+        again = data.daily(syms, "2023-03-15", "2023-04-30")
+        with data.session() as inner:
+            assert inner is sess
+    assert data._session is None
+
+    pd.testing.assert_frame_equal(got, plain[["close"]])
+    pd.testing.assert_frame_equal(got_cols, plain_cols)
+    pd.testing.assert_frame_equal(full, plain)
+    assert len(again) < len(full)
+    # 预登记窗口一次取齐: close → +volume 补列 → 全列重读, 之后全命中
+    assert [r["columns"] for r in reads] == [["close"], ["volume"], None]
+    assert reads[0]["start"] == pd.Timestamp("2023-02-01")
+    stats = sess.stats()
+    assert stats["hits"] == 1 and stats["store_reads"] == 3
+    assert stats["by_kind"]["daily"]["misses"] == 3
+
+
 # ---- features --------------------------------------------------------------
 
 def test_feature_registry():
@@ -85,6 +344,29 @@ def test_build_feature_matrix():
     assert X.entry_timing == "open"
 
 
+def test_build_feature_matrix_reserves_only_for_cache_misses(monkeypatch):
+    from qlab.data import DataLayer
+    from qlab.data.sources import FakeDataSource
+    from qlab.features import build_feature_matrix
+    from qlab.features.library import Momentum, RealizedVol
+    from qlab.features.store import InMemoryFeatureStore
+
+    data = DataLayer(source=FakeDataSource(seed=1, n_symbols=5))
+    universe = data.universe("csi500", "2023-01-01", "2023-06-30")
+    store = InMemoryFeatureStore()
+    kw = dict(data=data, universe=universe, date_range=("2023-03-01", "2023-06-30"),
+              feature_store=store)
+    build_feature_matrix(features=[RealizedVol(60)], **kw)
+
+    reserved = []
+    monkeypatch.setattr(data, "reserve_daily", lambda syms, start, end: reserved.append(start))
+    build_feature_matrix(features=[RealizedVol(60)], **kw)
+    assert reserved == []  # 全部命中特征缓存, 不预登记日线窗口
+    build_feature_matrix(features=[RealizedVol(60), Momentum(5)], **kw)
+    assert reserved == [data.calendar.prev_trading_day(pd.Timestamp("2023-03-01"),
+                                                       Momentum(5).meta.lookback_days)]
+
+
 def test_feature_entry_timing_alignment():
     """open 入场: today_close/next_open 移一日, today_open 不动."""
     from qlab.core.enums import EntryTiming
@@ -338,6 +620,103 @@ def test_pit_blocks_same_day_close_leak_on_open_entry():
     assert float(Xt2["auction_like"].iloc[0]) == 102.5
 
 
+def test_intraday_reducers_match_callback_path():
+    """向量化 reducer 与逐窗口回调结果一致, 且整段日内数据只加载一次."""
+    from qlab.core.enums import Freq
+    from qlab.data import DataLayer
+    from qlab.data.alignment import IntradayAligner
+    from qlab.data.sources import FakeDataSource
+    from qlab.features.library.intraday import _compute_vol_slope, _vol_slope_windows
+
+    src = FakeDataSource(seed=3, n_symbols=6)
+    layer = DataLayer(src)
+    syms = src.all_symbols[:4]
+    dates = layer.calendar.trading_days(pd.Timestamp("2023-03-01"), pd.Timestamp("2023-03-31"))
+    calls = []
+
+    def loader(symbols, start, end):
+        calls.append((start, end))
+        return layer.intraday(symbols, start, end, freq=Freq.MIN_30, validate=False)
+
+    aligner = IntradayAligner(loader, layer.calendar)
+    for lookback in (2, 5):
+        calls.clear()
+        fast = aligner.apply_rolling(_compute_vol_slope, syms, dates, lookback,
+                                     reducer=_vol_slope_windows)
+        assert len(calls) == 1
+        slow = aligner.apply_rolling(_compute_vol_slope, syms, dates, lookback)
+        assert fast.notna().any()
+        pd.testing.assert_series_equal(fast, slow, rtol=1e-6, atol=1e-12)
+
+    # 缺价时 vol-slope reducer 放弃, 回退到回调路径
+    bars = layer.intraday(syms, dates[0], dates[-1], freq=Freq.MIN_30, validate=False).copy()
+    bars.iloc[3, bars.columns.get_loc("close")] = np.nan
+    static = IntradayAligner(bars, layer.calendar)
+    windows = static.windows(syms, dates, 5)
+    assert _vol_slope_windows(windows) is None
+    pd.testing.assert_series_equal(
+        static.apply_rolling(_compute_vol_slope, syms, dates, 5, reducer=_vol_slope_windows),
+        static.apply_rolling(_compute_vol_slope, syms, dates, 5),
+    )
+
+
+def test_intraday_cube_layout_and_morning_return():
+    """立方体与长表逐格一致、槽位时段来自日历; MorningReturn 的轴归约 ≡ 逐窗口回调."""
+    from qlab.core.enums import Freq
+    from qlab.data import DataLayer, IntradayCube
+    from qlab.data.sources import FakeDataSource
+    from qlab.data.universe import Universe, UniverseSpec
+    from qlab.features.context import FeatureContext
+    from qlab.features.library.intraday import MorningReturn, _morning_return
+
+    src = FakeDataSource(seed=5, n_symbols=5)
+    layer = DataLayer(src)
+    syms = src.all_symbols[:3]
+    days = layer.calendar.trading_days(pd.Timestamp("2023-03-01"), pd.Timestamp("2023-03-15"))
+    long = layer.intraday(syms, days[0], days[-1], freq=Freq.MIN_30, validate=False)
+    long = long.drop(long.index[5])  # 一个缺 bar(停牌槽位)
+
+    cube = IntradayCube.from_long(long, ["close", "volume"], layer.calendar)
+    assert cube.shape == (len(days), 8, len(syms))
+    assert list(cube.sessions) == ["morning"] * 4 + ["afternoon"] * 4
+    assert np.isnan(cube["close"]).sum() == 1
+    ts = long.index.get_level_values("timestamp")
+    back = cube["close"][
+        cube.days.get_indexer(ts.normalize()),
+        cube.slots.get_indexer(ts - ts.normalize()),
+        cube.symbols.get_indexer(long.index.get_level_values("symbol")),
+    ]
+    np.testing.assert_array_equal(back, long["close"].to_numpy())
+    assert cube.nbytes < long[["close", "volume"]].memory_usage(index=True).sum()
+    with pytest.raises(ValueError):
+        cube["close"][0, 0, 0] = 1.0
+
+    idx = pd.MultiIndex.from_product([days, syms], names=["date", "symbol"])
+    uni = Universe(pd.DataFrame({"in_universe": True, "weight": 1.0}, index=idx),
+                   UniverseSpec("probe"))
+    ctx = FeatureContext(data=layer, target_dates=days, universe=uni, calendar=layer.calendar)
+    got = MorningReturn().compute(ctx)
+    ref = ctx.intraday_rolling(_morning_return, lookback_days=1).rename("morning_return")
+    pd.testing.assert_series_equal(got, ref)
+    assert layer.intraday_cube(syms, days[0], days[-1], ["close"]) is not None
+
+
+def test_intraday_cube_close_auction_slots():
+    """1m 槽位 14:58/15:00 归尾盘集竞(schema 时段), session_mask 可取."""
+    from qlab.core.calendar import get_default_calendar
+    from qlab.data import IntradayCube
+
+    cal = get_default_calendar()
+    day = pd.Timestamp("2023-03-01")
+    ts = day + pd.to_timedelta(["09:25:00", "09:31:00", "11:30:00", "13:01:00",
+                                "14:57:00", "14:58:00", "15:00:00"])
+    idx = pd.MultiIndex.from_product([ts, ["A"]], names=["timestamp", "symbol"])
+    cube = IntradayCube.from_long(pd.DataFrame({"close": 1.0}, index=idx), ["close"], cal)
+    assert list(cube.sessions) == ["open_auction", "morning", "morning", "afternoon",
+                                   "afternoon", "close_auction", "close_auction"]
+    assert cube.session_mask("close_auction").sum() == 2
+
+
 # ---- labeling --------------------------------------------------------------
 
 def test_four_piece_stack_stage_smooth_newhigh():
@@ -1007,6 +1386,148 @@ def test_concept_query():
     assert "B" in members
 
 
+def test_membership_intervals_expand_like_per_date_queries():
+    from qlab.data.concept import concept_intervals, concepts_as_of, expand_concepts
+    from qlab.data.industry import expand_industry, industry_as_of, industry_intervals
+
+    ind = pd.DataFrame({
+        "date": pd.to_datetime(["2023-01-01", "2023-02-01", "2023-03-01", "2023-01-15", "2023-04-01"]),
+        "symbol": ["A", "A", "A", "B", "B"], "system": "sw", "level": 1,
+        "industry_code": ["X", "X", "Y", "Z", "X"], "industry_name": "n",
+    })
+    iv = industry_intervals(ind)
+    assert len(iv) == 4  # A 的两次 X 快照并成一段
+    con = pd.DataFrame({
+        "effective_date": pd.to_datetime(["2023-01-01", "2023-02-01", "2023-01-10"]),
+        "symbol": ["A", "A", "B"], "source": "eastmoney",
+        "concept_code": ["BK01", "BK02", "BK01"], "concept_name": "n",
+        "expired_date": pd.to_datetime(["2023-03-01", None, "2023-01-20"]),
+    })
+    dates = pd.date_range("2022-12-30", "2023-04-03")
+    wide = expand_industry(iv, dates, ["A", "B", "C"])
+    long = expand_concepts(concept_intervals(con), dates, ["A", "B"])
+    for d in dates:
+        want = industry_as_of(ind, ["A", "B", "C"], d)
+        assert [None if pd.isna(v) else v for v in want] == list(wide.loc[d])
+        want = concepts_as_of(con, ["A", "B"], d).sort_values(["symbol", "concept_code"])
+        got = long[long["date"] == d]
+        assert list(zip(want["symbol"], want["concept_code"], strict=True)) == \
+            list(zip(got["symbol"], got["concept_code"], strict=True))
+
+
+def test_feature_context_membership_without_per_date_queries(monkeypatch):
+    from qlab.data import DataLayer
+    from qlab.data.sources import FakeDataSource
+    from qlab.features.context import FeatureContext
+
+    data = DataLayer(source=FakeDataSource(seed=1, n_symbols=5))
+    uni = data.universe("csi500", "2023-01-01", "2023-03-31")
+    days = data.calendar.trading_days(pd.Timestamp("2023-03-01"), pd.Timestamp("2023-03-31"))
+    ctx = FeatureContext(data=data, target_dates=days, universe=uni, calendar=data.calendar)
+    monkeypatch.setattr(data, "industry", lambda *a, **k: pytest.fail("逐日查询"))
+    monkeypatch.setattr(data, "concepts", lambda *a, **k: pytest.fail("逐日查询"))
+    ind = ctx.industry()
+    assert len(ind) == len(days) * len(uni.all_symbols()) and ind.notna().all()
+    con = ctx.concepts()
+    assert set(con["date"]) == set(days) and set(con["symbol"]) <= set(uni.all_symbols())
+
+
+def test_sampled_membership_refined_to_exact_change_days():
+    """月采样 + 单点查询的数据源(如聚宽): 月中变更二分到确切交易日, 同逐日查询."""
+    from qlab.data import DataLayer
+    from qlab.data.sources import FakeDataSource
+    from qlab.features.context import FeatureContext
+
+    moved, joined, left = (pd.Timestamp(d) for d in ("2023-02-15", "2023-01-18", "2023-03-09"))
+
+    class SampledSource(FakeDataSource):
+        asof_calls = 0
+
+        def _industry_rows(self, symbols, days, system, level):
+            return pd.DataFrame([
+                {"date": d, "symbol": s, "system": system, "level": level,
+                 "industry_code": "801080" if s == self.all_symbols[0] and d >= moved
+                 else "801010",
+                 "industry_name": "n", "parent_code": None}
+                for d in days for s in symbols
+            ]).set_index(["date", "symbol", "system"])
+
+        def _concept_rows(self, symbols, days, source):
+            rows = [{"effective_date": d, "symbol": s, "source": source, "concept_code": "BK0001",
+                     "concept_name": "n", "expired_date": pd.NaT}
+                    for d in days for s in symbols if s != self.all_symbols[0] or joined <= d < left]
+            return pd.DataFrame(rows, columns=["effective_date", "symbol", "source", "concept_code",
+                                               "concept_name", "expired_date"]) \
+                .set_index(["effective_date", "symbol", "source"])
+
+        def _samples(self, date_range):
+            days = self.fetch_calendar().trading_days(*date_range)
+            return days[~days.to_period("M").duplicated()]
+
+        def fetch_industry_classification(self, symbols, date_range, system="sw", level=1):
+            return self._industry_rows(symbols, self._samples(date_range), system, level)
+
+        def industry_asof(self, symbols, date, system="sw", level=1):
+            SampledSource.asof_calls += 1
+            return self._industry_rows(symbols, [pd.Timestamp(date)], system, level)
+
+        def fetch_concepts(self, symbols, date_range, source="eastmoney"):
+            # 采样点连续出现的合成一段, 终点为首个未出现的采样点
+            samples = self._samples(date_range)
+            raw = self._concept_rows(symbols, samples, source).reset_index()
+            first, last = raw.groupby("symbol")["effective_date"].agg(["min", "max"]).T.to_numpy()
+            after = [samples[samples > d][0] if (samples > d).any() else pd.NaT for d in last]
+            return pd.DataFrame({
+                "effective_date": first, "symbol": sorted(set(raw["symbol"])), "source": source,
+                "concept_code": "BK0001", "concept_name": "n", "expired_date": after,
+            }).set_index(["effective_date", "symbol", "source"])
+
+        def concepts_asof(self, symbols, date, source="eastmoney"):
+            SampledSource.asof_calls += 1
+            d = pd.Timestamp(date)
+            return self._concept_rows(symbols, [d], source)
+
+    data = DataLayer(source=SampledSource(seed=1, n_symbols=3))
+    syms = data.source.all_symbols
+    days = data.calendar.trading_days(pd.Timestamp("2023-01-03"), pd.Timestamp("2023-04-28"))
+    wide = data.industry_matrix(days, syms)
+    assert SampledSource.asof_calls <= 10  # 二分, 不是逐日
+    for d in days:
+        assert list(wide.loc[d]) == list(data.industry(syms, d).reindex(syms))
+    assert wide.loc[moved, syms[0]] == "801080"
+    assert wide.loc[data.calendar.prev_trading_day(moved), syms[0]] == "801010"
+
+    ctx = FeatureContext(data=data, target_dates=days, universe=data.universe(
+        "csi500", "2023-01-01", "2023-04-30"), calendar=data.calendar)
+    con = ctx.concepts(source="eastmoney")
+    got = set(con.loc[con["symbol"] == syms[0], "date"])
+    assert got == {d for d in days if joined <= d < left}
+
+
+def test_industry_matrix_looks_back_for_change_event_sources():
+    """只给变更事件的数据源: 缺省回看 5 年, 起点前的最后一次变更仍生效."""
+    from qlab.data import DataLayer
+    from qlab.data.sources import FakeDataSource
+
+    class EventSource(FakeDataSource):
+        classification_sampled = False
+
+        def fetch_industry_classification(self, symbols, date_range, system="sw", level=1):
+            change = pd.Timestamp("2020-05-11")
+            rows = [{"date": change, "symbol": s, "system": system, "level": level,
+                     "industry_code": "801080", "industry_name": "电子", "parent_code": None}
+                    for s in symbols if date_range[0] <= change <= date_range[1]]
+            return pd.DataFrame(rows, columns=["date", "symbol", "system", "level",
+                                               "industry_code", "industry_name",
+                                               "parent_code"])
+
+    data = DataLayer(source=EventSource(seed=1, n_symbols=2))
+    syms = data.source.all_symbols
+    days = pd.DatetimeIndex(["2023-03-01", "2023-03-02"])
+    assert (data.industry_matrix(days, syms) == "801080").all().all()
+    assert data.industry_matrix(days, syms, lookback_days=0).isna().all().all()
+
+
 # ---- workspace -------------------------------------------------------------
 
 def test_workspace_create_remove(tmp_path):
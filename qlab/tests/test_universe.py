@@ -65,3 +65,35 @@ def test_index_universe_members_can_differ_by_day_on_fake():
     m1 = set(uni.members(d1))
     assert m0 == m1  # Fake 简化为固定成分
     assert 0 < len(m0) <= 50
+
+
+def test_membership_matrix_queries_match_frame():
+    from qlab.data.universe import Universe
+
+    idx = pd.MultiIndex.from_product(
+        [pd.to_datetime(["2023-01-03", "2023-01-04"]), ["A", "B", "C"]], names=["date", "symbol"])
+    df = pd.DataFrame({
+        "in_universe": [True, True, False, True, False, True],
+        "weight": [0.5, 0.5, None, 0.25, None, 0.75],
+    }, index=idx)
+    uni = Universe(df, UniverseSpec("custom"))
+
+    assert uni.members("2023-01-03") == ["A", "B"]
+    assert uni.members("2023-01-05") == []
+    assert uni.is_member("2023-01-04", "C") and not uni.is_member("2023-01-04", "B")
+    assert not uni.is_member("2023-01-04", "Z")
+    assert uni.weights("2023-01-04").to_dict() == {"A": 0.25, "C": 0.75}
+
+    panel = uni.members_panel()
+    assert panel.shape == (2, 3) and panel.to_numpy().sum() == 4
+    probe = pd.MultiIndex.from_tuples(
+        [(pd.Timestamp("2023-01-03"), "B"), (pd.Timestamp("2023-01-04"), "B"),
+         (pd.Timestamp("2023-01-09"), "A"), (pd.Timestamp("2023-01-03"), "Z")])
+    assert uni.mask_for(probe).tolist() == [True, False, False, False]
+
+    # 求交后权重按日重新归一
+    keep = pd.Series([True, False, True], index=idx[[0, 1, 5]])
+    sub = uni.intersect(keep)
+    assert sub.members("2023-01-03") == ["A"] and sub.members("2023-01-04") == ["C"]
+    assert sub.weights("2023-01-03").to_dict() == {"A": 1.0}
+    assert sub.name == "custom|filtered"